@@ -16,7 +16,6 @@ BuildRequires:  python3-wheel
 Requires:       python3
 Requires:       python3-click >= 8.0.0
 Requires:       python3-rich >= 13.0.0
-Requires:       python3-requests >= 2.28.0
 Requires:       python3-keyring >= 24.0.0
 Requires:       python3-openai >= 1.0.0
 Requires:       python3-cryptography >= 3.4.0
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for CmdRx.
+
+Measures the cold start of the cmdrx entry point with `python -X importtime`
+for the paths shell hooks hit most:
+
+1. `cmdrx --version`
+2. Piped input handed to a running cmdrxd daemon (a stub daemon is started
+   on a temporary socket, so no LLM or configuration is needed)
+
+Each scenario is run several times and the best run is used. Times are
+reported on top of a bare interpreter (`python -c pass`), so site-packages
+startup hooks do not count against cmdrx. Exits with status 1 if a scenario
+exceeds its import time threshold or imports a heavy module (openai, rich,
+keyring, the analysis core).
+
+Usage:
+    python scripts/startup_benchmark.py [--runs 5] [--max-version-ms 75] [--max-piped-ms 90]
+"""
+
+import argparse
+import os
+import re
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from cmdrx.client import SOCKET_ENV, read_message, send_message  # noqa: E402
+
+# Modules that must not be imported on the fast paths
+HEAVY_MODULES = ("openai", "anthropic", "rich", "keyring", "cmdrx.core", "cmdrx.llm")
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$")
+
+ENTRY_POINT = "from cmdrx.cli import main; main()"
+
+
+class StubHandler(socketserver.StreamRequestHandler):
+    """Answers analysis requests like cmdrxd without doing any work."""
+
+    def handle(self):
+        message = read_message(self.rfile)
+        if message and message.get("mode") == "piped":
+            while message and message.get("type") != "end":
+                message = read_message(self.rfile)
+        send_message(self.wfile, {"type": "output", "text": "ok\n"})
+        send_message(self.wfile, {"type": "exit", "code": 0})
+
+
+def measure(args, stdin=None, env=None, code=ENTRY_POINT):
+    """Run the entry point once and return (import ms, wall ms, imported modules)."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code] + args,
+        input=stdin,
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    if result.returncode != 0:
+        print(f"❌ cmdrx {' '.join(args)} failed:\n{result.stdout}{result.stderr}")
+        sys.exit(1)
+
+    total_us = 0
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), match.group(3), match.group(4)
+        modules[name] = cumulative
+        if len(indent) == 1:
+            total_us += cumulative
+
+    return total_us / 1000, wall_ms, modules
+
+
+def baseline(runs, env):
+    """Best import and wall time of a bare interpreter."""
+    samples = [measure([], env=env, code="pass") for _ in range(runs)]
+    return (
+        min(sample[0] for sample in samples),
+        min(sample[1] for sample in samples),
+        set(samples[-1][2]),
+    )
+
+
+def run_scenario(name, args, threshold_ms, runs, base, stdin=None, env=None):
+    """Measure one scenario and report whether it is within its threshold."""
+    samples = [measure(args, stdin, env) for _ in range(runs)]
+    import_ms = min(sample[0] for sample in samples) - base[0]
+    wall_ms = min(sample[1] for sample in samples) - base[1]
+    modules = {m: us for m, us in samples[-1][2].items() if m not in base[2]}
+
+    heavy = sorted(m for m in modules if m.split(".")[0] in HEAVY_MODULES or m in HEAVY_MODULES)
+    ok = import_ms <= threshold_ms and not heavy
+
+    print(f"\n{'✅' if ok else '❌'} {name}")
+    print(f"   imports: +{import_ms:.1f} ms (threshold {threshold_ms:.0f} ms), wall: +{wall_ms:.1f} ms")
+    top = sorted(
+        ((us, m) for m, us in modules.items() if "." not in m),
+        reverse=True
+    )[:5]
+    print("   slowest: " + ", ".join(f"{m} {us / 1000:.1f} ms" for us, m in top))
+    if heavy:
+        print(f"   heavy modules imported: {', '.join(heavy)}")
+
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cmdrx cold start")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per scenario (the best is used)")
+    parser.add_argument("--max-version-ms", type=float, default=75, help="Import budget for --version")
+    parser.add_argument("--max-piped-ms", type=float, default=90, help="Import budget for piped mode")
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = os.path.join(tmp, "cmdrxd.sock")
+        server = socketserver.ThreadingUnixStreamServer(socket_path, StubHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        env = dict(os.environ, **{SOCKET_ENV: socket_path})
+        env.pop("CMDRX_NO_DAEMON", None)
+        env["PYTHONPATH"] = os.pathsep.join(
+            filter(None, [str(Path(__file__).resolve().parent.parent / "src"), env.get("PYTHONPATH")])
+        )
+
+        base = baseline(options.runs, env)
+        print(f"Bare interpreter: {base[0]:.1f} ms imports, {base[1]:.1f} ms wall")
+
+        results = [
+            run_scenario("cmdrx --version", ["--version"], options.max_version_ms, options.runs, base, env=env),
+            run_scenario(
+                "piped input via cmdrxd", [], options.max_piped_ms, options.runs, base,
+                stdin="error: disk full\n" * 100, env=env
+            ),
+        ]
+        server.shutdown()
+
+    if not all(results):
+        print("\n❌ Startup regressed")
+        sys.exit(1)
+    print("\n✅ Startup within budget")
+
+
+if __name__ == "__main__":
+    main()
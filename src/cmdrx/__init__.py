@@ -5,12 +5,35 @@ A command line utility that analyzes CLI command outputs and provides
 troubleshooting steps and suggested fixes using AI/LLM services.
 """
 
+from typing import Any, List
+
 __version__ = "0.2.1"
 __author__ = "CmdRx Team"
 __email__ = "team@cmdrx.dev"
 
-from .core import CmdRxCore
-from .config import ConfigManager
-from .llm import LLMProvider
+__all__ = [
+    "AnalysisResult", "ArtifactSink", "CmdRxCore", "ConfigManager", "ConsoleSink", "LLMProvider"
+]
+
+# Public classes are imported on first access so that importing the package
+# (and therefore starting the CLI) does not load openai, keyring and rich
+_LAZY_ATTRIBUTES = {
+    "AnalysisResult": ".result",
+    "ArtifactSink": ".result",
+    "ConsoleSink": ".result",
+    "CmdRxCore": ".core",
+    "ConfigManager": ".config",
+    "LLMProvider": ".llm",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_ATTRIBUTES:
+        import importlib
+        module = importlib.import_module(_LAZY_ATTRIBUTES[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-__all__ = ["CmdRxCore", "ConfigManager", "LLMProvider"]
\ No newline at end of file
+def __dir__() -> List[str]:
+    return sorted(list(globals()) + list(_LAZY_ATTRIBUTES))
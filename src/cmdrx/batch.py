@@ -0,0 +1,274 @@
+"""
+CmdRx Batch Mode
+
+Runs many diagnostics or captured outputs through CmdRx with bounded parallelism.
+"""
+
+import json
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional, Tuple, TYPE_CHECKING
+
+from .exceptions import InputError
+from .execution import execute
+from .files import artifact_id, atomic_write
+
+if TYPE_CHECKING:
+    from .core import CmdRxCore
+
+
+@dataclass
+class BatchItem:
+    """A single command or captured output to analyze."""
+    command: str
+    output: Optional[str] = None
+    return_code: Optional[int] = None
+    source: str = ""
+
+
+@dataclass
+class BatchResult:
+    """Outcome of analyzing one batch item."""
+    item: BatchItem
+    status: str = "pending"
+    issues: int = 0
+    log_file: Optional[Path] = None
+    fix_script: Optional[Path] = None
+    record_id: Optional[int] = None
+    response_time: float = 0.0
+    cached: bool = False
+    error: Optional[str] = None
+
+
+def load_manifest(path: Path) -> List[BatchItem]:
+    """
+    Load commands from a manifest file.
+
+    The manifest contains one shell command per line. Blank lines and lines
+    starting with '#' are ignored.
+
+    Args:
+        path: Manifest file path
+
+    Returns:
+        Batch items to execute
+    """
+    try:
+        lines = path.read_text(encoding='utf-8').splitlines()
+    except OSError as e:
+        raise InputError(f"Failed to read manifest '{path}': {e}")
+
+    items = []
+    for line_number, line in enumerate(lines, 1):
+        command = line.strip()
+        if command and not command.startswith('#'):
+            items.append(BatchItem(command=command, source=f"{path.name}:{line_number}"))
+    return items
+
+
+def load_captures(directory: Path) -> List[BatchItem]:
+    """
+    Load previously captured outputs from a directory.
+
+    Every regular file is treated as the output of one command; the file name
+    is used as the command name.
+
+    Args:
+        directory: Directory containing captured output files
+
+    Returns:
+        Batch items to analyze
+    """
+    if not directory.is_dir():
+        raise InputError(f"Capture directory not found: {directory}")
+
+    items = []
+    for path in sorted(directory.iterdir()):
+        if not path.is_file() or path.name.startswith('.'):
+            continue
+        try:
+            output = path.read_text(encoding='utf-8', errors='replace')
+        except OSError as e:
+            raise InputError(f"Failed to read capture '{path}': {e}")
+        items.append(BatchItem(command=f"<capture {path.name}>", output=output, source=str(path)))
+    return items
+
+
+def run_command(command: str, timeout: int) -> Tuple[str, Optional[int]]:
+    """
+    Execute a shell command and capture its combined output.
+
+    Args:
+        command: Shell command to run
+        timeout: Timeout in seconds
+
+    Returns:
+        Timestamped stdout/stderr lines and the return code (None on timeout)
+    """
+    result = execute(command, timeout=timeout, tee=False)
+    try:
+        return result.text(), None if result.timed_out else result.return_code
+    finally:
+        result.close()
+
+
+class BatchRunner:
+    """
+    Runs batch items through a command execution pool and an LLM worker pool.
+
+    Commands are executed concurrently as child processes; each finished
+    output is handed straight to a bounded pool of analysis workers, so
+    execution and analysis overlap.
+    """
+
+    def __init__(
+        self,
+        core: 'CmdRxCore',
+        exec_workers: int = 8,
+        llm_workers: int = 4,
+        command_timeout: int = 30
+    ):
+        """
+        Initialize batch runner.
+
+        Args:
+            core: CmdRx core used for analysis
+            exec_workers: Maximum number of commands executing at once
+            llm_workers: Maximum number of concurrent LLM requests
+            command_timeout: Per-command timeout in seconds
+        """
+        self.core = core
+        self.exec_workers = max(1, exec_workers)
+        self.llm_workers = max(1, llm_workers)
+        self.command_timeout = command_timeout
+
+    def run(
+        self,
+        items: List[BatchItem],
+        on_result: Optional[Callable[[BatchResult], None]] = None
+    ) -> List[BatchResult]:
+        """
+        Execute and analyze all items.
+
+        Args:
+            items: Batch items to process
+            on_result: Called as each item finishes
+
+        Returns:
+            Results in the same order as items
+        """
+        results = [BatchResult(item=item) for item in items]
+
+        with ThreadPoolExecutor(self.exec_workers, thread_name_prefix="cmdrx-exec") as exec_pool, \
+             ThreadPoolExecutor(self.llm_workers, thread_name_prefix="cmdrx-llm") as llm_pool:
+
+            exec_futures: Dict[Future, BatchResult] = {}
+            llm_futures: List[Future] = []
+
+            for result in results:
+                if result.item.output is None:
+                    future = exec_pool.submit(run_command, result.item.command, self.command_timeout)
+                    exec_futures[future] = result
+                else:
+                    llm_futures.append(llm_pool.submit(self._analyze, result, on_result))
+
+            for future in as_completed(exec_futures):
+                result = exec_futures[future]
+                try:
+                    result.item.output, result.item.return_code = future.result()
+                except Exception as e:
+                    self._fail(result, f"Execution failed: {e}", on_result)
+                    continue
+                llm_futures.append(llm_pool.submit(self._analyze, result, on_result))
+
+            for future in llm_futures:
+                future.result()
+
+        return results
+
+    def _analyze(
+        self,
+        result: BatchResult,
+        on_result: Optional[Callable[[BatchResult], None]]
+    ) -> None:
+        """Analyze one item, recording failures on the result instead of raising."""
+        item = result.item
+
+        if not item.output or not item.output.strip():
+            result.status = "skipped"
+            result.error = "No output to analyze"
+            if on_result:
+                on_result(result)
+            return
+
+        start_time = time.time()
+        try:
+            analysis = self.core.analyze_quiet(item.command, item.output, item.return_code)
+        except Exception as e:
+            self._fail(result, str(e), on_result)
+            return
+
+        analysis_data = analysis['analysis']
+        result.status = analysis_data.get('status', 'info')
+        result.issues = len(analysis_data.get('issues', []) or [])
+        result.log_file = analysis['log_file']
+        result.fix_script = analysis['fix_script']
+        result.record_id = analysis.get('record_id')
+        result.cached = analysis['llm_response'].cached
+        result.response_time = time.time() - start_time
+
+        if on_result:
+            on_result(result)
+
+    def _fail(
+        self,
+        result: BatchResult,
+        error: str,
+        on_result: Optional[Callable[[BatchResult], None]]
+    ) -> None:
+        """Mark a result as failed."""
+        result.status = "failed"
+        result.error = error
+        if on_result:
+            on_result(result)
+
+
+def write_summary(results: List[BatchResult], log_dir: Path, fsync: str = 'off') -> Path:
+    """
+    Write a JSON summary of a batch run to the log directory.
+
+    Args:
+        results: Batch results
+        log_dir: Directory for output files
+        fsync: Flush the file to disk: 'off', 'file' or 'full'
+
+    Returns:
+        Path of the summary file
+    """
+    summary_file = log_dir / f"cmdrx_batch_{artifact_id()}.json"
+
+    summary: Dict[str, Any] = {
+        'timestamp': datetime.now().isoformat(),
+        'total': len(results),
+        'results': [
+            {
+                'command': result.item.command,
+                'source': result.item.source,
+                'return_code': result.item.return_code,
+                'status': result.status,
+                'issues': result.issues,
+                'log_file': str(result.log_file) if result.log_file else None,
+                'fix_script': str(result.fix_script) if result.fix_script else None,
+                'record_id': result.record_id,
+                'response_time': round(result.response_time, 3),
+                'cached': result.cached,
+                'error': result.error,
+            }
+            for result in results
+        ],
+    }
+
+    return atomic_write(summary_file, json.dumps(summary, indent=2), fsync=fsync)
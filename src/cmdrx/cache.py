@@ -0,0 +1,261 @@
+"""
+CmdRx Response Cache
+
+Persistent, content-addressed cache for LLM responses with TTL and LRU eviction.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional
+
+
+class ResponseCache:
+    """
+    On-disk LLM response cache shared by all local cmdrx processes.
+
+    Entries are keyed by provider, model and a hash of the normalized prompt.
+    The cache is stored in a SQLite database in WAL mode so that concurrent
+    processes can read and write it safely.
+    """
+
+    SCHEMA_VERSION = 1
+    DB_FILE = "responses.db"
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        ttl: int = 86400,
+        max_entries: int = 1000,
+        max_bytes: int = 50 * 1024 * 1024
+    ):
+        """
+        Initialize response cache.
+
+        Args:
+            cache_dir: Directory holding the cache database
+            ttl: Entry lifetime in seconds (0 disables expiry)
+            max_entries: Maximum number of cached responses
+            max_bytes: Maximum total size of cached response content
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.cache_dir / self.DB_FILE
+        self._init_db()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['ResponseCache']:
+        """
+        Create a cache from configuration.
+
+        Args:
+            config: CmdRx configuration dictionary
+
+        Returns:
+            Response cache, or None if caching is disabled or unavailable
+        """
+        if not config.get('cache_enabled', True):
+            return None
+
+        try:
+            return cls(
+                cache_dir=Path(config.get('cache_directory', '~/.cache/cmdrx')).expanduser(),
+                ttl=int(config.get('cache_ttl', 86400)),
+                max_entries=int(config.get('cache_max_entries', 1000)),
+                max_bytes=int(config.get('cache_max_bytes', 50 * 1024 * 1024))
+            )
+        except (OSError, sqlite3.Error):
+            return None
+
+    @staticmethod
+    def normalize_prompt(prompt: str) -> str:
+        """Normalize prompt text so that insignificant whitespace does not change the key."""
+        lines = prompt.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+        return "\n".join(line.rstrip() for line in lines).strip()
+
+    @classmethod
+    def make_key(cls, provider: str, model: str, prompt: str, base_url: str = '') -> str:
+        """
+        Build the cache key for a request.
+
+        Args:
+            provider: LLM provider name
+            model: LLM model name
+            prompt: The analysis prompt
+            base_url: API endpoint, so different endpoints serving the same
+                model name do not share entries
+
+        Returns:
+            Hex digest identifying the request
+        """
+        digest = hashlib.sha256()
+        parts = (str(cls.SCHEMA_VERSION), provider, model, base_url.rstrip('/'), cls.normalize_prompt(prompt))
+        for part in parts:
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            Dictionary with content, model, usage and created_at, or None on miss
+        """
+        now = time.time()
+
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT content, model, usage, created_at FROM responses WHERE key = ?",
+                    (key,)
+                ).fetchone()
+
+                if row is None:
+                    return None
+
+                content, model, usage, created_at = row
+                if self.ttl and now - created_at > self.ttl:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    return None
+
+                conn.execute(
+                    "UPDATE responses SET last_access = ? WHERE key = ?",
+                    (now, key)
+                )
+        except sqlite3.Error:
+            return None
+
+        return {
+            'content': content,
+            'model': model,
+            'usage': json.loads(usage) if usage else None,
+            'created_at': created_at,
+        }
+
+    def put(
+        self,
+        key: str,
+        provider: str,
+        model: str,
+        content: str,
+        usage: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Store a response and evict old entries if limits are exceeded.
+
+        Args:
+            key: Cache key from make_key()
+            provider: LLM provider name
+            model: LLM model name
+            content: Response content
+            usage: Token usage reported by the provider
+        """
+        now = time.time()
+        size = len(content.encode('utf-8'))
+
+        if self.max_bytes and size > self.max_bytes:
+            return
+
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses "
+                    "(key, provider, model, content, usage, size, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, provider, model, content,
+                     json.dumps(usage) if usage else None, size, now, now)
+                )
+                self._evict(conn, now)
+        except sqlite3.Error:
+            pass
+
+    def clear(self) -> int:
+        """
+        Remove all cached responses.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM responses").rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Entry count and total content size
+        """
+        with self._connect() as conn:
+            count, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {'entries': count, 'bytes': total, 'path': str(self.db_path)}
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection to the cache database as a single transaction."""
+        conn = sqlite3.connect(str(self.db_path), timeout=10)
+        try:
+            conn.execute("PRAGMA busy_timeout = 10000")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self) -> None:
+        """Create the cache schema if needed."""
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, "
+                "provider TEXT NOT NULL, "
+                "model TEXT NOT NULL, "
+                "content TEXT NOT NULL, "
+                "usage TEXT, "
+                "size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, "
+                "last_access REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_last_access "
+                "ON responses (last_access)"
+            )
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Drop expired entries, then least recently used ones until within limits."""
+        if self.ttl:
+            conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+
+        if self.max_entries:
+            conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+        if self.max_bytes:
+            total = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()[0]
+            if total > self.max_bytes:
+                rows = conn.execute(
+                    "SELECT key, size FROM responses ORDER BY last_access ASC"
+                ).fetchall()
+                for key, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    total -= size
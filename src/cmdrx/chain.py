@@ -0,0 +1,504 @@
+"""
+CmdRx Provider Chain
+
+Ordered multi-provider failover and hedged requests across LLM providers.
+"""
+
+import asyncio
+import fcntl
+import json
+import math
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+from .exceptions import ConfigurationError, LLMError
+from .llm import LLMProvider, LLMResponse
+
+if TYPE_CHECKING:
+    from .config import ConfigManager
+
+CHAIN_MODES = ('failover', 'hedge')
+
+# Chain entry keys and the settings they override
+ENTRY_KEYS = {
+    'provider': 'llm_provider',
+    'model': 'llm_model',
+    'base_url': 'llm_base_url',
+    'auth_type': 'llm_auth_type',
+    'timeout': 'llm_timeout',
+}
+
+
+class LatencyTracker:
+    """
+    Recent response latencies per provider, persisted between runs.
+
+    Hedging waits for a provider's p95 latency before sending the request to
+    the next provider, so samples are kept on disk; a single CLI invocation
+    would otherwise never collect enough of them. Concurrent processes merge
+    their samples under a file lock.
+    """
+
+    def __init__(self, path: Optional[Path] = None, window: int = 50, min_samples: int = 5):
+        """
+        Initialize latency tracker.
+
+        Args:
+            path: JSON file the samples are persisted to (None keeps them in memory)
+            window: Number of recent samples kept per provider
+            min_samples: Samples needed before a percentile is reported
+        """
+        self.path = path
+        self.window = window
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._samples: Dict[str, List[float]] = self._load() or {}
+
+    def record(self, name: str, seconds: float) -> None:
+        """Record one latency sample."""
+        with self._lock, self._file_lock():
+            # Start from what other processes have saved in the meantime
+            self._samples = self._load() or self._samples
+            samples = self._samples.setdefault(name, [])
+            samples.append(round(seconds, 3))
+            del samples[:-self.window]
+            self._save()
+
+    def percentile(self, name: str, percent: float = 95.0) -> Optional[float]:
+        """
+        Get a latency percentile for a provider.
+
+        Args:
+            name: Provider name
+            percent: Percentile to compute
+
+        Returns:
+            Latency in seconds, or None if there are too few samples
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(name, []))
+        if len(samples) < self.min_samples:
+            return None
+        index = max(0, math.ceil(percent / 100 * len(samples)) - 1)
+        return samples[index]
+
+    def _load(self) -> Optional[Dict[str, List[float]]]:
+        """Load persisted samples (None if the file is missing or damaged)."""
+        if not self.path:
+            return None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return {name: [float(s) for s in samples] for name, samples in data.items()}
+        except (OSError, ValueError, TypeError, AttributeError):
+            return None
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Hold an exclusive lock on the samples file while it is read and rewritten."""
+        fd = None
+        if self.path:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                fd = os.open(self.path.with_name(f"{self.path.name}.lock"), os.O_RDWR | os.O_CREAT, 0o600)
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            except OSError:
+                # Unlocked updates only risk losing a sample
+                pass
+        try:
+            yield
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+    def _save(self) -> None:
+        """Persist samples; failures only cost hedging accuracy."""
+        if not self.path:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._samples, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+
+class _HedgeLost(Exception):
+    """Raised inside a streaming attempt that lost the race to another provider."""
+
+
+def _lost_race(exc: BaseException) -> bool:
+    """Check whether an attempt was aborted because another provider won."""
+    cause: Optional[BaseException] = exc
+    while cause is not None:
+        if isinstance(cause, _HedgeLost):
+            return True
+        cause = cause.__cause__
+    return False
+
+
+class ProviderChain:
+    """
+    Sends analyses through an ordered chain of LLM providers.
+
+    In failover mode the next provider is tried when one fails. In hedge mode
+    the next provider is also tried when the current one has not answered
+    within its p95 latency; whichever answers first wins. For streamed
+    responses "answering" means producing the first text.
+    """
+
+    def __init__(self, config_manager: 'ConfigManager'):
+        """
+        Initialize provider chain.
+
+        Args:
+            config_manager: Configuration manager instance
+        """
+        self.config = config_manager.get_config()
+        self.mode = self.config.get('llm_chain_mode', 'failover')
+        if self.mode not in CHAIN_MODES:
+            raise ConfigurationError(
+                f"Invalid llm_chain_mode '{self.mode}' (expected one of: {', '.join(CHAIN_MODES)})"
+            )
+        self.hedge_delay = float(self.config.get('llm_hedge_delay', 10))
+
+        self.on_event: Optional[Callable[[str], None]] = None
+        self.members: List[Tuple[str, LLMProvider]] = []
+        self.skipped: Dict[str, str] = {}
+
+        for entry in self.config.get('llm_chain') or []:
+            name = f"{entry.get('provider', '?')}/{entry.get('model', '?')}"
+            try:
+                member = LLMProvider(config_manager, overrides=self._entry_overrides(entry))
+            except ConfigurationError as e:
+                # A provider without credentials is left out rather than failing the chain
+                self.skipped[name] = str(e)
+                continue
+            member.on_event = self._emit_event
+            self.members.append((name, member))
+
+        if not self.members:
+            details = "; ".join(f"{name}: {error}" for name, error in self.skipped.items())
+            raise ConfigurationError(f"No usable providers in llm_chain{': ' + details if details else ''}")
+
+        cache_dir = self.config.get('cache_directory')
+        self.latency = LatencyTracker(
+            Path(cache_dir).expanduser() / 'latency.json' if cache_dir else None
+        )
+
+    def analyze(self, prompt: str, use_cache: bool = True, refresh: bool = False) -> LLMResponse:
+        """
+        Send analysis request through the chain.
+
+        Args:
+            prompt: The analysis prompt
+            use_cache: Serve and store responses through the response cache
+            refresh: Skip the cache lookup but still store the fresh response
+
+        Returns:
+            Response of the first provider to answer successfully
+        """
+        def start(member: LLMProvider, claim: Callable[[], bool]) -> LLMResponse:
+            return member.analyze(prompt, use_cache=use_cache, refresh=refresh)
+
+        return self._race(start, streaming=False)
+
+    def analyze_stream(
+        self,
+        prompt: str,
+        on_text: Callable[[str], None],
+        use_cache: bool = True,
+        refresh: bool = False
+    ) -> LLMResponse:
+        """
+        Stream an analysis through the chain.
+
+        Only the provider that produces text first is shown. A provider that
+        fails before producing text is replaced by the next one; once text has
+        been shown the stream is not switched to another provider.
+
+        Args:
+            prompt: The analysis prompt
+            on_text: Called with each chunk of completion text
+            use_cache: Serve and store responses through the response cache
+            refresh: Skip the cache lookup but still store the fresh response
+
+        Returns:
+            LLM response containing the full completion
+        """
+        def start(member: LLMProvider, claim: Callable[[], bool]) -> LLMResponse:
+            def emit(text: str) -> None:
+                if not claim():
+                    raise _HedgeLost()
+                on_text(text)
+
+            return member.analyze_stream(prompt, emit, use_cache=use_cache, refresh=refresh)
+
+        return self._race(start, streaming=True)
+
+    async def aanalyze(
+        self,
+        prompt: str,
+        use_cache: bool = True,
+        refresh: bool = False,
+        timeout: Optional[float] = None
+    ) -> LLMResponse:
+        """
+        Send analysis request through the chain without blocking the event loop.
+
+        Losing hedged requests are cancelled as soon as a provider answers.
+
+        Args:
+            prompt: The analysis prompt
+            use_cache: Serve and store responses through the response cache
+            refresh: Skip the cache lookup but still store the fresh response
+            timeout: Deadline for the whole chain in seconds
+
+        Returns:
+            Response of the first provider to answer successfully
+        """
+        try:
+            return await asyncio.wait_for(self._arace(prompt, use_cache, refresh), timeout)
+        except asyncio.TimeoutError:
+            raise LLMError(f"LLM analysis exceeded deadline of {timeout}s")
+
+    async def aclose(self) -> None:
+        """Close the async connection pools of the running event loop."""
+        for _, member in self.members:
+            await member.aclose()
+
+    def warm_up(self) -> bool:
+        """
+        Open connections to the providers the next analysis starts with.
+
+        Returns:
+            True if every connection was established
+        """
+        first = 2 if self.mode == 'hedge' else 1
+        return all([member.warm_up() for _, member in self.members[:first]])
+
+    def test_connection(self) -> bool:
+        """
+        Test that at least one provider in the chain answers.
+
+        Returns:
+            True if connection successful
+        """
+        try:
+            response = self.analyze("Respond with 'OK' if you can read this test message.")
+            return bool(response and response.content)
+        except Exception:
+            return False
+
+    def get_provider_info(self) -> Dict[str, Any]:
+        """
+        Get information about the provider chain.
+
+        Returns:
+            Chain information
+        """
+        return {
+            'mode': self.mode,
+            'hedge_delay': self.hedge_delay,
+            'providers': [member.get_provider_info() for _, member in self.members],
+            'skipped': dict(self.skipped),
+        }
+
+    def _race(
+        self,
+        start: Callable[[LLMProvider, Callable[[], bool]], LLMResponse],
+        streaming: bool
+    ) -> LLMResponse:
+        """
+        Run attempts in order, failing over and hedging according to the mode.
+
+        Each attempt runs in a daemon thread so a losing request never holds
+        up the caller or process exit.
+
+        Args:
+            start: Runs one attempt against a member; the second argument
+                claims the stream and returns False if another attempt won
+            streaming: Whether the first text, not the full response, decides the race
+
+        Returns:
+            The winning response
+        """
+        events: List[str] = []
+        results: 'queue.Queue[Tuple[str, int, Any]]' = queue.Queue()
+        lock = threading.Lock()
+        winner: List[int] = []
+        launched: List[float] = []
+        errors: List[str] = []
+
+        def claim(index: int) -> bool:
+            with lock:
+                if not winner:
+                    winner.append(index)
+                    results.put(('first_text', index, time.monotonic()))
+                return winner[0] == index
+
+        def run(index: int) -> None:
+            try:
+                results.put(('done', index, start(self.members[index][1], lambda: claim(index))))
+            except Exception as e:
+                results.put(('error', index, e))
+
+        def launch() -> None:
+            index = len(launched)
+            launched.append(time.monotonic())
+            threading.Thread(
+                target=run,
+                args=(index,),
+                name=f"cmdrx-chain-{index}",
+                daemon=True
+            ).start()
+
+        launch()
+        running = 1
+
+        while True:
+            can_hedge = self.mode == 'hedge' and not winner and len(launched) < len(self.members)
+            wait = None
+            if can_hedge:
+                delay = self._hedge_after(len(launched) - 1, streaming)
+                wait = max(0.0, launched[-1] + delay - time.monotonic())
+
+            try:
+                kind, index, value = results.get(timeout=wait)
+            except queue.Empty:
+                slow = self.members[len(launched) - 1][0]
+                self._record(events, f"hedge: {slow} slower than {delay:.1f}s; also sending to "
+                                     f"{self.members[len(launched)][0]}")
+                launch()
+                running += 1
+                continue
+
+            name = self.members[index][0]
+
+            if kind == 'first_text':
+                self.latency.record(f"{name}:first_text", value - launched[index])
+                continue
+
+            if kind == 'done':
+                if streaming and winner and winner[0] != index:
+                    # Finished without producing text (e.g. empty completion) after losing
+                    running -= 1
+                    continue
+                response: LLMResponse = value
+                if not (response.cached or response.coalesced):
+                    self.latency.record(name, time.monotonic() - launched[index])
+                if not streaming:
+                    with lock:
+                        winner.append(index)
+                response.events = events + response.events
+                return response
+
+            # kind == 'error'
+            running -= 1
+            if _lost_race(value):
+                continue
+
+            errors.append(f"{name}: {value}")
+            if streaming and winner and winner[0] == index:
+                # Text from this provider was already shown; switching would garble it
+                raise value
+
+            if len(launched) < len(self.members) and not winner:
+                self._record(events, f"failover: {name} failed ({value}); trying "
+                                     f"{self.members[len(launched)][0]}")
+                launch()
+                running += 1
+            elif running == 0:
+                raise LLMError(f"All providers in chain failed: {'; '.join(errors)}")
+
+    async def _arace(self, prompt: str, use_cache: bool, refresh: bool) -> LLMResponse:
+        """Async version of the race; losing attempts are cancelled."""
+        events: List[str] = []
+        errors: List[str] = []
+        launched: List[float] = []
+        tasks: Dict['asyncio.Future[LLMResponse]', int] = {}
+
+        def launch() -> None:
+            member = self.members[len(launched)][1]
+            task = asyncio.ensure_future(member.aanalyze(prompt, use_cache=use_cache, refresh=refresh))
+            tasks[task] = len(launched)
+            launched.append(time.monotonic())
+
+        launch()
+
+        try:
+            while True:
+                wait = None
+                if self.mode == 'hedge' and len(launched) < len(self.members):
+                    delay = self._hedge_after(len(launched) - 1, streaming=False)
+                    wait = max(0.0, launched[-1] + delay - time.monotonic())
+
+                done, _ = await asyncio.wait(tasks, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    self._record(events, f"hedge: {self.members[len(launched) - 1][0]} slower than "
+                                         f"{delay:.1f}s; also sending to {self.members[len(launched)][0]}")
+                    launch()
+                    continue
+
+                for task in done:
+                    index = tasks.pop(task)
+                    name = self.members[index][0]
+                    try:
+                        response = task.result()
+                    except Exception as e:
+                        errors.append(f"{name}: {e}")
+                        if len(launched) < len(self.members):
+                            self._record(events, f"failover: {name} failed ({e}); trying "
+                                                 f"{self.members[len(launched)][0]}")
+                            launch()
+                        continue
+
+                    if not (response.cached or response.coalesced):
+                        self.latency.record(name, time.monotonic() - launched[index])
+                    response.events = events + response.events
+                    return response
+
+                if not tasks:
+                    raise LLMError(f"All providers in chain failed: {'; '.join(errors)}")
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Let the losers unwind (e.g. hand back a circuit breaker trial) before returning
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _hedge_after(self, index: int, streaming: bool) -> float:
+        """Seconds to wait for a member before hedging to the next one."""
+        name = self.members[index][0]
+        p95 = self.latency.percentile(f"{name}:first_text" if streaming else name)
+        return p95 if p95 is not None else self.hedge_delay
+
+    def _entry_overrides(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Translate a chain entry into settings overrides."""
+        if not entry.get('provider') or not entry.get('model'):
+            raise ConfigurationError("Each llm_chain entry needs a provider and a model")
+
+        overrides = {'llm_base_url': '', 'llm_auth_type': 'api_key'}
+        for key, value in entry.items():
+            # Short names map to llm_* settings; anything else (e.g. retry_max_attempts) passes through
+            overrides[ENTRY_KEYS.get(key, key)] = value
+        if overrides['llm_provider'] == 'custom' and 'auth_type' not in entry:
+            overrides['llm_auth_type'] = 'none'
+        return overrides
+
+    def _emit_event(self, event: str) -> None:
+        """Forward an event to the registered callback."""
+        if self.on_event:
+            self.on_event(event)
+
+    def _record(self, events: List[str], event: str) -> None:
+        """Store a chain event and notify the callback."""
+        events.append(event)
+        self._emit_event(event)
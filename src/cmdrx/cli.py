@@ -6,35 +6,74 @@ Main command line interface for the CmdRx tool.
 """
 
 import sys
-import subprocess
 import os
+import re
 from pathlib import Path
-from typing import Optional, List
+from typing import Iterator, Optional, List, Tuple, TYPE_CHECKING
 import click
-from rich.console import Console
-from rich.panel import Panel
-from rich.text import Text
 
-from .core import CmdRxCore
-from .config import ConfigManager
-from .exceptions import CmdRxError, ConfigurationError, LLMError
+# Heavy modules (rich, openai, keyring and the analysis core) are imported on
+# the code paths that need them, so --version, --help and handing an analysis
+# to cmdrxd start quickly. tests/test_startup.py guards this.
+from . import client
+from .exceptions import CmdRxError, ConfigurationError
 
-console = Console()
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+    from rich.console import Console
+    from .batch import BatchResult
+    from .execution import ExecutionResult
+    from .history import AnalysisHistory
 
-@click.command()
-@click.argument('command', nargs=-1, required=False)
+_console: Optional['Console'] = None
+
+# Piped input is read and compacted in chunks of this many characters
+PIPE_CHUNK_SIZE = 64 * 1024
+
+
+def get_console() -> 'Console':
+    """Get the CLI console, importing rich on first use."""
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console
+
+@click.command(context_settings={'ignore_unknown_options': True, 'allow_interspersed_args': False})
+@click.argument('command', nargs=-1, required=False, type=click.UNPROCESSED)
 @click.option('--config', '-c', is_flag=True, help='Open configuration interface')
 @click.option('--verbose', '-v', is_flag=True, help='Enable verbose output')
 @click.option('--version', is_flag=True, help='Show version and exit')
 @click.option('--log-dir', type=click.Path(), help='Override default log directory')
 @click.option('--dry-run', is_flag=True, help='Analyze without creating fix scripts')
+@click.option('--no-cache', is_flag=True, help='Bypass the response cache')
+@click.option('--refresh', is_flag=True, help='Ignore cached responses and store a fresh one')
+@click.option('--stream/--no-stream', default=None, help='Render results progressively as the AI responds')
+@click.option('--token-budget', type=int, default=None,
+              help='Approximate tokens of command output sent to the AI (0 disables compaction)')
+@click.option('--timeout', type=float, default=None,
+              help='Seconds before the command is killed (default: command_timeout setting, 0 = no limit)')
+@click.option('--every', metavar='INTERVAL', callback=lambda ctx, param, value: _parse_interval(value),
+              help='Re-run the command every INTERVAL (e.g. 30s, 5m) and analyze only when its output changes')
+@click.option('--follow', '-f', is_flag=True,
+              help='Keep reading piped input and analyze when errors spike or new messages appear')
+@click.option('--trigger', multiple=True, metavar='REGEX',
+              help='With --follow, also analyze when a line matches REGEX (repeatable)')
 def main(
     command: tuple,
     config: bool,
     verbose: bool,
     version: bool,
     log_dir: Optional[str],
-    dry_run: bool
+    dry_run: bool,
+    no_cache: bool,
+    refresh: bool,
+    stream: Optional[bool],
+    token_budget: Optional[int],
+    timeout: Optional[float],
+    every: Optional[float],
+    follow: bool,
+    trigger: Tuple[str, ...]
 ) -> None:
     """
     CmdRx - AI-powered command line troubleshooting tool.
@@ -42,7 +81,11 @@ def main(
     Usage:
         cmdrx systemctl status httpd    # Analyze command output
         systemctl status httpd | cmdrx  # Analyze piped input
+        tail -f app.log | cmdrx --follow # Analyze a live log when it matters
+        cmdrx --every 5m df -h          # Re-analyze when the output changes
         cmdrx --config                  # Open configuration
+        cmdrx batch manifest.txt        # Analyze many commands concurrently
+        cmdrx daemon start              # Keep cmdrx warm between invocations
     """
     
     if version:
@@ -50,132 +93,724 @@ def main(
         click.echo(f"CmdRx version {__version__}")
         return
     
+    if command and command[0] in SUBCOMMANDS:
+        SUBCOMMANDS[command[0]].main(
+            args=list(command[1:]),
+            prog_name=f"cmdrx {command[0]}",
+            obj={
+                'verbose': verbose,
+                'log_dir': log_dir,
+                'dry_run': dry_run,
+                'use_cache': not no_cache,
+                'refresh_cache': refresh,
+                'token_budget': token_budget,
+            }
+        )
+        return
+    
     if config:
         try:
+            from .config import ConfigManager
             config_manager = ConfigManager()
             config_manager.run_tui()
         except ConfigurationError as e:
-            console.print(f"[red]Configuration error: {e}[/red]")
+            get_console().print(f"[red]Configuration error: {e}[/red]")
             sys.exit(1)
         except Exception as e:
-            console.print(f"[red]Unexpected error: {e}[/red]")
+            get_console().print(f"[red]Unexpected error: {e}[/red]")
             if verbose:
-                console.print_exception()
+                get_console().print_exception()
             sys.exit(1)
         return
     
+    options = {
+        'verbose': verbose,
+        'log_dir': str(Path(log_dir).resolve()) if log_dir else None,
+        'dry_run': dry_run,
+        'use_cache': not no_cache,
+        'refresh_cache': refresh,
+        'stream': stream,
+        'token_budget': token_budget,
+    }
+    
     try:
-        # Initialize the core
-        core = CmdRxCore(verbose=verbose, log_dir=log_dir, dry_run=dry_run)
-        
-        # Determine input mode
-        if command:
-            # Standalone mode - execute command and analyze output
-            result = _execute_command_standalone(command, core, verbose)
+        # Determine input mode; a running cmdrxd daemon analyzes, else we do
+        if follow:
+            if command or sys.stdin.isatty():
+                raise CmdRxError("--follow analyzes piped input, e.g. tail -f app.log | cmdrx --follow")
+            # Follow mode runs in-process; its analyses are spread over a long session
+            from .runner import analyze_followed, run_analysis
+            exit_code = run_analysis(
+                options, get_console(),
+                lambda core: analyze_followed(core, sys.stdin, trigger)
+            )
+        elif every:
+            if not command:
+                raise CmdRxError("--every needs a command to re-run, e.g. cmdrx --every 5m df -h")
+            # Monitor mode runs in-process, reusing one core and its connections for every run
+            from .runner import monitor_command, run_analysis
+            exit_code = run_analysis(
+                options, get_console(),
+                lambda core: monitor_command(core, ' '.join(command), every, timeout)
+            )
+        elif command:
+            # Standalone mode - execute command, showing its output live, and analyze it.
+            # While it runs, the daemon or a background thread gets the analysis ready.
+            prepared = None if client.warm_up() else _prepare_in_background(options)
+            result = _run_command(command, verbose, timeout)
+            try:
+                exit_code = None
+                if prepared is None:
+                    exit_code = client.run_analysis(
+                        options, result.command, return_code=result.return_code,
+                        chunks=result.chunks(), echoed=True
+                    )
+                if exit_code is None:
+                    from .runner import analyze_command_output, run_analysis
+                    exit_code = run_analysis(
+                        options, get_console(),
+                        lambda core: analyze_command_output(
+                            core, result.command, result.chunks(), result.return_code, echoed=True
+                        ),
+                        prepared=prepared
+                    )
+            finally:
+                result.close()
         elif not sys.stdin.isatty():
             # Piped input mode
-            result = _execute_command_piped(core, verbose)
+            if verbose:
+                get_console().print("[blue]Reading from piped input...[/blue]")
+            exit_code = client.run_analysis(options, chunks=_read_stdin())
+            if exit_code is None:
+                from .runner import analyze_piped, run_analysis
+                exit_code = run_analysis(options, get_console(), lambda core: analyze_piped(core, _read_stdin()))
         else:
             # No input provided
-            console.print("[yellow]No command provided. Use --help for usage information.[/yellow]")
+            get_console().print("[yellow]No command provided. Use --help for usage information.[/yellow]")
             ctx = click.get_current_context()
             click.echo(ctx.get_help())
-            sys.exit(1)
+            exit_code = 1
+    except CmdRxError as e:
+        get_console().print(f"[red]Error: {e}[/red]")
+        exit_code = 1
+    except KeyboardInterrupt:
+        get_console().print("\n[yellow]Operation cancelled by user.[/yellow]")
+        exit_code = 1
+    
+    if exit_code:
+        sys.exit(exit_code)
+
+
+def _parse_interval(value: Optional[str]) -> Optional[float]:
+    """Parse the --every interval into seconds."""
+    if value is None:
+        return None
+    from .monitor import parse_interval
+    try:
+        return parse_interval(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="'--every'")
+
+
+def _read_stdin() -> Iterator[str]:
+    """Read piped input in chunks."""
+    return iter(lambda: sys.stdin.read(PIPE_CHUNK_SIZE), '')
+
+
+def _prepare_in_background(options: dict) -> 'Future':
+    """Create and warm up the analysis core in a background thread."""
+    import threading
+    from concurrent.futures import Future
+    
+    prepared: 'Future' = Future()
+    
+    def prepare() -> None:
+        try:
+            from .runner import prepare_core
+            prepared.set_result(prepare_core(options, get_console()))
+        except BaseException as e:
+            prepared.set_exception(e)
+    
+    # Daemonic, so an interrupted command is not held up by a slow connection
+    threading.Thread(target=prepare, name='cmdrx-prepare', daemon=True).start()
+    return prepared
+
+
+def _run_command(command: tuple, verbose: bool, timeout: Optional[float]) -> 'ExecutionResult':
+    """Execute a command, showing its output as it runs, and capture the output."""
+    from .execution import execute
+    from .settings import default_settings, load_settings
+    
+    cmd_str = ' '.join(command)
+    try:
+        settings = load_settings()
+    except (OSError, ValueError):
+        # Reported when the analysis loads the configuration
+        settings = default_settings()
+    if timeout is None:
+        timeout = float(settings.get('command_timeout', 30))
+    
+    if verbose:
+        click.secho(f"Executing command: {cmd_str}", fg='blue', err=True)
+    
+    result = execute(
+        cmd_str,
+        timeout=timeout,
+        max_bytes=int(settings.get('capture_max_bytes', 0)),
+        memory_bytes=int(settings.get('capture_memory_bytes', 0))
+    )
+    
+    summary = f"exit code {result.return_code}, {result.duration:.1f}s"
+    if result.timed_out:
+        summary = f"timed out after {timeout:g}s and was killed"
+    if result.capture.omitted_lines:
+        summary += f", {result.capture.omitted_lines} lines beyond the capture limit omitted"
+    if result.timed_out:
+        click.secho(f"── cmdrx: {cmd_str}: {summary}", fg='yellow', err=True)
+    else:
+        click.secho(f"── cmdrx: {cmd_str}: {summary}", dim=True, err=True)
+    
+    return result
+
+
+@click.command('batch')
+@click.argument('manifest', type=click.Path(exists=True, dir_okay=False), required=False)
+@click.option('--from-dir', type=click.Path(exists=True, file_okay=False),
+              help='Analyze captured output files from a directory')
+@click.option('--exec-workers', type=int, default=None, help='Commands to execute concurrently')
+@click.option('--llm-workers', type=int, default=None, help='Concurrent LLM requests')
+@click.option('--timeout', type=int, default=None, help='Per-command timeout in seconds')
+@click.pass_obj
+def batch(
+    options: Optional[dict],
+    manifest: Optional[str],
+    from_dir: Optional[str],
+    exec_workers: Optional[int],
+    llm_workers: Optional[int],
+    timeout: Optional[int]
+) -> None:
+    """
+    Analyze many commands or captured outputs concurrently.
+    
+    MANIFEST is a file with one shell command per line ('#' starts a comment).
+    
+    \b
+    Usage:
+        cmdrx batch diagnostics.txt
+        cmdrx batch --from-dir /var/tmp/captures
+    """
+    from rich.progress import (
+        BarColumn, MofNCompleteColumn, Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
+    )
+    from .batch import BatchRunner, load_manifest, load_captures, write_summary
+    from .core import CmdRxCore
+    
+    options = options or {}
+    verbose = options.get('verbose', False)
+    
+    if bool(manifest) == bool(from_dir):
+        get_console().print("[red]Provide either a manifest file or --from-dir.[/red]")
+        sys.exit(1)
+    
+    try:
+        items = load_manifest(Path(manifest)) if manifest else load_captures(Path(from_dir or ''))
+        if not items:
+            get_console().print("[yellow]Nothing to analyze.[/yellow]")
+            return
         
-        if result:
-            console.print("\n[green]✓ Analysis complete. Check the output above and generated files.[/green]")
+        core = CmdRxCore(
+            verbose=verbose,
+            log_dir=options.get('log_dir'),
+            dry_run=options.get('dry_run', False),
+            use_cache=options.get('use_cache', True),
+            refresh_cache=options.get('refresh_cache', False),
+            token_budget=options.get('token_budget')
+        )
+        runner = BatchRunner(
+            core,
+            exec_workers=exec_workers or core.config.get('batch_exec_workers', 8),
+            llm_workers=llm_workers or core.config.get('batch_llm_workers', 4),
+            command_timeout=timeout or core.config.get('command_timeout', 30)
+        )
+        
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            TimeElapsedColumn(),
+            console=get_console(),
+            transient=True
+        ) as progress:
+            task = progress.add_task(f"Analyzing {len(items)} items...", total=len(items))
+            
+            def on_result(result: 'BatchResult') -> None:
+                progress.advance(task)
+                if verbose and result.error:
+                    progress.console.print(f"[yellow]{result.item.command}: {result.error}[/yellow]")
+            
+            results = runner.run(items, on_result=on_result)
+        
+        _show_batch_summary(results)
+        summary_file = write_summary(results, core.log_dir, fsync=core.output_generator.fsync)
+        if core.output_generator.collector is not None:
+            core.output_generator.collector.note([summary_file])
+        get_console().print(f"📄 Batch summary: [cyan]{summary_file}[/cyan]")
     
     except ConfigurationError as e:
-        console.print(f"[red]Configuration error: {e}[/red]")
-        console.print("[yellow]Run 'cmdrx --config' to set up configuration.[/yellow]")
-        sys.exit(1)
-    except LLMError as e:
-        console.print(f"[red]LLM service error: {e}[/red]")
+        get_console().print(f"[red]Configuration error: {e}[/red]")
+        get_console().print("[yellow]Run 'cmdrx --config' to set up configuration.[/yellow]")
         sys.exit(1)
     except CmdRxError as e:
-        console.print(f"[red]Error: {e}[/red]")
+        get_console().print(f"[red]Error: {e}[/red]")
         sys.exit(1)
     except KeyboardInterrupt:
-        console.print("\n[yellow]Operation cancelled by user.[/yellow]")
+        get_console().print("\n[yellow]Operation cancelled by user.[/yellow]")
+        sys.exit(1)
+
+
+def _show_batch_summary(results: list) -> None:
+    """Display a summary table of batch results."""
+    from rich.table import Table
+    
+    status_colors = {
+        'success': 'green',
+        'warning': 'yellow',
+        'error': 'red',
+        'info': 'blue',
+        'failed': 'red',
+        'skipped': 'dim'
+    }
+    
+    table = Table(title="Batch Summary")
+    table.add_column("#", style="dim", justify="right")
+    table.add_column("Command", style="cyan", overflow="fold")
+    table.add_column("Exit", justify="right")
+    table.add_column("Status")
+    table.add_column("Issues", justify="right")
+    table.add_column("Time", justify="right")
+    table.add_column("Log / Error", overflow="fold")
+    
+    for i, result in enumerate(results, 1):
+        color = status_colors.get(result.status, 'white')
+        exit_code = result.item.return_code
+        if result.log_file:
+            detail = str(result.log_file.name)
+        elif result.record_id is not None:
+            detail = f"cmdrx show {result.record_id}"
+        else:
+            detail = result.error or ""
+        table.add_row(
+            str(i),
+            result.item.command,
+            "-" if exit_code is None else str(exit_code),
+            f"[{color}]{result.status.upper()}[/{color}]",
+            str(result.issues),
+            "cached" if result.cached else f"{result.response_time:.1f}s",
+            detail
+        )
+    
+    get_console().print(table)
+    
+    counts: dict = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    get_console().print("  ".join(f"{status}: {count}" for status, count in sorted(counts.items())))
+
+
+@click.group('daemon')
+def daemon() -> None:
+    """Manage the cmdrxd daemon that keeps cmdrx warm between invocations."""
+
+
+@daemon.command('start')
+@click.option('--idle-timeout', type=float, default=None,
+              help='Exit after this many idle seconds (default: daemon_idle_timeout setting, 0 = never)')
+def daemon_start(idle_timeout: Optional[float]) -> None:
+    """Start cmdrxd in the background."""
+    try:
+        status = client.start_daemon(idle_timeout)
+    except CmdRxError as e:
+        get_console().print(f"[red]Error: {e}[/red]")
         sys.exit(1)
-    except Exception as e:
-        console.print(f"[red]Unexpected error: {e}[/red]")
-        if verbose:
-            console.print_exception()
+    get_console().print(f"[green]cmdrxd running[/green] (pid {status['pid']}, socket {status['socket']})")
+
+
+@daemon.command('stop')
+def daemon_stop() -> None:
+    """Stop the running cmdrxd."""
+    if client.request({'type': 'shutdown'}) is None:
+        get_console().print("[yellow]cmdrxd is not running.[/yellow]")
+    else:
+        get_console().print("[green]cmdrxd stopped.[/green]")
+
+
+@daemon.command('reload')
+def daemon_reload() -> None:
+    """Make cmdrxd forget cached credentials and reload its configuration."""
+    if client.request({'type': 'reload'}) is None:
+        get_console().print("[yellow]cmdrxd is not running.[/yellow]")
+    else:
+        get_console().print("[green]cmdrxd will reload credentials and configuration.[/green]")
+
+
+@daemon.command('status')
+def daemon_status() -> None:
+    """Show whether cmdrxd is running."""
+    status = client.request({'type': 'ping'})
+    if status is None:
+        get_console().print(f"[yellow]cmdrxd is not running[/yellow] (socket {client.socket_path()})")
         sys.exit(1)
+    get_console().print(
+        f"[green]cmdrxd running[/green] (pid {status['pid']}, up {status['uptime']:.0f}s, "
+        f"{status['requests']} analyses, {status['active']} active, socket {status['socket']})"
+    )
 
 
-def _execute_command_standalone(command: tuple, core: CmdRxCore, verbose: bool) -> bool:
-    """Execute a command in standalone mode and analyze its output."""
-    cmd_str = ' '.join(command)
+@click.command('serve')
+@click.option('--host', default=None, help='Address to listen on (default: serve_host setting)')
+@click.option('--port', type=int, default=None, help='Port to listen on (default: serve_port setting)')
+@click.option('--workers', type=int, default=None, help='Concurrent analyses (default: serve_workers setting)')
+@click.option('--queue-size', type=int, default=None,
+              help='Requests waiting for a worker before 503 (default: serve_queue_size setting)')
+@click.option('--artifacts/--no-artifacts', default=None,
+              help='Write log files and fix scripts for each analysis (default: serve_artifacts setting)')
+@click.pass_obj
+def serve(
+    options: Optional[dict],
+    host: Optional[str],
+    port: Optional[int],
+    workers: Optional[int],
+    queue_size: Optional[int],
+    artifacts: Optional[bool]
+) -> None:
+    """
+    Serve analyses over HTTP for scripts on other hosts.
     
-    if verbose:
-        console.print(f"[blue]Executing command: {cmd_str}[/blue]")
+    POST {"command": ..., "output": ..., "return_code": ...} as JSON to
+    /v1/analyze; GET /healthz and /metrics report the server's state.
+    
+    \b
+    Usage:
+        cmdrx serve --port 8765 --workers 8
+        curl -s localhost:8765/v1/analyze -d '{"command": "df -h", "output": "..."}'
+    """
+    from .core import CmdRxCore
+    from .result import ArtifactSink
+    from .server import ANALYZE_PATH, AnalysisServer
+    
+    options = options or {}
     
     try:
-        # Execute the command
-        result = subprocess.run(
-            cmd_str,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=30  # 30 second timeout
+        core = CmdRxCore(
+            log_dir=options.get('log_dir'),
+            dry_run=options.get('dry_run', False),
+            use_cache=options.get('use_cache', True),
+            refresh_cache=options.get('refresh_cache', False),
+            token_budget=options.get('token_budget')
         )
+        config = core.config
+        if artifacts is None:
+            artifacts = bool(config.get('serve_artifacts', True))
+        if port is None:
+            port = int(config.get('serve_port', 8765))
         
-        # Prepare the full output (stdout + stderr)
-        output_parts = []
-        if result.stdout:
-            output_parts.append(f"STDOUT:\n{result.stdout}")
-        if result.stderr:
-            output_parts.append(f"STDERR:\n{result.stderr}")
-        
-        command_output = "\n".join(output_parts) if output_parts else ""
-        
-        if not command_output.strip():
-            console.print("[yellow]Command produced no output to analyze.[/yellow]")
-            return False
-        
-        # Show the command output
-        console.print(Panel(
-            command_output,
-            title=f"Command Output: {cmd_str}",
-            border_style="blue"
-        ))
-        
-        # Analyze with CmdRx
-        return core.analyze_output(cmd_str, command_output, result.returncode)
-        
-    except subprocess.TimeoutExpired:
-        raise CmdRxError(f"Command '{cmd_str}' timed out after 30 seconds")
-    except subprocess.CalledProcessError as e:
-        raise CmdRxError(f"Command '{cmd_str}' failed: {e}")
+        server = AnalysisServer(
+            core,
+            address=(host or config.get('serve_host', '127.0.0.1'), port),
+            workers=workers or int(config.get('serve_workers', 4)),
+            queue_size=queue_size or int(config.get('serve_queue_size', 64)),
+            sinks=[ArtifactSink(core.output_generator)] if artifacts else [],
+            token=str(config.get('serve_token', '')),
+            max_body_bytes=int(config.get('serve_max_body_bytes', 10 * 1024 * 1024)),
+            request_timeout=float(config.get('serve_request_timeout', 30))
+        )
+    except ConfigurationError as e:
+        get_console().print(f"[red]Configuration error: {e}[/red]")
+        get_console().print("[yellow]Run 'cmdrx --config' to set up configuration.[/yellow]")
+        sys.exit(1)
+    except (CmdRxError, OSError) as e:
+        get_console().print(f"[red]Error: {e}[/red]")
+        sys.exit(1)
+    
+    get_console().print(
+        f"[green]cmdrx serving on {server.url}{ANALYZE_PATH}[/green] "
+        f"({server.workers} workers, queue {server.queue_size})"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        get_console().print("\n[yellow]Finishing queued analyses...[/yellow]")
+    finally:
+        server.close()
 
 
-def _execute_command_piped(core: CmdRxCore, verbose: bool) -> bool:
-    """Process piped input and analyze it."""
-    if verbose:
-        console.print("[blue]Reading from piped input...[/blue]")
+def _open_history() -> 'AnalysisHistory':
+    """Open the analysis history index or exit with an error."""
+    from .history import AnalysisHistory
+    from .settings import load_settings
     
     try:
-        # Read all input from stdin
-        piped_input = sys.stdin.read()
-        
-        if not piped_input.strip():
-            console.print("[yellow]No input received from pipe.[/yellow]")
-            return False
-        
-        # Show the piped input
-        console.print(Panel(
-            piped_input,
-            title="Piped Input",
-            border_style="blue"
-        ))
-        
-        # Analyze with CmdRx (no original command or return code available)
-        return core.analyze_output("<piped input>", piped_input, None)
-        
-    except Exception as e:
-        raise CmdRxError(f"Failed to read piped input: {e}")
+        history = AnalysisHistory.from_config(load_settings())
+    except (OSError, ValueError) as e:
+        get_console().print(f"[red]Configuration error: {e}[/red]")
+        sys.exit(1)
+    if history is None:
+        get_console().print("[yellow]Analysis history is disabled or unavailable (history_enabled setting).[/yellow]")
+        sys.exit(1)
+    return history
+
+
+def _parse_since(value: Optional[str]) -> Optional[str]:
+    """Turn --since (an ISO date/time or an age such as 7d) into an ISO timestamp."""
+    if value is None:
+        return None
+    from datetime import datetime, timedelta
+    from .monitor import parse_interval
+    try:
+        return (datetime.now() - timedelta(seconds=parse_interval(value))).isoformat()
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).isoformat()
+    except ValueError:
+        raise click.BadParameter(f"expected a date such as 2024-05-01 or an age such as 12h or 7d, got '{value}'",
+                                 param_hint="'--since'")
+
+
+@click.group('history', invoke_without_command=True)
+@click.option('--limit', '-n', type=int, default=20, show_default=True, help='Number of analyses to show')
+@click.option('--status', type=click.Choice(['success', 'warning', 'error', 'info'], case_sensitive=False),
+              help='Only analyses with this status')
+@click.option('--command', 'command_filter', metavar='TEXT', help='Only commands containing TEXT')
+@click.option('--since', callback=lambda ctx, param, value: _parse_since(value),
+              help='Only analyses since a date (2024-05-01) or within an age (12h, 7d)')
+@click.pass_context
+def history(
+    ctx: click.Context,
+    limit: int,
+    status: Optional[str],
+    command_filter: Optional[str],
+    since: Optional[str]
+) -> None:
+    """
+    List past analyses, most recent first.
+    
+    \b
+    Usage:
+        cmdrx history --status error --since 7d
+        cmdrx history import ~/cmdrx_logs
+    """
+    if ctx.invoked_subcommand is not None:
+        return
+    entries = _open_history().recent(limit=limit, status=status, command=command_filter, since=since)
+    _show_history(entries)
+
+
+@history.command('import')
+@click.argument('directories', nargs=-1, type=click.Path(exists=True, file_okay=False))
+@click.option('--workers', type=int, default=None, help='Parser processes (default: CPU count)')
+@click.pass_obj
+def history_import(options: Optional[dict], directories: Tuple[str, ...], workers: Optional[int]) -> None:
+    """
+    Index existing cmdrx_analysis_*.log files.
+    
+    DIRECTORIES default to the log directory. Files already indexed are skipped.
+    """
+    if not directories:
+        directories = (str(_log_directory(options)),)
+    paths = [Path(directory) for directory in directories if Path(directory).is_dir()]
+    
+    with get_console().status("Importing log files...") as status:
+        counts = _open_history().import_logs(
+            paths, workers=workers, on_progress=lambda done: status.update(f"Importing log files... {done:,}")
+        )
+    get_console().print(
+        f"[green]Imported {counts['imported']:,} analyses[/green] "
+        f"({counts['skipped']:,} already indexed, {counts['failed']:,} unreadable)"
+    )
+
+
+@click.command('search')
+@click.argument('query', nargs=-1, required=True)
+@click.option('--limit', '-n', type=int, default=20, show_default=True, help='Number of analyses to show')
+@click.option('--oldest', is_flag=True, help='Order by time, oldest first (when did this first appear?)')
+@click.option('--status', type=click.Choice(['success', 'warning', 'error', 'info'], case_sensitive=False),
+              help='Only analyses with this status')
+@click.option('--since', callback=lambda ctx, param, value: _parse_since(value),
+              help='Only analyses since a date (2024-05-01) or within an age (12h, 7d)')
+@click.option('--raw', is_flag=True, help='Pass QUERY to SQLite FTS5 as is (AND, OR, NEAR, prefix*)')
+def search(
+    query: Tuple[str, ...],
+    limit: int,
+    oldest: bool,
+    status: Optional[str],
+    since: Optional[str],
+    raw: bool
+) -> None:
+    """
+    Search past commands, their output and the analyses.
+    
+    Words must all appear; quote a phrase to match it exactly.
+    
+    \b
+    Usage:
+        cmdrx search "connection refused" --oldest
+        cmdrx search --raw 'oom* AND kube*'
+    """
+    if raw:
+        fts_query = " ".join(query)
+    else:
+        fts_query = " ".join('"' + term.replace('"', '""') + '"' for term in query)
+    
+    try:
+        entries = _open_history().search(fts_query, limit=limit, oldest_first=oldest, status=status, since=since)
+    except ValueError as e:
+        get_console().print(f"[red]{e}[/red]")
+        sys.exit(1)
+    _show_history(entries)
+
+
+@click.command('show')
+@click.argument('record_id', type=int)
+@click.option('--json', 'as_json', is_flag=True, help='Print the stored record as JSON')
+@click.pass_obj
+def show(options: Optional[dict], record_id: int, as_json: bool) -> None:
+    """
+    Show an analysis from the analysis store (log_format "store").
+    
+    The log file text is rendered from the stored record on demand.
+    """
+    import json
+    from .output import OutputGenerator
+    from .store import AnalysisStore
+    
+    log_dir = _log_directory(options)
+    record = AnalysisStore(log_dir).get(record_id)
+    if record is None:
+        get_console().print(f"[red]No stored analysis {record_id} in {log_dir}[/red]")
+        sys.exit(1)
+    
+    if as_json:
+        click.echo(json.dumps(record, indent=2, ensure_ascii=False))
+    else:
+        click.echo(OutputGenerator(log_dir).render_record(record))
+
+
+@click.command('gc')
+@click.option('--rescan', is_flag=True, help='Scan the whole log directory instead of reading the journals')
+@click.option('--limit', type=int, default=10000, show_default=True,
+              help='Maximum files to compress and to delete in this run')
+@click.option('--quiet', '-q', is_flag=True, help='Print nothing (for background runs)')
+@click.pass_obj
+def gc(options: Optional[dict], rescan: bool, limit: int, quiet: bool) -> None:
+    """
+    Compress and delete old artifacts per the retention policy.
+    
+    Set retention_max_age_days, retention_max_bytes, retention_max_files and
+    retention_compress_after_days in the configuration. Only artifacts written
+    since the previous run are examined, unless --rescan is given.
+    """
+    from .history import AnalysisHistory
+    from .retention import GarbageCollector
+    from .settings import load_settings
+    
+    log_dir = _log_directory(options)
+    try:
+        settings = load_settings()
+    except (OSError, ValueError) as e:
+        get_console().print(f"[red]Configuration error: {e}[/red]")
+        sys.exit(1)
+    collector = GarbageCollector.from_config(settings, log_dir)
+    if collector is None:
+        if not quiet:
+            get_console().print("[yellow]No retention policy configured (retention_* settings).[/yellow]")
+        return
+    collector.history = AnalysisHistory.from_config(settings)
+    
+    result = collector.collect(rescan=rescan, limit=limit)
+    if quiet:
+        return
+    if result.skipped:
+        get_console().print("[yellow]Another cmdrx gc is running.[/yellow]")
+        return
+    get_console().print(
+        f"[green]{result.discovered:,} new artifacts, {result.compressed:,} compressed, "
+        f"{result.deleted:,} deleted ({result.freed_bytes / 1024 / 1024:.1f} MB freed)[/green]; "
+        f"{result.files:,} files, {result.total_bytes / 1024 / 1024:.1f} MB in {log_dir}"
+    )
+
+
+def _log_directory(options: Optional[dict]) -> Path:
+    """Get the log directory from --log-dir or the configuration."""
+    from .settings import load_settings
+    
+    log_dir = (options or {}).get('log_dir')
+    if not log_dir:
+        try:
+            log_dir = load_settings().get('log_directory', '~/cmdrx_logs')
+        except (OSError, ValueError) as e:
+            get_console().print(f"[red]Configuration error: {e}[/red]")
+            sys.exit(1)
+    return Path(log_dir).expanduser()
+
+
+def _show_history(entries: list) -> None:
+    """Display a table of history entries."""
+    from rich.table import Table
+    from rich.text import Text
+    from .history import SNIPPET_END, SNIPPET_START
+    
+    if not entries:
+        get_console().print("[yellow]No matching analyses.[/yellow]")
+        return
+    
+    status_colors = {'success': 'green', 'warning': 'yellow', 'error': 'red', 'info': 'blue'}
+    
+    table = Table()
+    table.add_column("#", style="dim", justify="right")
+    table.add_column("Time", no_wrap=True)
+    table.add_column("Command", style="cyan", overflow="fold")
+    table.add_column("Exit", justify="right")
+    table.add_column("Status")
+    table.add_column("Issues", justify="right")
+    table.add_column("Tokens", justify="right")
+    table.add_column("Match" if entries[0].snippet is not None else "Log", overflow="fold")
+    
+    for entry in entries:
+        color = status_colors.get(entry.status, 'white')
+        if entry.snippet is not None:
+            detail = Text()
+            for i, part in enumerate(re.split(f"[{SNIPPET_START}{SNIPPET_END}]", entry.snippet.replace("\n", " "))):
+                detail.append(part, style="bold magenta" if i % 2 else "")
+        elif entry.record_id is not None:
+            detail = Text(f"cmdrx show {entry.record_id}")
+        else:
+            detail = Text(Path(entry.log_file).name if entry.log_file else "")
+        table.add_row(
+            str(entry.id),
+            entry.timestamp[:19].replace('T', ' '),
+            Text(entry.command),
+            "-" if entry.return_code is None else str(entry.return_code),
+            f"[{color}]{entry.status.upper()}[/{color}]",
+            str(len(entry.issues)),
+            "cached" if entry.cached else ("-" if entry.total_tokens is None else f"{entry.total_tokens:,}"),
+            detail
+        )
+    
+    get_console().print(table)
+
+
+# Subcommands dispatched from main() when the first argument matches
+SUBCOMMANDS = {
+    'batch': batch,
+    'daemon': daemon,
+    'serve': serve,
+    'history': history,
+    'search': search,
+    'show': show,
+    'gc': gc,
+}
 
 
 if __name__ == "__main__":
@@ -0,0 +1,223 @@
+"""
+CmdRx Daemon Client
+
+Thin client for the cmdrxd daemon. Only the standard library is used here so
+that handing an analysis to a running daemon stays cheap.
+"""
+
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from .exceptions import DaemonError
+
+SOCKET_NAME = "cmdrxd.sock"
+
+# Set to any non-empty value to always analyze in-process
+NO_DAEMON_ENV = "CMDRX_NO_DAEMON"
+
+# Overrides the socket location
+SOCKET_ENV = "CMDRX_SOCKET"
+
+# How long start_daemon() waits for the socket to appear
+START_TIMEOUT = 10.0
+
+
+def socket_path() -> Path:
+    """
+    Get the daemon socket path for the current user.
+
+    Returns:
+        $CMDRX_SOCKET, else cmdrxd.sock in $XDG_RUNTIME_DIR/cmdrx or ~/.cache/cmdrx
+    """
+    if os.environ.get(SOCKET_ENV):
+        return Path(os.environ[SOCKET_ENV]).expanduser()
+
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    base = Path(runtime_dir) if runtime_dir else Path.home() / '.cache'
+    return base / 'cmdrx' / SOCKET_NAME
+
+
+def send_message(stream: Any, message: Dict[str, Any]) -> None:
+    """Write one newline-delimited JSON message to a binary stream."""
+    stream.write(json.dumps(message).encode('utf-8') + b"\n")
+
+
+def read_message(stream: Any) -> Optional[Dict[str, Any]]:
+    """Read one newline-delimited JSON message, or None at end of stream."""
+    line = stream.readline()
+    if not line:
+        return None
+    message: Dict[str, Any] = json.loads(line)
+    return message
+
+
+def terminal_info() -> Dict[str, Any]:
+    """Describe the client's terminal so the daemon can render for it."""
+    return {
+        'tty': sys.stdout.isatty(),
+        'width': shutil.get_terminal_size().columns,
+        'term': os.environ.get('TERM', ''),
+        'colorterm': os.environ.get('COLORTERM', ''),
+        'no_color': bool(os.environ.get('NO_COLOR')),
+    }
+
+
+def connect(path: Optional[Path] = None, timeout: Optional[float] = None) -> Optional[socket.socket]:
+    """
+    Connect to the daemon.
+
+    Args:
+        path: Socket path (defaults to socket_path())
+        timeout: Socket timeout in seconds
+
+    Returns:
+        Connected socket, or None if no daemon is listening
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(path or socket_path()))
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def request(message: Dict[str, Any], path: Optional[Path] = None, timeout: float = 5.0) -> Optional[Dict[str, Any]]:
+    """
+    Send a control message (ping, shutdown) and return the reply.
+
+    Returns:
+        The daemon's reply, or None if no daemon is listening
+    """
+    sock = connect(path, timeout)
+    if sock is None:
+        return None
+    with sock, sock.makefile('rwb') as stream:
+        send_message(stream, message)
+        stream.flush()
+        return read_message(stream)
+
+
+def warm_up() -> bool:
+    """
+    Ask a running daemon to get ready for an analysis.
+
+    The daemon reloads changed configuration and reopens provider
+    connections that expired while idle, while the command still runs.
+
+    Returns:
+        True if a daemon is running and will take the analysis
+    """
+    if os.environ.get(NO_DAEMON_ENV):
+        return False
+    return request({'type': 'warm'}, timeout=1.0) is not None
+
+
+def run_analysis(
+    options: Dict[str, Any],
+    command: Optional[str] = None,
+    output: Optional[str] = None,
+    return_code: Optional[int] = None,
+    chunks: Optional[Iterable[str]] = None,
+    echoed: bool = False
+) -> Optional[int]:
+    """
+    Have the daemon analyze command output or piped input.
+
+    Rendered output is streamed to stdout as it arrives.
+
+    Args:
+        options: Analysis options (verbose, log_dir, dry_run, use_cache,
+            refresh_cache, stream, token_budget)
+        command: The command that was executed (None for piped input)
+        output: Combined output of the command
+        return_code: The command's exit code
+        chunks: Piped input or command output as text chunks, sent while
+            they are read
+        echoed: The command output was already shown while it ran
+
+    Returns:
+        Exit code, or None if no daemon is running and the caller should
+        analyze in-process
+    """
+    if os.environ.get(NO_DAEMON_ENV):
+        return None
+
+    sock = connect()
+    if sock is None:
+        return None
+
+    with sock, sock.makefile('rwb') as stream:
+        header: Dict[str, Any] = {
+            'type': 'analyze',
+            'mode': 'piped' if command is None else 'command',
+            'options': options,
+            'terminal': terminal_info(),
+        }
+        if command is not None:
+            header.update(command=command, output=output, return_code=return_code, echoed=echoed)
+        try:
+            send_message(stream, header)
+            if chunks is not None:
+                for chunk in chunks:
+                    send_message(stream, {'type': 'data', 'text': chunk})
+                send_message(stream, {'type': 'end'})
+            stream.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # The daemon stopped reading early, e.g. to report an error
+            pass
+
+        # Relay rendered output until the daemon reports the exit code
+        while True:
+            message = read_message(stream)
+            if message is None:
+                sys.stdout.write("cmdrx: connection to daemon lost\n")
+                return 1
+            if message['type'] == 'output':
+                sys.stdout.write(message['text'])
+                sys.stdout.flush()
+            elif message['type'] == 'exit':
+                return int(message['code'])
+
+
+def start_daemon(idle_timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Start cmdrxd as a detached background process unless it is running.
+
+    Args:
+        idle_timeout: Exit after this many idle seconds (default: daemon_idle_timeout setting)
+
+    Returns:
+        Status reported by the daemon
+    """
+    status = request({'type': 'ping'})
+    if status is not None:
+        return status
+
+    args = [sys.executable, '-m', 'cmdrx.daemon']
+    if idle_timeout is not None:
+        args += ['--idle-timeout', str(idle_timeout)]
+    subprocess.Popen(
+        args,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        status = request({'type': 'ping'})
+        if status is not None:
+            return status
+        time.sleep(0.05)
+
+    raise DaemonError(f"cmdrxd did not start within {START_TIMEOUT:.0f} seconds")
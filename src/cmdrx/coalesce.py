@@ -0,0 +1,135 @@
+"""
+CmdRx Request Coalescing Module
+
+Single-flight execution: while a request for a key is in flight, callers
+asking for the same key wait for it and share its result instead of
+sending their own. During an incident many hosts submit the same error
+output at once; through the daemon or server they then cost one LLM call.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
+
+
+class _Flight:
+    """A call in progress and the callers waiting for it."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time; concurrent callers share it.
+
+    Threads and event loops are coalesced separately: an async caller only
+    joins calls started on the same event loop.
+    """
+
+    _shared: Optional['SingleFlight'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._tasks: Dict[Tuple[int, str], Tuple['asyncio.Task', list]] = {}
+        # Callers served by another caller's request
+        self.coalesced = 0
+
+    @classmethod
+    def shared(cls) -> 'SingleFlight':
+        """Get the process-wide instance used by all providers."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def in_flight(self) -> int:
+        """Number of calls currently running."""
+        with self._lock:
+            return len(self._flights) + len(self._tasks)
+
+    def call(self, key: str, fn: Callable[[], T]) -> Tuple[T, bool]:
+        """
+        Run fn, or wait for the call already running for key.
+
+        Exceptions raised by the running call are raised to every caller.
+
+        Args:
+            key: Identifies requests that may share a result
+            fn: Performs the request
+
+        Returns:
+            The result, and True if it came from another caller's call
+        """
+        with self._lock:
+            running = self._flights.get(key)
+            if running is None:
+                flight = self._flights[key] = _Flight()
+            else:
+                flight = running
+                self.coalesced += 1
+
+        if running is not None:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value, True
+
+        try:
+            flight.value = fn()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.value, False
+
+    async def acall(self, key: str, factory: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """
+        Await factory(), or the call already running for key on this loop.
+
+        A caller that is cancelled (e.g. by its deadline) stops waiting; the
+        request itself is only cancelled when no caller is left waiting.
+
+        Args:
+            key: Identifies requests that may share a result
+            factory: Creates the request coroutine
+
+        Returns:
+            The result, and True if it came from another caller's call
+        """
+        task_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            entry = self._tasks.get(task_key)
+            shared = entry is not None
+            if entry is None:
+                task = asyncio.ensure_future(factory())
+                entry = self._tasks[task_key] = (task, [0])
+                task.add_done_callback(lambda _: self._forget(task_key, task))
+            else:
+                self.coalesced += 1
+        task, waiters = entry
+
+        waiters[0] += 1
+        try:
+            return await asyncio.shield(task), shared
+        except asyncio.CancelledError:
+            if not task.done() and waiters[0] == 1:
+                task.cancel()
+            raise
+        finally:
+            waiters[0] -= 1
+
+    def _forget(self, task_key: Tuple[int, str], task: 'asyncio.Task') -> None:
+        """Remove a finished task unless a newer one replaced it."""
+        with self._lock:
+            if self._tasks.get(task_key, (None,))[0] is task:
+                del self._tasks[task_key]
@@ -0,0 +1,334 @@
+"""
+CmdRx Output Compaction
+
+Streams command output into a token-budgeted summary before it is sent to the LLM.
+"""
+
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .templates import TemplateMiner
+
+# Rough average for English text and log output
+CHARS_PER_TOKEN = 4
+
+# CSI/OSC escape sequences and other two-character escapes
+ANSI_PATTERN = re.compile(r'\x1b\[[0-?]*[ -/]*[@-~]|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)|\x1b[@-Z\\-_]')
+
+# Arrival timestamps added to captured command output by cmdrx
+CAPTURE_PREFIX_PATTERN = re.compile(r'^\[\+\d+\.\d+s( stderr)?\] ', re.MULTILINE)
+
+# Matched against the lowercased line; much faster than IGNORECASE
+ERROR_PATTERN = re.compile(
+    r'\b(?:err(?:or|no)?|fail(?:ed|ure|ing)?|fatal|panic|exception|traceback|crit(?:ical)?|emerg|alert|'
+    r'denied|refused|unreachable|timed? ?out|segfault|oom|killed|abort(?:ed)?|warn(?:ing)?|cannot|unable)\b'
+)
+
+# Numbers and hex identifiers (and therefore timestamps, PIDs and request IDs)
+# that make otherwise identical log lines differ
+VARIABLE_PATTERN = re.compile(r'\d[0-9a-fA-F]*')
+
+
+def strip_ansi(text: str) -> str:
+    """Remove terminal escape sequences from text."""
+    if '\x1b' not in text:
+        return text
+    return ANSI_PATTERN.sub('', text)
+
+
+def strip_capture_prefixes(text: str) -> str:
+    """
+    Remove the arrival timestamps cmdrx adds to captured output.
+
+    The timestamps differ on every run, so they are kept out of LLM prompts
+    (and therefore cache keys). Lines captured from stderr keep a stable
+    "[stderr] " marker.
+    """
+    if '[+' not in text:
+        return text
+    return CAPTURE_PREFIX_PATTERN.sub(lambda m: '[stderr] ' if m.group(1) else '', text)
+
+
+def is_error_line(line: str) -> bool:
+    """Check whether a line looks like an error or warning."""
+    return bool(ERROR_PATTERN.search(line.lower()))
+
+
+def line_signature(line: str) -> str:
+    """
+    Get a signature shared by near-identical lines.
+
+    Timestamps, hex identifiers and numbers are replaced so that lines that
+    only differ in those parts collapse together.
+    """
+    return VARIABLE_PATTERN.sub('#', line)
+
+
+@dataclass
+class CompactedOutput:
+    """Command output reduced to fit a token budget."""
+    text: str
+    total_lines: int = 0
+    total_bytes: int = 0
+    omitted_lines: int = 0
+    collapsed_lines: int = 0
+    kept_error_lines: int = 0
+    omitted_error_lines: int = 0
+    truncated_lines: int = 0
+    templates: Optional[str] = None
+    template_count: int = 0
+
+    @property
+    def reduced(self) -> bool:
+        """True if anything was removed or collapsed."""
+        return bool(self.omitted_lines or self.collapsed_lines or self.truncated_lines or self.templates)
+
+    @property
+    def estimated_tokens(self) -> int:
+        """Approximate token count of the compacted text."""
+        return len(self.text) // CHARS_PER_TOKEN
+
+    def summary(self) -> str:
+        """Describe what was removed, for display and for the LLM prompt."""
+        parts = [
+            f"{self.total_lines:,} lines ({_format_bytes(self.total_bytes)}) "
+            f"compacted to ~{self.estimated_tokens:,} tokens"
+        ]
+        if self.omitted_lines:
+            parts.append(f"{self.omitted_lines:,} lines omitted from the middle")
+        if self.collapsed_lines:
+            parts.append(f"{self.collapsed_lines:,} repeated lines collapsed")
+        if self.kept_error_lines:
+            parts.append(f"{self.kept_error_lines:,} error-like lines kept from the omitted part")
+        if self.omitted_error_lines:
+            parts.append(f"{self.omitted_error_lines:,} error-like lines dropped (budget)")
+        if self.truncated_lines:
+            parts.append(f"{self.truncated_lines:,} overlong lines truncated")
+        if self.templates:
+            parts.append(f"summarized as {self.template_count:,} log templates for analysis")
+        return "; ".join(parts)
+
+
+class OutputCompactor:
+    """
+    Streaming, token-budgeted compaction of command output.
+
+    Text is fed in chunks of any size. ANSI codes are stripped, runs of
+    repeated or near-identical lines are collapsed with a count, and the head
+    and tail of the output are kept together with error-like lines from the
+    part in between. Memory use is bounded by the budget regardless of how
+    much output is fed.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 8000,
+        head_share: float = 0.25,
+        error_share: float = 0.35,
+        max_line_chars: int = 2000,
+        miner: Optional['TemplateMiner'] = None
+    ):
+        """
+        Initialize output compactor.
+
+        Args:
+            token_budget: Approximate number of tokens the result may use
+            head_share: Share of the budget reserved for the start of the output
+            error_share: Maximum share of the budget for error lines from the middle
+            max_line_chars: Lines longer than this are truncated
+            miner: Also mine log templates from the cleaned lines
+        """
+        self.token_budget = max(1, token_budget)
+        self.char_budget = self.token_budget * CHARS_PER_TOKEN
+        self.head_budget = int(self.char_budget * head_share)
+        self.error_budget = int(self.char_budget * error_share)
+        self.max_line_chars = max_line_chars
+        self.miner = miner
+
+        self._partial: List[str] = []
+        self._partial_len = 0
+        self._partial_truncated = False
+
+        # Current run of near-identical lines: first line, signature, count
+        self._run: Optional[Tuple[str, str, int]] = None
+
+        self._head: List[str] = []
+        self._head_chars = 0
+        self._tail: Deque[Tuple[str, str, int]] = deque()
+        self._tail_chars = 0
+        self._evicted = False
+
+        # Error lines from the omitted middle, deduplicated by signature
+        self._errors: Dict[str, List] = {}
+        self._error_chars = 0
+
+        self._stats = CompactedOutput(text="")
+
+    def feed(self, text: str) -> None:
+        """
+        Feed the next chunk of output.
+
+        Args:
+            text: Output text; lines may be split across chunks
+        """
+        self._stats.total_bytes += len(text.encode('utf-8', errors='replace'))
+
+        pieces = text.split('\n')
+        last = pieces.pop()
+
+        for piece in pieces:
+            if self._partial or self._partial_truncated:
+                self._append_partial(piece)
+                self._finish_line(*self._take_partial())
+            elif len(piece) > self.max_line_chars:
+                self._finish_line(piece[:self.max_line_chars], True)
+            else:
+                self._finish_line(piece, False)
+
+        self._append_partial(last)
+
+    def feed_all(self, chunks: Iterable[str]) -> 'CompactedOutput':
+        """Feed every chunk and return the result."""
+        for chunk in chunks:
+            self.feed(chunk)
+        return self.finish()
+
+    def finish(self) -> CompactedOutput:
+        """
+        Flush pending input and build the compacted output.
+
+        Returns:
+            Compacted output with statistics
+        """
+        if self._partial or self._partial_truncated:
+            self._finish_line(*self._take_partial())
+        self._flush_run()
+
+        parts = list(self._head)
+        stats = self._stats
+
+        if self._evicted:
+            parts.append(f"[... {stats.omitted_lines:,} lines omitted by cmdrx ...]")
+            if self._errors:
+                parts.append("[error-like lines from the omitted part:]")
+                for line, count in self._errors.values():
+                    parts.append(line if count == 1 else f"{line}  [x{count} similar]")
+                parts.append("[... end of omitted part ...]")
+
+        parts.extend(entry for entry, _, _ in self._tail)
+        stats.text = "\n".join(parts)
+        stats.kept_error_lines = sum(count for _, count in self._errors.values())
+
+        if self.miner and self.miner.worthwhile():
+            stats.templates = self.miner.summarize(self.token_budget)
+            stats.template_count = len(self.miner.templates)
+        return stats
+
+    def _append_partial(self, text: str) -> None:
+        """Add text to the current line, truncating overlong lines."""
+        if not text or self._partial_truncated:
+            return
+        room = self.max_line_chars - self._partial_len
+        if len(text) > room:
+            text = text[:room]
+            self._partial_truncated = True
+        self._partial.append(text)
+        self._partial_len += len(text)
+
+    def _take_partial(self) -> Tuple[str, bool]:
+        """Return the buffered line and whether it was truncated, resetting the buffer."""
+        line = "".join(self._partial)
+        truncated = self._partial_truncated
+        self._partial = []
+        self._partial_len = 0
+        self._partial_truncated = False
+        return line, truncated
+
+    def _finish_line(self, line: str, truncated: bool) -> None:
+        """Process a complete input line."""
+        self._stats.total_lines += 1
+
+        # Progress output redraws the line with carriage returns; keep the final state
+        line = strip_ansi(line).rstrip('\r')
+        if '\r' in line:
+            line = line.rsplit('\r', 1)[1]
+        line = line.rstrip()
+
+        if truncated:
+            self._stats.truncated_lines += 1
+            line += " [line truncated by cmdrx]"
+
+        if self.miner:
+            self.miner.add(strip_capture_prefixes(line))
+
+        signature = line_signature(line)
+        if self._run and self._run[1] == signature:
+            first, _, count = self._run
+            self._run = (first, signature, count + 1)
+            return
+
+        self._flush_run()
+        self._run = (line, signature, 1)
+
+    def _flush_run(self) -> None:
+        """Emit the current run of near-identical lines as one entry."""
+        if not self._run:
+            return
+        first, signature, count = self._run
+        self._run = None
+
+        if count > 1:
+            self._stats.collapsed_lines += count - 1
+            first = f"{first}  [repeated {count}x]"
+        self._add_entry(first, signature, count)
+
+    def _add_entry(self, entry: str, signature: str, lines: int) -> None:
+        """Place an entry in the head, or the tail while evicting to the middle."""
+        if not self._evicted and self._head_chars + len(entry) + 1 <= self.head_budget:
+            self._head.append(entry)
+            self._head_chars += len(entry) + 1
+            return
+
+        self._tail.append((entry, signature, lines))
+        self._tail_chars += len(entry) + 1
+
+        while self._tail and self._tail_chars > self._tail_budget():
+            self._evict(*self._tail.popleft())
+
+    def _tail_budget(self) -> int:
+        """Budget left for the tail after the head and kept error lines."""
+        return max(0, self.char_budget - self._head_chars - self._error_chars)
+
+    def _evict(self, entry: str, signature: str, lines: int) -> None:
+        """Move an entry out of the tail into the omitted middle."""
+        self._evicted = True
+        self._tail_chars -= len(entry) + 1
+        self._stats.omitted_lines += lines
+
+        if not is_error_line(entry):
+            return
+
+        kept = self._errors.get(signature)
+        if kept is not None:
+            kept[1] += lines
+        elif self._error_chars + len(entry) + 1 <= self.error_budget:
+            self._errors[signature] = [entry, lines]
+            self._error_chars += len(entry) + 1
+        else:
+            self._stats.omitted_error_lines += lines
+            return
+
+        # Error lines kept from the middle are not counted as omitted
+        self._stats.omitted_lines -= lines
+
+
+def _format_bytes(size: float) -> str:
+    """Format a byte count for display."""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
@@ -6,19 +6,38 @@ Handles configuration management including TUI interface and secure credential s
 
 import os
 import json
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any, Optional, List
-import keyring
+from typing import Dict, Any, Optional, List, Tuple
 from rich.console import Console
 from rich.prompt import Prompt, Confirm
 from rich.panel import Panel
 from rich.table import Table
 from rich.text import Text
 
+from .client import request
 from .exceptions import ConfigurationError, SecurityError
+from .settings import CONFIG_FILE, config_directory, default_settings, load_settings
 
 console = Console()
 
+# Where credentials can be looked up, in the default order
+CREDENTIAL_SOURCES = ('keyring', 'environment', 'file')
+
+# Comma-separated lookup order overriding the credential_sources setting
+CREDENTIAL_SOURCES_ENV = 'CMDRX_CREDENTIAL_SOURCES'
+
+
+@dataclass
+class CredentialLookup:
+    """How one credential was resolved."""
+    key: str
+    source: Optional[str]
+    seconds: float
+    cached: bool = False
+
 
 class ConfigManager:
     """
@@ -26,7 +45,7 @@ class ConfigManager:
     """
     
     SERVICE_NAME = "cmdrx"
-    CONFIG_FILE = "config.json"
+    CONFIG_FILE = CONFIG_FILE
     
     # Predefined LLM providers
     PREDEFINED_PROVIDERS = {
@@ -53,14 +72,62 @@ class ConfigManager:
         }
     }
     
+    # Resolved credentials shared by every ConfigManager in the process, and
+    # therefore by all requests served by cmdrxd:
+    # (key, sources) -> (credential, source, expiry on the monotonic clock)
+    _credential_cache: Dict[Tuple[str, Tuple[str, ...]], Tuple[Optional[str], Optional[str], float]] = {}
+    _credential_cache_lock = threading.Lock()
+    
     def __init__(self):
         """Initialize configuration manager."""
-        self.config_dir = Path.home() / '.config' / 'cmdrx'
+        self.config_dir = config_directory()
         self.config_dir.mkdir(parents=True, exist_ok=True)
         self.config_file = self.config_dir / self.CONFIG_FILE
         
         # Load existing configuration
         self._config = self._load_config()
+        
+        # Credential resolutions made by this manager, for verbose reporting
+        self.credential_lookups: List[CredentialLookup] = []
+    
+    @classmethod
+    def clear_credential_cache(cls, key: Optional[str] = None) -> None:
+        """
+        Invalidate cached credentials.
+        
+        Args:
+            key: Credential to forget (all credentials if None)
+        """
+        with cls._credential_cache_lock:
+            if key is None:
+                cls._credential_cache.clear()
+            else:
+                for cache_key in [k for k in cls._credential_cache if k[0] == key]:
+                    del cls._credential_cache[cache_key]
+    
+    def _invalidate_credential(self, key: str) -> None:
+        """Forget a credential that is about to change, here and in a running cmdrxd."""
+        self.clear_credential_cache(key)
+        request({'type': 'reload'}, timeout=1.0)
+    
+    def credential_sources(self) -> Tuple[str, ...]:
+        """
+        Get the credential lookup order.
+        
+        Returns:
+            Sources from $CMDRX_CREDENTIAL_SOURCES or the credential_sources setting
+        """
+        value = os.getenv(CREDENTIAL_SOURCES_ENV) or self._config.get('credential_sources', CREDENTIAL_SOURCES)
+        if isinstance(value, str):
+            value = [part.strip() for part in value.split(',') if part.strip()]
+        
+        unknown = [source for source in value if source not in CREDENTIAL_SOURCES]
+        if unknown:
+            raise ConfigurationError(
+                f"Unknown credential source(s): {', '.join(unknown)} "
+                f"(expected {', '.join(CREDENTIAL_SOURCES)})"
+            )
+        return tuple(value)
     
     def get_config(self) -> Dict[str, Any]:
         """Get current configuration."""
@@ -347,29 +414,13 @@ class ConfigManager:
     
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from file."""
-        default_config = {
-            'llm_provider': 'openai',
-            'llm_model': 'gpt-4',
-            'llm_base_url': '',
-            'llm_auth_type': 'api_key',
-            'llm_timeout': 30,
-            'log_directory': '~/cmdrx_logs',
-            'verbose': False,
-            'auto_fix_scripts': True,
-            'command_timeout': 30
-        }
+        default_config = default_settings()
         
         if not self.config_file.exists():
             return default_config
         
         try:
-            with open(self.config_file, 'r') as f:
-                config = json.load(f)
-            
-            # Merge with defaults to ensure all keys exist
-            merged_config = default_config.copy()
-            merged_config.update(config)
-            return merged_config
+            return load_settings(self.config_file)
         
         except Exception as e:
             console.print(f"[yellow]Warning: Could not load config file: {e}[/yellow]")
@@ -390,8 +441,11 @@ class ConfigManager:
     
     def _store_credential(self, key: str, value: str) -> None:
         """Store credential securely using multiple methods."""
+        self._invalidate_credential(key)
+        
         # Try keyring first
         try:
+            import keyring
             keyring.set_password(self.SERVICE_NAME, key, value)
             console.print(f"[green]✓ Stored '{key}' in system keyring[/green]")
             return
@@ -427,25 +481,54 @@ class ConfigManager:
             raise SecurityError(f"Failed to store credential '{key}': {e}")
     
     def _get_credential(self, key: str) -> Optional[str]:
-        """Retrieve credential using multiple fallback methods."""
-        # Method 1: Try keyring first
-        try:
-            credential = keyring.get_password(self.SERVICE_NAME, key)
+        """Retrieve a credential from the configured sources, in order, with caching."""
+        start = time.perf_counter()
+        sources = self.credential_sources()
+        ttl = float(self._config.get('credential_cache_ttl', 300))
+        cache_key = (key, sources)
+        
+        if ttl > 0:
+            cached = self._credential_cache.get(cache_key)
+            if cached and cached[2] > time.monotonic():
+                self.credential_lookups.append(
+                    CredentialLookup(key, cached[1], time.perf_counter() - start, cached=True)
+                )
+                return cached[0]
+        
+        credential, found_in = None, None
+        for source in sources:
+            credential = getattr(self, f"_credential_from_{source}")(key)
             if credential:
-                return credential
+                found_in = source
+                break
+        
+        if ttl > 0:
+            with self._credential_cache_lock:
+                self._credential_cache[cache_key] = (credential, found_in, time.monotonic() + ttl)
+        
+        self.credential_lookups.append(CredentialLookup(key, found_in, time.perf_counter() - start))
+        return credential
+    
+    def _credential_from_keyring(self, key: str) -> Optional[str]:
+        """Look up a credential in the system keyring."""
+        try:
+            import keyring
+            return keyring.get_password(self.SERVICE_NAME, key)
         except Exception as e:
             if self._config.get('verbose', False):
                 console.print(f"[yellow]Keyring unavailable for '{key}': {e}[/yellow]")
-        
-        # Method 2: Try environment variables
+        return None
+    
+    def _credential_from_environment(self, key: str) -> Optional[str]:
+        """Look up a credential in CMDRX_<KEY>."""
         env_var = f"CMDRX_{key.upper()}"
         credential = os.getenv(env_var)
-        if credential:
-            if self._config.get('verbose', False):
-                console.print(f"[green]Using environment variable {env_var}[/green]")
-            return credential
-        
-        # Method 3: Try credentials file
+        if credential and self._config.get('verbose', False):
+            console.print(f"[green]Using environment variable {env_var}[/green]")
+        return credential
+    
+    def _credential_from_file(self, key: str) -> Optional[str]:
+        """Look up a credential in credentials.json."""
         creds_file = self.config_dir / 'credentials.json'
         if creds_file.exists():
             try:
@@ -459,12 +542,24 @@ class ConfigManager:
             except Exception as e:
                 if self._config.get('verbose', False):
                     console.print(f"[yellow]Could not read credentials file: {e}[/yellow]")
-        
         return None
     
-    def get_llm_credentials(self) -> Dict[str, str]:
-        """Get LLM credentials for the configured provider."""
-        provider = self._config.get('llm_provider', 'openai')
+    def get_llm_credentials(
+        self,
+        provider: Optional[str] = None,
+        auth_type: Optional[str] = None
+    ) -> Dict[str, str]:
+        """
+        Get LLM credentials for a provider.
+        
+        Args:
+            provider: Provider name (defaults to the configured provider)
+            auth_type: Custom provider auth type (defaults to the configured one)
+            
+        Returns:
+            Credentials for the provider
+        """
+        provider = provider or self._config.get('llm_provider', 'openai')
         credentials = {}
         
         if provider in self.PREDEFINED_PROVIDERS:
@@ -472,7 +567,7 @@ class ConfigManager:
             if api_key:
                 credentials['api_key'] = api_key
         elif provider == 'custom':
-            auth_type = self._config.get('llm_auth_type', 'none')
+            auth_type = auth_type or self._config.get('llm_auth_type', 'none')
             if auth_type == 'api_key':
                 api_key = self._get_credential('custom_api_key')
                 if api_key:
@@ -553,8 +648,11 @@ class ConfigManager:
     
     def _store_credential_with_method(self, key: str, value: str, method: str) -> None:
         """Store credential using specified method."""
+        self._invalidate_credential(key)
+        
         if method == 'keyring':
             try:
+                import keyring
                 keyring.set_password(self.SERVICE_NAME, key, value)
                 console.print(f"[green]✓ Stored '{key}' in system keyring[/green]")
                 return
@@ -4,34 +4,54 @@ CmdRx Core Module
 Main business logic for analyzing command outputs and generating reports.
 """
 
+import asyncio
+import io
 import os
 import json
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import IO, Callable, Optional, Dict, Any, List, Sequence, Set
 from rich.console import Console
-from rich.panel import Panel
-from rich.markdown import Markdown
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
+from .chain import ProviderChain
+from .compaction import CompactedOutput, OutputCompactor, strip_capture_prefixes
 from .config import ConfigManager
+from .history import AnalysisHistory
 from .llm import LLMProvider, LLMResponse
-from .output import OutputGenerator
+from .mapreduce import MapReduceAnalyzer, iter_chunks
+from .output import Artifacts, OutputGenerator
+from .render import DISPLAY_SECTIONS, render_section
+from .result import AnalysisResult, AnalysisSink, ArtifactSink
+from .retention import GarbageCollector
+from .store import AnalysisStore
+from .streaming import IncrementalJSONParser
+from .templates import TemplateMiner
 from .exceptions import CmdRxError, ConfigurationError, LLMError
 
-console = Console()
-
 
 class CmdRxCore:
     """
     Core CmdRx functionality for analyzing command outputs.
     """
     
+    # Result sections in display order
+    DISPLAY_SECTIONS = DISPLAY_SECTIONS
+    
     def __init__(
         self, 
         verbose: bool = False, 
         log_dir: Optional[str] = None,
-        dry_run: bool = False
+        dry_run: bool = False,
+        use_cache: bool = True,
+        refresh_cache: bool = False,
+        stream: Optional[bool] = None,
+        token_budget: Optional[int] = None,
+        console: Optional[Console] = None,
+        config_manager: Optional[ConfigManager] = None,
+        llm_provider: Optional[Any] = None
     ):
         """
         Initialize CmdRx core.
@@ -40,17 +60,33 @@ class CmdRxCore:
             verbose: Enable verbose output
             log_dir: Override default log directory
             dry_run: Don't create fix scripts
+            use_cache: Serve repeated analyses from the response cache
+            refresh_cache: Ignore cached responses but store fresh ones
+            stream: Stream the LLM response and render sections as they complete
+                (defaults to the stream_output setting)
+            token_budget: Approximate token budget for command output in the
+                prompt, 0 to disable compaction (defaults to output_token_budget)
+            console: Console for all output (defaults to stdout)
+            config_manager: Already loaded configuration to reuse
+            llm_provider: Already initialized provider to reuse; it is shared,
+                so retry events are not reported on this core's console
         """
         self.verbose = verbose
+        self.console = console or Console()
         self.dry_run = dry_run
+        self.use_cache = use_cache
+        self.refresh_cache = refresh_cache
         
         # Initialize configuration
         try:
-            self.config_manager = ConfigManager()
+            self.config_manager = config_manager or ConfigManager()
             self.config = self.config_manager.get_config()
         except Exception as e:
             raise ConfigurationError(f"Failed to load configuration: {e}")
         
+        self.stream = stream if stream is not None else bool(self.config.get('stream_output', False))
+        self.token_budget = token_budget if token_budget is not None else int(self.config.get('output_token_budget', 0))
+        
         # Set up log directory
         if log_dir:
             self.log_dir = Path(log_dir)
@@ -59,24 +95,65 @@ class CmdRxCore:
         
         self.log_dir.mkdir(parents=True, exist_ok=True)
         
-        # Initialize LLM provider
+        # Initialize LLM provider (or an ordered failover/hedging chain of them)
         try:
-            self.llm_provider = LLMProvider(self.config_manager)
+            if llm_provider is not None:
+                self.llm_provider = llm_provider
+            elif self.config.get('llm_chain'):
+                self.llm_provider = ProviderChain(self.config_manager)
+            else:
+                self.llm_provider = LLMProvider(self.config_manager)
         except Exception as e:
             raise ConfigurationError(f"Failed to initialize LLM provider: {e}")
         
+        if verbose and llm_provider is None:
+            # Report retries, circuit breaker changes and failovers as they happen
+            self.llm_provider.on_event = lambda event: self.console.print(f"[yellow]↻ {event}[/yellow]")
+            
+            for lookup in getattr(self.config_manager, 'credential_lookups', []):
+                found = f"from {lookup.source}" if lookup.source else "not found"
+                self.console.print(
+                    f"[blue]Credential '{lookup.key}' {found} in {lookup.seconds * 1000:.1f} ms"
+                    f"{' (cached)' if lookup.cached else ''}[/blue]"
+                )
+        
+        # Provider for the final map-reduce request, created on first use
+        self._reduce_llm: Optional[LLMProvider] = None
+        self._lock = threading.Lock()
+        
+        # Collected once, possibly ahead of time by warm_up()
+        self._system_info: Optional[Dict[str, str]] = None
+        
+        # Parsed result of the most recent analyze_output() call
+        self.last_analysis: Optional[Dict[str, Any]] = None
+        
         # Initialize output generator
+        history = AnalysisHistory.from_config(self.config)
+        store = AnalysisStore.from_config(self.config, self.log_dir)
+        collector = GarbageCollector.from_config(self.config, self.log_dir)
+        if collector is not None:
+            collector.history = history
+            if store is not None:
+                store.on_segment_closed = collector.note
         self.output_generator = OutputGenerator(
             log_dir=self.log_dir, 
             dry_run=dry_run, 
-            verbose=verbose
+            verbose=verbose,
+            console=self.console,
+            history=history,
+            store=store,
+            fsync=str(self.config.get('artifact_fsync', 'off')),
+            collector=collector
         )
     
     def analyze_output(
         self, 
         command: str, 
         output: str, 
-        return_code: Optional[int] = None
+        return_code: Optional[int] = None,
+        compacted: Optional[CompactedOutput] = None,
+        raw: Optional[IO[str]] = None,
+        background: Optional[str] = None
     ) -> bool:
         """
         Analyze command output using configured LLM.
@@ -85,48 +162,462 @@ class CmdRxCore:
             command: The original command executed
             output: The command output to analyze
             return_code: The command's exit code (if available)
+            compacted: Result of compacting the output while it was read, if
+                already done by the caller
+            raw: Seekable stream with the full output, used for map-reduce
+                analysis when output was already compacted by the caller
+            background: What the LLM should know beyond the output, such as
+                earlier results when following a stream
             
         Returns:
             True if analysis completed successfully
         """
         
         if self.verbose:
-            console.print(f"[blue]Starting analysis of command: {command}[/blue]")
+            self.console.print(f"[blue]Starting analysis of command: {command}[/blue]")
         
         # Prepare analysis context
-        analysis_context = {
-            'command': command,
-            'output': output,
-            'return_code': return_code,
-            'timestamp': datetime.now().isoformat(),
-            'system_info': self._get_system_info()
-        }
-        
-        # Generate LLM prompt
-        prompt = self._generate_prompt(analysis_context)
-        
-        if self.verbose:
-            console.print("[blue]Sending request to LLM...[/blue]")
+        analysis_context = self._build_context(command, output, return_code, compacted)
+        analysis_context['background'] = background
         
         # Get LLM analysis
+        rendered: Set[str] = set()
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
-            console=console,
+            console=self.console,
             transient=True
         ) as progress:
             task = progress.add_task("Analyzing with AI...", total=None)
             
             try:
-                llm_response = self.llm_provider.analyze(prompt)
+                provider = self._prepare_output(
+                    analysis_context,
+                    raw if compacted is not None else output,
+                    on_progress=lambda description: progress.update(task, description=description)
+                )
+                if analysis_context.get('mapreduce'):
+                    progress.console.print(f"[dim]Map-reduce: {analysis_context['mapreduce']}[/dim]")
+                
+                # Generate LLM prompt
+                prompt = self._generate_prompt(analysis_context)
+                
+                if self.verbose:
+                    progress.console.print("[blue]Sending request to LLM...[/blue]")
+                progress.update(task, description="Analyzing with AI...")
+                
+                if self.stream:
+                    llm_response = self._analyze_streaming(prompt, rendered, provider)
+                else:
+                    llm_response = provider.analyze(
+                        prompt,
+                        use_cache=self.use_cache,
+                        refresh=self.refresh_cache
+                    )
             except Exception as e:
                 raise LLMError(f"LLM analysis failed: {e}")
         
         if self.verbose:
-            console.print("[green]✓ LLM analysis complete[/green]")
+            if llm_response.cached:
+                self.console.print(f"[green]✓ Served from response cache ({llm_response.response_time * 1000:.0f} ms)[/green]")
+            elif llm_response.coalesced:
+                self.console.print("[green]✓ Shared the result of an identical request already in flight[/green]")
+            else:
+                self.console.print("[green]✓ LLM analysis complete[/green]")
         
         # Process and display results
-        return self._process_llm_response(analysis_context, llm_response)
+        return self._process_llm_response(analysis_context, llm_response, rendered)
+    
+    def analyze(
+        self,
+        command: str,
+        output: str,
+        return_code: Optional[int] = None,
+        sinks: Sequence[AnalysisSink] = (),
+        background: Optional[str] = None
+    ) -> AnalysisResult:
+        """
+        Analyze command output and return the result without side effects.
+        
+        Nothing is displayed or written unless sinks are given, such as
+        ConsoleSink or ArtifactSink. Safe to call from many threads on one
+        core; the core keeps no per-analysis state.
+        
+        Args:
+            command: The original command executed
+            output: The command output to analyze
+            return_code: The command's exit code (if available)
+            sinks: Called in order with the result, in the calling thread
+            background: What the LLM should know beyond the output
+            
+        Returns:
+            The parsed analysis with usage and timings
+        """
+        started = time.perf_counter()
+        analysis_context = self._build_context(command, output, return_code)
+        analysis_context['background'] = background
+        
+        try:
+            provider = self._prepare_output(analysis_context, output, quiet=True)
+            prompt = self._generate_prompt(analysis_context)
+            prepared = time.perf_counter()
+            llm_response = provider.analyze(
+                prompt,
+                use_cache=self.use_cache,
+                refresh=self.refresh_cache
+            )
+        except Exception as e:
+            raise LLMError(f"LLM analysis failed: {e}")
+        
+        return self._finish_result(analysis_context, llm_response, sinks, started, prepared)
+    
+    async def aanalyze(
+        self,
+        command: str,
+        output: str,
+        return_code: Optional[int] = None,
+        sinks: Sequence[AnalysisSink] = (),
+        background: Optional[str] = None,
+        timeout: Optional[float] = None
+    ) -> AnalysisResult:
+        """
+        Analyze command output without blocking the event loop.
+        
+        Like analyze(), but the LLM request runs on the provider's async
+        client, and preparing the output (including map-reduce) runs in the
+        loop's default executor. Sinks still run synchronously on the loop.
+        
+        Args:
+            command: The original command executed
+            output: The command output to analyze
+            return_code: The command's exit code (if available)
+            sinks: Called in order with the result
+            background: What the LLM should know beyond the output
+            timeout: Deadline for the LLM request in seconds
+            
+        Returns:
+            The parsed analysis with usage and timings
+        """
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        analysis_context = await loop.run_in_executor(None, self._build_context, command, output, return_code)
+        analysis_context['background'] = background
+        
+        try:
+            provider = await loop.run_in_executor(
+                None, lambda: self._prepare_output(analysis_context, output, quiet=True)
+            )
+            prompt = self._generate_prompt(analysis_context)
+            prepared = time.perf_counter()
+            llm_response = await provider.aanalyze(
+                prompt,
+                use_cache=self.use_cache,
+                refresh=self.refresh_cache,
+                timeout=timeout
+            )
+        except Exception as e:
+            raise LLMError(f"LLM analysis failed: {e}")
+        
+        return self._finish_result(analysis_context, llm_response, sinks, started, prepared)
+    
+    def analyze_quiet(
+        self,
+        command: str,
+        output: str,
+        return_code: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyze command output and write artifacts without console output.
+        
+        Used by batch mode, where many analyses run concurrently and only a
+        summary is displayed.
+        
+        Args:
+            command: The original command executed
+            output: The command output to analyze
+            return_code: The command's exit code (if available)
+            
+        Returns:
+            Dictionary with analysis data, LLM response and artifact paths
+        """
+        result = self.analyze(command, output, return_code, sinks=[ArtifactSink(self.output_generator)])
+        artifacts = result.artifacts or Artifacts(log_file=None, fix_script=None)
+        
+        return {
+            'analysis': result.to_dict(),
+            'llm_response': result.llm_response,
+            'log_file': artifacts.log_file,
+            'fix_script': artifacts.fix_script,
+            'record_id': artifacts.record_id,
+        }
+    
+    def _finish_result(
+        self,
+        context: Dict[str, Any],
+        llm_response: LLMResponse,
+        sinks: Sequence[AnalysisSink],
+        started: float,
+        prepared: float
+    ) -> AnalysisResult:
+        """Parse the LLM response into a result, record timings and run the sinks."""
+        answered = time.perf_counter()
+        result = AnalysisResult.from_analysis(context, self._parse_analysis(llm_response, quiet=True), llm_response)
+        parsed = time.perf_counter()
+        result.timings = {
+            'prepare': prepared - started,
+            'llm': answered - prepared,
+            'parse': parsed - answered,
+        }
+        
+        for sink in sinks:
+            sink.emit(result)
+        
+        finished = time.perf_counter()
+        result.timings['sinks'] = finished - parsed
+        result.timings['total'] = finished - started
+        return result
+    
+    async def aanalyze_output(
+        self,
+        command: str,
+        output: str,
+        return_code: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> bool:
+        """
+        Analyze command output without blocking the event loop.
+        
+        Many analyses can run concurrently on one loop; they share the
+        provider's async client. Cancelling the calling task cancels the
+        in-flight LLM request. Preparing the output (including map-reduce)
+        and displaying and writing the results run in the loop's default
+        executor.
+        
+        Args:
+            command: The original command executed
+            output: The command output to analyze
+            return_code: The command's exit code (if available)
+            timeout: Deadline for the LLM request in seconds
+            
+        Returns:
+            True if analysis completed successfully
+        """
+        loop = asyncio.get_running_loop()
+        # Collecting system information runs subprocesses on first use
+        analysis_context = await loop.run_in_executor(None, self._build_context, command, output, return_code)
+        
+        try:
+            provider = await loop.run_in_executor(None, self._prepare_output, analysis_context, output)
+            prompt = self._generate_prompt(analysis_context)
+            llm_response = await provider.aanalyze(
+                prompt,
+                use_cache=self.use_cache,
+                refresh=self.refresh_cache,
+                timeout=timeout
+            )
+        except Exception as e:
+            raise LLMError(f"LLM analysis failed: {e}")
+        
+        return await loop.run_in_executor(None, self._process_llm_response, analysis_context, llm_response)
+    
+    def warm_up(self) -> None:
+        """
+        Prepare everything an analysis needs besides the output itself.
+        
+        Collects system information and opens the LLM provider connection,
+        so the request goes out as soon as the output is available. Meant to
+        run while the analyzed command is still executing.
+        """
+        self._system_info = self._get_system_info()
+        
+        started = time.perf_counter()
+        connected = self.llm_provider.warm_up()
+        if self.verbose:
+            state = "open" if connected else "not opened"
+            self.console.print(
+                f"[blue]LLM connection {state} after {(time.perf_counter() - started) * 1000:.0f} ms[/blue]"
+            )
+    
+    def create_compactor(self) -> Optional[OutputCompactor]:
+        """
+        Create a compactor for streaming command output into the token budget.
+        
+        Returns:
+            Output compactor, or None if compaction is disabled
+        """
+        if self.token_budget <= 0:
+            return None
+        
+        # Large logs are additionally summarized as templates with counts
+        min_lines = int(self.config.get('log_template_min_lines', 0))
+        miner = TemplateMiner(min_lines=min_lines) if min_lines > 0 else None
+        
+        return OutputCompactor(token_budget=self.token_budget, miner=miner)
+    
+    def compact_output(self, output: str) -> Optional[CompactedOutput]:
+        """
+        Compact captured command output to fit the token budget.
+        
+        Args:
+            output: Command output
+            
+        Returns:
+            Compacted output, or None if compaction is disabled
+        """
+        compactor = self.create_compactor()
+        if compactor is None:
+            return None
+        compactor.feed(output)
+        return compactor.finish()
+    
+    def _build_context(
+        self,
+        command: str,
+        output: str,
+        return_code: Optional[int],
+        compacted: Optional[CompactedOutput] = None
+    ) -> Dict[str, Any]:
+        """Prepare the analysis context for a command output."""
+        if compacted is None:
+            compacted = self.compact_output(output)
+        
+        if compacted:
+            # A template summary replaces the raw lines when the output is mostly repetitive logs
+            output = compacted.templates or compacted.text
+        
+        return {
+            'command': command,
+            'output': output,
+            'compaction': compacted.summary() if compacted and compacted.reduced else None,
+            'log_templates': bool(compacted and compacted.templates),
+            # Lines were dropped to fit the budget, so map-reduce could see more
+            'oversized': bool(compacted and compacted.omitted_lines and not compacted.templates),
+            'output_size': compacted.total_bytes if compacted else len(output),
+            'return_code': return_code,
+            'timestamp': datetime.now().isoformat(),
+            'system_info': self._get_cached_system_info()
+        }
+    
+    def _prepare_output(
+        self,
+        context: Dict[str, Any],
+        source: Any,
+        on_progress: Optional[Callable[[str], None]] = None,
+        quiet: bool = False
+    ) -> Any:
+        """
+        Run map-reduce over an oversized output if enabled.
+        
+        When the compacted output had to drop lines and the output is within
+        mapreduce_max_chunks, findings are extracted from every chunk and
+        replace the output in the context.
+        
+        Args:
+            context: Analysis context, updated in place
+            source: Full output as a string or seekable text stream (None if unavailable)
+            on_progress: Called with a short progress description
+            quiet: Don't report on the console
+            
+        Returns:
+            The provider to use for the final analysis request
+        """
+        if not context.get('oversized') or source is None or not self.config.get('mapreduce_enabled', False):
+            return self.llm_provider
+        
+        analyzer = MapReduceAnalyzer(
+            self.llm_provider,
+            chunk_tokens=int(self.config.get('mapreduce_chunk_tokens', 6000)),
+            concurrency=int(self.config.get('mapreduce_concurrency', 4)),
+            findings_budget=self.token_budget,
+            use_cache=self.use_cache,
+            refresh=self.refresh_cache
+        )
+        
+        total_chunks = analyzer.estimate_chunks(context['output_size'])
+        max_chunks = int(self.config.get('mapreduce_max_chunks', 32))
+        if total_chunks > max_chunks:
+            if self.verbose and not quiet:
+                self.console.print(
+                    f"[yellow]Output needs ~{total_chunks} chunks (limit {max_chunks}); "
+                    f"analyzing the compacted output instead[/yellow]"
+                )
+            return self.llm_provider
+        
+        if isinstance(source, str):
+            source = io.StringIO(source)
+        else:
+            source.seek(0)
+        
+        result = analyzer.run(
+            context['command'],
+            iter_chunks(source, analyzer.chunk_tokens),
+            total_chunks,
+            on_progress=on_progress
+        )
+        context['output'] = result.findings
+        context['mapreduce'] = result.summary()
+        
+        return self._reduce_provider()
+    
+    def _reduce_provider(self) -> Any:
+        """Get the provider for the final map-reduce request (mapreduce_reduce_model)."""
+        model = self.config.get('mapreduce_reduce_model')
+        if not model:
+            return self.llm_provider
+        
+        with self._lock:
+            if self._reduce_llm is None:
+                self._reduce_llm = LLMProvider(self.config_manager, overrides={'llm_model': model})
+                self._reduce_llm.on_event = self.llm_provider.on_event
+        return self._reduce_llm
+    
+    def _analyze_streaming(self, prompt: str, rendered: Set[str], provider: Any = None) -> LLMResponse:
+        """
+        Stream the LLM analysis, displaying each section as soon as it is complete.
+        
+        Args:
+            prompt: The analysis prompt
+            rendered: Updated with the sections that have been displayed
+            provider: Provider to use instead of the configured one
+            
+        Returns:
+            The complete LLM response
+        """
+        parser = IncrementalJSONParser()
+        
+        def on_text(text: str) -> None:
+            if parser.feed(text):
+                self._display_ready_sections(parser.fields, rendered, final=parser.complete)
+        
+        response: LLMResponse = (provider or self.llm_provider).analyze_stream(
+            prompt,
+            on_text,
+            use_cache=self.use_cache,
+            refresh=self.refresh_cache
+        )
+        return response
+    
+    def _display_ready_sections(
+        self,
+        analysis_data: Dict[str, Any],
+        rendered: Set[str],
+        final: bool = False
+    ) -> None:
+        """Display sections that are complete, keeping the normal display order."""
+        for section in self.DISPLAY_SECTIONS:
+            if section in rendered:
+                continue
+            
+            ready = section in analysis_data
+            if section == 'analysis':
+                # The panel title needs the status, which follows the analysis text
+                ready = ready and ('status' in analysis_data or final)
+            
+            if not ready and not final:
+                break
+            
+            self._display_section(section, analysis_data)
+            rendered.add(section)
     
     def _generate_prompt(self, context: Dict[str, Any]) -> str:
         """Generate the prompt for LLM analysis."""
@@ -153,11 +644,35 @@ class CmdRxCore:
                 f"- User: {system_info.get('user', 'Unknown')}",
             ])
         
+        if context.get('background'):
+            prompt_parts.extend(["", context['background']])
+        
+        if context.get('compaction') and not context.get('mapreduce'):
+            prompt_parts.extend([
+                "",
+                f"Note: the output was compacted to fit the analysis budget ({context['compaction']}).",
+                "Bracketed [...] lines were inserted by cmdrx to mark omissions and repeat counts.",
+            ])
+        
+        if context.get('mapreduce'):
+            prompt_parts.extend([
+                "",
+                f"Note: the output was too large for a single request ({context['mapreduce']}).",
+                "The section below contains the findings extracted from the full output, not the raw output.",
+            ])
+        
+        if context.get('log_templates'):
+            prompt_parts.append(
+                "The log lines are grouped into templates with occurrence counts, first/last "
+                "timestamps and sample values for the <*> variable parts."
+            )
+        
         prompt_parts.extend([
             "",
-            "Command output:",
+            "Findings from the command output:" if context.get('mapreduce') else "Command output:",
             "```",
-            context['output'],
+            # Arrival timestamps would make every prompt (and cache key) unique
+            strip_capture_prefixes(context['output']),
             "```",
             "",
             "Please provide your analysis in the following JSON format:",
@@ -200,17 +715,35 @@ class CmdRxCore:
     def _process_llm_response(
         self, 
         context: Dict[str, Any], 
-        llm_response: LLMResponse
+        llm_response: LLMResponse,
+        rendered: Optional[Set[str]] = None
     ) -> bool:
         """Process LLM response and generate outputs."""
         
+        analysis_data = self._parse_analysis(llm_response)
+        self.last_analysis = analysis_data
+        
+        # Display analysis results not already shown while streaming
+        self._display_ready_sections(analysis_data, rendered if rendered is not None else set(), final=True)
+        
+        # Generate output files
+        return self.output_generator.generate_outputs(context, analysis_data, llm_response)
+    
+    def _parse_analysis(self, llm_response: LLMResponse, quiet: bool = False) -> Dict[str, Any]:
+        """Parse the LLM response into analysis data, falling back to plain text."""
+        
         try:
             # Parse JSON response
-            analysis_data = json.loads(llm_response.content)
+            analysis_data: Dict[str, Any] = json.loads(llm_response.content)
         except json.JSONDecodeError as e:
-            if self.verbose:
-                console.print(f"[yellow]Failed to parse JSON response: {e}[/yellow]")
-                console.print("[yellow]Treating as plain text response[/yellow]")
+            # Recover fields from JSON wrapped in prose or cut off mid-stream
+            parser = IncrementalJSONParser()
+            parser.feed(llm_response.content)
+            
+            if self.verbose and not quiet:
+                self.console.print(f"[yellow]Failed to parse JSON response: {e}[/yellow]")
+                if not parser.fields:
+                    self.console.print("[yellow]Treating as plain text response[/yellow]")
             
             # Fallback to plain text processing
             analysis_data = {
@@ -221,106 +754,26 @@ class CmdRxCore:
                 "suggested_fixes": [],
                 "additional_info": ""
             }
+            if parser.fields:
+                analysis_data.update(parser.fields)
         
-        # Display analysis results
-        self._display_analysis(analysis_data)
-        
-        # Generate output files
-        return self.output_generator.generate_outputs(context, analysis_data, llm_response)
+        return analysis_data
     
     def _display_analysis(self, analysis_data: Dict[str, Any]) -> None:
         """Display the analysis results to the console."""
-        
-        # Status indicator
-        status = analysis_data.get('status', 'info')
-        status_colors = {
-            'success': 'green',
-            'warning': 'yellow', 
-            'error': 'red',
-            'info': 'blue'
-        }
-        status_color = status_colors.get(status, 'blue')
-        
-        # Main analysis
-        console.print(Panel(
-            analysis_data.get('analysis', 'No analysis provided'),
-            title=f"[{status_color}]Analysis ({status.upper()})[/{status_color}]",
-            border_style=status_color
-        ))
-        
-        # Issues identified
-        issues = analysis_data.get('issues', [])
-        if issues:
-            issues_text = "\n".join(f"• {issue}" for issue in issues)
-            console.print(Panel(
-                issues_text,
-                title="[red]Issues Identified[/red]",
-                border_style="red"
-            ))
-        
-        # Troubleshooting steps
-        steps = analysis_data.get('troubleshooting_steps', [])
-        if steps:
-            steps_text = []
-            for step in steps:
-                step_num = step.get('step', '?')
-                description = step.get('description', 'No description')
-                command = step.get('command', '')
-                explanation = step.get('explanation', '')
-                
-                step_text = f"**{step_num}. {description}**"
-                if command:
-                    step_text += f"\n   Command: `{command}`"
-                if explanation:
-                    step_text += f"\n   {explanation}"
-                steps_text.append(step_text)
-            
-            console.print(Panel(
-                Markdown("\n\n".join(steps_text)),
-                title="[blue]Troubleshooting Steps[/blue]",
-                border_style="blue"
-            ))
-        
-        # Suggested fixes
-        fixes = analysis_data.get('suggested_fixes', [])
-        if fixes:
-            fixes_text = []
-            for i, fix in enumerate(fixes, 1):
-                description = fix.get('description', 'No description')
-                commands = fix.get('commands', [])
-                risk_level = fix.get('risk_level', 'unknown')
-                explanation = fix.get('explanation', '')
-                
-                risk_colors = {'low': 'green', 'medium': 'yellow', 'high': 'red'}
-                risk_color = risk_colors.get(risk_level, 'yellow')
-                
-                fix_text = f"**Fix {i}: {description}**\n"
-                fix_text += f"Risk Level: [{risk_color}]{risk_level.upper()}[/{risk_color}]\n"
-                
-                if commands:
-                    fix_text += "\nCommands:\n"
-                    for cmd in commands:
-                        fix_text += f"```bash\n{cmd}\n```\n"
-                
-                if explanation:
-                    fix_text += f"\n{explanation}"
-                
-                fixes_text.append(fix_text)
-            
-            console.print(Panel(
-                Markdown("\n\n---\n\n".join(fixes_text)),
-                title="[green]Suggested Fixes[/green]",
-                border_style="green"
-            ))
-        
-        # Additional information
-        additional_info = analysis_data.get('additional_info', '')
-        if additional_info:
-            console.print(Panel(
-                additional_info,
-                title="[cyan]Additional Information[/cyan]",
-                border_style="cyan"
-            ))
+        for section in self.DISPLAY_SECTIONS:
+            self._display_section(section, analysis_data)
+    
+    def _display_section(self, section: str, analysis_data: Dict[str, Any]) -> None:
+        """Display a single section of the analysis results."""
+        render_section(self.console, section, analysis_data)
+    
+    def _get_cached_system_info(self) -> Dict[str, str]:
+        """Get system information, collecting it on first use."""
+        if self._system_info is None:
+            # Concurrent first calls collect the same values, so no lock is needed
+            self._system_info = self._get_system_info()
+        return self._system_info
     
     def _get_system_info(self) -> Dict[str, str]:
         """Get basic system information for context."""
@@ -0,0 +1,341 @@
+"""
+CmdRx Daemon
+
+Resident per-user daemon (cmdrxd) that keeps configuration, credentials and
+pooled LLM connections warm, and runs analyses for the thin cmdrx client
+over a Unix socket.
+"""
+
+import os
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Dict, Iterator, Literal, Optional, Tuple, Union, cast
+
+import click
+from rich.console import Console
+
+from .chain import ProviderChain
+from .client import read_message, request, send_message, socket_path
+from .config import ConfigManager
+from .exceptions import CmdRxError, DaemonError
+from .llm import LLMProvider
+from .runner import analyze_command_output, analyze_piped, run_analysis
+
+if TYPE_CHECKING:
+    from .core import CmdRxCore
+
+
+class _SocketWriter:
+    """File-like object sending rendered console output to the client."""
+
+    def __init__(self, stream: Any):
+        self._stream = stream
+        self._lock = threading.Lock()
+
+    def write(self, text: str) -> int:
+        # Progress spinners render from a background thread
+        with self._lock:
+            send_message(self._stream, {'type': 'output', 'text': text})
+        return len(text)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._stream.flush()
+
+    def isatty(self) -> bool:
+        return False
+
+
+def client_console(stream: Any, terminal: Dict[str, Any]) -> Console:
+    """
+    Create a console rendering for the client's terminal.
+
+    Args:
+        stream: Binary stream to the client
+        terminal: Terminal description sent by the client
+
+    Returns:
+        Console writing output messages to the stream
+    """
+    color_system: Optional[Literal['standard', '256', 'truecolor']] = None
+    if terminal.get('tty') and not terminal.get('no_color'):
+        if terminal.get('colorterm') in ('truecolor', '24bit'):
+            color_system = 'truecolor'
+        elif '256color' in terminal.get('term', ''):
+            color_system = '256'
+        else:
+            color_system = 'standard'
+
+    return Console(
+        file=cast(IO[str], _SocketWriter(stream)),
+        width=terminal.get('width') or 80,
+        force_terminal=bool(terminal.get('tty')),
+        color_system=color_system,
+        no_color=bool(terminal.get('no_color'))
+    )
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Unix socket server holding warm CmdRx state.
+
+    Configuration and the LLM provider (with its credentials and pooled
+    connections) are created once and shared by all requests; they are
+    reloaded when the configuration file changes or on a reload request. Each request gets its own
+    lightweight CmdRxCore rendering to the client's terminal.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: Path, idle_timeout: float = 0):
+        """
+        Initialize daemon server.
+
+        Args:
+            path: Socket path
+            idle_timeout: Exit after this many seconds without requests (0 = never)
+        """
+        self.path = path
+        self.idle_timeout = idle_timeout
+        self.started = time.time()
+        self.last_activity = self.started
+        self.requests = 0
+        self.active = 0
+
+        self._stopping = threading.Event()
+        self._state_lock = threading.Lock()
+        self._count_lock = threading.Lock()
+        self._config_manager: Optional[ConfigManager] = None
+        self._provider: Any = None
+        self._config_mtime: Optional[float] = None
+
+        path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        _remove_stale_socket(path)
+
+        # Only the owner may connect
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(str(path), DaemonHandler)
+        finally:
+            os.umask(old_umask)
+
+    def run(self) -> None:
+        """Serve requests until stopped or idle for too long."""
+        self.timeout = 1.0
+        try:
+            while not self._stopping.is_set():
+                self.handle_request()
+                if (
+                    self.idle_timeout
+                    and not self.active
+                    and time.time() - self.last_activity > self.idle_timeout
+                ):
+                    break
+        finally:
+            self.server_close()
+            try:
+                self.path.unlink()
+            except OSError:
+                pass
+
+    def stop(self) -> None:
+        """Stop after the current poll interval."""
+        self._stopping.set()
+
+    def track(self, delta: int) -> None:
+        """Count an analysis starting (1) or finishing (-1)."""
+        with self._count_lock:
+            self.active += delta
+            if delta > 0:
+                self.requests += 1
+            self.last_activity = time.time()
+
+    def warm_state(self) -> Tuple[ConfigManager, Any]:
+        """
+        Get the shared configuration and provider, reloading on config changes.
+
+        Returns:
+            Configuration manager and LLM provider (or provider chain)
+        """
+        with self._state_lock:
+            config_file = Path.home() / '.config' / 'cmdrx' / ConfigManager.CONFIG_FILE
+            try:
+                mtime = config_file.stat().st_mtime
+            except OSError:
+                mtime = None
+
+            if self._provider is None or mtime != self._config_mtime:
+                if self._provider is not None:
+                    ConfigManager.clear_credential_cache()
+                config_manager = ConfigManager()
+                provider: Union[ProviderChain, LLMProvider]
+                if config_manager.get_config().get('llm_chain'):
+                    provider = ProviderChain(config_manager)
+                else:
+                    provider = LLMProvider(config_manager)
+                self._config_manager, self._provider = config_manager, provider
+                self._config_mtime = mtime
+
+            assert self._config_manager is not None
+            return self._config_manager, self._provider
+
+    def warm_up(self) -> None:
+        """Get ready for an analysis that is about to be requested."""
+        self.track(0)
+        try:
+            _, provider = self.warm_state()
+            provider.warm_up()
+        except Exception:
+            # Reported by the analysis request itself
+            pass
+
+    def reload(self) -> None:
+        """Forget cached credentials and reload configuration on the next request."""
+        with self._state_lock:
+            ConfigManager.clear_credential_cache()
+            self._provider = None
+
+    def status(self) -> Dict[str, Any]:
+        """Describe the running daemon."""
+        return {
+            'type': 'status',
+            'pid': os.getpid(),
+            'uptime': time.time() - self.started,
+            'requests': self.requests,
+            'active': self.active,
+            'socket': str(self.path),
+        }
+
+
+class DaemonHandler(socketserver.StreamRequestHandler):
+    """Handles one client connection."""
+
+    server: DaemonServer
+
+    def handle(self) -> None:
+        if not _same_user(self.request):
+            return
+
+        message = read_message(self.rfile)
+        if message is None:
+            return
+
+        kind = message.get('type')
+        if kind == 'ping':
+            send_message(self.wfile, self.server.status())
+        elif kind == 'reload':
+            self.server.reload()
+            send_message(self.wfile, {'type': 'ok'})
+        elif kind == 'warm':
+            send_message(self.wfile, {'type': 'ok'})
+            self.wfile.flush()
+            self.server.warm_up()
+        elif kind == 'shutdown':
+            send_message(self.wfile, {'type': 'ok'})
+            self.server.stop()
+        elif kind == 'analyze':
+            self.server.track(1)
+            try:
+                code = self._analyze(message)
+                send_message(self.wfile, {'type': 'exit', 'code': code})
+            except (BrokenPipeError, ConnectionResetError):
+                # Client went away, e.g. interrupted with Ctrl-C
+                pass
+            finally:
+                self.server.track(-1)
+        else:
+            send_message(self.wfile, {'type': 'error', 'message': f"Unknown request: {kind}"})
+
+    def _analyze(self, message: Dict[str, Any]) -> int:
+        """Run an analysis request, rendering to the client."""
+        out = client_console(self.wfile, message.get('terminal', {}))
+        options = message.get('options', {})
+
+        try:
+            config_manager, provider = self.server.warm_state()
+        except Exception as e:
+            out.print(f"[red]Configuration error: {e}[/red]")
+            out.print("[yellow]Run 'cmdrx --config' to set up configuration.[/yellow]")
+            return 1
+
+        if message.get('mode') == 'piped':
+            def analyze(core: 'CmdRxCore') -> bool:
+                return analyze_piped(core, self._data())
+        else:
+            # Large command output follows the request as data messages
+            output = message.get('output')
+
+            def analyze(core: 'CmdRxCore') -> bool:
+                return analyze_command_output(
+                    core, message['command'], self._data() if output is None else output,
+                    message.get('return_code'), echoed=message.get('echoed', False)
+                )
+
+        return run_analysis(
+            options, out, analyze,
+            config_manager=config_manager, llm_provider=provider
+        )
+
+    def _data(self) -> Iterator[str]:
+        """Read piped input or command output chunks sent by the client."""
+        while True:
+            message = read_message(self.rfile)
+            if message is None:
+                raise CmdRxError("Client closed the connection before the end of input")
+            if message.get('type') == 'end':
+                return
+            yield message.get('text', '')
+
+
+def _same_user(sock: socket.socket) -> bool:
+    """Check that the peer runs as the daemon's user, where the platform tells us."""
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return True
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+    _, uid, _ = struct.unpack('3i', creds)
+    return bool(uid == os.getuid())
+
+
+def _remove_stale_socket(path: Path) -> None:
+    """Remove a socket left behind by a daemon that is no longer running."""
+    if not path.exists():
+        return
+    if request({'type': 'ping'}, path, timeout=1.0) is not None:
+        raise DaemonError(f"cmdrxd is already running on {path}")
+    path.unlink()
+
+
+@click.command('cmdrxd')
+@click.option('--idle-timeout', type=float, default=None,
+              help='Exit after this many idle seconds (default: daemon_idle_timeout setting, 0 = never)')
+def main(idle_timeout: Optional[float]) -> None:
+    """Run the cmdrx daemon in the foreground."""
+    if idle_timeout is None:
+        idle_timeout = float(ConfigManager().get_config().get('daemon_idle_timeout', 0))
+
+    try:
+        server = DaemonServer(socket_path(), idle_timeout=idle_timeout)
+    except DaemonError as e:
+        click.echo(f"cmdrxd: {e}", err=True)
+        sys.exit(1)
+
+    try:
+        server.warm_state()
+    except Exception as e:
+        # Reported to clients on their first request
+        click.echo(f"cmdrxd: configuration not loaded: {e}", err=True)
+
+    click.echo(f"cmdrxd listening on {server.path}", err=True)
+    try:
+        server.run()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
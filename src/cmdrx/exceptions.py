@@ -20,6 +20,21 @@ class LLMError(CmdRxError):
     pass
 
 
+class CircuitOpenError(LLMError):
+    """Raised when a provider's circuit breaker is open and requests fail fast."""
+    pass
+
+
+class RateLimitError(LLMError):
+    """Raised when the client-side rate limit would delay a request too long."""
+    pass
+
+
+class DaemonError(CmdRxError):
+    """Raised when the cmdrxd daemon cannot be started or reached."""
+    pass
+
+
 class InputError(CmdRxError):
     """Raised when there are input processing errors."""
     pass
@@ -0,0 +1,305 @@
+"""
+CmdRx Execution Module
+
+Runs shell commands for analysis. Output is shown live as it arrives and
+captured with arrival timestamps into a bounded buffer that spills to disk,
+so long-running and chatty commands neither block the terminal nor exhaust
+memory.
+"""
+
+import codecs
+import os
+import selectors
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import IO, BinaryIO, Deque, Iterator, List, Optional, TextIO, cast
+
+from .exceptions import CmdRxError
+
+# Captured output beyond this size is written to a temporary file
+CAPTURE_MEMORY_BYTES = 8 * 1024 * 1024
+
+# At most this much output is kept; the middle of longer output is dropped
+CAPTURE_MAX_BYTES = 64 * 1024 * 1024
+
+# Seconds between SIGTERM and SIGKILL when a command times out
+KILL_GRACE_PERIOD = 2.0
+
+READ_SIZE = 64 * 1024
+
+
+class CaptureBuffer:
+    """
+    Bounded capture of command output lines.
+
+    Lines are kept in a spooled temporary file until the head of the output
+    fills three quarters of the limit; after that only the most recent lines
+    are kept in a ring that holds the remaining quarter. Sizes are counted
+    in characters.
+    """
+
+    def __init__(self, max_bytes: int = CAPTURE_MAX_BYTES, memory_bytes: int = CAPTURE_MEMORY_BYTES):
+        """
+        Initialize capture buffer.
+
+        Args:
+            max_bytes: Approximate limit on the captured output (0 = unlimited)
+            memory_bytes: Captured output beyond this size spills to disk
+        """
+        self._file = tempfile.SpooledTemporaryFile(max_size=memory_bytes, mode='w+', encoding='utf-8')
+        self._tail_limit = max_bytes // 4 if max_bytes else 0
+        self._head_limit = max_bytes - self._tail_limit if max_bytes else 0
+        self._head_bytes = 0
+        self._tail: Deque[str] = deque()
+        self._tail_bytes = 0
+
+        self.total_lines = 0
+        self.total_bytes = 0
+        self.omitted_lines = 0
+
+    def add(self, line: str) -> None:
+        """Capture one line, including its newline."""
+        self.total_lines += 1
+        self.total_bytes += len(line)
+
+        if not self._head_limit or (not self._tail and self._head_bytes + len(line) <= self._head_limit):
+            self._file.write(line)
+            self._head_bytes += len(line)
+            return
+
+        if len(line) > self._tail_limit:
+            line = line[:self._tail_limit - 1] + "\n"
+        self._tail.append(line)
+        self._tail_bytes += len(line)
+        while self._tail_bytes > self._tail_limit:
+            self._tail_bytes -= len(self._tail.popleft())
+            self.omitted_lines += 1
+
+    def chunks(self, size: int = READ_SIZE) -> Iterator[str]:
+        """Iterate over the captured output in chunks of text."""
+        self._file.seek(0)
+        for chunk in iter(lambda: self._file.read(size), ''):
+            yield chunk
+        if self.omitted_lines:
+            yield f"[... {self.omitted_lines} lines omitted by cmdrx ...]\n"
+        if self._tail:
+            yield "".join(self._tail)
+
+    def text(self) -> str:
+        """Get the captured output as one string."""
+        return "".join(self.chunks())
+
+    def close(self) -> None:
+        """Discard the captured output."""
+        self._file.close()
+        self._tail.clear()
+
+
+@dataclass
+class ExecutionResult:
+    """Outcome of an executed command."""
+    command: str
+    return_code: int
+    duration: float
+    capture: CaptureBuffer = field(repr=False)
+    timed_out: bool = False
+
+    def chunks(self) -> Iterator[str]:
+        """Iterate over the captured, timestamped output."""
+        return self.capture.chunks()
+
+    def text(self) -> str:
+        """Get the captured, timestamped output as one string."""
+        return self.capture.text()
+
+    def close(self) -> None:
+        """Discard the captured output."""
+        self.capture.close()
+
+
+def execute(
+    command: str,
+    timeout: Optional[float] = None,
+    tee: bool = True,
+    max_bytes: int = CAPTURE_MAX_BYTES,
+    memory_bytes: int = CAPTURE_MEMORY_BYTES
+) -> ExecutionResult:
+    """
+    Run a shell command, streaming and capturing its output.
+
+    stdout and stderr are read as data arrives. With tee, each is copied to
+    our own stdout/stderr unchanged. Both are captured as lines in arrival
+    order, prefixed with the seconds since the command started; stderr lines
+    are marked as such. The command runs in its own process group, which is
+    killed as a whole on timeout or interrupt.
+
+    Args:
+        command: Shell command to run
+        timeout: Seconds before the command is killed (None or 0 = no limit)
+        tee: Copy the output to the terminal while it runs
+        max_bytes: Approximate limit on the captured output (0 = unlimited)
+        memory_bytes: Captured output beyond this size spills to disk
+
+    Returns:
+        Execution result holding the captured output
+
+    Raises:
+        CmdRxError: If the command cannot be started
+    """
+    capture = CaptureBuffer(max_bytes, memory_bytes)
+    start = time.monotonic()
+    try:
+        process = subprocess.Popen(
+            command,
+            shell=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=True
+        )
+    except OSError as e:
+        capture.close()
+        raise CmdRxError(f"Command '{command}' could not be started: {e}")
+    assert process.stdout is not None and process.stderr is not None
+
+    targets = {
+        process.stdout: _binary_stream(sys.stdout) if tee else None,
+        process.stderr: _binary_stream(sys.stderr) if tee else None,
+    }
+    lines = {
+        process.stdout: _LineCapture(capture, start, ""),
+        process.stderr: _LineCapture(capture, start, " stderr"),
+    }
+    deadline = start + timeout if timeout else None
+    timed_out = False
+
+    try:
+        with selectors.DefaultSelector() as selector:
+            for stream in targets:
+                selector.register(stream, selectors.EVENT_READ)
+
+            while selector.get_map():
+                wait = None
+                if deadline is not None:
+                    wait = deadline - time.monotonic()
+                    if wait <= 0:
+                        timed_out = True
+                        break
+
+                for key, _ in selector.select(wait):
+                    pipe = cast(IO[bytes], key.fileobj)
+                    data = os.read(key.fd, READ_SIZE)
+                    if not data:
+                        selector.unregister(pipe)
+                        continue
+                    target = targets[pipe]
+                    if target is not None:
+                        target.write(data)
+                        target.flush()
+                    lines[pipe].feed(data)
+    except BaseException:
+        _kill_group(process)
+        capture.close()
+        raise
+    finally:
+        process.stdout.close()
+        process.stderr.close()
+
+    if timed_out:
+        _kill_group(process)
+    for line_capture in lines.values():
+        line_capture.finish()
+    if timed_out:
+        capture.add(f"[cmdrx: command timed out after {timeout:g}s and was killed]\n")
+
+    return ExecutionResult(
+        command=command,
+        return_code=process.wait(),
+        duration=time.monotonic() - start,
+        timed_out=timed_out,
+        capture=capture
+    )
+
+
+class _LineCapture:
+    """Splits one stream's output into timestamped lines."""
+
+    def __init__(self, capture: CaptureBuffer, start: float, label: str):
+        self._capture = capture
+        self._start = start
+        self._label = label
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._partial: List[str] = []
+        self._line_started: Optional[float] = None
+
+    def feed(self, data: bytes) -> None:
+        now = time.monotonic()
+        text = self._decoder.decode(data)
+        while text:
+            if self._line_started is None:
+                self._line_started = now
+            newline = text.find("\n")
+            if newline < 0:
+                self._partial.append(text)
+                return
+            self._partial.append(text[:newline + 1])
+            self._emit()
+            text = text[newline + 1:]
+
+    def finish(self) -> None:
+        tail = self._decoder.decode(b'', final=True)
+        if tail:
+            self._partial.append(tail)
+        if self._partial:
+            self._partial.append("\n")
+            self._emit()
+
+    def _emit(self) -> None:
+        assert self._line_started is not None
+        elapsed = self._line_started - self._start
+        self._capture.add(f"[+{elapsed:.3f}s{self._label}] {''.join(self._partial)}")
+        self._partial = []
+        self._line_started = None
+
+
+def _binary_stream(stream: Optional[TextIO]) -> Optional[BinaryIO]:
+    """Get the binary buffer behind a text stream, if it has one."""
+    if stream is None:
+        return None
+    try:
+        stream.flush()
+    except (AttributeError, OSError, ValueError):
+        pass
+    return getattr(stream, 'buffer', None)
+
+
+def _kill_group(process: subprocess.Popen) -> None:
+    """Terminate the command's process group, forcibly after a grace period."""
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        try:
+            os.killpg(process.pid, sig)
+        except ProcessLookupError:
+            break
+        deadline = time.monotonic() + KILL_GRACE_PERIOD
+        while _group_alive(process):
+            if time.monotonic() > deadline:
+                break
+            time.sleep(0.05)
+        else:
+            break
+    process.wait()
+
+
+def _group_alive(process: subprocess.Popen) -> bool:
+    """Check whether any process of the command's group is still running."""
+    # Reap the shell so it does not count as a member
+    process.poll()
+    try:
+        os.killpg(process.pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
@@ -0,0 +1,114 @@
+"""
+CmdRx File Utilities
+
+Collision-free artifact names and atomic file writes, so that many cmdrx
+processes, on one host or several, can share a log directory (including
+one on NFS) without overwriting or half-reading each other's files.
+"""
+
+import os
+import re
+import secrets
+import socket
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+FSYNC_POLICIES = ('off', 'file', 'full')
+
+_id_lock = threading.Lock()
+_last_micros = 0
+_host: Optional[str] = None
+
+
+def artifact_id() -> str:
+    """
+    Create a unique, time-ordered name for the artifacts of one analysis.
+
+    The ID is the local time to the microsecond (never repeating or going
+    backwards within a process), followed by the short host name, the
+    process ID and a random suffix, e.g.
+    20240501_101500_123456_web-01_4242_9f3a1c.
+
+    Returns:
+        Artifact ID usable in file names
+    """
+    global _last_micros
+    with _id_lock:
+        micros = max(time.time_ns() // 1000, _last_micros + 1)
+        _last_micros = micros
+
+    seconds, micros = divmod(micros, 1_000_000)
+    stamp = datetime.fromtimestamp(seconds).strftime('%Y%m%d_%H%M%S')
+    return f"{stamp}_{micros:06d}_{host_name()}_{os.getpid()}_{secrets.token_hex(3)}"
+
+
+def host_name() -> str:
+    """Get the short host name, restricted to characters safe in file names."""
+    global _host
+    if _host is None:
+        name = socket.gethostname().split('.')[0]
+        _host = re.sub(r'[^A-Za-z0-9-]', '-', name)[:32] or 'host'
+    return _host
+
+
+def atomic_write(
+    path: Path,
+    content: Union[str, bytes],
+    executable: bool = False,
+    fsync: str = 'off'
+) -> Path:
+    """
+    Write a file so that readers see either nothing or the complete file.
+
+    The content is written to a hidden temporary file in the same
+    directory, which is then renamed over the target.
+
+    Args:
+        path: Target file
+        content: Text (written as UTF-8) or bytes
+        executable: Make the file executable by its owner
+        fsync: 'off', 'file' to flush the file to disk before renaming, or
+            'full' to also flush the directory entry afterwards
+
+    Returns:
+        The target path
+    """
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    temp = path.with_name(f".{path.name}.{os.getpid()}.{secrets.token_hex(4)}.tmp")
+
+    try:
+        with open(temp, 'xb') as f:
+            f.write(data)
+            if executable:
+                os.fchmod(f.fileno(), os.fstat(f.fileno()).st_mode | 0o100)
+            if fsync in ('file', 'full'):
+                sync_file(f)
+        os.replace(temp, path)
+    except BaseException:
+        temp.unlink(missing_ok=True)
+        raise
+
+    if fsync == 'full':
+        sync_directory(path.parent)
+    return path
+
+
+def sync_file(f: BinaryIO) -> None:
+    """Flush a file's data to disk."""
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def sync_directory(directory: Path) -> None:
+    """Flush a directory's entries (new and renamed files) to disk."""
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    except OSError:
+        # Some file systems do not support syncing directories
+        pass
+    finally:
+        os.close(fd)
@@ -0,0 +1,320 @@
+"""
+CmdRx Follow Mode
+
+Watches a never-ending stream of log lines (tail -f | cmdrx --follow) and
+decides locally when it is worth an analysis: on an error-rate spike, a new
+kind of log message or a line matching a trigger pattern. Analyses are
+debounced and rate-limited, and each covers only the lines that arrived since
+the previous one, plus a rolling summary of earlier results.
+"""
+
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, TextIO
+
+from .compaction import is_error_line, strip_ansi
+from .exceptions import InputError
+from .templates import TemplateMiner
+
+# Error-rate spikes are detected per bucket of this many seconds
+SPIKE_BUCKET_SECONDS = 10.0
+
+# Weight of the latest bucket in the moving average of errors per bucket
+SPIKE_BASELINE_WEIGHT = 0.1
+
+# Lines longer than this are split while reading
+MAX_LINE_LENGTH = 8192
+
+
+@dataclass
+class FollowWindow:
+    """Lines collected for one analysis."""
+    lines: List[str]
+    reasons: List[str]
+    dropped_lines: int = 0
+    background: str = ""
+
+    @property
+    def text(self) -> str:
+        """The window as output text, noting lines that were not kept."""
+        text = "\n".join(self.lines)
+        if self.dropped_lines:
+            text = f"[... {self.dropped_lines} earlier lines not kept by cmdrx ...]\n{text}"
+        return text
+
+
+@dataclass
+class _Summary:
+    """Outcome of an earlier analysis."""
+    at: datetime
+    reasons: List[str]
+    text: str
+
+
+class FollowWatcher:
+    """
+    Decides when a followed stream is worth analyzing.
+
+    Lines are fed as they arrive. Three cheap local triggers are checked:
+    the number of error-like lines in a short bucket jumping well above its
+    moving average, a line that does not fit any log template learned so
+    far, and a line matching a trigger pattern. An analysis is due once
+    triggers have been quiet for the debounce period (or the maximum delay
+    has passed since the first one), and never sooner than the minimum
+    interval after the previous analysis.
+    """
+
+    def __init__(
+        self,
+        patterns: Iterable[str] = (),
+        window_lines: int = 1000,
+        debounce: float = 5.0,
+        max_delay: float = 30.0,
+        min_interval: float = 60.0,
+        spike_min_errors: int = 5,
+        spike_factor: float = 3.0,
+        learn_lines: int = 500,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize follow watcher.
+
+        Args:
+            patterns: Regular expressions of lines that trigger an analysis
+            window_lines: Most recent lines kept for the next analysis
+            debounce: Seconds without new triggers before analyzing
+            max_delay: Seconds after the first trigger to analyze regardless
+            min_interval: Minimum seconds between analyses
+            spike_min_errors: Error lines per bucket that can count as a spike
+                (0 disables the error-rate trigger)
+            spike_factor: How far above its moving average a bucket must be
+            learn_lines: Lines used to learn log templates before new ones
+                trigger an analysis (0 disables the new-template trigger)
+            clock: Monotonic clock, for tests
+
+        Raises:
+            InputError: If a pattern is not a valid regular expression
+        """
+        try:
+            self.patterns = [re.compile(pattern) for pattern in patterns]
+        except re.error as e:
+            raise InputError(f"Invalid trigger pattern: {e}")
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.min_interval = min_interval
+        self.spike_min_errors = spike_min_errors
+        self.spike_factor = spike_factor
+        self.learn_lines = learn_lines
+        self.clock = clock
+
+        self.total_lines = 0
+        self.error_lines = 0
+        self.analyses = 0
+
+        self._window: Deque[str] = deque(maxlen=max(1, window_lines))
+        self._window_lines = 0
+        self._reasons: List[str] = []
+        self._first_trigger: Optional[float] = None
+        self._last_trigger: Optional[float] = None
+        self._last_analysis: Optional[float] = None
+        self._summaries: Deque[_Summary] = deque(maxlen=3)
+
+        self._miner = TemplateMiner(min_lines=0) if learn_lines else None
+        self._bucket_start = clock()
+        self._bucket_errors = 0
+        self._baseline = 0.0
+        self._spiking = False
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], patterns: Iterable[str] = ()) -> 'FollowWatcher':
+        """Create a follow watcher from configuration and extra trigger patterns."""
+        return cls(
+            patterns=list(config.get('follow_triggers') or []) + list(patterns),
+            window_lines=int(config.get('follow_window_lines', 1000)),
+            debounce=float(config.get('follow_debounce', 5.0)),
+            max_delay=float(config.get('follow_max_delay', 30.0)),
+            min_interval=float(config.get('follow_min_interval', 60.0)),
+            spike_min_errors=int(config.get('follow_spike_min_errors', 5)),
+            spike_factor=float(config.get('follow_spike_factor', 3.0)),
+            learn_lines=int(config.get('follow_learn_lines', 500))
+        )
+
+    def feed(self, line: str) -> Optional[str]:
+        """
+        Add one line and check the triggers.
+
+        Args:
+            line: Line without trailing newline
+
+        Returns:
+            Why the line triggers an analysis, if it does
+        """
+        line = strip_ansi(line)
+        now = self.clock()
+        self.total_lines += 1
+        self._window.append(line)
+        self._window_lines += 1
+
+        reason = self._match_pattern(line)
+        if is_error_line(line):
+            self.error_lines += 1
+            reason = reason or self._count_error(now)
+        else:
+            self._roll_bucket(now)
+        reason = reason or self._new_template(line)
+
+        if reason:
+            if reason not in self._reasons:
+                self._reasons.append(reason)
+            if self._first_trigger is None:
+                self._first_trigger = now
+            self._last_trigger = now
+        return reason
+
+    def wait_time(self) -> Optional[float]:
+        """
+        Get the seconds until an analysis is due.
+
+        Returns:
+            Seconds to wait (0 or less when due), None if nothing triggered
+        """
+        if self._first_trigger is None or self._last_trigger is None:
+            return None
+        due = min(self._last_trigger + self.debounce, self._first_trigger + self.max_delay)
+        if self._last_analysis is not None:
+            due = max(due, self._last_analysis + self.min_interval)
+        return due - self.clock()
+
+    def take(self) -> FollowWindow:
+        """
+        Start an analysis of the lines that arrived since the previous one.
+
+        Returns:
+            Window with the new lines, the triggers and the rolling summary
+        """
+        window = FollowWindow(
+            lines=list(self._window),
+            reasons=self._reasons or ["end of input"],
+            dropped_lines=self._window_lines - len(self._window),
+            background=self.background()
+        )
+        self._window.clear()
+        self._window_lines = 0
+        self._reasons = []
+        self._first_trigger = self._last_trigger = None
+        self._last_analysis = self.clock()
+        self.analyses += 1
+        return window
+
+    def analyzed(self, window: FollowWindow, summary: str) -> None:
+        """
+        Record the outcome of an analysis for the rolling summary.
+
+        Args:
+            window: The analyzed window
+            summary: Short summary of the analysis result
+        """
+        self._summaries.append(_Summary(datetime.now(), window.reasons, summary))
+
+    def background(self) -> str:
+        """Describe the stream so far and the most recent analyses."""
+        parts = [
+            f"This is analysis {self.analyses + 1} of a continuously followed stream: "
+            f"{self.total_lines:,} lines seen so far, {self.error_lines:,} of them error-like. "
+            "The output below contains only the lines that arrived since the previous analysis."
+        ]
+        if self._summaries:
+            parts.append("Earlier analyses (most recent last):")
+            for summary in self._summaries:
+                parts.append(f"- {summary.at:%H:%M:%S} ({', '.join(summary.reasons)}): {summary.text}")
+        return "\n".join(parts)
+
+    def _match_pattern(self, line: str) -> Optional[str]:
+        for pattern in self.patterns:
+            if pattern.search(line):
+                return f"matched /{pattern.pattern}/"
+        return None
+
+    def _count_error(self, now: float) -> Optional[str]:
+        self._roll_bucket(now)
+        self._bucket_errors += 1
+        if (
+            self.spike_min_errors
+            and not self._spiking
+            and self._bucket_errors >= max(self.spike_min_errors, self.spike_factor * self._baseline)
+        ):
+            self._spiking = True
+            return f"error spike ({self._bucket_errors} errors in {SPIKE_BUCKET_SECONDS:g}s)"
+        return None
+
+    def _roll_bucket(self, now: float) -> None:
+        """Fold finished buckets into the moving average of errors per bucket."""
+        while now - self._bucket_start >= SPIKE_BUCKET_SECONDS:
+            self._baseline += SPIKE_BASELINE_WEIGHT * (self._bucket_errors - self._baseline)
+            self._bucket_errors = 0
+            self._bucket_start += SPIKE_BUCKET_SECONDS
+            self._spiking = False
+            if now - self._bucket_start > SPIKE_BUCKET_SECONDS * 100:
+                # Long quiet period; the baseline has decayed to nothing anyway
+                self._baseline = 0.0
+                self._bucket_start = now
+
+    def _new_template(self, line: str) -> Optional[str]:
+        if self._miner is None:
+            return None
+        template = self._miner.add(line)
+        if template is None or template.count > 1 or self._miner.total_lines <= self.learn_lines:
+            return None
+        return "new log message"
+
+
+def follow(
+    stream: TextIO,
+    watcher: FollowWatcher,
+    analyze: Callable[[FollowWindow], None]
+) -> int:
+    """
+    Follow a stream until it ends, analyzing whenever the watcher says so.
+
+    Lines are read on a background thread, so the window keeps sliding
+    while an analysis runs. Whatever triggered before the end of the
+    stream is analyzed before returning.
+
+    Args:
+        stream: Text stream to follow
+        watcher: Decides when to analyze
+        analyze: Runs one analysis of a window
+
+    Returns:
+        Number of analyses run
+    """
+    changed = threading.Condition()
+    ended = threading.Event()
+
+    def read() -> None:
+        try:
+            for line in iter(lambda: stream.readline(MAX_LINE_LENGTH), ''):
+                with changed:
+                    watcher.feed(line.rstrip("\n"))
+                    changed.notify()
+        finally:
+            with changed:
+                ended.set()
+                changed.notify()
+
+    threading.Thread(target=read, name='cmdrx-follow', daemon=True).start()
+
+    while True:
+        with changed:
+            wait = watcher.wait_time()
+            while not ended.is_set() and (wait is None or wait > 0):
+                changed.wait(wait)
+                wait = watcher.wait_time()
+            if ended.is_set() and wait is None:
+                return watcher.analyses
+            window = watcher.take()
+        analyze(window)
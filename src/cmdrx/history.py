@@ -0,0 +1,556 @@
+"""
+CmdRx Analysis History
+
+SQLite index of past analyses with an FTS5 full-text index over the
+analyzed output and the results, so questions like "when did this error
+first appear" do not require grepping thousands of log files. Existing log
+files can be imported in parallel.
+"""
+
+import gzip
+import json
+import os
+import re
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# Output and analysis text beyond this many characters is not indexed
+MAX_INDEXED_CHARS = 64 * 1024
+
+# Search snippets mark matching terms with these characters
+SNIPPET_START = "\x02"
+SNIPPET_END = "\x03"
+
+# Imported log files are inserted in transactions of this many entries
+IMPORT_BATCH_SIZE = 500
+
+LOG_FILE_PATTERN = re.compile(r'^cmdrx_analysis_(\d{8}_\d{6}(?:_[\w-]+)?)\.log(?:\.gz)?$')
+
+
+@dataclass
+class HistoryEntry:
+    """One recorded analysis."""
+    timestamp: str
+    command: str
+    return_code: Optional[int] = None
+    status: str = 'info'
+    issues: List[str] = field(default_factory=list)
+    provider: str = ''
+    model: str = ''
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    response_time: float = 0.0
+    cached: bool = False
+    log_file: Optional[str] = None
+    fix_script: Optional[str] = None
+    record_id: Optional[int] = None
+    output: str = ''
+    analysis: str = ''
+    id: Optional[int] = None
+    snippet: Optional[str] = None
+
+    @property
+    def total_tokens(self) -> Optional[int]:
+        """Prompt and completion tokens, if reported."""
+        if self.prompt_tokens is None and self.completion_tokens is None:
+            return None
+        return (self.prompt_tokens or 0) + (self.completion_tokens or 0)
+
+
+class AnalysisHistory:
+    """
+    Local index of every analysis.
+
+    Metadata is kept in a regular table; the command, analyzed output and
+    results are indexed in an FTS5 table sharing its row IDs. The database
+    is in WAL mode so concurrent cmdrx processes can record analyses safely.
+    """
+
+    SCHEMA_VERSION = 2
+    DB_FILE = "history.db"
+
+    COLUMNS = (
+        'timestamp', 'command', 'return_code', 'status', 'issues', 'provider', 'model',
+        'prompt_tokens', 'completion_tokens', 'response_time', 'cached', 'log_file', 'fix_script',
+        'record_id'
+    )
+
+    def __init__(self, db_path: Path):
+        """
+        Initialize analysis history.
+
+        Args:
+            db_path: History database file
+        """
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_db()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['AnalysisHistory']:
+        """
+        Open the history index from configuration.
+
+        Args:
+            config: CmdRx configuration dictionary
+
+        Returns:
+            Analysis history, or None if disabled or unavailable
+        """
+        if not config.get('history_enabled', True):
+            return None
+
+        directory = Path(config.get('history_directory', '~/.local/share/cmdrx')).expanduser()
+        try:
+            return cls(directory / cls.DB_FILE)
+        except (OSError, sqlite3.Error):
+            return None
+
+    def record(self, entry: HistoryEntry) -> Optional[int]:
+        """
+        Record an analysis.
+
+        Args:
+            entry: The analysis
+
+        Returns:
+            Row ID of the entry, or None if it could not be recorded
+        """
+        try:
+            with self._connect() as conn:
+                return self._insert(conn, entry)
+        except sqlite3.Error:
+            return None
+
+    def recent(
+        self,
+        limit: int = 20,
+        status: Optional[str] = None,
+        command: Optional[str] = None,
+        since: Optional[str] = None
+    ) -> List[HistoryEntry]:
+        """
+        List recorded analyses, most recent first.
+
+        Args:
+            limit: Maximum number of entries
+            status: Only analyses with this status
+            command: Only analyses whose command contains this text
+            since: Only analyses at or after this ISO date or time
+
+        Returns:
+            Matching entries
+        """
+        where, params = self._filters(status, command, since)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT id, {', '.join(self.COLUMNS)} FROM analyses {where} "
+                f"ORDER BY timestamp DESC LIMIT ?",
+                (*params, limit)
+            ).fetchall()
+        return [self._entry(row) for row in rows]
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        oldest_first: bool = False,
+        status: Optional[str] = None,
+        since: Optional[str] = None
+    ) -> List[HistoryEntry]:
+        """
+        Full-text search over commands, output and analyses.
+
+        Args:
+            query: FTS5 query
+            limit: Maximum number of entries
+            oldest_first: Order by time, oldest first, instead of by relevance
+            status: Only analyses with this status
+            since: Only analyses at or after this ISO date or time
+
+        Returns:
+            Matching entries with a snippet of the matching text, matching
+            terms enclosed in SNIPPET_START and SNIPPET_END
+
+        Raises:
+            ValueError: If the query is not valid FTS5 syntax
+        """
+        where, params = self._filters(status, None, since, prefix='a.')
+        where = f"{where} AND" if where else "WHERE"
+        order = "a.timestamp ASC" if oldest_first else "rank"
+        try:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    f"SELECT a.id, {', '.join('a.' + c for c in self.COLUMNS)}, "
+                    f"snippet(analyses_fts, -1, '{SNIPPET_START}', '{SNIPPET_END}', ' … ', 12) "
+                    f"FROM analyses_fts JOIN analyses a ON a.id = analyses_fts.rowid "
+                    f"{where} analyses_fts MATCH ? ORDER BY {order} LIMIT ?",
+                    (*params, query, limit)
+                ).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Invalid search query: {e}")
+
+        entries = []
+        for row in rows:
+            entry = self._entry(row[:-1])
+            entry.snippet = row[-1]
+            entries.append(entry)
+        return entries
+
+    def get(self, entry_id: int) -> Optional[HistoryEntry]:
+        """
+        Get one recorded analysis with its indexed text.
+
+        Args:
+            entry_id: Row ID
+
+        Returns:
+            The entry, or None if not found
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT id, {', '.join(self.COLUMNS)} FROM analyses WHERE id = ?", (entry_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            text = conn.execute(
+                "SELECT output, analysis FROM analyses_fts WHERE rowid = ?", (entry_id,)
+            ).fetchone()
+
+        entry = self._entry(row)
+        if text:
+            entry.output, entry.analysis = text
+        return entry
+
+    def import_logs(
+        self,
+        directories: Iterable[Path],
+        workers: Optional[int] = None,
+        on_progress: Optional[Any] = None
+    ) -> Dict[str, int]:
+        """
+        Import existing log files into the index.
+
+        Files already indexed are skipped. Parsing runs in a process pool;
+        entries are inserted in batches from this process.
+
+        Args:
+            directories: Directories holding cmdrx_analysis_*.log files
+            workers: Parser processes (default: CPU count)
+            on_progress: Called with the number of files handled so far
+
+        Returns:
+            Counts of imported, skipped and unreadable files
+        """
+        with self._connect() as conn:
+            known = {row[0] for row in conn.execute("SELECT log_file FROM analyses WHERE log_file IS NOT NULL")}
+
+        paths = []
+        skipped = 0
+        for directory in directories:
+            for path in sorted(directory.iterdir()):
+                if not LOG_FILE_PATTERN.match(path.name):
+                    continue
+                if str(path.resolve()) in known:
+                    skipped += 1
+                else:
+                    paths.append(path)
+
+        imported = failed = handled = 0
+        batch: List[HistoryEntry] = []
+
+        def flush() -> None:
+            nonlocal imported
+            with self._connect() as conn:
+                for entry in batch:
+                    if self._insert(conn, entry) is not None:
+                        imported += 1
+            batch.clear()
+
+        workers = workers or os.cpu_count() or 1
+        if len(paths) < IMPORT_BATCH_SIZE or workers == 1:
+            parsed: Iterable[Optional[HistoryEntry]] = map(parse_log_file, paths)
+            pool = None
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers)
+            parsed = pool.map(parse_log_file, paths, chunksize=64)
+
+        try:
+            for entry in parsed:
+                handled += 1
+                if entry is None:
+                    failed += 1
+                else:
+                    batch.append(entry)
+                    if len(batch) >= IMPORT_BATCH_SIZE:
+                        flush()
+                if on_progress:
+                    on_progress(handled)
+            flush()
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        return {'imported': imported, 'skipped': skipped, 'failed': failed}
+
+    def rename_logs(self, renames: Dict[str, str]) -> None:
+        """
+        Point entries at moved log files (e.g. after compression).
+
+        Args:
+            renames: Old to new log file paths
+        """
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    "UPDATE analyses SET log_file = ? WHERE log_file = ?",
+                    [(new, old) for old, new in renames.items()]
+                )
+        except sqlite3.Error:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get history statistics.
+
+        Returns:
+            Entry count, time range and database path
+        """
+        with self._connect() as conn:
+            count, first, last = conn.execute(
+                "SELECT COUNT(*), MIN(timestamp), MAX(timestamp) FROM analyses"
+            ).fetchone()
+        return {'entries': count, 'first': first, 'last': last, 'path': str(self.db_path)}
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection to the history database as a single transaction."""
+        conn = sqlite3.connect(str(self.db_path), timeout=10)
+        try:
+            conn.execute("PRAGMA busy_timeout = 10000")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self) -> None:
+        """Create the history schema if needed."""
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS analyses ("
+                "id INTEGER PRIMARY KEY, "
+                "timestamp TEXT NOT NULL, "
+                "command TEXT NOT NULL, "
+                "return_code INTEGER, "
+                "status TEXT, "
+                "issues TEXT, "
+                "provider TEXT, "
+                "model TEXT, "
+                "prompt_tokens INTEGER, "
+                "completion_tokens INTEGER, "
+                "response_time REAL, "
+                "cached INTEGER NOT NULL DEFAULT 0, "
+                "log_file TEXT UNIQUE, "
+                "fix_script TEXT, "
+                "record_id INTEGER)"
+            )
+            if conn.execute("PRAGMA user_version").fetchone()[0] == 1:
+                conn.execute("ALTER TABLE analyses ADD COLUMN record_id INTEGER")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_timestamp ON analyses (timestamp)")
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS analyses_fts "
+                "USING fts5(command, output, analysis, issues)"
+            )
+            conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    def _insert(self, conn: sqlite3.Connection, entry: HistoryEntry) -> Optional[int]:
+        """Insert an entry and its text; returns None if its log file is already indexed."""
+        values = (
+            entry.timestamp, entry.command, entry.return_code, entry.status,
+            json.dumps(entry.issues), entry.provider, entry.model,
+            entry.prompt_tokens, entry.completion_tokens, entry.response_time,
+            int(entry.cached), entry.log_file, entry.fix_script, entry.record_id,
+        )
+        cursor = conn.execute(
+            f"INSERT OR IGNORE INTO analyses ({', '.join(self.COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(self.COLUMNS))})",
+            values
+        )
+        if not cursor.rowcount:
+            return None
+
+        conn.execute(
+            "INSERT INTO analyses_fts (rowid, command, output, analysis, issues) VALUES (?, ?, ?, ?, ?)",
+            (
+                cursor.lastrowid, entry.command, entry.output[:MAX_INDEXED_CHARS],
+                entry.analysis[:MAX_INDEXED_CHARS], "\n".join(entry.issues)
+            )
+        )
+        return cursor.lastrowid
+
+    @staticmethod
+    def _filters(
+        status: Optional[str],
+        command: Optional[str],
+        since: Optional[str],
+        prefix: str = ''
+    ) -> tuple:
+        """Build a WHERE clause for the common filters."""
+        clauses = []
+        params: List[Any] = []
+        if status:
+            clauses.append(f"{prefix}status = ?")
+            params.append(status.lower())
+        if command:
+            clauses.append(f"{prefix}command LIKE ?")
+            params.append(f"%{command}%")
+        if since:
+            clauses.append(f"{prefix}timestamp >= ?")
+            params.append(since)
+        return ("WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    @classmethod
+    def _entry(cls, row: tuple) -> HistoryEntry:
+        """Build an entry from an id + COLUMNS row."""
+        values = dict(zip(cls.COLUMNS, row[1:]))
+        values['issues'] = json.loads(values['issues'] or '[]')
+        values['cached'] = bool(values['cached'])
+        return HistoryEntry(id=row[0], **values)
+
+
+def entry_from_analysis(
+    context: Dict[str, Any],
+    analysis_data: Dict[str, Any],
+    llm_response: Any,
+    log_file: Optional[Path],
+    fix_script: Optional[Path],
+    record_id: Optional[int] = None
+) -> HistoryEntry:
+    """
+    Build a history entry for a completed analysis.
+
+    Args:
+        context: Analysis context (command, output, etc.)
+        analysis_data: Parsed analysis data
+        llm_response: The LLM response
+        log_file: Written log file
+        fix_script: Written fix script, if any
+        record_id: Analysis store record, if stored there
+
+    Returns:
+        History entry
+    """
+    usage = llm_response.usage or {}
+    return HistoryEntry(
+        timestamp=context.get('timestamp') or datetime.now().isoformat(),
+        command=context.get('command', ''),
+        return_code=context.get('return_code'),
+        status=str(analysis_data.get('status', 'info')).lower(),
+        issues=[str(issue) for issue in analysis_data.get('issues') or []],
+        provider=llm_response.provider or '',
+        model=llm_response.model or '',
+        prompt_tokens=usage.get('prompt_tokens', usage.get('input_tokens')),
+        completion_tokens=usage.get('completion_tokens', usage.get('output_tokens')),
+        response_time=llm_response.response_time,
+        cached=llm_response.cached,
+        log_file=str(log_file.resolve()) if log_file else None,
+        fix_script=str(fix_script.resolve()) if fix_script else None,
+        record_id=record_id,
+        output=context.get('output', ''),
+        analysis=str(analysis_data.get('analysis', ''))
+    )
+
+
+_HEADER_PATTERN = re.compile(r'^([A-Za-z ]+): (.*)$')
+
+
+def parse_log_file(path: Path) -> Optional[HistoryEntry]:
+    """
+    Parse a cmdrx_analysis_*.log file written by OutputGenerator (or its
+    .log.gz once compressed by retention).
+
+    Args:
+        path: Log file
+
+    Returns:
+        History entry, or None if the file cannot be read or parsed
+    """
+    try:
+        if path.suffix == '.gz':
+            with gzip.open(path, 'rt', encoding='utf-8', errors='replace') as f:
+                text = f.read()
+        else:
+            text = path.read_text(encoding='utf-8', errors='replace')
+    except (OSError, EOFError):
+        return None
+
+    head, _, rest = text.partition("\nSYSTEM INFORMATION\n")
+    headers = {}
+    for line in head.splitlines():
+        match = _HEADER_PATTERN.match(line)
+        if match:
+            headers[match.group(1)] = match.group(2)
+    if 'Command' not in headers or 'Timestamp' not in headers:
+        return None
+
+    output = _section(rest, "COMMAND OUTPUT", "\nANALYSIS RESULTS\n")
+    results = _section(rest, "ANALYSIS RESULTS", None)
+    status_match = re.search(r'^Status: (\S+)', results, re.MULTILINE)
+    analysis_match = re.search(
+        r'^Analysis: (.*?)(?=\n\n(?:ISSUES IDENTIFIED|TROUBLESHOOTING STEPS|SUGGESTED FIXES|'
+        r'ADDITIONAL INFORMATION|LLM USAGE INFORMATION|RETRY AND CIRCUIT|RAW LLM RESPONSE)\n|\Z)',
+        results, re.MULTILINE | re.DOTALL
+    )
+    issues_block = _section(results, "ISSUES IDENTIFIED", "\n\n")
+    issues = [re.sub(r'^\d+\. ', '', line) for line in issues_block.splitlines() if re.match(r'^\d+\. ', line)]
+
+    usage: Dict[str, Any] = {}
+    usage_block = _section(results, "LLM USAGE INFORMATION", "\n\n")
+    if usage_block:
+        try:
+            usage = json.loads(usage_block)
+        except ValueError:
+            usage = {}
+
+    return_code = headers.get('Return Code', '')
+    response_time = headers.get('Response Time', '0').rstrip('s')
+    log_match = LOG_FILE_PATTERN.match(path.name)
+    fix_script = path.with_name(f"cmdrx_fix_{log_match.group(1)}.sh") if log_match else None
+
+    try:
+        return HistoryEntry(
+            timestamp=headers['Timestamp'],
+            command=headers['Command'],
+            return_code=int(return_code) if re.fullmatch(r'-?\d+', return_code) else None,
+            status=(status_match.group(1) if status_match else 'unknown').lower(),
+            issues=issues,
+            provider=headers.get('LLM Provider', ''),
+            model=headers.get('LLM Model', ''),
+            prompt_tokens=usage.get('prompt_tokens', usage.get('input_tokens')),
+            completion_tokens=usage.get('completion_tokens', usage.get('output_tokens')),
+            response_time=float(response_time),
+            cached=headers.get('Cached') == 'yes',
+            log_file=str(path.resolve()),
+            fix_script=str(fix_script.resolve()) if fix_script and fix_script.exists() else None,
+            output=output,
+            analysis=analysis_match.group(1).strip() if analysis_match else ''
+        )
+    except ValueError:
+        return None
+
+
+def _section(text: str, title: str, end: Optional[str]) -> str:
+    """Get the body of a log file section underlined with dashes."""
+    match = re.search(rf'(?:^|\n){re.escape(title)}\n-+\n', text)
+    if not match:
+        return ''
+    body = text[match.end():]
+    if end:
+        body = body.split(end, 1)[0]
+    return body.strip("\n")
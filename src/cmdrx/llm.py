@@ -4,18 +4,33 @@ CmdRx LLM Provider Module
 Handles communication with various LLM services including OpenAI, Anthropic, Grok, and custom providers.
 """
 
+import asyncio
 import json
 import time
-from dataclasses import dataclass
-from typing import Dict, Any, Optional, TYPE_CHECKING
-import requests
-from openai import OpenAI
+import weakref
+from dataclasses import dataclass, field, replace
+from functools import partial
+from typing import Dict, Any, Awaitable, Callable, Iterable, List, Optional, Tuple, TYPE_CHECKING, cast
 
-from .exceptions import LLMError, ConfigurationError
+from .cache import ResponseCache
+from .coalesce import SingleFlight
+from .exceptions import CircuitOpenError, LLMError, ConfigurationError, RateLimitError
+from .ratelimit import estimate_tokens
+from .resilience import Resilience, RetryLog
+from .transport import TransportManager
 
 if TYPE_CHECKING:
+    from openai import OpenAI
+    from openai.types.chat import ChatCompletionChunk, ChatCompletionMessageParam
     from .config import ConfigManager
 
+SYSTEM_PROMPT = (
+    "You are CmdRx, an expert system administrator AI assistant. "
+    "Provide detailed, accurate troubleshooting information."
+)
+MAX_TOKENS = 2000
+TEMPERATURE = 0.1  # Low temperature for consistent, focused responses
+
 
 @dataclass
 class LLMResponse:
@@ -25,6 +40,11 @@ class LLMResponse:
     usage: Optional[Dict[str, Any]] = None
     response_time: float = 0.0
     provider: str = ""
+    cached: bool = False
+    # Shared from an identical request that was already in flight
+    coalesced: bool = False
+    attempts: int = 1
+    events: List[str] = field(default_factory=list)
 
 
 class LLMProvider:
@@ -32,51 +52,324 @@ class LLMProvider:
     Handles communication with LLM providers.
     """
     
-    def __init__(self, config_manager: 'ConfigManager'):
+    def __init__(self, config_manager: 'ConfigManager', overrides: Optional[Dict[str, Any]] = None):
         """
         Initialize LLM provider.
         
         Args:
             config_manager: Configuration manager instance
+            overrides: Settings replacing the configured ones, such as the
+                llm_provider and llm_model of a provider chain entry
         """
         self.config_manager = config_manager
         self.config = config_manager.get_config()
-        self.credentials = config_manager.get_llm_credentials()
+        if overrides:
+            self.config = {**self.config, **overrides}
+            self.credentials = config_manager.get_llm_credentials(
+                self.config.get('llm_provider'),
+                self.config.get('llm_auth_type')
+            )
+        else:
+            self.credentials = config_manager.get_llm_credentials()
         
         # Validate configuration
         self._validate_config()
         
+        # Pooled keep-alive connections shared with every other provider client
+        self.transport = TransportManager.shared(self.config)
+        
         # Initialize client based on provider
         self.provider = self.config.get('llm_provider', 'openai')
         self.client = self._create_client()
+        self._anthropic_client: Any = None
+        
+        # Async clients are created on first use, one per event loop; entries
+        # go away with their loop
+        self._async_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]' = (
+            weakref.WeakKeyDictionary()
+        )
+        
+        # Persistent response cache (None when disabled)
+        self.cache = ResponseCache.from_config(self.config)
+        
+        # Identical concurrent requests share one upstream call (None when disabled)
+        self.flights = SingleFlight.shared() if self.config.get('coalesce_requests', True) else None
+        
+        # Retries, circuit breaker and rate limit; on_event receives their events
+        self.on_event: Optional[Callable[[str], None]] = None
+        self.resilience = Resilience.from_config(
+            self.config,
+            f"{self.provider}/{self._model_name()}",
+            on_event=self._emit_event
+        )
     
-    def analyze(self, prompt: str) -> LLMResponse:
+    def analyze(self, prompt: str, use_cache: bool = True, refresh: bool = False) -> LLMResponse:
         """
         Send analysis request to LLM.
         
         Args:
             prompt: The analysis prompt
+            use_cache: Serve and store responses through the response cache
+            refresh: Skip the cache lookup but still store the fresh response
             
         Returns:
             LLM response
         """
         start_time = time.time()
         
-        try:
-            if self.provider in ['openai', 'grok', 'custom']:
-                response = self._analyze_openai_compatible(prompt)
-            elif self.provider == 'anthropic':
-                response = self._analyze_anthropic(prompt)
-            else:
-                raise LLMError(f"Unsupported provider: {self.provider}")
+        cache_key, cached = self._check_cache(prompt, use_cache, refresh, start_time)
+        if cached:
+            return cached
+        
+        if self.provider in ['openai', 'grok', 'custom']:
+            request = partial(self._analyze_openai_compatible, prompt)
+        elif self.provider == 'anthropic':
+            request = partial(self._analyze_anthropic, prompt)
+        else:
+            raise LLMError(f"Unsupported provider: {self.provider}")
+        
+        def send() -> LLMResponse:
+            log = RetryLog()
+            try:
+                response = self.resilience.call(request, log, cost=self._estimate_cost(prompt))
+            except (CircuitOpenError, RateLimitError):
+                raise
+            except Exception as e:
+                raise LLMError(f"LLM analysis failed: {e}") from e
+            
+            return self._finish_response(response, start_time, cache_key, log)
+        
+        return self._coalesce(prompt, send, start_time)
+    
+    def analyze_stream(
+        self,
+        prompt: str,
+        on_text: Callable[[str], None],
+        use_cache: bool = True,
+        refresh: bool = False
+    ) -> LLMResponse:
+        """
+        Send analysis request to LLM and stream the completion as it arrives.
+        
+        Args:
+            prompt: The analysis prompt
+            on_text: Called with each chunk of completion text
+            use_cache: Serve and store responses through the response cache
+            refresh: Skip the cache lookup but still store the fresh response
             
-            response.response_time = time.time() - start_time
-            response.provider = self.provider
+        Returns:
+            LLM response containing the full completion
+        """
+        start_time = time.time()
+        
+        cache_key, cached = self._check_cache(prompt, use_cache, refresh, start_time)
+        if cached:
+            on_text(cached.content)
+            return cached
+        
+        # Retrying is only safe until the first text has been shown
+        emitted = []
+        
+        def emit(text: str) -> None:
+            emitted.append(True)
+            on_text(text)
+        
+        if self.provider in ['openai', 'grok', 'custom']:
+            request = partial(self._stream_openai_compatible, prompt, emit)
+        elif self.provider == 'anthropic':
+            request = partial(self._stream_anthropic, prompt, emit)
+        else:
+            raise LLMError(f"Unsupported provider: {self.provider}")
+        
+        def send() -> LLMResponse:
+            log = RetryLog()
+            try:
+                response = self.resilience.call(
+                    request, log, can_retry=lambda: not emitted, cost=self._estimate_cost(prompt)
+                )
+            except (CircuitOpenError, RateLimitError):
+                raise
+            except Exception as e:
+                raise LLMError(f"LLM analysis failed: {e}") from e
             
-            return response
+            return self._finish_response(response, start_time, cache_key, log)
         
-        except Exception as e:
-            raise LLMError(f"LLM analysis failed: {e}")
+        response = self._coalesce(prompt, send, start_time)
+        if response.coalesced:
+            # Another caller's request was streamed to that caller
+            on_text(response.content)
+        return response
+    
+    async def aanalyze(
+        self,
+        prompt: str,
+        use_cache: bool = True,
+        refresh: bool = False,
+        timeout: Optional[float] = None
+    ) -> LLMResponse:
+        """
+        Send analysis request to LLM without blocking the event loop.
+        
+        The request can be cancelled like any other coroutine; cancellation
+        propagates as asyncio.CancelledError.
+        
+        Args:
+            prompt: The analysis prompt
+            use_cache: Serve and store responses through the response cache
+            refresh: Skip the cache lookup but still store the fresh response
+            timeout: Deadline for this call in seconds (None uses llm_timeout only)
+            
+        Returns:
+            LLM response
+        """
+        start_time = time.time()
+        
+        cache_key, cached = self._check_cache(prompt, use_cache, refresh, start_time)
+        if cached:
+            return cached
+        
+        if self.provider in ['openai', 'grok', 'custom']:
+            request = partial(self._aanalyze_openai_compatible, prompt)
+        elif self.provider == 'anthropic':
+            request = partial(self._aanalyze_anthropic, prompt)
+        else:
+            raise LLMError(f"Unsupported provider: {self.provider}")
+        
+        async def send() -> LLMResponse:
+            log = RetryLog()
+            try:
+                response = await self.resilience.acall(request, log, cost=self._estimate_cost(prompt))
+            except (CircuitOpenError, RateLimitError):
+                raise
+            except Exception as e:
+                raise LLMError(f"LLM analysis failed: {e}") from e
+            
+            return self._finish_response(response, start_time, cache_key, log)
+        
+        try:
+            return await asyncio.wait_for(self._acoalesce(prompt, send, start_time), timeout)
+        except asyncio.TimeoutError:
+            raise LLMError(f"LLM analysis exceeded deadline of {timeout}s")
+    
+    async def aclose(self) -> None:
+        """Close the async connection pool of the running event loop."""
+        self._async_clients.pop(asyncio.get_running_loop(), None)
+        await self.transport.aclose()
+    
+    def warm_up(self) -> bool:
+        """
+        Open the provider connection before the first request.
+        
+        Returns:
+            True if the connection was established
+        """
+        if self.provider == 'anthropic':
+            client = self._get_anthropic_client()
+        else:
+            client = self.client
+        timeout = min(float(self.config.get('llm_timeout', 30)), 5.0)
+        return self.transport.warm_up(str(client.base_url), timeout=timeout)
+    
+    def _emit_event(self, event: str) -> None:
+        """Forward a retry, circuit breaker or rate limit event to the registered callback."""
+        if self.on_event:
+            self.on_event(event)
+    
+    def _estimate_cost(self, prompt: str) -> int:
+        """Estimate the prompt tokens of a request for the rate limiter."""
+        return estimate_tokens(SYSTEM_PROMPT + prompt)
+    
+    def _model_name(self) -> str:
+        """Get the configured model name."""
+        return str(self.config.get('llm_model', ''))
+    
+    def _check_cache(
+        self,
+        prompt: str,
+        use_cache: bool,
+        refresh: bool,
+        start_time: float
+    ) -> Tuple[Optional[str], Optional[LLMResponse]]:
+        """
+        Compute the cache key for a request and look it up.
+        
+        Returns:
+            Cache key (None if caching is off) and the cached response, if any
+        """
+        if not self.cache or not use_cache:
+            return None, None
+        
+        cache_key = self._cache_key(prompt)
+        if refresh:
+            return cache_key, None
+        
+        entry = self.cache.get(cache_key)
+        if not entry:
+            return cache_key, None
+        
+        return cache_key, LLMResponse(
+            content=entry['content'],
+            model=entry['model'],
+            usage=entry['usage'],
+            response_time=time.time() - start_time,
+            provider=self.provider,
+            cached=True
+        )
+    
+    def _coalesce(self, prompt: str, send: Callable[[], LLMResponse], start_time: float) -> LLMResponse:
+        """Send a request, or share the identical request already in flight."""
+        if self.flights is None:
+            return send()
+        
+        response, shared = self.flights.call(self._cache_key(prompt), send)
+        return self._shared_response(response, start_time) if shared else response
+    
+    async def _acoalesce(
+        self,
+        prompt: str,
+        send: Callable[[], Awaitable[LLMResponse]],
+        start_time: float
+    ) -> LLMResponse:
+        """Send a request without blocking, or share the identical one in flight."""
+        if self.flights is None:
+            return await send()
+        
+        response, shared = await self.flights.acall(self._cache_key(prompt), send)
+        return self._shared_response(response, start_time) if shared else response
+    
+    def _cache_key(self, prompt: str) -> str:
+        """Identify requests that may share a result: same provider, endpoint, model and normalized prompt."""
+        return ResponseCache.make_key(
+            self.provider, self._model_name(), prompt, self.config.get('llm_base_url') or ''
+        )
+    
+    @staticmethod
+    def _shared_response(response: LLMResponse, start_time: float) -> LLMResponse:
+        """Copy another caller's response for this caller."""
+        return replace(
+            response,
+            response_time=time.time() - start_time,
+            coalesced=True,
+            events=list(response.events)
+        )
+    
+    def _finish_response(
+        self,
+        response: LLMResponse,
+        start_time: float,
+        cache_key: Optional[str],
+        log: RetryLog
+    ) -> LLMResponse:
+        """Stamp timing, provider and retry history on a fresh response and cache it."""
+        response.response_time = time.time() - start_time
+        response.provider = self.provider
+        response.attempts = log.attempts
+        response.events = log.events
+        
+        if self.cache and cache_key and response.content:
+            self.cache.put(cache_key, self.provider, response.model, response.content, response.usage)
+        
+        return response
     
     def _validate_config(self) -> None:
         """Validate LLM configuration."""
@@ -105,8 +398,66 @@ class LLMProvider:
             if not base_url:
                 raise ConfigurationError("Base URL required for custom provider")
     
-    def _create_client(self) -> OpenAI:
+    def _create_client(self) -> 'OpenAI':
         """Create OpenAI-compatible client."""
+        from openai import OpenAI
+        
+        return OpenAI(**self._client_args(), http_client=self.transport.sync_client())
+    
+    def _get_anthropic_client(self) -> Any:
+        """Get the Anthropic client, creating it on first use."""
+        import anthropic
+        
+        api_key = self.credentials.get('api_key')
+        if not api_key:
+            raise ConfigurationError("Anthropic API key not configured")
+        
+        if self._anthropic_client is None:
+            self._anthropic_client = anthropic.Anthropic(
+                api_key=api_key,
+                timeout=self.config.get('llm_timeout', 30),
+                max_retries=0,
+                http_client=self.transport.sync_client()
+            )
+        return self._anthropic_client
+    
+    def _get_async_client(self) -> Any:
+        """Get the async client for the running event loop, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        
+        if client is None:
+            # Drop clients of loops that were closed without aclose()
+            for closed in [other for other in self._async_clients if other.is_closed()]:
+                del self._async_clients[closed]
+            
+            client = self._async_clients[loop] = self._create_async_client()
+        
+        return client
+    
+    def _create_async_client(self) -> Any:
+        """Create an async client on the running event loop's connection pool."""
+        http_client = self.transport.async_client()
+        if self.provider == 'anthropic':
+            import anthropic
+            
+            api_key = self.credentials.get('api_key')
+            if not api_key:
+                raise ConfigurationError("Anthropic API key not configured")
+            
+            return anthropic.AsyncAnthropic(
+                api_key=api_key,
+                timeout=self.config.get('llm_timeout', 30),
+                max_retries=0,
+                http_client=http_client
+            )
+        
+        from openai import AsyncOpenAI
+        
+        return AsyncOpenAI(**self._client_args(), http_client=http_client)
+    
+    def _client_args(self) -> Dict[str, Any]:
+        """Get constructor arguments for OpenAI-compatible clients."""
         base_url = self.config.get('llm_base_url')
         api_key = self.credentials.get('api_key', 'not-needed')
         timeout = self.config.get('llm_timeout', 30)
@@ -119,11 +470,12 @@ class LLMProvider:
         elif self.provider == 'custom' and not base_url:
             raise ConfigurationError("Base URL required for custom provider")
         
-        return OpenAI(
-            api_key=api_key,
-            base_url=base_url,
-            timeout=timeout
-        )
+        return {
+            'api_key': api_key,
+            'base_url': base_url,
+            'timeout': timeout,
+            'max_retries': 0  # Retries are handled by the resilience layer
+        }
     
     def _analyze_openai_compatible(self, prompt: str) -> LLMResponse:
         """Analyze using OpenAI-compatible API."""
@@ -132,82 +484,188 @@ class LLMProvider:
         try:
             response = self.client.chat.completions.create(
                 model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are CmdRx, an expert system administrator AI assistant. Provide detailed, accurate troubleshooting information."
-                    },
-                    {
-                        "role": "user", 
-                        "content": prompt
-                    }
-                ],
-                temperature=0.1,  # Low temperature for consistent, focused responses
-                max_tokens=2000,
+                messages=self._openai_messages(prompt),
+                temperature=TEMPERATURE,
+                max_tokens=MAX_TOKENS,
+            )
+            
+            return self._openai_response(response, model)
+        
+        except Exception as e:
+            raise LLMError(f"OpenAI-compatible API error: {e}") from e
+    
+    async def _aanalyze_openai_compatible(self, prompt: str) -> LLMResponse:
+        """Analyze using the async OpenAI-compatible API."""
+        model = self.config.get('llm_model', 'gpt-4')
+        
+        try:
+            response = await self._get_async_client().chat.completions.create(
+                model=model,
+                messages=self._openai_messages(prompt),
+                temperature=TEMPERATURE,
+                max_tokens=MAX_TOKENS,
+            )
+            
+            return self._openai_response(response, model)
+        
+        except Exception as e:
+            raise LLMError(f"OpenAI-compatible API error: {e}") from e
+    
+    def _openai_response(self, response: Any, model: str) -> LLMResponse:
+        """Convert an OpenAI chat completion into an LLM response."""
+        content = response.choices[0].message.content
+        usage = {
+            'prompt_tokens': response.usage.prompt_tokens,
+            'completion_tokens': response.usage.completion_tokens,
+            'total_tokens': response.usage.total_tokens
+        } if response.usage else None
+        
+        return LLMResponse(
+            content=content,
+            model=model,
+            usage=usage
+        )
+    
+    def _stream_openai_compatible(self, prompt: str, on_text: Callable[[str], None]) -> LLMResponse:
+        """Stream a completion from an OpenAI-compatible API."""
+        model = self.config.get('llm_model', 'gpt-4')
+        
+        extra_args: Dict[str, Any] = {}
+        if self.provider == 'openai':
+            # Ask for a final usage chunk; not all compatible servers support this
+            extra_args['stream_options'] = {'include_usage': True}
+        
+        try:
+            stream = self.client.chat.completions.create(
+                model=model,
+                messages=self._openai_messages(prompt),
+                temperature=TEMPERATURE,
+                max_tokens=MAX_TOKENS,
+                stream=True,
+                **extra_args
             )
             
-            content = response.choices[0].message.content
-            usage = {
-                'prompt_tokens': response.usage.prompt_tokens,
-                'completion_tokens': response.usage.completion_tokens,
-                'total_tokens': response.usage.total_tokens
-            } if response.usage else None
+            parts: List[str] = []
+            usage = None
+            for chunk in cast(Iterable['ChatCompletionChunk'], stream):
+                if chunk.choices and chunk.choices[0].delta.content:
+                    text = chunk.choices[0].delta.content
+                    parts.append(text)
+                    on_text(text)
+                if chunk.usage:
+                    usage = {
+                        'prompt_tokens': chunk.usage.prompt_tokens,
+                        'completion_tokens': chunk.usage.completion_tokens,
+                        'total_tokens': chunk.usage.total_tokens
+                    }
             
             return LLMResponse(
-                content=content,
+                content="".join(parts),
                 model=model,
                 usage=usage
             )
         
         except Exception as e:
-            raise LLMError(f"OpenAI-compatible API error: {e}")
+            raise LLMError(f"OpenAI-compatible API error: {e}") from e
+    
+    def _openai_messages(self, prompt: str) -> List['ChatCompletionMessageParam']:
+        """Build the chat messages for an OpenAI-compatible request."""
+        return [
+            {
+                "role": "system",
+                "content": SYSTEM_PROMPT
+            },
+            {
+                "role": "user", 
+                "content": prompt
+            }
+        ]
     
     def _analyze_anthropic(self, prompt: str) -> LLMResponse:
         """Analyze using Anthropic Claude API."""
-        import anthropic
+        model = self.config.get('llm_model', 'claude-3-sonnet-20240229')
         
-        api_key = self.credentials.get('api_key')
-        if not api_key:
-            raise ConfigurationError("Anthropic API key not configured")
+        try:
+            client = self._get_anthropic_client()
+            
+            message = client.messages.create(**self._anthropic_request(model, prompt))
+            
+            return self._anthropic_response(message, model)
         
+        except ImportError:
+            raise LLMError("Anthropic library not installed. Install with: pip install anthropic")
+        except Exception as e:
+            raise LLMError(f"Anthropic API error: {e}") from e
+    
+    async def _aanalyze_anthropic(self, prompt: str) -> LLMResponse:
+        """Analyze using the async Anthropic Claude API."""
         model = self.config.get('llm_model', 'claude-3-sonnet-20240229')
-        timeout = self.config.get('llm_timeout', 30)
         
         try:
-            client = anthropic.Anthropic(
-                api_key=api_key,
-                timeout=timeout
-            )
+            client = self._get_async_client()
             
-            message = client.messages.create(
-                model=model,
-                max_tokens=2000,
-                temperature=0.1,
-                system="You are CmdRx, an expert system administrator AI assistant. Provide detailed, accurate troubleshooting information.",
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            )
+            message = await client.messages.create(**self._anthropic_request(model, prompt))
             
-            content = message.content[0].text if message.content else ""
-            usage = {
-                'input_tokens': message.usage.input_tokens,
-                'output_tokens': message.usage.output_tokens,
-            } if message.usage else None
+            return self._anthropic_response(message, model)
+        
+        except ImportError:
+            raise LLMError("Anthropic library not installed. Install with: pip install anthropic")
+        except Exception as e:
+            raise LLMError(f"Anthropic API error: {e}") from e
+    
+    def _anthropic_request(self, model: str, prompt: str) -> Dict[str, Any]:
+        """Build the arguments for an Anthropic messages request."""
+        return {
+            'model': model,
+            'max_tokens': MAX_TOKENS,
+            'temperature': TEMPERATURE,
+            'system': SYSTEM_PROMPT,
+            'messages': [
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ]
+        }
+    
+    def _anthropic_response(self, message: Any, model: str) -> LLMResponse:
+        """Convert an Anthropic message into an LLM response."""
+        content = message.content[0].text if message.content else ""
+        usage = {
+            'input_tokens': message.usage.input_tokens,
+            'output_tokens': message.usage.output_tokens,
+        } if message.usage else None
+        
+        return LLMResponse(
+            content=content,
+            model=model,
+            usage=usage
+        )
+    
+    def _stream_anthropic(self, prompt: str, on_text: Callable[[str], None]) -> LLMResponse:
+        """Stream a completion from the Anthropic Claude API."""
+        model = self.config.get('llm_model', 'claude-3-sonnet-20240229')
+        
+        try:
+            client = self._get_anthropic_client()
+            
+            parts: List[str] = []
+            with client.messages.stream(**self._anthropic_request(model, prompt)) as stream:
+                for text in stream.text_stream:
+                    parts.append(text)
+                    on_text(text)
+                message = stream.get_final_message()
             
             return LLMResponse(
-                content=content,
+                content="".join(parts),
                 model=model,
-                usage=usage
+                usage=self._anthropic_response(message, model).usage
             )
         
         except ImportError:
             raise LLMError("Anthropic library not installed. Install with: pip install anthropic")
         except Exception as e:
-            raise LLMError(f"Anthropic API error: {e}")
+            raise LLMError(f"Anthropic API error: {e}") from e
     
     def test_connection(self) -> bool:
         """
@@ -218,7 +676,8 @@ class LLMProvider:
         """
         try:
             test_prompt = "Respond with 'OK' if you can read this test message."
-            response = self.analyze(test_prompt)
+            # A cached answer would say nothing about the endpoint or credentials
+            response = self.analyze(test_prompt, use_cache=False)
             return bool(response and response.content)
         except Exception:
             return False
@@ -236,5 +695,6 @@ class LLMProvider:
             'base_url': self.config.get('llm_base_url'),
             'auth_type': self.config.get('llm_auth_type'),
             'timeout': self.config.get('llm_timeout'),
-            'has_credentials': bool(self.credentials)
+            'has_credentials': bool(self.credentials),
+            'transport': self.transport.get_info()
         }
\ No newline at end of file
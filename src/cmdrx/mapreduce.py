@@ -0,0 +1,242 @@
+"""
+CmdRx Map-Reduce Analysis
+
+Analyzes outputs too large for one prompt by extracting findings from chunks
+concurrently and merging them hierarchically.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List, Optional, TextIO, TYPE_CHECKING
+
+from .compaction import CHARS_PER_TOKEN, strip_ansi, strip_capture_prefixes
+from .exceptions import LLMError
+
+if TYPE_CHECKING:
+    from .llm import LLMProvider
+
+MAP_PROMPT = """You are helping troubleshoot a Linux/Unix command whose output is too large to analyze at once.
+This is part {index} of {total} of the output of: {command}
+
+Extract the findings that matter for troubleshooting: errors, warnings, failures, anomalies and
+relevant state. Quote the key lines exactly, include counts for repeated messages and keep
+timestamps. Reply with concise bullet points only. If this part contains nothing notable, reply
+with "No notable findings."
+
+Output part {index}/{total}:
+```
+{chunk}
+```"""
+
+MERGE_PROMPT = """You are helping troubleshoot a Linux/Unix command whose output was analyzed in parts.
+Below are findings extracted from consecutive parts of the output of: {command}
+
+Merge them into one list of concise bullet points. Combine duplicates (adding up counts), keep
+quoted lines, timestamps and every distinct error, and drop "No notable findings" entries.
+
+{findings}"""
+
+NO_FINDINGS = "No notable findings."
+
+
+def iter_chunks(source: TextIO, chunk_tokens: int) -> Iterator[str]:
+    """
+    Split output into chunks on line boundaries.
+
+    Args:
+        source: Readable text stream with the raw output
+        chunk_tokens: Approximate size of each chunk in tokens
+
+    Returns:
+        Iterator over chunks; lines longer than a chunk are truncated
+    """
+    chunk_chars = max(1, chunk_tokens) * CHARS_PER_TOKEN
+    lines: List[str] = []
+    size = 0
+
+    for line in source:
+        line = strip_capture_prefixes(strip_ansi(line.rstrip('\n')))[:chunk_chars]
+        if size + len(line) + 1 > chunk_chars and lines:
+            yield "\n".join(lines)
+            lines = []
+            size = 0
+        lines.append(line)
+        size += len(line) + 1
+
+    if lines:
+        yield "\n".join(lines)
+
+
+@dataclass
+class MapReduceResult:
+    """Merged findings from a map-reduce analysis."""
+    findings: str
+    chunks: int = 0
+    map_calls: int = 0
+    merge_calls: int = 0
+    levels: int = 0
+
+    def summary(self) -> str:
+        """Describe the run for display and for the LLM prompt."""
+        return (
+            f"output split into {self.chunks:,} chunks; findings extracted with "
+            f"{self.map_calls:,} map and {self.merge_calls:,} merge requests over "
+            f"{self.levels} level{'s' if self.levels != 1 else ''}"
+        )
+
+
+class MapReduceAnalyzer:
+    """
+    Extracts findings from output chunks concurrently and merges them.
+
+    Chunks are read lazily and at most a bounded number of requests are in
+    flight, so memory use depends on the chunk size and concurrency rather
+    than on the size of the output. When the combined findings are still too
+    large for one prompt they are merged in groups, level by level, until
+    they fit.
+    """
+
+    def __init__(
+        self,
+        provider: 'LLMProvider',
+        chunk_tokens: int = 6000,
+        concurrency: int = 4,
+        findings_budget: int = 8000,
+        use_cache: bool = True,
+        refresh: bool = False
+    ):
+        """
+        Initialize map-reduce analyzer.
+
+        Args:
+            provider: LLM provider used for the map and merge requests
+            chunk_tokens: Approximate size of each chunk in tokens
+            concurrency: Maximum number of concurrent LLM requests
+            findings_budget: Approximate token budget for the merged findings
+            use_cache: Serve and store responses through the response cache
+            refresh: Skip cache lookups but still store fresh responses
+        """
+        self.provider = provider
+        self.chunk_tokens = max(1, chunk_tokens)
+        self.concurrency = max(1, concurrency)
+        self.findings_chars = max(1, findings_budget) * CHARS_PER_TOKEN
+        self.use_cache = use_cache
+        self.refresh = refresh
+
+    def estimate_chunks(self, total_chars: int) -> int:
+        """Estimate the number of chunks for an output of the given size."""
+        chunk_chars = self.chunk_tokens * CHARS_PER_TOKEN
+        return max(1, -(-total_chars // chunk_chars))
+
+    def run(
+        self,
+        command: str,
+        chunks: Iterable[str],
+        total_chunks: int,
+        on_progress: Optional[Callable[[str], None]] = None
+    ) -> MapReduceResult:
+        """
+        Extract and merge findings from all chunks.
+
+        Args:
+            command: The command whose output is analyzed
+            chunks: Output chunks, in order
+            total_chunks: Expected number of chunks (used in prompts and progress)
+            on_progress: Called with a short progress description
+
+        Returns:
+            Merged findings
+        """
+        result = MapReduceResult(findings="")
+
+        findings = self._map(command, chunks, total_chunks, result, on_progress)
+        result.chunks = len(findings)
+        result.levels = 1
+
+        # Merge groups of findings until they fit in one prompt
+        while len(findings) > 1 and sum(len(f) + 2 for f in findings) > self.findings_chars:
+            groups = self._group(findings)
+            result.levels += 1
+            if on_progress:
+                on_progress(f"Merging findings (level {result.levels}, {len(groups)} groups)...")
+            findings = self._parallel(
+                [self._merge_prompt(command, group) for group in groups]
+            )
+            result.merge_calls += len(groups)
+
+        result.findings = "\n\n".join(findings)
+        return result
+
+    def _map(
+        self,
+        command: str,
+        chunks: Iterable[str],
+        total_chunks: int,
+        result: MapReduceResult,
+        on_progress: Optional[Callable[[str], None]]
+    ) -> List[str]:
+        """Run the map requests with a bounded number in flight."""
+        futures: List[Future] = []
+        findings: List[str] = []
+
+        with ThreadPoolExecutor(self.concurrency, thread_name_prefix="cmdrx-map") as pool:
+            for index, chunk in enumerate(chunks, 1):
+                # Bound memory: wait for the oldest request before reading further ahead
+                while len(futures) - len(findings) >= self.concurrency * 2:
+                    findings.append(self._collect(futures[len(findings)], len(findings) + 1))
+                    self._report(on_progress, len(findings), total_chunks)
+
+                prompt = MAP_PROMPT.format(
+                    index=index,
+                    total=max(total_chunks, index),
+                    command=command,
+                    chunk=chunk
+                )
+                futures.append(pool.submit(self._ask, prompt))
+                result.map_calls += 1
+
+            while len(findings) < len(futures):
+                findings.append(self._collect(futures[len(findings)], len(findings) + 1))
+                self._report(on_progress, len(findings), total_chunks)
+
+        return findings
+
+    def _collect(self, future: Future, index: int) -> str:
+        """Get the findings of one part, labelled with its position."""
+        try:
+            return f"Part {index}:\n{future.result().strip() or NO_FINDINGS}"
+        except Exception as e:
+            raise LLMError(f"Failed to analyze part {index} of the output: {e}") from e
+
+    def _parallel(self, prompts: List[str]) -> List[str]:
+        """Run prompts concurrently, returning the answers in order."""
+        with ThreadPoolExecutor(self.concurrency, thread_name_prefix="cmdrx-merge") as pool:
+            return [answer.strip() for answer in pool.map(self._ask, prompts)]
+
+    def _ask(self, prompt: str) -> str:
+        """Send one map or merge request."""
+        response = self.provider.analyze(prompt, use_cache=self.use_cache, refresh=self.refresh)
+        return response.content or ""
+
+    def _group(self, findings: List[str]) -> List[List[str]]:
+        """Group consecutive findings to fit merge prompts, at least two per group."""
+        groups: List[List[str]] = []
+        size = 0
+        for entry in findings:
+            if groups and (len(groups[-1]) < 2 or size + len(entry) <= self.findings_chars):
+                groups[-1].append(entry)
+                size += len(entry) + 2
+            else:
+                groups.append([entry])
+                size = len(entry) + 2
+        return groups
+
+    def _merge_prompt(self, command: str, group: List[str]) -> str:
+        """Build the prompt merging one group of findings."""
+        return MERGE_PROMPT.format(command=command, findings="\n\n".join(group))
+
+    @staticmethod
+    def _report(on_progress: Optional[Callable[[str], None]], done: int, total: int) -> None:
+        """Report map progress."""
+        if on_progress:
+            on_progress(f"Extracting findings from output parts ({done}/{total})...")
@@ -0,0 +1,156 @@
+"""
+CmdRx Monitor Module
+
+Support for re-running a diagnostic command on an interval (cmdrx --every):
+output is normalized and fingerprinted so that only runs whose output
+materially changed are analyzed, with a diff against the last analyzed run.
+"""
+
+import difflib
+import hashlib
+import re
+from typing import List, Optional
+
+from .compaction import strip_ansi, strip_capture_prefixes
+
+# Parts of otherwise identical output that change from run to run
+VOLATILE_PATTERNS = [
+    # ISO 8601 and syslog timestamps, clock times
+    (re.compile(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:[.,]\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?'), '<time>'),
+    (re.compile(r'\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec) [ \d]\d \d{2}:\d{2}(?::\d{2})?'), '<time>'),
+    (re.compile(r'\b\d{1,2}:\d{2}:\d{2}(?:[.,]\d+)?\b'), '<time>'),
+    # Relative times, e.g. "since ...; 3min 12s ago" or "Up 5 minutes"
+    (re.compile(
+        r'\b(?:\d+(?:\.\d+)?\s*(?:us|ms|s|sec|min|h|d|w|y|seconds?|minutes?|hours?|days?|weeks?|months?)\s+)+ago\b'
+    ), '<duration> ago'),
+    (re.compile(r'\bUp (?:About )?(?:an?|\d+) (?:seconds?|minutes?|hours?|days?|weeks?|months?)\b'), 'Up <duration>'),
+    # Process IDs: sshd[1234], pid=1234, PID: 1234, Main PID: 1234
+    (re.compile(r'(?<=\[)\d+(?=\])'), '<pid>'),
+    (re.compile(r'\b(pid[=: ]\s*)\d+', re.IGNORECASE), r'\1<pid>'),
+    # UUIDs and long hex identifiers
+    (re.compile(r'\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b', re.IGNORECASE), '<id>'),
+    (re.compile(r'\b(?:0x)?[0-9a-f]{12,}\b', re.IGNORECASE), '<id>'),
+]
+
+INTERVAL_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*(ms|s|m|h|d)?\s*$')
+
+INTERVAL_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_interval(text: str) -> float:
+    """
+    Parse an interval such as "60", "30s", "5m" or "1h".
+
+    Args:
+        text: Interval; plain numbers are seconds
+
+    Returns:
+        Interval in seconds
+
+    Raises:
+        ValueError: If the interval cannot be parsed or is not positive
+    """
+    match = INTERVAL_PATTERN.match(text)
+    if not match:
+        raise ValueError(f"Invalid interval '{text}' (expected e.g. 30s, 5m or 1h)")
+    seconds = float(match.group(1)) * INTERVAL_UNITS[match.group(2) or 's']
+    if seconds <= 0:
+        raise ValueError(f"Interval must be positive: '{text}'")
+    return seconds
+
+
+def normalize_output(output: str) -> List[str]:
+    """
+    Normalize command output for comparison between runs.
+
+    Capture timestamps, ANSI escape codes and trailing whitespace are removed;
+    timestamps, durations, PIDs and long identifiers are masked.
+
+    Args:
+        output: Captured command output
+
+    Returns:
+        Normalized lines
+    """
+    output = strip_capture_prefixes(strip_ansi(output))
+    lines = []
+    for line in output.splitlines():
+        for pattern, replacement in VOLATILE_PATTERNS:
+            line = pattern.sub(replacement, line)
+        lines.append(line.rstrip())
+    return lines
+
+
+class OutputMonitor:
+    """
+    Tracks the last analyzed output of a repeatedly executed command.
+
+    Runs are compared by a fingerprint of their normalized output and exit
+    code, so a run is only analyzed when something other than timestamps,
+    PIDs and the like changed.
+    """
+
+    def __init__(self, context_lines: int = 3, max_diff_lines: int = 200):
+        """
+        Initialize output monitor.
+
+        Args:
+            context_lines: Unchanged lines shown around each change in diffs
+            max_diff_lines: Diffs are cut to this many lines
+        """
+        self.context_lines = context_lines
+        self.max_diff_lines = max_diff_lines
+        self.fingerprint: Optional[str] = None
+        self._lines: List[str] = []
+        self._return_code: Optional[int] = None
+
+    def check(self, output: str, return_code: Optional[int]) -> Optional[str]:
+        """
+        Compare a run with the last analyzed one.
+
+        Args:
+            output: Captured command output
+            return_code: The command's exit code
+
+        Returns:
+            None if the output did not materially change, otherwise a diff
+            against the last analyzed run ("" for the first run)
+        """
+        lines = normalize_output(output)
+        fingerprint = self._fingerprint(lines, return_code)
+        if fingerprint == self.fingerprint:
+            return None
+        if self.fingerprint is None:
+            return ""
+
+        diff = list(difflib.unified_diff(
+            self._lines, lines,
+            fromfile='previous analyzed run', tofile='this run',
+            n=self.context_lines, lineterm=''
+        ))
+        if len(diff) > self.max_diff_lines:
+            omitted = len(diff) - self.max_diff_lines
+            diff = diff[:self.max_diff_lines] + [f"[... {omitted} more diff lines omitted by cmdrx ...]"]
+        if return_code != self._return_code:
+            diff.insert(0, f"Exit code changed from {self._return_code} to {return_code}")
+        return "\n".join(diff)
+
+    def analyzed(self, output: str, return_code: Optional[int]) -> None:
+        """
+        Remember a run as the last analyzed one.
+
+        Args:
+            output: Captured command output
+            return_code: The command's exit code
+        """
+        self._lines = normalize_output(output)
+        self._return_code = return_code
+        self.fingerprint = self._fingerprint(self._lines, return_code)
+
+    @staticmethod
+    def _fingerprint(lines: List[str], return_code: Optional[int]) -> str:
+        digest = hashlib.sha256(f"{return_code}\n".encode())
+        for line in lines:
+            digest.update(line.encode('utf-8', errors='replace'))
+            digest.update(b'\n')
+        return digest.hexdigest()
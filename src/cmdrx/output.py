@@ -6,16 +6,24 @@ Handles generation of log files, fix scripts, and other output artifacts.
 
 import os
 import json
-import stat
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, NamedTuple, Optional
 from rich.console import Console
 
 from .exceptions import OutputError
+from .files import artifact_id, atomic_write
+from .history import AnalysisHistory, entry_from_analysis
 from .llm import LLMResponse
+from .retention import GarbageCollector
+from .store import AnalysisStore
 
-console = Console()
+
+class Artifacts(NamedTuple):
+    """Where an analysis was written."""
+    log_file: Optional[Path]
+    fix_script: Optional[Path]
+    record_id: Optional[int] = None
 
 
 class OutputGenerator:
@@ -23,7 +31,17 @@ class OutputGenerator:
     Generates output files including logs and fix scripts.
     """
     
-    def __init__(self, log_dir: Path, dry_run: bool = False, verbose: bool = False):
+    def __init__(
+        self,
+        log_dir: Path,
+        dry_run: bool = False,
+        verbose: bool = False,
+        console: Optional[Console] = None,
+        history: Optional[AnalysisHistory] = None,
+        store: Optional[AnalysisStore] = None,
+        fsync: str = 'off',
+        collector: Optional[GarbageCollector] = None
+    ):
         """
         Initialize output generator.
         
@@ -31,10 +49,21 @@ class OutputGenerator:
             log_dir: Directory for output files
             dry_run: Don't create fix scripts if True
             verbose: Enable verbose output
+            console: Console for status messages (defaults to stdout)
+            history: Index in which written analyses are recorded
+            store: Append analyses to this store instead of writing log files
+            fsync: Flush written files to disk: 'off', 'file' or 'full'
+                (file and directory entry)
+            collector: Retention garbage collector told about new files
         """
         self.log_dir = log_dir
         self.dry_run = dry_run
         self.verbose = verbose
+        self.console = console or Console()
+        self.history = history
+        self.store = store
+        self.fsync = fsync
+        self.collector = collector
         
         # Ensure log directory exists
         self.log_dir.mkdir(parents=True, exist_ok=True)
@@ -56,25 +85,121 @@ class OutputGenerator:
         Returns:
             True if outputs generated successfully
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        artifacts = self.write_artifacts(context, analysis_data, llm_response)
         
-        try:
-            # Generate log file
-            log_file = self._generate_log_file(context, analysis_data, llm_response, timestamp)
+        # Show generated files
+        self._show_generated_files(artifacts)
+        
+        return True
+    
+    def write_artifacts(
+        self,
+        context: Dict[str, Any],
+        analysis_data: Dict[str, Any],
+        llm_response: LLMResponse
+    ) -> Artifacts:
+        """
+        Write the log file (or store record) and fix script without displaying anything.
+        
+        Args:
+            context: Analysis context (command, output, etc.)
+            analysis_data: Parsed analysis data
+            llm_response: Raw LLM response
             
+        Returns:
+            Paths of the log file and fix script and the store record ID
+            (None if not generated)
+        """
+        # Unique across threads, processes and hosts sharing the log directory
+        timestamp = artifact_id()
+        
+        try:
             # Generate fix script if there are suggested fixes
             fix_script = None
             suggested_fixes = analysis_data.get('suggested_fixes', [])
             if suggested_fixes and not self.dry_run:
                 fix_script = self._generate_fix_script(suggested_fixes, timestamp, context)
             
-            # Show generated files
-            self._show_generated_files(log_file, fix_script)
-            
-            return True
+            # Generate log file or store record
+            log_file = record_id = None
+            if self.store is not None:
+                record_id = self.store.append(self.create_record(context, analysis_data, llm_response, fix_script))
+                if self.verbose:
+                    self.console.print(f"[blue]Analysis stored as record {record_id}[/blue]")
+            else:
+                log_file = self._generate_log_file(context, analysis_data, llm_response, timestamp)
         
         except Exception as e:
             raise OutputError(f"Failed to generate outputs: {e}")
+        
+        if self.history is not None:
+            # The log file is the record; a failed index update is not an error
+            self.history.record(
+                entry_from_analysis(context, analysis_data, llm_response, log_file, fix_script, record_id)
+            )
+        
+        if self.collector is not None:
+            self.collector.note([log_file, fix_script])
+            self.collector.schedule()
+        
+        return Artifacts(log_file, fix_script, record_id)
+    
+    def create_record(
+        self,
+        context: Dict[str, Any],
+        analysis_data: Dict[str, Any],
+        llm_response: LLMResponse,
+        fix_script: Optional[Path] = None
+    ) -> Dict[str, Any]:
+        """
+        Create a structured record of an analysis for the analysis store.
+        
+        Args:
+            context: Analysis context (command, output, etc.)
+            analysis_data: Parsed analysis data
+            llm_response: Raw LLM response
+            fix_script: Generated fix script, if any
+            
+        Returns:
+            JSON-serializable record
+        """
+        return {
+            'timestamp': context.get('timestamp', datetime.now().isoformat()),
+            'command': context.get('command'),
+            'return_code': context.get('return_code'),
+            'compaction': context.get('compaction'),
+            'system_info': context.get('system_info', {}),
+            'output': context.get('output'),
+            'analysis': analysis_data,
+            'llm': {
+                'provider': llm_response.provider,
+                'model': llm_response.model,
+                'usage': llm_response.usage,
+                'response_time': llm_response.response_time,
+                'cached': llm_response.cached,
+                'coalesced': llm_response.coalesced,
+                'attempts': llm_response.attempts,
+                'events': llm_response.events,
+                'content': llm_response.content,
+            },
+            'fix_script': str(fix_script) if fix_script else None,
+        }
+    
+    def render_record(self, record: Dict[str, Any]) -> str:
+        """
+        Render a stored analysis record as log file text.
+        
+        Args:
+            record: Record created by create_record
+            
+        Returns:
+            The log file content the analysis would have been written as
+        """
+        context = {key: record.get(key) for key in ('timestamp', 'command', 'return_code', 'compaction')}
+        context['system_info'] = record.get('system_info') or {}
+        context['output'] = record.get('output') or 'No output'
+        llm_response = LLMResponse(**record.get('llm', {'content': '', 'model': ''}))
+        return self._create_log_content(context, record.get('analysis') or {}, llm_response)
     
     def _generate_log_file(
         self, 
@@ -92,11 +217,10 @@ class OutputGenerator:
         log_content = self._create_log_content(context, analysis_data, llm_response)
         
         try:
-            with open(log_file, 'w', encoding='utf-8') as f:
-                f.write(log_content)
+            atomic_write(log_file, log_content, fsync=self.fsync)
             
             if self.verbose:
-                console.print(f"[blue]Log file created: {log_file}[/blue]")
+                self.console.print(f"[blue]Log file created: {log_file}[/blue]")
             
             return log_file
         
@@ -118,14 +242,10 @@ class OutputGenerator:
         script_content = self._create_fix_script_content(suggested_fixes, context)
         
         try:
-            with open(script_file, 'w', encoding='utf-8') as f:
-                f.write(script_content)
-            
-            # Make script executable
-            script_file.chmod(script_file.stat().st_mode | stat.S_IEXEC)
+            atomic_write(script_file, script_content, executable=True, fsync=self.fsync)
             
             if self.verbose:
-                console.print(f"[blue]Fix script created: {script_file}[/blue]")
+                self.console.print(f"[blue]Fix script created: {script_file}[/blue]")
             
             return script_file
         
@@ -152,10 +272,21 @@ class OutputGenerator:
             f"LLM Provider: {llm_response.provider}",
             f"LLM Model: {llm_response.model}",
             f"Response Time: {llm_response.response_time:.2f}s",
+            f"Cached: {'yes' if llm_response.cached else 'no'}",
+            f"Attempts: {llm_response.attempts}",
+        ]
+        
+        if llm_response.coalesced:
+            log_parts.append("Coalesced: yes (shared an identical request already in flight)")
+        
+        if context.get('compaction'):
+            log_parts.append(f"Output Compaction: {context['compaction']}")
+        
+        log_parts.extend([
             "",
             "SYSTEM INFORMATION",
             "-" * 40,
-        ]
+        ])
         
         # Add system info
         system_info = context.get('system_info', {})
@@ -253,6 +384,14 @@ class OutputGenerator:
                 ""
             ])
         
+        if llm_response.events:
+            log_parts.extend([
+                "RETRY AND CIRCUIT BREAKER EVENTS",
+                "-" * 32,
+                *llm_response.events,
+                ""
+            ])
+        
         log_parts.extend([
             "RAW LLM RESPONSE",
             "-" * 17,
@@ -371,19 +510,23 @@ class OutputGenerator:
         
         return "\n".join(script_parts)
     
-    def _show_generated_files(self, log_file: Optional[Path], fix_script: Optional[Path]) -> None:
+    def _show_generated_files(self, artifacts: Artifacts) -> None:
         """Show information about generated files."""
+        log_file, fix_script, record_id = artifacts
         
-        console.print("\n[bold]Generated Files:[/bold]")
+        self.console.print("\n[bold]Generated Files:[/bold]")
         
         if log_file:
             file_size = log_file.stat().st_size
-            console.print(f"📄 Log file: [cyan]{log_file}[/cyan] ({file_size} bytes)")
+            self.console.print(f"📄 Log file: [cyan]{log_file}[/cyan] ({file_size} bytes)")
+        
+        if record_id is not None:
+            self.console.print(f"📄 Stored analysis: [cyan]{record_id}[/cyan] (view with [yellow]cmdrx show {record_id}[/yellow])")
         
         if fix_script:
-            console.print(f"🔧 Fix script: [green]{fix_script}[/green] (executable)")
-            console.print(f"   Run with: [yellow]bash {fix_script}[/yellow]")
+            self.console.print(f"🔧 Fix script: [green]{fix_script}[/green] (executable)")
+            self.console.print(f"   Run with: [yellow]bash {fix_script}[/yellow]")
         elif self.dry_run:
-            console.print("[yellow]Fix script generation skipped (dry run mode)[/yellow]")
+            self.console.print("[yellow]Fix script generation skipped (dry run mode)[/yellow]")
         
-        console.print(f"📁 All files saved to: [blue]{self.log_dir}[/blue]")
\ No newline at end of file
+        self.console.print(f"📁 All files saved to: [blue]{self.log_dir}[/blue]")
\ No newline at end of file
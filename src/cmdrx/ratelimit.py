@@ -0,0 +1,229 @@
+"""
+CmdRx Rate Limiting
+
+Client-side requests-per-minute and tokens-per-minute limits per
+provider/model. The token buckets live in a small file per provider/model
+that every local cmdrx process updates under an exclusive lock, so
+parallel processes share one budget instead of each running into 429s.
+"""
+
+import asyncio
+import fcntl
+import os
+import re
+import struct
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from .compaction import CHARS_PER_TOKEN
+from .exceptions import RateLimitError
+
+# Requests available, tokens available, wall-clock time of the last update
+STATE = struct.Struct('<3d')
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the prompt tokens of a request from its text."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+@dataclass
+class Reservation:
+    """Capacity taken for one request, settled once its usage is known."""
+    tokens: int
+    wait: float
+
+
+class RateLimiter:
+    """
+    Shared token buckets for one provider/model.
+
+    Each bucket holds up to one minute's worth of its limit and refills
+    continuously. A request takes one request and its estimated prompt
+    tokens right away, possibly overdrawing the buckets, and then sleeps
+    until the overdraft has refilled. Callers are therefore served in the
+    order they arrived, across processes, without polling. Once the
+    response reports its actual usage the difference is charged or
+    refunded.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        rpm: float = 0,
+        tpm: float = 0,
+        max_wait: float = 60.0,
+        name: str = ''
+    ):
+        """
+        Initialize rate limiter.
+
+        Args:
+            path: State file shared by all processes using this limit
+            rpm: Requests per minute (0 = unlimited)
+            tpm: Tokens per minute (0 = unlimited)
+            max_wait: Fail instead of waiting longer than this many seconds
+            name: Provider/model, for messages
+        """
+        self.path = path
+        self.rpm = max(0.0, float(rpm))
+        self.tpm = max(0.0, float(tpm))
+        self.max_wait = max_wait
+        self.name = name or path.stem
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], name: str) -> Optional['RateLimiter']:
+        """
+        Create the limiter for a provider/model from the rate_limits setting.
+
+        rate_limits maps "provider/model" or "provider" to {"rpm": N, "tpm": N};
+        the more specific entry wins.
+
+        Args:
+            config: CmdRx configuration dictionary
+            name: Provider/model the requests go to
+
+        Returns:
+            Rate limiter, or None if no limit is configured
+        """
+        limits = config.get('rate_limits') or {}
+        entry = limits.get(name) or limits.get(name.split('/')[0])
+        if not entry or not (entry.get('rpm') or entry.get('tpm')):
+            return None
+
+        cache_dir = Path(config.get('cache_directory') or '~/.cache/cmdrx').expanduser()
+        file_name = re.sub(r'[^A-Za-z0-9._-]', '_', name) + '.bucket'
+        return cls(
+            cache_dir / 'ratelimit' / file_name,
+            rpm=entry.get('rpm', 0),
+            tpm=entry.get('tpm', 0),
+            max_wait=float(config.get('rate_limit_max_wait', 60)),
+            name=name
+        )
+
+    def acquire(self, tokens: int) -> Reservation:
+        """
+        Take capacity for a request, sleeping until it is available.
+
+        Args:
+            tokens: Estimated prompt tokens
+
+        Returns:
+            Reservation to settle with the actual usage
+
+        Raises:
+            RateLimitError: If the wait would exceed max_wait
+        """
+        reservation = self._reserve(tokens)
+        if reservation.wait > 0:
+            try:
+                time.sleep(reservation.wait)
+            except BaseException:
+                self.release(reservation)
+                raise
+        return reservation
+
+    async def aacquire(self, tokens: int) -> Reservation:
+        """
+        Take capacity for a request without blocking the event loop.
+
+        Args:
+            tokens: Estimated prompt tokens
+
+        Returns:
+            Reservation to settle with the actual usage
+
+        Raises:
+            RateLimitError: If the wait would exceed max_wait
+        """
+        reservation = self._reserve(tokens)
+        if reservation.wait > 0:
+            try:
+                await asyncio.sleep(reservation.wait)
+            except BaseException:
+                self.release(reservation)
+                raise
+        return reservation
+
+    def settle(self, reservation: Reservation, usage: Optional[Dict[str, Any]]) -> None:
+        """
+        Charge or refund the difference between estimated and actual tokens.
+
+        Args:
+            reservation: Capacity taken for the request
+            usage: Token usage reported by the provider (None keeps the estimate)
+        """
+        if not self.tpm or not usage:
+            return
+        # OpenAI-style usage, or Anthropic's input_tokens/output_tokens
+        actual = usage.get('total_tokens') or (
+            (usage.get('prompt_tokens', usage.get('input_tokens')) or 0)
+            + (usage.get('completion_tokens', usage.get('output_tokens')) or 0)
+        )
+        if actual:
+            self._adjust(0, actual - reservation.tokens)
+
+    def release(self, reservation: Reservation) -> None:
+        """Return the capacity of a request that was not sent."""
+        self._adjust(-1, -reservation.tokens)
+
+    def available(self) -> Dict[str, float]:
+        """Current requests and tokens available (negative while overdrawn)."""
+        with self._state() as (fd, requests, tokens):
+            return {'requests': requests, 'tokens': tokens}
+
+    def _reserve(self, tokens: int) -> Reservation:
+        """Take capacity now and compute how long to wait for it."""
+        # A request larger than the bucket could never fit
+        tokens = int(min(tokens, self.tpm)) if self.tpm else int(tokens)
+
+        with self._state() as (fd, requests, available_tokens):
+            requests -= 1
+            available_tokens -= tokens
+            wait = 0.0
+            if self.rpm and requests < 0:
+                wait = -requests * 60.0 / self.rpm
+            if self.tpm and available_tokens < 0:
+                wait = max(wait, -available_tokens * 60.0 / self.tpm)
+
+            if wait > self.max_wait:
+                raise RateLimitError(
+                    f"Rate limit for {self.name} needs a {wait:.0f}s wait, "
+                    f"more than rate_limit_max_wait ({self.max_wait:.0f}s)"
+                )
+            self._write(fd, requests, available_tokens)
+
+        return Reservation(tokens=tokens, wait=wait)
+
+    def _adjust(self, requests: float, tokens: float) -> None:
+        """Take (positive) or return (negative) capacity."""
+        with self._state() as (fd, available_requests, available_tokens):
+            self._write(fd, available_requests - requests, available_tokens - tokens)
+
+    @contextmanager
+    def _state(self) -> Iterator[tuple]:
+        """Lock the state file and read the refilled buckets."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            now = time.time()
+            data = os.pread(fd, STATE.size, 0)
+            if len(data) == STATE.size:
+                requests, tokens, updated = STATE.unpack(data)
+                # Wall-clock time is shared between processes; never refill backwards
+                elapsed = max(0.0, now - updated)
+                requests = min(self.rpm, requests + elapsed * self.rpm / 60.0)
+                tokens = min(self.tpm, tokens + elapsed * self.tpm / 60.0)
+            else:
+                requests, tokens = self.rpm, self.tpm
+            yield fd, requests, tokens
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _write(fd: int, requests: float, tokens: float) -> None:
+        os.pwrite(fd, STATE.pack(requests, tokens, time.time()), 0)
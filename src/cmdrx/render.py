@@ -0,0 +1,137 @@
+"""
+CmdRx Render Module
+
+Rich rendering of analysis results for the terminal.
+"""
+
+from typing import Any, Dict
+from rich.console import Console
+from rich.panel import Panel
+from rich.markdown import Markdown
+
+# Result sections in display order
+DISPLAY_SECTIONS = (
+    'analysis',
+    'issues',
+    'troubleshooting_steps',
+    'suggested_fixes',
+    'additional_info',
+)
+
+
+def render_analysis(console: Console, analysis_data: Dict[str, Any]) -> None:
+    """
+    Display all sections of the analysis results.
+    
+    Args:
+        console: Console to print to
+        analysis_data: Parsed analysis data
+    """
+    for section in DISPLAY_SECTIONS:
+        render_section(console, section, analysis_data)
+
+
+def render_section(console: Console, section: str, analysis_data: Dict[str, Any]) -> None:
+    """
+    Display a single section of the analysis results.
+    
+    Empty sections are skipped.
+    
+    Args:
+        console: Console to print to
+        section: One of DISPLAY_SECTIONS
+        analysis_data: Parsed analysis data
+    """
+    
+    if section == 'analysis':
+        # Status indicator
+        status = analysis_data.get('status', 'info')
+        status_colors = {
+            'success': 'green',
+            'warning': 'yellow', 
+            'error': 'red',
+            'info': 'blue'
+        }
+        status_color = status_colors.get(status, 'blue')
+        
+        # Main analysis
+        console.print(Panel(
+            analysis_data.get('analysis', 'No analysis provided'),
+            title=f"[{status_color}]Analysis ({status.upper()})[/{status_color}]",
+            border_style=status_color
+        ))
+    
+    elif section == 'issues':
+        # Issues identified
+        issues = analysis_data.get('issues', [])
+        if issues:
+            issues_text = "\n".join(f"• {issue}" for issue in issues)
+            console.print(Panel(
+                issues_text,
+                title="[red]Issues Identified[/red]",
+                border_style="red"
+            ))
+    
+    elif section == 'troubleshooting_steps':
+        steps = analysis_data.get('troubleshooting_steps', [])
+        if steps:
+            steps_text = []
+            for step in steps:
+                step_num = step.get('step', '?')
+                description = step.get('description', 'No description')
+                command = step.get('command', '')
+                explanation = step.get('explanation', '')
+                
+                step_text = f"**{step_num}. {description}**"
+                if command:
+                    step_text += f"\n   Command: `{command}`"
+                if explanation:
+                    step_text += f"\n   {explanation}"
+                steps_text.append(step_text)
+            
+            console.print(Panel(
+                Markdown("\n\n".join(steps_text)),
+                title="[blue]Troubleshooting Steps[/blue]",
+                border_style="blue"
+            ))
+    
+    elif section == 'suggested_fixes':
+        fixes = analysis_data.get('suggested_fixes', [])
+        if fixes:
+            fixes_text = []
+            for i, fix in enumerate(fixes, 1):
+                description = fix.get('description', 'No description')
+                commands = fix.get('commands', [])
+                risk_level = fix.get('risk_level', 'unknown')
+                explanation = fix.get('explanation', '')
+                
+                risk_colors = {'low': 'green', 'medium': 'yellow', 'high': 'red'}
+                risk_color = risk_colors.get(risk_level, 'yellow')
+                
+                fix_text = f"**Fix {i}: {description}**\n"
+                fix_text += f"Risk Level: [{risk_color}]{risk_level.upper()}[/{risk_color}]\n"
+                
+                if commands:
+                    fix_text += "\nCommands:\n"
+                    for cmd in commands:
+                        fix_text += f"```bash\n{cmd}\n```\n"
+                
+                if explanation:
+                    fix_text += f"\n{explanation}"
+                
+                fixes_text.append(fix_text)
+            
+            console.print(Panel(
+                Markdown("\n\n---\n\n".join(fixes_text)),
+                title="[green]Suggested Fixes[/green]",
+                border_style="green"
+            ))
+    
+    elif section == 'additional_info':
+        additional_info = analysis_data.get('additional_info', '')
+        if additional_info:
+            console.print(Panel(
+                additional_info,
+                title="[cyan]Additional Information[/cyan]",
+                border_style="cyan"
+            ))
@@ -0,0 +1,524 @@
+"""
+CmdRx Resilience
+
+Retry with decorrelated jitter, Retry-After handling, deadline budgets,
+per-provider circuit breakers and client-side rate limits for LLM requests.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from .exceptions import CircuitOpenError, LLMError
+from .ratelimit import RateLimiter, Reservation
+
+T = TypeVar('T')
+
+# HTTP status codes worth retrying
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+
+
+def _root_cause(exc: BaseException) -> BaseException:
+    """Follow the exception chain down to the original error."""
+    while exc.__cause__ is not None:
+        exc = exc.__cause__
+    return exc
+
+
+def get_status_code(exc: BaseException) -> Optional[int]:
+    """Get the HTTP status code carried by an SDK error, if any."""
+    cause = _root_cause(exc)
+    status = getattr(cause, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(cause, 'response', None), 'status_code', None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """
+    Decide whether a failed request is worth retrying.
+
+    Rate limits, server errors, timeouts and connection failures are
+    retryable; client errors such as bad requests or authentication
+    failures are not.
+    """
+    status = get_status_code(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+
+    name = type(_root_cause(exc)).__name__
+    return any(marker in name for marker in ('Timeout', 'Connect', 'Network', 'Protocol'))
+
+
+def get_retry_after(exc: BaseException) -> Optional[float]:
+    """
+    Get the server-requested delay from Retry-After headers.
+
+    Args:
+        exc: Failed request error
+
+    Returns:
+        Delay in seconds, or None if the server did not ask for one
+    """
+    response = getattr(_root_cause(exc), 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get('retry-after-ms')
+    if retry_after_ms:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000)
+        except ValueError:
+            pass
+
+    retry_after = headers.get('retry-after')
+    if not retry_after:
+        return None
+
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class RetryLog:
+    """Attempts made and events recorded for one request."""
+    attempts: int = 0
+    events: List[str] = field(default_factory=list)
+
+
+class RetryPolicy:
+    """
+    Retry schedule using decorrelated jitter within a total deadline.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 20.0,
+        deadline: float = 90.0
+    ):
+        """
+        Initialize retry policy.
+
+        Args:
+            max_attempts: Maximum number of attempts including the first
+            base_delay: Minimum delay between attempts in seconds
+            max_delay: Maximum delay between attempts in seconds
+            deadline: Total time budget for all attempts in seconds
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'RetryPolicy':
+        """Create a retry policy from configuration."""
+        return cls(
+            max_attempts=int(config.get('retry_max_attempts', 4)),
+            base_delay=float(config.get('retry_base_delay', 0.5)),
+            max_delay=float(config.get('retry_max_delay', 20.0)),
+            deadline=float(config.get('retry_deadline', 90.0))
+        )
+
+    def next_delay(self, previous_delay: float) -> float:
+        """Get the next jittered delay given the previous one."""
+        upper = max(self.base_delay, previous_delay * 3)
+        return min(self.max_delay, random.uniform(self.base_delay, upper))
+
+
+class CircuitBreaker:
+    """
+    Per provider/model circuit breaker.
+
+    After a number of consecutive retryable failures the circuit opens and
+    requests fail immediately. Once the reset timeout has passed a single
+    trial request is let through; success closes the circuit again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    _registry: Dict[str, 'CircuitBreaker'] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Initialize circuit breaker.
+
+        Args:
+            name: Circuit name, usually provider/model
+            failure_threshold: Consecutive failures before the circuit opens
+            reset_timeout: Seconds to wait before allowing a trial request
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+
+    @classmethod
+    def get(cls, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0) -> 'CircuitBreaker':
+        """Get the process-wide breaker for a circuit name."""
+        with cls._registry_lock:
+            breaker = cls._registry.get(name)
+            if breaker is None:
+                breaker = cls(name, failure_threshold, reset_timeout)
+                cls._registry[name] = breaker
+            return breaker
+
+    @property
+    def state(self) -> str:
+        """Current circuit state."""
+        with self._lock:
+            return self._state
+
+    def retry_in(self) -> float:
+        """Seconds until an open circuit allows a trial request."""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        """
+        Check whether a request may be sent.
+
+        Returns:
+            False if the circuit is open
+        """
+        return self.admit() is not None
+
+    def admit(self) -> Optional[str]:
+        """
+        Admit a request if the circuit allows it.
+
+        Returns:
+            CLOSED for an ordinary request, HALF_OPEN for the single trial
+            request, or None if the circuit is open
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return self.CLOSED
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                return self.HALF_OPEN
+            return None
+
+    def abandon_trial(self) -> Optional[str]:
+        """
+        Give back a trial request that ended without an outcome.
+
+        A cancelled or interrupted trial says nothing about the provider, so
+        the circuit returns to open with its reset timeout already elapsed and
+        the next request becomes the trial.
+
+        Returns:
+            Description of the state change, if any
+        """
+        with self._lock:
+            if self._state != self.HALF_OPEN:
+                return None
+            self._state = self.OPEN
+            self._opened_at = time.monotonic() - self.reset_timeout
+        return f"circuit {self.name}: trial request abandoned; {self.HALF_OPEN} -> {self.OPEN}"
+
+    def record_success(self) -> Optional[str]:
+        """
+        Record a successful request.
+
+        Returns:
+            Description of the state change, if any
+        """
+        with self._lock:
+            previous = self._state
+            self._state = self.CLOSED
+            self._failures = 0
+        if previous != self.CLOSED:
+            return f"circuit {self.name}: {previous} -> {self.CLOSED}"
+        return None
+
+    def record_failure(self) -> Optional[str]:
+        """
+        Record a failed request.
+
+        Returns:
+            Description of the state change, if any
+        """
+        with self._lock:
+            previous = self._state
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+            current = self._state
+            failures = self._failures
+        if current != previous:
+            return f"circuit {self.name}: {previous} -> {current} after {failures} consecutive failures"
+        return None
+
+
+class Resilience:
+    """
+    Runs LLM requests through a retry policy, circuit breaker and rate limiter.
+
+    Every attempt, retries included, is charged to the rate limiter. Every
+    retry, breaker transition and rate limit wait is recorded as a human-readable event
+    and passed to the optional on_event callback.
+    """
+
+    def __init__(
+        self,
+        policy: RetryPolicy,
+        breaker: CircuitBreaker,
+        on_event: Optional[Callable[[str], None]] = None,
+        limiter: Optional[RateLimiter] = None
+    ):
+        """
+        Initialize resilience wrapper.
+
+        Args:
+            policy: Retry policy
+            breaker: Circuit breaker for the target provider/model
+            on_event: Called with each retry, breaker or rate limit event
+            limiter: Rate limiter for the target provider/model (None = unlimited)
+        """
+        self.policy = policy
+        self.breaker = breaker
+        self.on_event = on_event
+        self.limiter = limiter
+
+    @classmethod
+    def from_config(
+        cls,
+        config: Dict[str, Any],
+        circuit_name: str,
+        on_event: Optional[Callable[[str], None]] = None
+    ) -> 'Resilience':
+        """Create a resilience wrapper from configuration."""
+        breaker = CircuitBreaker.get(
+            circuit_name,
+            failure_threshold=int(config.get('circuit_failure_threshold', 5)),
+            reset_timeout=float(config.get('circuit_reset_timeout', 30.0))
+        )
+        limiter = RateLimiter.from_config(config, circuit_name)
+        return cls(RetryPolicy.from_config(config), breaker, on_event, limiter)
+
+    def call(
+        self,
+        request: Callable[[], T],
+        log: RetryLog,
+        can_retry: Callable[[], bool] = lambda: True,
+        cost: int = 0
+    ) -> T:
+        """
+        Run a request with retries.
+
+        Args:
+            request: Function performing one attempt
+            log: Receives the attempt count and retry/breaker events
+            can_retry: Returns False once a retry is no longer safe
+                (for example after streamed text was shown)
+            cost: Estimated prompt tokens, charged to the rate limiter per attempt
+
+        Returns:
+            Result of the first successful attempt
+        """
+        start = time.monotonic()
+        delay = 0.0
+
+        while True:
+            log.attempts += 1
+            trial = self._check_breaker(log.events)
+            reservation = self._acquire(log.events, cost, trial)
+            try:
+                result = request()
+            except Exception as e:
+                delay = self._handle_failure(e, log.attempts, start, delay, log.events, can_retry)
+                time.sleep(delay)
+                continue
+            except BaseException:
+                self._abandon(log.events, trial)
+                raise
+
+            self._record(log.events, self.breaker.record_success())
+            self._settle(reservation, result)
+            return result
+
+    async def acall(
+        self,
+        request: Callable[[], Awaitable[T]],
+        log: RetryLog,
+        cost: int = 0
+    ) -> T:
+        """
+        Run an async request with retries.
+
+        Args:
+            request: Coroutine function performing one attempt
+            log: Receives the attempt count and retry/breaker events
+            cost: Estimated prompt tokens, charged to the rate limiter per attempt
+
+        Returns:
+            Result of the first successful attempt
+        """
+        start = time.monotonic()
+        delay = 0.0
+
+        while True:
+            log.attempts += 1
+            trial = self._check_breaker(log.events)
+            reservation = await self._aacquire(log.events, cost, trial)
+            try:
+                result = await request()
+            except Exception as e:
+                delay = self._handle_failure(e, log.attempts, start, delay, log.events, lambda: True)
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled, e.g. by a deadline or as a losing hedge
+                self._abandon(log.events, trial)
+                raise
+
+            self._record(log.events, self.breaker.record_success())
+            self._settle(reservation, result)
+            return result
+
+    def _check_breaker(self, events: List[str]) -> bool:
+        """
+        Fail fast when the circuit is open.
+
+        Returns:
+            True if this attempt is the circuit's half-open trial request
+        """
+        admitted = self.breaker.admit()
+        if admitted is None:
+            message = (
+                f"circuit {self.breaker.name} is open; "
+                f"failing fast (retry in {self.breaker.retry_in():.0f}s)"
+            )
+            self._record(events, message)
+            raise CircuitOpenError(message)
+        return admitted == CircuitBreaker.HALF_OPEN
+
+    def _abandon(self, events: List[str], trial: bool) -> None:
+        """Hand back the half-open trial of an attempt that ended without an outcome."""
+        if trial:
+            self._record(events, self.breaker.abandon_trial())
+
+    def _acquire(self, events: List[str], cost: int, trial: bool) -> Optional[Reservation]:
+        """
+        Wait for rate limit capacity for an attempt.
+
+        The half-open trial is handed back if no capacity is granted, so a
+        RateLimitError does not leave the circuit stuck half-open.
+        """
+        limiter = self.limiter
+        if limiter is None:
+            return None
+        try:
+            reservation = limiter.acquire(cost)
+        except BaseException:
+            self._abandon(events, trial)
+            raise
+        self._record_wait(events, limiter, reservation)
+        return reservation
+
+    async def _aacquire(self, events: List[str], cost: int, trial: bool) -> Optional[Reservation]:
+        """Async variant of _acquire()."""
+        limiter = self.limiter
+        if limiter is None:
+            return None
+        try:
+            reservation = await limiter.aacquire(cost)
+        except BaseException:
+            self._abandon(events, trial)
+            raise
+        self._record_wait(events, limiter, reservation)
+        return reservation
+
+    def _record_wait(self, events: List[str], limiter: RateLimiter, reservation: Reservation) -> None:
+        """Record time spent waiting for the rate limit."""
+        if reservation.wait >= 0.1:
+            self._record(events, f"rate limit {limiter.name}: waited {reservation.wait:.1f}s")
+
+    def _settle(self, reservation: Optional[Reservation], result: Any) -> None:
+        """Charge the rate limiter for the tokens actually used."""
+        if reservation is not None and self.limiter is not None:
+            self.limiter.settle(reservation, getattr(result, 'usage', None))
+
+    def _handle_failure(
+        self,
+        error: Exception,
+        attempt: int,
+        start: float,
+        previous_delay: float,
+        events: List[str],
+        can_retry: Callable[[], bool]
+    ) -> float:
+        """
+        Record a failed attempt and decide how long to wait before the next one.
+
+        Raises the error if it should not be retried.
+        """
+        retryable = is_retryable(error)
+        if retryable:
+            self._record(events, self.breaker.record_failure())
+        else:
+            # The provider answered (e.g. a bad request), so it is not unhealthy
+            self._record(events, self.breaker.record_success())
+
+        if not retryable or not can_retry():
+            raise error
+
+        status = get_status_code(error)
+        reason = f"HTTP {status}" if status else type(_root_cause(error)).__name__
+
+        if attempt >= self.policy.max_attempts:
+            self._record(events, f"attempt {attempt} failed ({reason}); giving up after {attempt} attempts")
+            raise error
+
+        delay = self.policy.next_delay(previous_delay)
+        retry_after = get_retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+
+        elapsed = time.monotonic() - start
+        if elapsed + delay > self.policy.deadline:
+            self._record(
+                events,
+                f"attempt {attempt} failed ({reason}); retry deadline of "
+                f"{self.policy.deadline:.0f}s would be exceeded"
+            )
+            raise LLMError(f"Retry deadline exceeded after {attempt} attempts: {error}") from error
+
+        source = " (Retry-After)" if retry_after is not None and delay == retry_after else ""
+        self._record(events, f"attempt {attempt} failed ({reason}); retrying in {delay:.1f}s{source}")
+        return delay
+
+    def _record(self, events: List[str], event: Optional[str]) -> None:
+        """Store an event and notify the callback."""
+        if not event:
+            return
+        events.append(event)
+        if self.on_event:
+            self.on_event(event)
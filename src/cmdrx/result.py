@@ -0,0 +1,157 @@
+"""
+CmdRx Result Module
+
+Typed analysis results for library use, and the sinks that display or
+persist them.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Protocol
+from rich.console import Console
+
+from .llm import LLMResponse
+from .output import Artifacts, OutputGenerator
+from .render import render_analysis
+
+
+@dataclass
+class AnalysisResult:
+    """Outcome of one analysis, without any side effects applied."""
+    command: str
+    return_code: Optional[int]
+    status: str
+    analysis: str
+    issues: List[str] = field(default_factory=list)
+    troubleshooting_steps: List[Dict[str, Any]] = field(default_factory=list)
+    suggested_fixes: List[Dict[str, Any]] = field(default_factory=list)
+    additional_info: str = ""
+    provider: str = ""
+    model: str = ""
+    usage: Dict[str, Any] = field(default_factory=dict)
+    cached: bool = False
+    coalesced: bool = False
+    attempts: int = 1
+    # Seconds spent in each phase: prepare, llm, parse, sinks and total
+    timings: Dict[str, float] = field(default_factory=dict)
+    # Set by ArtifactSink
+    artifacts: Optional[Artifacts] = None
+    # What the result was made from, for sinks that need the full context
+    context: Dict[str, Any] = field(default_factory=dict, repr=False)
+    llm_response: Optional[LLMResponse] = field(default=None, repr=False)
+
+    @classmethod
+    def from_analysis(
+        cls,
+        context: Dict[str, Any],
+        analysis_data: Dict[str, Any],
+        llm_response: LLMResponse
+    ) -> 'AnalysisResult':
+        """
+        Create a result from parsed analysis data.
+
+        Args:
+            context: Analysis context (command, output, etc.)
+            analysis_data: Parsed analysis data
+            llm_response: Raw LLM response
+
+        Returns:
+            Analysis result
+        """
+        return cls(
+            command=context.get('command', ''),
+            return_code=context.get('return_code'),
+            status=str(analysis_data.get('status') or 'info'),
+            analysis=str(analysis_data.get('analysis') or ''),
+            issues=list(analysis_data.get('issues') or []),
+            troubleshooting_steps=list(analysis_data.get('troubleshooting_steps') or []),
+            suggested_fixes=list(analysis_data.get('suggested_fixes') or []),
+            additional_info=str(analysis_data.get('additional_info') or ''),
+            provider=llm_response.provider,
+            model=llm_response.model,
+            usage=dict(llm_response.usage or {}),
+            cached=llm_response.cached,
+            coalesced=llm_response.coalesced,
+            attempts=llm_response.attempts,
+            context=context,
+            llm_response=llm_response,
+        )
+
+    @property
+    def prompt_tokens(self) -> int:
+        """Tokens sent to the LLM (0 if not reported)."""
+        return int(self.usage.get('prompt_tokens') or 0)
+
+    @property
+    def completion_tokens(self) -> int:
+        """Tokens generated by the LLM (0 if not reported)."""
+        return int(self.usage.get('completion_tokens') or 0)
+
+    @property
+    def total_tokens(self) -> int:
+        """Prompt and completion tokens."""
+        return int(self.usage.get('total_tokens') or self.prompt_tokens + self.completion_tokens)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the analysis data in the LLM response format used by logs and renderers."""
+        return {
+            'analysis': self.analysis,
+            'status': self.status,
+            'issues': self.issues,
+            'troubleshooting_steps': self.troubleshooting_steps,
+            'suggested_fixes': self.suggested_fixes,
+            'additional_info': self.additional_info,
+        }
+
+
+class AnalysisSink(Protocol):
+    """Receives each result after the analysis, in the calling thread."""
+
+    def emit(self, result: AnalysisResult) -> None:
+        ...
+
+
+class ArtifactSink:
+    """
+    Writes the log file (or store record) and fix script of each result.
+
+    Sets result.artifacts. Safe to share between threads, since artifact
+    names never collide.
+    """
+
+    def __init__(self, output_generator: OutputGenerator):
+        """
+        Initialize artifact sink.
+
+        Args:
+            output_generator: Generator writing the artifacts
+        """
+        self.output_generator = output_generator
+
+    def emit(self, result: AnalysisResult) -> None:
+        # Results made by CmdRxCore always carry their LLM response
+        assert result.llm_response is not None
+        result.artifacts = self.output_generator.write_artifacts(
+            result.context, result.to_dict(), result.llm_response
+        )
+
+
+class ConsoleSink:
+    """
+    Displays each result on a console, one result at a time.
+    """
+
+    def __init__(self, console: Optional[Console] = None):
+        """
+        Initialize console sink.
+
+        Args:
+            console: Console to print to (defaults to stdout)
+        """
+        self.console = console or Console()
+        # Keeps the panels of concurrent results from interleaving
+        self._lock = threading.Lock()
+
+    def emit(self, result: AnalysisResult) -> None:
+        with self._lock:
+            render_analysis(self.console, result.to_dict())
@@ -0,0 +1,424 @@
+"""
+CmdRx Log Retention
+
+Keeps the log directory bounded: artifacts older than a few days are
+gzip-compressed, and the oldest ones are deleted once a maximum age, total
+size or file count is exceeded. Writers append each new artifact to a
+per-host journal, so garbage collection only reads what is new instead of
+rescanning the whole directory; it runs as `cmdrx gc` or in a detached
+background process, never on the analysis path.
+"""
+
+import fcntl
+import gzip
+import os
+import re
+import shutil
+import sqlite3
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .files import host_name
+
+STATE_DIR = ".cmdrx"
+
+# Files managed by retention; the latest store segment is still being written
+ARTIFACT_PATTERN = re.compile(r'^cmdrx_(?:analysis|fix|batch)_[\w.-]+$')
+SEGMENT_PATTERN = re.compile(r'^analyses-(\d{6})\.jsonl\.(?:gz|zst)$')
+
+# Artifacts that are compressed once older than the compression age
+COMPRESSIBLE_SUFFIXES = ('.log', '.json')
+
+# Journals are replaced once fully read and larger than this
+JOURNAL_ROTATE_BYTES = 1024 * 1024
+
+
+@dataclass
+class RetentionPolicy:
+    """Limits for the log directory (0 disables a limit)."""
+    max_age_days: float = 0
+    max_bytes: int = 0
+    max_files: int = 0
+    compress_after_days: float = 0
+
+    @property
+    def active(self) -> bool:
+        """Whether there is anything to enforce."""
+        return any((self.max_age_days, self.max_bytes, self.max_files, self.compress_after_days))
+
+
+@dataclass
+class CollectionResult:
+    """What one garbage collection run did."""
+    discovered: int = 0
+    compressed: int = 0
+    deleted: int = 0
+    freed_bytes: int = 0
+    files: int = 0
+    total_bytes: int = 0
+    skipped: bool = False
+
+
+class GarbageCollector:
+    """
+    Enforces a retention policy on a log directory.
+
+    Artifacts are tracked in a small SQLite database in the directory's
+    .cmdrx folder. The first run scans the directory once; later runs only
+    read the journal lines appended since. Each run does a bounded amount
+    of work, so a large backlog is worked off over several runs.
+    """
+
+    DB_FILE = "gc.db"
+    LOCK_FILE = "gc.lock"
+    STAMP_FILE = "gc.started"
+
+    def __init__(
+        self,
+        log_dir: Path,
+        policy: RetentionPolicy,
+        auto_interval: float = 0,
+        history: Optional[Any] = None
+    ):
+        """
+        Initialize garbage collector.
+
+        Args:
+            log_dir: Log directory
+            policy: Retention policy
+            auto_interval: Start a background collection after writing
+                artifacts at most this often, in seconds (0 = never)
+            history: Analysis history whose log paths follow compression
+        """
+        self.log_dir = log_dir
+        self.policy = policy
+        self.auto_interval = auto_interval
+        self.history = history
+        self.state_dir = log_dir / STATE_DIR
+        self.journal = self.state_dir / f"journal-{host_name()}.txt"
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], log_dir: Path) -> Optional['GarbageCollector']:
+        """
+        Create a garbage collector from configuration.
+
+        Args:
+            config: CmdRx configuration dictionary
+            log_dir: Log directory
+
+        Returns:
+            Garbage collector, or None if no retention limit is configured
+        """
+        policy = RetentionPolicy(
+            max_age_days=float(config.get('retention_max_age_days', 0)),
+            max_bytes=int(config.get('retention_max_bytes', 0)),
+            max_files=int(config.get('retention_max_files', 0)),
+            compress_after_days=float(config.get('retention_compress_after_days', 0))
+        )
+        if not policy.active:
+            return None
+        auto = config.get('retention_auto_gc', False)
+        return cls(log_dir, policy, auto_interval=float(config.get('retention_gc_interval', 3600)) if auto else 0)
+
+    def note(self, paths: Iterable[Optional[Path]]) -> None:
+        """
+        Journal newly written artifacts for the next collection.
+
+        Args:
+            paths: Artifacts in the log directory (None entries are ignored)
+        """
+        lines = []
+        for path in paths:
+            if path is None:
+                continue
+            try:
+                size = path.stat().st_size
+            except OSError:
+                continue
+            lines.append(f"{time.time():.3f}\t{size}\t{path.name}\n")
+        if not lines:
+            return
+        try:
+            self.state_dir.mkdir(exist_ok=True)
+            with open(self.journal, 'a', encoding='utf-8') as f:
+                f.write("".join(lines))
+        except OSError:
+            # A missed entry is picked up by the next rescan
+            pass
+
+    def schedule(self) -> bool:
+        """
+        Start a background collection if one is due.
+
+        Costs a single stat when none is due.
+
+        Returns:
+            True if a collection was started
+        """
+        if not self.auto_interval:
+            return False
+        stamp = self.state_dir / self.STAMP_FILE
+        try:
+            if time.time() - stamp.stat().st_mtime < self.auto_interval:
+                return False
+        except FileNotFoundError:
+            pass
+        try:
+            self.state_dir.mkdir(exist_ok=True)
+            stamp.touch()
+            subprocess.Popen(
+                [sys.executable, '-m', 'cmdrx.cli', '--log-dir', str(self.log_dir), 'gc', '--quiet'],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True
+            )
+        except OSError:
+            return False
+        return True
+
+    def collect(self, rescan: bool = False, limit: int = 10000, now: Optional[float] = None) -> CollectionResult:
+        """
+        Enforce the retention policy.
+
+        Args:
+            rescan: Scan the whole directory instead of reading the journals
+            limit: Maximum files to compress and to delete in this run
+            now: Current time, for tests
+
+        Returns:
+            What was done; skipped if another collection is running
+        """
+        now = time.time() if now is None else now
+        result = CollectionResult()
+
+        with self._lock() as locked:
+            if not locked:
+                result.skipped = True
+                return result
+
+            with self._connect() as conn:
+                if rescan or not conn.execute("SELECT 1 FROM meta WHERE key = 'scanned'").fetchone():
+                    result.discovered = self._scan(conn)
+                else:
+                    result.discovered = self._read_journals(conn)
+
+            result.deleted, result.freed_bytes = self._expire(now, limit)
+            if self.policy.compress_after_days:
+                result.compressed = self._compress(now - self.policy.compress_after_days * 86400, limit)
+
+            with self._connect() as conn:
+                result.files, result.total_bytes = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM artifacts"
+                ).fetchone()
+        return result
+
+    @contextmanager
+    def _lock(self) -> Iterator[bool]:
+        """Hold the collection lock if no other collection has it."""
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.state_dir / self.LOCK_FILE, 'a') as f:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open the collection state database as a single transaction."""
+        conn = sqlite3.connect(str(self.state_dir / self.DB_FILE), timeout=10)
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS artifacts ("
+                "name TEXT PRIMARY KEY, created REAL NOT NULL, size INTEGER NOT NULL, "
+                "compressed INTEGER NOT NULL DEFAULT 0)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_artifacts_created ON artifacts (created)")
+            conn.execute("CREATE TABLE IF NOT EXISTS journals (name TEXT PRIMARY KEY, offset INTEGER NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _scan(self, conn: sqlite3.Connection) -> int:
+        """Track every artifact in the directory; journals so far are covered by the scan."""
+        for journal in self.state_dir.glob("journal-*.txt"):
+            conn.execute(
+                "INSERT OR REPLACE INTO journals (name, offset) VALUES (?, ?)",
+                (journal.name, journal.stat().st_size)
+            )
+
+        rows: List[Tuple[str, float, int, int]] = []
+        segments: List[Tuple[int, str, float, int]] = []
+        with os.scandir(self.log_dir) as entries:
+            for entry in entries:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                match = SEGMENT_PATTERN.match(entry.name)
+                if not match and not ARTIFACT_PATTERN.match(entry.name):
+                    continue
+                info = entry.stat(follow_symlinks=False)
+                if match:
+                    segments.append((int(match.group(1)), entry.name, info.st_mtime, info.st_size))
+                else:
+                    rows.append((entry.name, info.st_mtime, info.st_size, int(entry.name.endswith('.gz'))))
+
+        # The newest segment is still being appended to
+        for _, name, mtime, size in sorted(segments)[:-1]:
+            rows.append((name, mtime, size, 1))
+
+        conn.execute("DELETE FROM artifacts")
+        conn.executemany("INSERT INTO artifacts (name, created, size, compressed) VALUES (?, ?, ?, ?)", rows)
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('scanned', ?)", (str(time.time()),))
+        return len(rows)
+
+    def _read_journals(self, conn: sqlite3.Connection) -> int:
+        """Track artifacts journaled since the previous run."""
+        offsets = dict(conn.execute("SELECT name, offset FROM journals"))
+        discovered = 0
+        for journal in sorted(self.state_dir.glob("journal-*.txt")):
+            offset = offsets.get(journal.name, 0)
+            offset, rows = self._read_journal(journal, offset)
+            discovered += len(rows)
+            conn.executemany(
+                "INSERT OR IGNORE INTO artifacts (name, created, size, compressed) VALUES (?, ?, ?, ?)", rows
+            )
+
+            if offset >= JOURNAL_ROTATE_BYTES:
+                # Start a new journal; lines appended during the swap are read from the old one
+                consumed = journal.with_suffix(".consumed")
+                os.replace(journal, consumed)
+                _, rows = self._read_journal(consumed, offset)
+                conn.executemany(
+                    "INSERT OR IGNORE INTO artifacts (name, created, size, compressed) VALUES (?, ?, ?, ?)", rows
+                )
+                discovered += len(rows)
+                consumed.unlink()
+                offset = 0
+            conn.execute("INSERT OR REPLACE INTO journals (name, offset) VALUES (?, ?)", (journal.name, offset))
+        return discovered
+
+    @staticmethod
+    def _read_journal(path: Path, offset: int) -> Tuple[int, List[Tuple[str, float, int, int]]]:
+        """Read complete journal lines after an offset."""
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+        end = data.rfind(b'\n') + 1
+        rows = []
+        for line in data[:end].decode('utf-8', errors='replace').splitlines():
+            try:
+                created, size, name = line.split('\t', 2)
+                rows.append((name, float(created), int(size), int(name.endswith(('.gz', '.zst')))))
+            except ValueError:
+                continue
+        return offset + end, rows
+
+    def _compress(self, before: float, limit: int) -> int:
+        """Gzip artifacts created before a time."""
+        with self._connect() as conn:
+            names = [name for (name,) in conn.execute(
+                "SELECT name FROM artifacts WHERE compressed = 0 AND created < ? ORDER BY created LIMIT ?",
+                (before, limit)
+            )]
+
+        updates: List[Tuple[str, Tuple[Any, ...]]] = []
+        renames = {}
+        for name in names:
+            if not name.endswith(COMPRESSIBLE_SUFFIXES):
+                # Fix scripts stay runnable
+                updates.append(("UPDATE artifacts SET compressed = 1 WHERE name = ?", (name,)))
+                continue
+            source = self.log_dir / name
+            try:
+                size = _gzip_file(source)
+            except OSError:
+                continue
+            if size is None:
+                updates.append(("DELETE FROM artifacts WHERE name = ?", (name,)))
+            else:
+                updates.append((
+                    "UPDATE artifacts SET name = ?, size = ?, compressed = 1 WHERE name = ?",
+                    (name + '.gz', size, name)
+                ))
+                renames[str(source.resolve())] = str(source.resolve()) + '.gz'
+
+        with self._connect() as conn:
+            for statement, params in updates:
+                conn.execute(statement, params)
+
+        if renames and self.history is not None:
+            self.history.rename_logs(renames)
+        return len(renames)
+
+    def _expire(self, now: float, limit: int) -> Tuple[int, int]:
+        """Delete the oldest artifacts beyond the age, count and size limits."""
+        policy = self.policy
+        with self._connect() as conn:
+            files, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM artifacts").fetchone()
+            rows = conn.execute("SELECT name, created, size FROM artifacts ORDER BY created").fetchmany(
+                max(limit, 0)
+            )
+
+        expired = []
+        for name, created, size in rows:
+            if (
+                (policy.max_age_days and created < now - policy.max_age_days * 86400)
+                or (policy.max_files and files > policy.max_files)
+                or (policy.max_bytes and total > policy.max_bytes)
+            ):
+                expired.append((name, size))
+                files -= 1
+                total -= size
+            else:
+                break
+
+        freed = 0
+        for name, size in expired:
+            try:
+                (self.log_dir / name).unlink()
+                freed += size
+            except FileNotFoundError:
+                pass
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM artifacts WHERE name = ?", [(name,) for name, _ in expired])
+        return len(expired), freed
+
+
+def _gzip_file(source: Path) -> Optional[int]:
+    """
+    Replace a file by a gzip-compressed copy with the same modification time.
+
+    Returns:
+        Size of the compressed file, or None if the source is gone
+
+    Raises:
+        OSError: If the file cannot be compressed
+    """
+    target = source.with_name(source.name + '.gz')
+    temp = source.with_name(f".{target.name}.{os.getpid()}.tmp")
+    try:
+        info = source.stat()
+        with open(source, 'rb') as src, gzip.open(temp, 'wb') as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.utime(temp, (info.st_atime, info.st_mtime))
+        os.replace(temp, target)
+        source.unlink()
+        return target.stat().st_size
+    except FileNotFoundError:
+        temp.unlink(missing_ok=True)
+        return None
+    except OSError:
+        temp.unlink(missing_ok=True)
+        raise
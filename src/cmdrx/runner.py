@@ -0,0 +1,361 @@
+"""
+CmdRx Analysis Runner
+
+Runs one analysis with a CmdRxCore and renders it to a console. Shared by
+in-process CLI runs and the cmdrxd daemon.
+"""
+
+import tempfile
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import datetime
+from typing import IO, Any, Callable, Iterable, Iterator, Optional, TextIO, Tuple, Union
+from rich.console import Console
+from rich.panel import Panel
+from rich.text import Text
+
+from .compaction import CompactedOutput
+from .core import CmdRxCore
+from .exceptions import CmdRxError, ConfigurationError, LLMError
+from .execution import execute
+from .follow import FollowWatcher, FollowWindow, follow
+from .monitor import OutputMonitor
+
+# Raw piped input kept for map-reduce analysis spills to disk beyond this size
+PIPE_SPOOL_SIZE = 8 * 1024 * 1024
+
+# Length of each earlier result in the rolling summary of a followed stream
+FOLLOW_SUMMARY_CHARS = 600
+
+
+def create_core(options: dict, out: Console, **core_args: Any) -> CmdRxCore:
+    """
+    Create a core for the analysis options from the command line.
+    
+    Args:
+        options: Analysis options from the command line
+        out: Console to render to
+        core_args: Extra CmdRxCore arguments, e.g. a warm provider
+        
+    Returns:
+        Core rendering to the console
+    """
+    return CmdRxCore(
+        verbose=options.get('verbose', False),
+        log_dir=options.get('log_dir'),
+        dry_run=options.get('dry_run', False),
+        use_cache=options.get('use_cache', True),
+        refresh_cache=options.get('refresh_cache', False),
+        stream=options.get('stream'),
+        token_budget=options.get('token_budget'),
+        console=out,
+        **core_args
+    )
+
+
+def prepare_core(options: dict, out: Console) -> Tuple[CmdRxCore, str]:
+    """
+    Create a core and warm it up while the analyzed command runs.
+    
+    Console output is held back so it does not interleave with the
+    command's own output.
+    
+    Args:
+        options: Analysis options from the command line
+        out: Console to render to
+        
+    Returns:
+        Warm core and the console output it held back
+    """
+    # Capturing is per thread, so the command's output is unaffected
+    out.begin_capture()
+    try:
+        core = create_core(options, out)
+        core.warm_up()
+    finally:
+        held_back = out.end_capture()
+    return core, held_back
+
+
+def run_analysis(
+    options: dict,
+    out: Console,
+    analyze: Callable[[CmdRxCore], bool],
+    prepared: Optional['Future[Tuple[CmdRxCore, str]]'] = None,
+    **core_args: Any
+) -> int:
+    """
+    Create a core, run one analysis with it and report the outcome.
+    
+    Shared by in-process runs and the cmdrxd daemon.
+    
+    Args:
+        options: Analysis options from the command line
+        out: Console to render to
+        analyze: Runs the analysis with the core, returning True on success
+        prepared: Result of prepare_core() run in the background, used
+            instead of creating a core
+        core_args: Extra CmdRxCore arguments, e.g. a warm provider
+        
+    Returns:
+        Process exit code
+    """
+    verbose = options.get('verbose', False)
+    try:
+        if prepared is not None:
+            core, held_back = prepared.result()
+            out.file.write(held_back)
+        else:
+            core = create_core(options, out, **core_args)
+        
+        if analyze(core):
+            out.print("\n[green]✓ Analysis complete. Check the output above and generated files.[/green]")
+        return 0
+    
+    except ConfigurationError as e:
+        out.print(f"[red]Configuration error: {e}[/red]")
+        out.print("[yellow]Run 'cmdrx --config' to set up configuration.[/yellow]")
+    except LLMError as e:
+        out.print(f"[red]LLM service error: {e}[/red]")
+    except CmdRxError as e:
+        out.print(f"[red]Error: {e}[/red]")
+    except KeyboardInterrupt:
+        out.print("\n[yellow]Operation cancelled by user.[/yellow]")
+    except Exception as e:
+        out.print(f"[red]Unexpected error: {e}[/red]")
+        if verbose:
+            out.print_exception()
+    return 1
+
+
+def analyze_command_output(
+    core: CmdRxCore,
+    cmd_str: str,
+    command_output: Union[str, Iterable[str]],
+    return_code: Optional[int],
+    echoed: bool = False
+) -> bool:
+    """
+    Show and analyze the output of an executed command.
+    
+    Args:
+        core: Core to analyze with
+        cmd_str: The command that was executed
+        command_output: Its combined output, as a string or text chunks
+        return_code: Its exit code
+        echoed: The output was already shown while the command ran
+        
+    Returns:
+        True if the output was analyzed
+    """
+    chunks = [command_output] if isinstance(command_output, str) else command_output
+    with _read_output(core, chunks) as (output, compacted, raw):
+        if not output.strip():
+            core.console.print("[yellow]Command produced no output to analyze.[/yellow]")
+            return False
+        
+        # Show the command output unless the user watched it as it ran
+        if not echoed:
+            core.console.print(Panel(
+                output,
+                title=f"Command Output: {cmd_str}",
+                border_style="blue"
+            ))
+        show_compaction(core, compacted)
+        
+        # Analyze with CmdRx
+        return core.analyze_output(cmd_str, output, return_code, compacted=compacted, raw=raw)
+
+
+def analyze_piped(core: CmdRxCore, chunks: Iterable[str]) -> bool:
+    """Show and analyze piped input, read as a sequence of text chunks."""
+    try:
+        with _read_output(core, chunks) as (piped_input, compacted, raw):
+            if not piped_input.strip():
+                core.console.print("[yellow]No input received from pipe.[/yellow]")
+                return False
+            
+            # Show the piped input
+            core.console.print(Panel(
+                piped_input,
+                title="Piped Input",
+                border_style="blue"
+            ))
+            show_compaction(core, compacted)
+            
+            # Analyze with CmdRx (no original command or return code available)
+            return core.analyze_output("<piped input>", piped_input, None, compacted=compacted, raw=raw)
+        
+    except Exception as e:
+        raise CmdRxError(f"Failed to read piped input: {e}")
+
+
+def analyze_followed(core: CmdRxCore, stream: TextIO, patterns: Iterable[str] = ()) -> bool:
+    """
+    Follow piped input until it ends, analyzing when local triggers fire.
+    
+    Args:
+        core: Core to analyze with
+        stream: Piped input
+        patterns: Extra regular expressions of lines that trigger an analysis
+        
+    Returns:
+        True if at least one analysis was run
+    """
+    watcher = FollowWatcher.from_config(core.config, patterns)
+    core.console.print(
+        f"[blue]Following piped input; analyzing on error spikes, new log messages"
+        f"{' and trigger patterns' if watcher.patterns else ''} "
+        f"(at most every {watcher.min_interval:g}s). Press Ctrl-C to stop.[/blue]"
+    )
+    
+    def analyze(window: FollowWindow) -> None:
+        core.console.rule(f"[bold]{datetime.now():%H:%M:%S} · {', '.join(window.reasons)}[/bold]")
+        try:
+            core.analyze_output("<followed input>", window.text, None, background=window.background)
+        except LLMError as e:
+            # Keep following; the next trigger gets another chance
+            core.console.print(f"[red]LLM service error: {e}[/red]")
+            watcher.analyzed(window, f"analysis failed: {e}")
+            return
+        
+        result = core.last_analysis or {}
+        summary = f"[{result.get('status', 'info')}] {result.get('analysis', '')}"
+        issues = result.get('issues') or []
+        if issues:
+            summary += f" Issues: {'; '.join(str(issue) for issue in issues)}"
+        watcher.analyzed(window, summary[:FOLLOW_SUMMARY_CHARS])
+    
+    try:
+        analyses = follow(stream, watcher, analyze)
+    except KeyboardInterrupt:
+        analyses = watcher.analyses
+    
+    core.console.print(
+        f"[blue]Stopped following after {watcher.total_lines:,} lines and {analyses} "
+        f"{'analysis' if analyses == 1 else 'analyses'}.[/blue]"
+    )
+    return analyses > 0
+
+
+def monitor_command(
+    core: CmdRxCore,
+    cmd_str: str,
+    interval: float,
+    timeout: Optional[float] = None
+) -> bool:
+    """
+    Re-run a command on an interval, analyzing runs whose output changed.
+    
+    Args:
+        core: Core to analyze with
+        cmd_str: Command to run
+        interval: Seconds from the start of one run to the start of the next
+        timeout: Seconds before a run is killed (default: command_timeout setting)
+        
+    Returns:
+        True if at least one run was analyzed
+    """
+    if timeout is None:
+        timeout = float(core.config.get('command_timeout', 30))
+    monitor = OutputMonitor()
+    runs = analyses = 0
+    
+    core.console.print(
+        f"[blue]Running '{cmd_str}' every {interval:g}s; analyzing when its output changes. "
+        f"Press Ctrl-C to stop.[/blue]"
+    )
+    
+    try:
+        while True:
+            started = time.monotonic()
+            result = execute(
+                cmd_str,
+                timeout=timeout,
+                tee=False,
+                max_bytes=int(core.config.get('capture_max_bytes', 0)),
+                memory_bytes=int(core.config.get('capture_memory_bytes', 0))
+            )
+            try:
+                output = result.text()
+            finally:
+                result.close()
+            runs += 1
+            
+            stamp = f"{datetime.now():%H:%M:%S} · run {runs}, exit code {result.return_code}"
+            diff = monitor.check(output, result.return_code)
+            if diff is None:
+                core.console.print(f"[dim]{stamp}: unchanged since the last analysis[/dim]")
+            elif not output.strip():
+                core.console.print(f"[yellow]{stamp}: no output to analyze[/yellow]")
+                monitor.analyzed(output, result.return_code)
+            else:
+                core.console.rule(f"[bold]{stamp}: {'output changed' if diff else 'first run'}[/bold]")
+                background = None
+                if diff:
+                    core.console.print(Panel(Text(diff), title="Changes since the last analysis", border_style="blue"))
+                    background = "\n".join([
+                        f"This command is re-run every {interval:g}s and analyzed when its output changes.",
+                        "Changes since the previous analyzed run (timestamps, PIDs and IDs masked):",
+                        "```diff",
+                        diff,
+                        "```",
+                        "Focus on what the changes mean.",
+                    ])
+                try:
+                    core.analyze_output(cmd_str, output, result.return_code, background=background)
+                except LLMError as e:
+                    # Not remembered, so the next run is compared with the last analyzed one
+                    core.console.print(f"[red]LLM service error: {e}[/red]")
+                else:
+                    monitor.analyzed(output, result.return_code)
+                    analyses += 1
+            
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        pass
+    
+    core.console.print(
+        f"[blue]Stopped after {runs} {'run' if runs == 1 else 'runs'} and {analyses} "
+        f"{'analysis' if analyses == 1 else 'analyses'}.[/blue]"
+    )
+    return analyses > 0
+
+
+@contextmanager
+def _read_output(
+    core: CmdRxCore,
+    chunks: Iterable[str]
+) -> Iterator[Tuple[str, Optional[CompactedOutput], Optional[IO[str]]]]:
+    """
+    Read output chunks, compacting while reading so memory stays bounded.
+    
+    Yields:
+        Output to show and analyze, the compaction result and, when map-reduce
+        analysis is enabled, the full output for analyzing it in chunks
+    """
+    raw = None
+    try:
+        compactor = core.create_compactor()
+        if compactor:
+            if core.config.get('mapreduce_enabled', False):
+                # Keep the full output for map-reduce analysis if it does not fit
+                raw = tempfile.SpooledTemporaryFile(max_size=PIPE_SPOOL_SIZE, mode='w+')
+            for chunk in chunks:
+                compactor.feed(chunk)
+                if raw:
+                    raw.write(chunk)
+            compacted = compactor.finish()
+            yield compacted.text, compacted, raw
+        else:
+            yield "".join(chunks), None, None
+    finally:
+        if raw:
+            raw.close()
+
+
+def show_compaction(core: CmdRxCore, compacted: Optional[CompactedOutput]) -> None:
+    """Report how much of the output was dropped to fit the token budget."""
+    if compacted and compacted.reduced:
+        core.console.print(f"[dim]Output compacted: {compacted.summary()}[/dim]")
@@ -0,0 +1,453 @@
+"""
+CmdRx Server
+
+HTTP API (cmdrx serve) that lets scripts on other hosts submit command
+output for analysis, so only the server holds LLM credentials. Requests
+wait in a bounded queue for a fixed pool of analysis workers; when the
+queue is full the server answers 503 with Retry-After instead of piling
+up work.
+"""
+
+import hmac
+import json
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .exceptions import LLMError
+from .result import AnalysisResult, AnalysisSink
+
+ANALYZE_PATH = '/v1/analyze'
+HEALTH_PATH = '/healthz'
+METRICS_PATH = '/metrics'
+
+# Analysis outcomes counted in cmdrx_requests_total
+OUTCOMES = ('ok', 'rejected', 'invalid', 'unauthorized', 'failed')
+
+
+class ServerMetrics:
+    """Counters exported on the metrics endpoint."""
+
+    def __init__(self) -> None:
+        self.started = time.time()
+        self.requests = {outcome: 0 for outcome in OUTCOMES}
+        self.queue_seconds = 0.0
+        self.analysis_seconds = 0.0
+        self.llm_seconds = 0.0
+        self.analyses = 0
+        self.cached = 0
+        self.coalesced = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+    def count(self, outcome: str) -> None:
+        """Count a finished request."""
+        with self._lock:
+            self.requests[outcome] += 1
+
+    def observe(self, result: AnalysisResult, queued: float) -> None:
+        """Record a completed analysis."""
+        with self._lock:
+            self.analyses += 1
+            self.queue_seconds += queued
+            self.analysis_seconds += result.timings.get('total', 0.0)
+            self.llm_seconds += result.timings.get('llm', 0.0)
+            self.cached += int(result.cached)
+            self.coalesced += int(result.coalesced)
+            if not (result.cached or result.coalesced):
+                # Only tokens actually sent to the provider
+                self.prompt_tokens += result.prompt_tokens
+                self.completion_tokens += result.completion_tokens
+
+    def mean_analysis_seconds(self) -> Optional[float]:
+        """Average time of an analysis, or None before the first one."""
+        with self._lock:
+            return self.analysis_seconds / self.analyses if self.analyses else None
+
+    def render(self, gauges: Dict[str, float]) -> str:
+        """
+        Render the metrics in the Prometheus text format.
+
+        Args:
+            gauges: Current values such as the queue depth, by metric name
+
+        Returns:
+            Metrics text
+        """
+        with self._lock:
+            lines = ["# TYPE cmdrx_requests_total counter"]
+            lines += [
+                f'cmdrx_requests_total{{outcome="{outcome}"}} {count}'
+                for outcome, count in self.requests.items()
+            ]
+            counters = {
+                'cmdrx_analyses_total': self.analyses,
+                'cmdrx_cache_hits_total': self.cached,
+                'cmdrx_coalesced_total': self.coalesced,
+                'cmdrx_queue_seconds_total': round(self.queue_seconds, 6),
+                'cmdrx_analysis_seconds_total': round(self.analysis_seconds, 6),
+                'cmdrx_llm_seconds_total': round(self.llm_seconds, 6),
+            }
+            tokens = {'prompt': self.prompt_tokens, 'completion': self.completion_tokens}
+
+        for name, value in counters.items():
+            lines += [f"# TYPE {name} counter", f"{name} {value}"]
+        lines.append("# TYPE cmdrx_tokens_total counter")
+        lines += [f'cmdrx_tokens_total{{kind="{kind}"}} {value}' for kind, value in tokens.items()]
+
+        gauges = {'cmdrx_uptime_seconds': round(time.time() - self.started, 3), **gauges}
+        for name, value in gauges.items():
+            lines += [f"# TYPE {name} gauge", f"{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+@dataclass
+class _Job:
+    """An analysis request waiting for a worker."""
+    command: str
+    output: str
+    return_code: Optional[int]
+    background: Optional[str] = None
+    enqueued: float = field(default_factory=time.perf_counter)
+    future: Future = field(default_factory=Future)
+
+
+class AnalysisServer(ThreadingHTTPServer):
+    """
+    HTTP server running analyses on a shared CmdRxCore.
+
+    Connections are handled by their own threads, which only parse the
+    request and queue it; the LLM work is done by a fixed pool of workers
+    so that the number of concurrent provider requests stays bounded.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        core: Any,
+        address: Tuple[str, int] = ('127.0.0.1', 8765),
+        workers: int = 4,
+        queue_size: int = 64,
+        sinks: Sequence[AnalysisSink] = (),
+        token: str = '',
+        max_body_bytes: int = 10 * 1024 * 1024,
+        request_timeout: float = 30.0
+    ):
+        """
+        Initialize analysis server.
+
+        Args:
+            core: CmdRxCore shared by all workers
+            address: Host and port to listen on (port 0 picks a free port)
+            workers: Concurrent analyses
+            queue_size: Requests that may wait for a worker before new ones
+                are rejected with 503
+            sinks: Applied to every result, e.g. an ArtifactSink
+            token: Bearer token required on analysis and metrics requests
+                (empty = no authentication)
+            max_body_bytes: Largest accepted request body
+            request_timeout: Seconds a connection may stall while a request
+                is read before it is dropped
+        """
+        self.core = core
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.sinks = list(sinks)
+        self.token = token
+        self.max_body_bytes = max_body_bytes
+        self.request_timeout = request_timeout
+        self.metrics = ServerMetrics()
+        self.busy = 0
+
+        # Admitted requests, running or waiting; bounded by workers + queue_size
+        self._pending = 0
+        self._jobs: 'queue.Queue[Optional[_Job]]' = queue.Queue()
+        self._count_lock = threading.Lock()
+        self._closing = threading.Event()
+
+        super().__init__(address, AnalysisHandler)
+
+        self._worker_threads: List[threading.Thread] = [
+            threading.Thread(target=self._work, name=f"cmdrx-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._worker_threads:
+            thread.start()
+
+    @property
+    def url(self) -> str:
+        """Base URL the server is listening on."""
+        host, port = self.server_address[:2]
+        return f"http://{str(host)}:{port}"
+
+    def submit(self, job: _Job) -> bool:
+        """
+        Queue an analysis.
+
+        Args:
+            job: The analysis request
+
+        Returns:
+            False if the queue is full or the server is shutting down
+        """
+        with self._count_lock:
+            if self._closing.is_set() or self._pending >= self.workers + self.queue_size:
+                return False
+            self._pending += 1
+        self._jobs.put(job)
+        return True
+
+    @property
+    def queued(self) -> int:
+        """Requests waiting for a worker."""
+        with self._count_lock:
+            return self._pending - self.busy
+
+    def retry_after(self) -> int:
+        """Estimate in seconds when a rejected request could be accepted."""
+        mean = self.metrics.mean_analysis_seconds() or 1.0
+        # Time for the workers to work through the current queue
+        return max(1, min(300, math.ceil(mean * (self.queued + 1) / self.workers)))
+
+    def health(self) -> Dict[str, Any]:
+        """Describe the server's state."""
+        queued = self.queued
+        if self._closing.is_set():
+            status = 'stopping'
+        elif queued >= self.queue_size:
+            status = 'saturated'
+        else:
+            status = 'ok'
+        return {
+            'status': status,
+            'workers': self.workers,
+            'busy': self.busy,
+            'queued': queued,
+            'queue_size': self.queue_size,
+            'uptime': time.time() - self.metrics.started,
+        }
+
+    def render_metrics(self) -> str:
+        """Render the metrics endpoint."""
+        return self.metrics.render({
+            'cmdrx_queue_depth': self.queued,
+            'cmdrx_queue_capacity': self.queue_size,
+            'cmdrx_workers': self.workers,
+            'cmdrx_workers_busy': self.busy,
+        })
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop accepting requests and let the workers finish the queued ones.
+
+        Call after serve_forever() has returned (see shutdown()).
+
+        Args:
+            timeout: Seconds to wait for each worker
+        """
+        with self._count_lock:
+            self._closing.set()
+        for _ in self._worker_threads:
+            # Queued after the admitted jobs, which still run
+            self._jobs.put(None)
+        for thread in self._worker_threads:
+            thread.join(timeout)
+        self.server_close()
+
+    def _work(self) -> None:
+        """Run queued analyses until a stop marker is received."""
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            with self._count_lock:
+                self.busy += 1
+            try:
+                queued = time.perf_counter() - job.enqueued
+                result = self.core.analyze(
+                    job.command, job.output, job.return_code,
+                    sinks=self.sinks, background=job.background
+                )
+                result.timings['queue'] = queued
+                self.metrics.observe(result, queued)
+                job.future.set_result(result)
+            except BaseException as e:
+                job.future.set_exception(e)
+            finally:
+                with self._count_lock:
+                    self.busy -= 1
+                    self._pending -= 1
+
+
+class AnalysisHandler(BaseHTTPRequestHandler):
+    """Handles one HTTP request."""
+
+    server: AnalysisServer
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self) -> None:
+        super().setup()
+        # Stalled clients must not pin a handler thread
+        self.connection.settimeout(self.server.request_timeout)
+
+    def do_GET(self) -> None:
+        if self.path == HEALTH_PATH:
+            health = self.server.health()
+            self._send_json(503 if health['status'] == 'stopping' else 200, health)
+        elif self.path == METRICS_PATH:
+            if self._authorized():
+                self._send(200, self.server.render_metrics().encode('utf-8'), 'text/plain; version=0.0.4')
+        else:
+            self._send_error(404, f"Not found: {self.path}")
+
+    def do_POST(self) -> None:
+        if self.path != ANALYZE_PATH:
+            self._send_error(404, f"Not found: {self.path}")
+            return
+        if not self._authorized():
+            self.server.metrics.count('unauthorized')
+            return
+
+        job = self._read_job()
+        if job is None:
+            self.server.metrics.count('invalid')
+            return
+
+        if not self.server.submit(job):
+            self.server.metrics.count('rejected')
+            retry_after = self.server.retry_after()
+            self._send_error(503, "Server is saturated, retry later", {'Retry-After': str(retry_after)})
+            return
+
+        try:
+            result = job.future.result()
+        except LLMError as e:
+            self.server.metrics.count('failed')
+            self._send_error(502, str(e))
+            return
+        except Exception as e:
+            self.server.metrics.count('failed')
+            self._send_error(500, f"Analysis failed: {e}")
+            return
+
+        self.server.metrics.count('ok')
+        self._send_json(200, result_payload(result))
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Request lines are not logged; the metrics endpoint counts them
+        pass
+
+    def _authorized(self) -> bool:
+        """Check the bearer token, answering 401 if it is wrong."""
+        if not self.server.token:
+            return True
+        header = self.headers.get('Authorization', '')
+        if hmac.compare_digest(header.encode('utf-8'), f"Bearer {self.server.token}".encode('utf-8')):
+            return True
+        self._send_error(401, "Missing or invalid bearer token", {'WWW-Authenticate': 'Bearer'})
+        return False
+
+    def _read_job(self) -> Optional[_Job]:
+        """Parse an analysis request, answering 4xx if it is not valid."""
+        try:
+            length = int(self.headers.get('Content-Length', ''))
+        except ValueError:
+            self._send_error(411, "Content-Length required")
+            return None
+        if length < 0:
+            self._send_error(400, "Invalid Content-Length")
+            return None
+        if length > self.server.max_body_bytes:
+            self._send_error(413, f"Request body exceeds {self.server.max_body_bytes} bytes")
+            return None
+
+        try:
+            data = self.rfile.read(length)
+        except OSError:
+            self._send_error(408, f"Request body not received within {self.server.request_timeout:g}s")
+            return None
+        try:
+            body = json.loads(data)
+        except ValueError as e:
+            self._send_error(400, f"Invalid JSON: {e}")
+            return None
+
+        if not isinstance(body, dict):
+            self._send_error(400, "Request body must be a JSON object")
+            return None
+        command, output = body.get('command'), body.get('output')
+        return_code, background = body.get('return_code'), body.get('background')
+        if not isinstance(command, str) or not command:
+            self._send_error(400, "'command' must be a non-empty string")
+            return None
+        if not isinstance(output, str):
+            self._send_error(400, "'output' must be a string")
+            return None
+        if return_code is not None and (not isinstance(return_code, int) or isinstance(return_code, bool)):
+            self._send_error(400, "'return_code' must be an integer")
+            return None
+        if background is not None and not isinstance(background, str):
+            self._send_error(400, "'background' must be a string")
+            return None
+
+        return _Job(command, output, return_code, background)
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self._send(status, body, 'application/json', headers)
+
+    def _send_error(self, status: int, message: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self._send_json(status, {'error': message}, headers)
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status >= 400:
+            # The request body may not have been read
+            self.send_header('Connection', 'close')
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def result_payload(result: AnalysisResult) -> Dict[str, Any]:
+    """
+    Convert an analysis result to the JSON returned by the analysis endpoint.
+
+    Args:
+        result: Analysis result
+
+    Returns:
+        JSON-serializable response body
+    """
+    artifacts = None
+    if result.artifacts is not None:
+        artifacts = {
+            'log_file': str(result.artifacts.log_file) if result.artifacts.log_file else None,
+            'fix_script': str(result.artifacts.fix_script) if result.artifacts.fix_script else None,
+            'record_id': result.artifacts.record_id,
+        }
+
+    return {
+        'command': result.command,
+        'return_code': result.return_code,
+        **result.to_dict(),
+        'provider': result.provider,
+        'model': result.model,
+        'usage': result.usage,
+        'cached': result.cached,
+        'coalesced': result.coalesced,
+        'attempts': result.attempts,
+        'timings': result.timings,
+        'artifacts': artifacts,
+    }
@@ -0,0 +1,122 @@
+"""
+CmdRx Settings
+
+Default settings and loading of the configuration file, kept free of heavy
+imports so the CLI can read settings without loading the configuration UI.
+"""
+
+import copy
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+CONFIG_FILE = "config.json"
+
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    'llm_provider': 'openai',
+    'llm_model': 'gpt-4',
+    'llm_base_url': '',
+    'llm_auth_type': 'api_key',
+    'llm_timeout': 30,
+    'llm_chain': [],
+    'llm_chain_mode': 'failover',
+    'llm_hedge_delay': 10,
+    'log_directory': '~/cmdrx_logs',
+    'log_format': 'text',
+    'store_segment_bytes': 64 * 1024 * 1024,
+    'store_compression': 'gzip',
+    'artifact_fsync': 'off',
+    'retention_max_age_days': 0,
+    'retention_max_bytes': 0,
+    'retention_max_files': 0,
+    'retention_compress_after_days': 0,
+    'retention_auto_gc': True,
+    'retention_gc_interval': 3600,
+    'verbose': False,
+    'auto_fix_scripts': True,
+    'command_timeout': 30,
+    'capture_max_bytes': 64 * 1024 * 1024,
+    'capture_memory_bytes': 8 * 1024 * 1024,
+    'output_token_budget': 8000,
+    'log_template_min_lines': 1000,
+    'mapreduce_enabled': False,
+    'mapreduce_chunk_tokens': 6000,
+    'mapreduce_concurrency': 4,
+    'mapreduce_max_chunks': 32,
+    'mapreduce_reduce_model': '',
+    'daemon_idle_timeout': 0,
+    'serve_host': '127.0.0.1',
+    'serve_port': 8765,
+    'serve_workers': 4,
+    'serve_queue_size': 64,
+    'serve_artifacts': True,
+    'serve_token': '',
+    'serve_max_body_bytes': 10 * 1024 * 1024,
+    'serve_request_timeout': 30,
+    'follow_triggers': [],
+    'follow_window_lines': 1000,
+    'follow_debounce': 5,
+    'follow_max_delay': 30,
+    'follow_min_interval': 60,
+    'follow_spike_min_errors': 5,
+    'follow_spike_factor': 3,
+    'follow_learn_lines': 500,
+    'credential_sources': ['keyring', 'environment', 'file'],
+    'credential_cache_ttl': 300,
+    'stream_output': True,
+    'batch_exec_workers': 8,
+    'batch_llm_workers': 4,
+    'http_pool_size': 20,
+    'http_keepalive_connections': 10,
+    'http_keepalive_expiry': 60,
+    'http2': False,
+    'retry_max_attempts': 4,
+    'retry_base_delay': 0.5,
+    'retry_max_delay': 20,
+    'retry_deadline': 90,
+    'circuit_failure_threshold': 5,
+    'circuit_reset_timeout': 30,
+    'rate_limits': {},
+    'rate_limit_max_wait': 60,
+    'cache_enabled': True,
+    'coalesce_requests': True,
+    'cache_directory': '~/.cache/cmdrx',
+    'cache_ttl': 86400,
+    'cache_max_entries': 1000,
+    'cache_max_bytes': 50 * 1024 * 1024,
+    'history_enabled': True,
+    'history_directory': '~/.local/share/cmdrx'
+}
+
+
+def config_directory() -> Path:
+    """Get the per-user configuration directory."""
+    return Path.home() / '.config' / 'cmdrx'
+
+
+def default_settings() -> Dict[str, Any]:
+    """Get a copy of the default settings."""
+    return copy.deepcopy(DEFAULT_SETTINGS)
+
+
+def load_settings(config_file: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Load settings from the configuration file, merged over the defaults.
+    
+    Args:
+        config_file: Configuration file (defaults to ~/.config/cmdrx/config.json)
+        
+    Returns:
+        Settings; the defaults if the file does not exist
+        
+    Raises:
+        OSError, ValueError: If the file exists but cannot be read or parsed
+    """
+    config_file = config_file or config_directory() / CONFIG_FILE
+    settings = default_settings()
+    
+    if config_file.exists():
+        with open(config_file, 'r') as f:
+            settings.update(json.load(f))
+    
+    return settings
@@ -0,0 +1,236 @@
+"""
+CmdRx Analysis Store
+
+Append-only storage for analyses as an alternative to one text log file per
+run. Records are JSON objects appended to size-rotated, compressed segment
+files; a fixed-width offset index gives random access by record ID. Each
+record is compressed on its own, so segments stay valid gzip (or zstd)
+streams that tools like zcat can read as JSON lines.
+"""
+
+import fcntl
+import gzip
+import importlib.util
+import json
+import os
+import struct
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from .files import sync_directory, sync_file
+
+INDEX_FILE = "analyses.idx"
+
+# Index entries: segment number, offset and length of the compressed record
+INDEX_ENTRY = struct.Struct('<IQI')
+
+SEGMENT_SUFFIXES = {'gzip': '.jsonl.gz', 'zstd': '.jsonl.zst'}
+
+
+class AnalysisStore:
+    """
+    Segmented, compressed append-only store of analysis records.
+
+    Record IDs are assigned in order starting at 1; the Nth index entry
+    locates record N. Appends from concurrent processes are serialized with
+    a lock on the index file.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        segment_bytes: int = 64 * 1024 * 1024,
+        compression: str = 'gzip',
+        fsync: str = 'off'
+    ):
+        """
+        Initialize analysis store.
+
+        Args:
+            directory: Directory for segment and index files
+            segment_bytes: Compressed size at which a new segment is started
+            compression: 'gzip', or 'zstd' when the zstandard package is
+                installed (gzip is used otherwise)
+            fsync: Flush appends to disk: 'off', 'file' or 'full' (also the
+                directory entry of new segments)
+        """
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.compression = compression if compression == 'zstd' and _zstd_available() else 'gzip'
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.directory / INDEX_FILE
+
+        # Called with each segment that is complete because a new one was started
+        self.on_segment_closed: Optional[Callable[[Iterable[Path]], None]] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], directory: Path) -> Optional['AnalysisStore']:
+        """
+        Create a store from configuration.
+
+        Args:
+            config: CmdRx configuration dictionary
+            directory: Log directory
+
+        Returns:
+            Analysis store, or None unless log_format is 'store'
+        """
+        if config.get('log_format', 'text') != 'store':
+            return None
+        return cls(
+            directory,
+            segment_bytes=int(config.get('store_segment_bytes', 64 * 1024 * 1024)),
+            compression=str(config.get('store_compression', 'gzip')),
+            fsync=str(config.get('artifact_fsync', 'off'))
+        )
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """
+        Append a record.
+
+        Args:
+            record: JSON-serializable record
+
+        Returns:
+            ID of the new record
+        """
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+        blob = _compress(line, self.compression)
+
+        with self._locked_index() as index:
+            count = self._count(index)
+            segment, end = 1, 0
+            if count:
+                segment, offset, length = self._read_entry(index, count)
+                end = offset + length
+                current = self._segment_path(segment)
+                if (
+                    current is None
+                    or self._compression_of(current) != self.compression
+                    or end + len(blob) > self.segment_bytes
+                ):
+                    segment, end = segment + 1, 0
+                    if current is not None and self.on_segment_closed is not None:
+                        self.on_segment_closed([current])
+
+            with open(self._segment_name(segment), 'ab+') as f:
+                # Drop anything an interrupted append left behind the last record
+                f.truncate(end)
+                f.seek(end)
+                f.write(blob)
+                if self.fsync != 'off':
+                    sync_file(f)
+            if self.fsync == 'full' and end == 0:
+                sync_directory(self.directory)
+
+            # The record only exists once its index entry is written
+            index.truncate(count * INDEX_ENTRY.size)
+            index.seek(count * INDEX_ENTRY.size)
+            index.write(INDEX_ENTRY.pack(segment, end, len(blob)))
+            if self.fsync != 'off':
+                sync_file(index)
+            return count + 1
+
+    def get(self, record_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Read a record.
+
+        Args:
+            record_id: Record ID
+
+        Returns:
+            The record, or None if it does not exist (or its segment is gone)
+        """
+        location = self.locate(record_id)
+        if location is None:
+            return None
+        path, offset, length = location
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            blob = f.read(length)
+        record: Dict[str, Any] = json.loads(_decompress(blob, self._compression_of(path)))
+        return record
+
+    def count(self) -> int:
+        """Get the number of records appended so far."""
+        try:
+            return self.index_path.stat().st_size // INDEX_ENTRY.size
+        except FileNotFoundError:
+            return 0
+
+    def locate(self, record_id: int) -> Optional[Tuple[Path, int, int]]:
+        """
+        Find where a record is stored.
+
+        Args:
+            record_id: Record ID
+
+        Returns:
+            Segment path, offset and compressed length, or None
+        """
+        try:
+            with open(self.index_path, 'rb') as index:
+                if record_id < 1 or record_id > self._count(index):
+                    return None
+                segment, offset, length = self._read_entry(index, record_id)
+        except FileNotFoundError:
+            return None
+        path = self._segment_path(segment)
+        return (path, offset, length) if path else None
+
+    @contextmanager
+    def _locked_index(self) -> Iterator[BinaryIO]:
+        """Open the index file with an exclusive lock."""
+        with open(self.index_path, 'ab+') as index:
+            fcntl.flock(index.fileno(), fcntl.LOCK_EX)
+            try:
+                yield index
+            finally:
+                fcntl.flock(index.fileno(), fcntl.LOCK_UN)
+
+    @staticmethod
+    def _count(index: BinaryIO) -> int:
+        return os.fstat(index.fileno()).st_size // INDEX_ENTRY.size
+
+    @staticmethod
+    def _read_entry(index: BinaryIO, record_id: int) -> Tuple[int, int, int]:
+        index.seek((record_id - 1) * INDEX_ENTRY.size)
+        return INDEX_ENTRY.unpack(index.read(INDEX_ENTRY.size))
+
+    def _segment_name(self, segment: int) -> Path:
+        """Path of a new segment file with the configured compression."""
+        return self.directory / f"analyses-{segment:06d}{SEGMENT_SUFFIXES[self.compression]}"
+
+    def _segment_path(self, segment: int) -> Optional[Path]:
+        """Find a segment file, whichever compression it was written with."""
+        for suffix in SEGMENT_SUFFIXES.values():
+            path = self.directory / f"analyses-{segment:06d}{suffix}"
+            if path.exists():
+                return path
+        return None
+
+    @staticmethod
+    def _compression_of(path: Path) -> str:
+        return 'zstd' if path.name.endswith(SEGMENT_SUFFIXES['zstd']) else 'gzip'
+
+
+def _zstd_available() -> bool:
+    return importlib.util.find_spec('zstandard') is not None
+
+
+def _compress(data: bytes, compression: str) -> bytes:
+    if compression == 'zstd':
+        import zstandard  # type: ignore[import-not-found]
+        compressed: bytes = zstandard.ZstdCompressor().compress(data)
+        return compressed
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def _decompress(data: bytes, compression: str) -> bytes:
+    if compression == 'zstd':
+        import zstandard  # type: ignore[import-not-found]
+        decompressed: bytes = zstandard.ZstdDecompressor().decompress(data)
+        return decompressed
+    return gzip.decompress(data)
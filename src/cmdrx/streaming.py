@@ -0,0 +1,134 @@
+"""
+CmdRx Streaming Support
+
+Incremental JSON parsing for analyses streamed token by token from an LLM.
+"""
+
+import json
+from typing import Dict, Any, List, Optional, Tuple
+
+
+class IncrementalJSONParser:
+    """
+    Incrementally parses a streamed JSON object.
+
+    Text is fed in arbitrary chunks; every time a top-level field of the
+    object is complete, it is decoded and reported. Any text before the
+    opening brace (such as a markdown fence) is ignored.
+    """
+
+    # Parser states
+    _SEEK_OBJECT = 0
+    _SEEK_KEY = 1
+    _IN_KEY = 2
+    _SEEK_COLON = 3
+    _IN_VALUE = 4
+    _DONE = 5
+
+    def __init__(self) -> None:
+        """Initialize parser state."""
+        self.fields: Dict[str, Any] = {}
+        self._state = self._SEEK_OBJECT
+        self._key: List[str] = []
+        self._value: List[str] = []
+        self._current_key = ""
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def complete(self) -> bool:
+        """True once the closing brace of the top-level object has been seen."""
+        return self._state == self._DONE
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """
+        Feed the next chunk of streamed text.
+
+        Args:
+            text: Newly received text
+
+        Returns:
+            List of (key, value) pairs completed by this chunk
+        """
+        completed = []
+
+        for char in text:
+            state = self._state
+
+            if state == self._SEEK_OBJECT:
+                if char == '{':
+                    self._state = self._SEEK_KEY
+
+            elif state == self._SEEK_KEY:
+                if char == '"':
+                    self._key = []
+                    self._state = self._IN_KEY
+                elif char == '}':
+                    self._state = self._DONE
+
+            elif state == self._IN_KEY:
+                if self._escape:
+                    self._key.append(char)
+                    self._escape = False
+                elif char == '\\':
+                    self._key.append(char)
+                    self._escape = True
+                elif char == '"':
+                    self._current_key = json.loads('"' + "".join(self._key) + '"')
+                    self._state = self._SEEK_COLON
+                else:
+                    self._key.append(char)
+
+            elif state == self._SEEK_COLON:
+                if char == ':':
+                    self._value = []
+                    self._depth = 0
+                    self._state = self._IN_VALUE
+
+            elif state == self._IN_VALUE:
+                field = self._consume_value_char(char)
+                if field is not None:
+                    completed.append(field)
+
+        return completed
+
+    def _consume_value_char(self, char: str) -> Optional[Tuple[str, Any]]:
+        """Consume one character of a field value, returning the field once complete."""
+        if self._in_string:
+            self._value.append(char)
+            if self._escape:
+                self._escape = False
+            elif char == '\\':
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+            return None
+
+        if self._depth == 0 and char in ',}':
+            field = self._finish_value()
+            self._state = self._DONE if char == '}' else self._SEEK_KEY
+            return field
+
+        if char == '"':
+            self._in_string = True
+        elif char in '[{':
+            self._depth += 1
+        elif char in ']}':
+            self._depth -= 1
+
+        self._value.append(char)
+        return None
+
+    def _finish_value(self) -> Optional[Tuple[str, Any]]:
+        """Decode the buffered value of the current field."""
+        raw = "".join(self._value).strip()
+        self._value = []
+
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            return None
+
+        self.fields[self._current_key] = value
+        return self._current_key, value
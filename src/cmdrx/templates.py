@@ -0,0 +1,271 @@
+"""
+CmdRx Log Template Mining
+
+Drain-style parse-tree clustering of log lines into templates with counts,
+timestamps and sample values.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+
+from .compaction import CHARS_PER_TOKEN, is_error_line
+
+WILDCARD = "<*>"
+
+# Leading timestamps: ISO 8601, syslog ("Oct 18 02:01:00") and bracketed forms
+TIMESTAMP_PATTERN = re.compile(
+    r'^\[?(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?'
+    r'|[A-Z][a-z]{2} [ \d]\d \d{2}:\d{2}:\d{2}(?:\.\d+)?)\]?\s+'
+)
+
+# Digit runs (numbers, and therefore IDs, addresses and durations) are variables
+NUMBER_PATTERN = re.compile(r'\d+')
+
+
+@dataclass
+class LogTemplate:
+    """A cluster of log lines sharing one message shape."""
+    tokens: List[str]
+    count: int = 0
+    first_seen: Optional[str] = None
+    last_seen: Optional[str] = None
+    samples: Dict[int, List[str]] = field(default_factory=dict)
+    sampling: bool = True
+
+    @property
+    def text(self) -> str:
+        """Template with variable parts shown as <*>."""
+        return " ".join(self.tokens)
+
+
+class TemplateMiner:
+    """
+    Mines log templates from a stream of lines.
+
+    Lines are routed through a fixed-depth parse tree keyed by token count and
+    leading tokens, then matched against the templates in the leaf by token
+    similarity (the Drain algorithm). Digit runs are treated as variables up
+    front. Memory is bounded by the template limit.
+    """
+
+    def __init__(
+        self,
+        depth: int = 4,
+        similarity: float = 0.5,
+        max_children: int = 100,
+        max_templates: int = 5000,
+        max_samples: int = 3,
+        min_lines: int = 1000
+    ):
+        """
+        Initialize template miner.
+
+        Args:
+            depth: Parse tree depth; depth - 2 leading tokens are used for routing
+            similarity: Minimum share of matching tokens to join a template
+            max_children: Maximum distinct tokens per tree node
+            max_templates: Maximum number of templates kept
+            max_samples: Distinct sample values kept per variable
+            min_lines: Minimum number of lines before a summary is worthwhile
+        """
+        self.prefix_tokens = max(1, depth - 2)
+        self.similarity = similarity
+        self.max_children = max_children
+        self.max_templates = max_templates
+        self.max_samples = max_samples
+        self.min_lines = min_lines
+
+        self.templates: List[LogTemplate] = []
+        self.total_lines = 0
+        self.unmatched_lines = 0
+
+        # Leaves are stored under the None key of the last node
+        self._root: Dict[int, Dict[Optional[str], Any]] = {}
+        # Exact masked line -> template, skipping the tree for repeated shapes
+        self._seen: Dict[Tuple[str, ...], LogTemplate] = {}
+
+    def add(self, line: str) -> Optional[LogTemplate]:
+        """
+        Add one log line.
+
+        Args:
+            line: Log line without trailing newline
+
+        Returns:
+            The template the line was assigned to, if any
+        """
+        self.total_lines += 1
+
+        timestamp = None
+        match = TIMESTAMP_PATTERN.match(line)
+        if match:
+            timestamp = match.group(1)
+            line = line[match.end():]
+
+        masked = tuple(NUMBER_PATTERN.sub(WILDCARD, line).split())
+        if not masked:
+            return None
+
+        template = self._seen.get(masked)
+        if template is None:
+            template = self._match(masked)
+            if template is None:
+                self.unmatched_lines += 1
+                return None
+            if len(self._seen) >= self.max_templates * 20:
+                self._seen.clear()
+            self._seen[masked] = template
+
+        template.count += 1
+        if timestamp:
+            if template.first_seen is None:
+                template.first_seen = timestamp
+            template.last_seen = timestamp
+
+        if template.sampling:
+            self._add_samples(template, line.split())
+
+        return template
+
+    def add_text(self, text: str) -> None:
+        """Add every line of a block of text."""
+        for line in text.splitlines():
+            self.add(line)
+
+    def worthwhile(self) -> bool:
+        """
+        Check whether a template summary is better than raw lines.
+
+        Returns:
+            True if there are enough lines and they repeat enough
+        """
+        return (
+            0 < self.min_lines <= self.total_lines
+            and len(self.templates) * 4 <= self.total_lines
+        )
+
+    def summarize(self, token_budget: int = 4000) -> str:
+        """
+        Render templates as a summary within a token budget.
+
+        Error-like templates are listed first, then the rest by frequency.
+
+        Args:
+            token_budget: Approximate number of tokens the summary may use
+
+        Returns:
+            Summary text
+        """
+        char_budget = token_budget * CHARS_PER_TOKEN
+        ranked = sorted(self.templates, key=lambda t: (not is_error_line(t.text), -t.count))
+
+        lines: List[str] = []
+        used = 0
+        shown = 0
+        for template in ranked:
+            entry = self._format_template(template)
+            if used + len(entry) > char_budget and shown:
+                break
+            lines.append(entry)
+            used += len(entry) + 1
+            shown += 1
+
+        header = (
+            f"[log template summary by cmdrx: {self.total_lines:,} lines, "
+            f"{len(self.templates):,} templates, showing {shown:,}"
+        )
+        if self.unmatched_lines:
+            header += f", {self.unmatched_lines:,} lines beyond the template limit"
+        header += "; <*> marks variable parts]"
+
+        return "\n".join([header] + lines)
+
+    def _match(self, tokens: Tuple[str, ...]) -> Optional[LogTemplate]:
+        """Find or create the template for a masked token sequence."""
+        leaf = self._leaf(tokens)
+
+        best = None
+        best_score = (-1.0, -1)
+        for template in leaf:
+            score = self._similarity(template.tokens, tokens)
+            if score > best_score:
+                best, best_score = template, score
+
+        if best is not None and best_score[0] >= self.similarity:
+            self._merge(best, tokens)
+            return best
+
+        if len(self.templates) >= self.max_templates:
+            return None
+
+        template = LogTemplate(tokens=list(tokens))
+        leaf.append(template)
+        self.templates.append(template)
+        return template
+
+    def _leaf(self, tokens: Tuple[str, ...]) -> List[LogTemplate]:
+        """Walk the parse tree to the leaf for a token sequence."""
+        node = self._root.setdefault(len(tokens), {})
+        for token in tokens[:self.prefix_tokens]:
+            child = node.get(token)
+            if child is None:
+                if len(node) >= self.max_children:
+                    token = WILDCARD
+                child = node.setdefault(token, {})
+            node = child
+        leaf: List[LogTemplate] = node.setdefault(None, [])
+        return leaf
+
+    def _similarity(self, template: List[str], tokens: Tuple[str, ...]) -> Tuple[float, int]:
+        """Share of positions that match, and the number of constant tokens."""
+        same = 0
+        constants = 0
+        for expected, token in zip(template, tokens):
+            if expected == token:
+                same += 1
+            if expected != WILDCARD:
+                constants += 1
+        return (same / len(tokens), constants)
+
+    def _merge(self, template: LogTemplate, tokens: Tuple[str, ...]) -> None:
+        """Turn positions where a new line differs into variables."""
+        for i, (expected, token) in enumerate(zip(template.tokens, tokens)):
+            if expected != token and expected != WILDCARD:
+                template.tokens[i] = WILDCARD
+                template.sampling = True
+
+    def _add_samples(self, template: LogTemplate, tokens: List[str]) -> None:
+        """Record a few distinct values seen at each variable position."""
+        full = True
+        for i, expected in enumerate(template.tokens):
+            if WILDCARD not in expected:
+                continue
+            values = template.samples.setdefault(i, [])
+            if len(values) < self.max_samples:
+                full = False
+                if tokens[i] not in values:
+                    values.append(tokens[i])
+        if full:
+            # Every variable has enough samples; stop collecting until the template changes
+            template.sampling = False
+
+    def _format_template(self, template: LogTemplate) -> str:
+        """Render one template with its statistics."""
+        parts = [f"{template.count:>8,}x  {template.text}"]
+
+        if template.first_seen:
+            if template.first_seen == template.last_seen:
+                parts.append(f"          at {template.first_seen}")
+            else:
+                parts.append(f"          {template.first_seen} .. {template.last_seen}")
+
+        samples = [
+            f"{', '.join(values)}"
+            for i, values in sorted(template.samples.items())
+            if WILDCARD in template.tokens[i] and values
+        ]
+        if samples:
+            parts.append(f"          samples: {' | '.join(samples)}")
+
+        return "\n".join(parts)
@@ -0,0 +1,193 @@
+"""
+CmdRx HTTP Transport
+
+Process-wide pooled, keep-alive HTTP clients shared by all LLM provider clients.
+"""
+
+import asyncio
+import importlib.util
+import threading
+import weakref
+from typing import Dict, Any, Tuple
+
+
+class TransportManager:
+    """
+    Owns the pooled HTTP clients used to talk to LLM providers.
+
+    One manager exists per distinct pool configuration per process, so TCP and
+    TLS connection setup is paid once per process (or daemon lifetime) rather
+    than once per analysis. The OpenAI and Anthropic SDKs are both given the
+    same underlying client.
+    """
+
+    _shared: Dict[Tuple[Any, ...], 'TransportManager'] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        pool_size: int = 20,
+        keepalive_connections: int = 10,
+        keepalive_expiry: float = 60.0,
+        http2: bool = False
+    ):
+        """
+        Initialize transport manager.
+
+        Args:
+            pool_size: Maximum number of concurrent connections
+            keepalive_connections: Maximum number of idle connections kept open
+            keepalive_expiry: Seconds an idle connection is kept open
+            http2: Use HTTP/2 when the h2 package is installed
+        """
+        self.pool_size = pool_size
+        self.keepalive_connections = keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2 and importlib.util.find_spec('h2') is not None
+
+        self._lock = threading.Lock()
+        self._sync_client: Any = None
+        # Entries go away with their event loop
+        self._async_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]' = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @classmethod
+    def shared(cls, config: Dict[str, Any]) -> 'TransportManager':
+        """
+        Get the process-wide transport manager for a configuration.
+
+        Args:
+            config: CmdRx configuration dictionary
+
+        Returns:
+            Shared transport manager
+        """
+        settings = (
+            int(config.get('http_pool_size', 20)),
+            int(config.get('http_keepalive_connections', 10)),
+            float(config.get('http_keepalive_expiry', 60.0)),
+            bool(config.get('http2', False)),
+        )
+
+        with cls._shared_lock:
+            manager = cls._shared.get(settings)
+            if manager is None:
+                manager = cls(*settings)
+                cls._shared[settings] = manager
+            return manager
+
+    def sync_client(self) -> Any:
+        """
+        Get the shared synchronous HTTP client, creating it on first use.
+
+        Returns:
+            httpx-compatible client suitable for the provider SDKs
+        """
+        with self._lock:
+            if self._sync_client is None:
+                from openai import DefaultHttpxClient
+
+                self._sync_client = DefaultHttpxClient(**self._client_args())
+            return self._sync_client
+
+    def async_client(self) -> Any:
+        """
+        Get the shared async HTTP client for the running event loop.
+
+        Async connection pools are bound to the loop that created them, so one
+        client is kept per loop.
+
+        Returns:
+            httpx-compatible async client suitable for the provider SDKs
+        """
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                # Drop clients of loops that were closed without aclose()
+                for closed in [other for other in self._async_clients if other.is_closed()]:
+                    del self._async_clients[closed]
+                client = self._async_clients[loop] = self._create_async_client()
+            return client
+
+    def warm_up(self, url: str, timeout: float = 5.0) -> bool:
+        """
+        Open a pooled connection to a provider ahead of its first request.
+
+        Sends an unauthenticated HEAD request to the URL and ignores the
+        response; the TCP and TLS connection stays in the keep-alive pool for
+        the request that follows. Never raises: a failed warm-up only means
+        the first request opens the connection itself.
+
+        Args:
+            url: Provider base URL
+            timeout: Seconds to wait for the connection
+
+        Returns:
+            True if the connection was established
+        """
+        try:
+            self.sync_client().head(url, timeout=timeout)
+        except Exception:
+            return False
+        return True
+
+    async def aclose(self) -> None:
+        """Close the async client of the running event loop."""
+        with self._lock:
+            client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def close(self) -> None:
+        """Close the synchronous client and forget async clients."""
+        with self._lock:
+            if self._sync_client is not None:
+                self._sync_client.close()
+                self._sync_client = None
+            self._async_clients.clear()
+
+    def get_info(self) -> Dict[str, Any]:
+        """
+        Get the effective pool settings.
+
+        Returns:
+            Pool configuration
+        """
+        return {
+            'pool_size': self.pool_size,
+            'keepalive_connections': self.keepalive_connections,
+            'keepalive_expiry': self.keepalive_expiry,
+            'http2': self.http2,
+        }
+
+    def _create_async_client(self) -> Any:
+        """Create a pooled async client bound to the running event loop."""
+        from openai import DefaultAsyncHttpxClient
+
+        return DefaultAsyncHttpxClient(**self._client_args())
+
+    def _client_args(self) -> Dict[str, Any]:
+        """Get constructor arguments for the pooled clients."""
+        import httpx
+
+        return {
+            'limits': httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry
+            ),
+            'http2': self.http2,
+        }
+
+
+def close_all() -> None:
+    """Close every shared transport in this process."""
+    with TransportManager._shared_lock:
+        managers = list(TransportManager._shared.values())
+        TransportManager._shared.clear()
+
+    for manager in managers:
+        manager.close()
@@ -0,0 +1,79 @@
+"""
+Tests for CmdRx batch mode.
+"""
+
+import pytest
+from unittest.mock import Mock
+from pathlib import Path
+import tempfile
+
+from cmdrx.batch import BatchItem, BatchRunner, load_manifest, load_captures
+from cmdrx.llm import LLMResponse
+
+
+class TestBatch:
+    """Test batch loading and execution."""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Create a temporary directory."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield Path(temp_dir)
+
+    @pytest.fixture
+    def mock_core(self):
+        """Create a mock core whose analyses report an error status."""
+        core = Mock()
+        core.analyze_quiet.return_value = {
+            'analysis': {'status': 'error', 'issues': ['a', 'b']},
+            'llm_response': LLMResponse(content='{}', model='gpt-4'),
+            'log_file': Path('cmdrx_analysis.log'),
+            'fix_script': None,
+        }
+        return core
+
+    def test_load_manifest_skips_comments(self, temp_dir):
+        """Test manifest parsing."""
+        manifest = temp_dir / 'manifest.txt'
+        manifest.write_text("# nightly checks\nuptime\n\n  df -h  \n")
+
+        items = load_manifest(manifest)
+
+        assert [item.command for item in items] == ['uptime', 'df -h']
+        assert items[1].source == 'manifest.txt:4'
+
+    def test_load_captures(self, temp_dir):
+        """Test loading captured outputs from a directory."""
+        (temp_dir / 'web01.txt').write_text("disk full")
+        (temp_dir / '.hidden').write_text("ignored")
+
+        items = load_captures(temp_dir)
+
+        assert len(items) == 1
+        assert items[0].output == "disk full"
+
+    def test_run_executes_and_analyzes(self, mock_core):
+        """Test that commands are executed and analyzed."""
+        items = [
+            BatchItem(command='echo hello'),
+            BatchItem(command='<capture>', output='captured'),
+            BatchItem(command='true'),
+        ]
+        seen = []
+
+        results = BatchRunner(mock_core, exec_workers=2, llm_workers=2).run(items, on_result=seen.append)
+
+        assert [r.status for r in results] == ['error', 'error', 'skipped']
+        assert results[0].item.return_code == 0
+        assert results[0].issues == 2
+        assert len(seen) == 3
+        assert mock_core.analyze_quiet.call_count == 2
+
+    def test_run_records_failures(self, mock_core):
+        """Test that analysis errors do not abort the batch."""
+        mock_core.analyze_quiet.side_effect = Exception("API Error")
+
+        results = BatchRunner(mock_core).run([BatchItem(command='<capture>', output='x')])
+
+        assert results[0].status == 'failed'
+        assert 'API Error' in results[0].error
@@ -0,0 +1,109 @@
+"""
+Tests for the CmdRx response cache.
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+from pathlib import Path
+import tempfile
+
+from cmdrx.cache import ResponseCache
+from cmdrx.config import ConfigManager
+from cmdrx.llm import LLMProvider, LLMResponse
+
+
+class TestResponseCache:
+    """Test response cache behaviour."""
+
+    @pytest.fixture
+    def cache_dir(self):
+        """Create a temporary cache directory."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield Path(temp_dir)
+
+    def test_key_ignores_insignificant_whitespace(self):
+        """Test that prompt normalization makes keys stable."""
+        key1 = ResponseCache.make_key('openai', 'gpt-4', "line one  \r\nline two\n")
+        key2 = ResponseCache.make_key('openai', 'gpt-4', "line one\nline two")
+        key3 = ResponseCache.make_key('anthropic', 'gpt-4', "line one\nline two")
+
+        assert key1 == key2
+        assert key1 != key3
+
+    def test_key_includes_endpoint(self):
+        """Test that endpoints serving the same model name do not share entries."""
+        key1 = ResponseCache.make_key('custom', 'llama3', 'prompt', 'http://gpu-a:8000/v1')
+        key2 = ResponseCache.make_key('custom', 'llama3', 'prompt', 'http://gpu-b:8000/v1')
+
+        assert key1 != key2
+        assert key1 == ResponseCache.make_key('custom', 'llama3', 'prompt', 'http://gpu-a:8000/v1/')
+
+    def test_put_and_get(self, cache_dir):
+        """Test storing and retrieving a response."""
+        cache = ResponseCache(cache_dir)
+        key = cache.make_key('openai', 'gpt-4', 'prompt')
+
+        assert cache.get(key) is None
+
+        cache.put(key, 'openai', 'gpt-4', '{"analysis": "ok"}', {'total_tokens': 10})
+        entry = cache.get(key)
+
+        assert entry['content'] == '{"analysis": "ok"}'
+        assert entry['usage'] == {'total_tokens': 10}
+
+    def test_ttl_expiry(self, cache_dir):
+        """Test that expired entries are treated as misses."""
+        cache = ResponseCache(cache_dir, ttl=60)
+        key = cache.make_key('openai', 'gpt-4', 'prompt')
+
+        with patch('cmdrx.cache.time.time', return_value=1000.0):
+            cache.put(key, 'openai', 'gpt-4', 'content')
+        with patch('cmdrx.cache.time.time', return_value=1100.0):
+            assert cache.get(key) is None
+
+    def test_lru_eviction(self, cache_dir):
+        """Test that least recently used entries are evicted first."""
+        cache = ResponseCache(cache_dir, ttl=0, max_entries=2)
+        keys = [cache.make_key('openai', 'gpt-4', f'prompt {i}') for i in range(3)]
+
+        with patch('cmdrx.cache.time.time', return_value=1.0):
+            cache.put(keys[0], 'openai', 'gpt-4', 'zero')
+        with patch('cmdrx.cache.time.time', return_value=2.0):
+            cache.put(keys[1], 'openai', 'gpt-4', 'one')
+        with patch('cmdrx.cache.time.time', return_value=3.0):
+            assert cache.get(keys[0]) is not None
+        with patch('cmdrx.cache.time.time', return_value=4.0):
+            cache.put(keys[2], 'openai', 'gpt-4', 'two')
+
+        assert cache.get(keys[0]) is not None
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[2]) is not None
+
+    def test_disabled_from_config(self, cache_dir):
+        """Test that caching can be disabled in configuration."""
+        assert ResponseCache.from_config({'cache_enabled': False}) is None
+        assert ResponseCache.from_config({'cache_directory': str(cache_dir)}) is not None
+
+    def test_provider_serves_and_bypasses_cache(self, cache_dir):
+        """Test that a repeated analysis is cached and use_cache/refresh bypass the lookup."""
+        config_manager = Mock(spec=ConfigManager)
+        config_manager.get_config.return_value = {
+            'llm_provider': 'custom', 'llm_model': 'm', 'llm_base_url': 'http://127.0.0.1:9/v1',
+            'cache_directory': str(cache_dir), 'retry_max_attempts': 1,
+        }
+        config_manager.get_llm_credentials.return_value = {}
+        with patch.object(LLMProvider, '_create_client'):
+            provider = LLMProvider(config_manager)
+
+        send = Mock(return_value=LLMResponse(content='{"status": "ok"}', model='m', usage={'total_tokens': 5}))
+        with patch.object(provider, '_analyze_openai_compatible', send):
+            assert not provider.analyze("prompt").cached
+            assert provider.analyze("prompt").cached
+            assert send.call_count == 1
+
+            assert not provider.analyze("prompt", use_cache=False).cached
+            assert not provider.analyze("prompt", refresh=True).cached
+            assert send.call_count == 3
+
+            assert provider.test_connection()
+            assert send.call_count == 4
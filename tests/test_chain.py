@@ -0,0 +1,171 @@
+"""
+Tests for CmdRx provider chain failover and hedging.
+"""
+
+import asyncio
+import time
+
+import pytest
+from unittest.mock import Mock, patch
+
+from cmdrx.chain import LatencyTracker, ProviderChain
+from cmdrx.exceptions import LLMError
+from cmdrx.llm import LLMResponse
+from cmdrx.resilience import CircuitBreaker, Resilience, RetryLog, RetryPolicy
+
+
+def make_chain(mode, members, hedge_delay=0.05):
+    """Create a chain whose members are the given fake providers."""
+    config_manager = Mock()
+    config_manager.get_config.return_value = {
+        'llm_chain': [{'provider': 'custom', 'model': f"m{i}"} for i in range(len(members))],
+        'llm_chain_mode': mode,
+        'llm_hedge_delay': hedge_delay,
+        'cache_directory': None,
+    }
+    with patch('cmdrx.chain.LLMProvider', side_effect=members):
+        return ProviderChain(config_manager)
+
+
+def slow_member(content, delay=0.0, error=None):
+    """Create a fake provider answering after a delay."""
+    def analyze(prompt, use_cache=True, refresh=False):
+        time.sleep(delay)
+        if error:
+            raise error
+        return LLMResponse(content=content, model='m', provider=content)
+
+    def analyze_stream(prompt, on_text, use_cache=True, refresh=False):
+        time.sleep(delay)
+        for part in (content, " done"):
+            on_text(part)
+        return LLMResponse(content=content + " done", model='m', provider=content)
+
+    async def aanalyze(prompt, use_cache=True, refresh=False):
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return LLMResponse(content=content, model='m', provider=content)
+
+    member = Mock()
+    member.analyze.side_effect = analyze
+    member.analyze_stream.side_effect = analyze_stream
+    member.aanalyze.side_effect = aanalyze
+    return member
+
+
+class TestProviderChain:
+    """Test failover and hedged requests."""
+
+    def test_failover_to_next_provider(self):
+        """Test that a failing provider is replaced by the next one."""
+        chain = make_chain('failover', [
+            slow_member('local', error=LLMError("connection refused")),
+            slow_member('remote'),
+        ])
+
+        response = chain.analyze("prompt")
+
+        assert response.provider == 'remote'
+        assert response.events[0].startswith("failover: custom/m0 failed")
+
+    def test_all_providers_failing_raises(self):
+        """Test that the chain fails once every provider has failed."""
+        chain = make_chain('failover', [
+            slow_member('a', error=LLMError("down")),
+            slow_member('b', error=LLMError("down too")),
+        ])
+
+        with pytest.raises(LLMError, match="All providers in chain failed"):
+            chain.analyze("prompt")
+
+    def test_hedge_keeps_fastest_answer(self):
+        """Test that a slow primary is hedged and the faster answer wins."""
+        chain = make_chain('hedge', [slow_member('slow', delay=2.0), slow_member('fast')])
+
+        start = time.monotonic()
+        response = chain.analyze("prompt")
+
+        assert response.provider == 'fast'
+        assert time.monotonic() - start < 1.0
+        assert response.events[0].startswith("hedge: custom/m0 slower than")
+
+    def test_hedged_stream_shows_only_winner(self):
+        """Test that text from the losing stream is never shown."""
+        chain = make_chain('hedge', [slow_member('slow', delay=0.3), slow_member('fast')])
+        shown = []
+
+        response = chain.analyze_stream("prompt", shown.append)
+        time.sleep(0.4)
+
+        assert response.provider == 'fast'
+        assert shown == ['fast', ' done']
+
+    def test_async_hedge_cancels_loser(self):
+        """Test that the async chain returns the faster provider."""
+        chain = make_chain('hedge', [slow_member('slow', delay=5.0), slow_member('fast')])
+
+        start = time.monotonic()
+        response = asyncio.run(chain.aanalyze("prompt"))
+
+        assert response.provider == 'fast'
+        assert time.monotonic() - start < 1.0
+
+    def test_async_hedge_loser_in_half_open_trial(self):
+        """Test that cancelling a losing trial request does not leave its circuit half-open."""
+        breaker = CircuitBreaker('custom/m0', failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        resilience = Resilience(RetryPolicy(max_attempts=1), breaker)
+
+        async def trial(prompt, use_cache=True, refresh=False):
+            return await resilience.acall(lambda: asyncio.sleep(5), RetryLog())
+
+        slow = Mock()
+        slow.aanalyze.side_effect = trial
+        chain = make_chain('hedge', [slow, slow_member('fast')])
+
+        response = asyncio.run(chain.aanalyze("prompt"))
+
+        assert response.provider == 'fast'
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.allow()
+
+    def test_latency_skips_shared_responses(self):
+        """Test that cached and coalesced answers do not count as provider latency."""
+        member = Mock()
+        member.analyze.side_effect = [
+            LLMResponse(content='a', model='m', cached=True),
+            LLMResponse(content='b', model='m', coalesced=True),
+            LLMResponse(content='c', model='m'),
+        ]
+        chain = make_chain('failover', [member])
+
+        with patch.object(chain.latency, 'record') as record:
+            for _ in range(3):
+                chain.analyze("prompt")
+
+        assert record.call_count == 1
+
+    def test_latency_samples_merged_between_processes(self, tmp_path):
+        """Test that trackers sharing a file keep each other's samples."""
+        path = tmp_path / 'latency.json'
+        first = LatencyTracker(path, min_samples=4)
+        second = LatencyTracker(path, min_samples=4)
+
+        first.record('openai/gpt-4', 1)
+        second.record('openai/gpt-4', 2)
+        first.record('anthropic/claude', 3)
+        second.record('openai/gpt-4', 4)
+
+        reloaded = LatencyTracker(path)
+        assert reloaded._samples == {'openai/gpt-4': [1, 2, 4], 'anthropic/claude': [3]}
+
+    def test_latency_percentile_persisted(self, tmp_path):
+        """Test that p95 latency survives between runs."""
+        tracker = LatencyTracker(tmp_path / 'latency.json', min_samples=5)
+        for seconds in (1, 2, 3, 4, 10):
+            tracker.record('openai/gpt-4', seconds)
+
+        reloaded = LatencyTracker(tmp_path / 'latency.json', min_samples=5)
+        assert reloaded.percentile('openai/gpt-4') == 10
+        assert reloaded.percentile('other/model') is None
@@ -0,0 +1,139 @@
+"""
+Tests for CmdRx request coalescing.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+import pytest
+
+from cmdrx.coalesce import SingleFlight
+from cmdrx.config import ConfigManager
+from cmdrx.exceptions import LLMError
+from cmdrx.llm import LLMProvider, LLMResponse
+
+
+def make_provider(**config):
+    config_manager = Mock(spec=ConfigManager)
+    config_manager.get_config.return_value = {
+        'llm_provider': 'custom', 'llm_model': 'm', 'llm_base_url': 'http://127.0.0.1:9/v1',
+        'cache_enabled': False, 'retry_max_attempts': 1, **config
+    }
+    config_manager.get_llm_credentials.return_value = {}
+    with patch.object(LLMProvider, '_create_client'):
+        return LLMProvider(config_manager)
+
+
+class TestSingleFlight:
+    """Test sharing of in-flight calls."""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Test that one call runs per key and later calls run again."""
+        flights = SingleFlight()
+        calls = []
+
+        def work(key):
+            def fn():
+                calls.append(key)
+                time.sleep(0.2)
+                return f"result {key}"
+            return flights.call(key, fn)
+
+        with ThreadPoolExecutor(max_workers=12) as pool:
+            results = list(pool.map(work, ["a"] * 10 + ["b"] * 2))
+
+        assert sorted(calls) == ["a", "b"]
+        assert [value for value, _ in results] == ["result a"] * 10 + ["result b"] * 2
+        assert sum(shared for _, shared in results) == 10
+        assert flights.in_flight() == 0
+        assert work("a") == ("result a", False)
+
+    def test_error_raised_to_every_caller(self):
+        """Test that a failed call fails its followers too."""
+        flights = SingleFlight()
+        started = threading.Event()
+
+        def fail():
+            started.set()
+            time.sleep(0.2)
+            raise LLMError("upstream down")
+
+        leader = ThreadPoolExecutor(max_workers=1).submit(flights.call, "k", fail)
+        started.wait(5)
+        with pytest.raises(LLMError, match="upstream down"):
+            flights.call("k", lambda: "not called")
+        with pytest.raises(LLMError):
+            leader.result()
+
+    def test_async_callers_and_cancellation(self):
+        """Test that async callers share a task that only the last waiter cancels."""
+        flights = SingleFlight()
+        calls = []
+
+        async def request():
+            calls.append(1)
+            await asyncio.sleep(0.2)
+            return "done"
+
+        async def main():
+            results = await asyncio.gather(*[flights.acall("k", request) for _ in range(5)])
+            assert [r[0] for r in results] == ["done"] * 5
+
+            # A follower giving up early leaves the request running for the others
+            leader = asyncio.ensure_future(flights.acall("k", request))
+            await asyncio.sleep(0)
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(flights.acall("k", request), 0.05)
+            assert await leader == ("done", False)
+
+            # Once every caller is gone the request is cancelled
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(flights.acall("k", request), 0.05)
+            await asyncio.sleep(0)
+            assert flights.in_flight() == 0
+
+        asyncio.run(main())
+        assert len(calls) == 3
+
+
+class TestProviderCoalescing:
+    """Test coalescing of identical LLM requests."""
+
+    def test_identical_prompts_sent_once(self):
+        """Test that whitespace-only differences share one request, streaming or not."""
+        provider = make_provider()
+        upstream = []
+
+        def send(prompt):
+            upstream.append(prompt)
+            time.sleep(0.3)
+            return LLMResponse(content='{"status": "error"}', model='m', usage={'total_tokens': 50})
+
+        streamed = []
+        with patch.object(provider, '_analyze_openai_compatible', side_effect=send):
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                futures = [pool.submit(provider.analyze, "disk full\n" + " " * i) for i in range(6)]
+                time.sleep(0.1)
+                futures.append(pool.submit(provider.analyze_stream, "disk full", streamed.append))
+                futures.append(pool.submit(provider.analyze, "other error"))
+                responses = [f.result() for f in futures]
+
+        assert len(upstream) == 2
+        assert sum(r.coalesced for r in responses) == 6
+        assert all(r.content == '{"status": "error"}' for r in responses)
+        assert streamed == ['{"status": "error"}']
+
+    def test_disabled(self):
+        """Test that coalesce_requests false sends every request."""
+        provider = make_provider(coalesce_requests=False)
+        send = Mock(side_effect=lambda prompt: time.sleep(0.1) or LLMResponse(content='x', model='m'))
+
+        with patch.object(provider, '_analyze_openai_compatible', send):
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                responses = list(pool.map(provider.analyze, ["same"] * 4))
+
+        assert send.call_count == 4
+        assert not any(r.coalesced for r in responses)
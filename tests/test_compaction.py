@@ -0,0 +1,68 @@
+"""
+Tests for CmdRx output compaction.
+"""
+
+from cmdrx.compaction import OutputCompactor, line_signature, strip_ansi
+
+
+class TestOutputCompactor:
+    """Test token-budgeted output compaction."""
+
+    def test_small_output_is_kept(self):
+        """Test that output within budget is only cleaned up."""
+        compactor = OutputCompactor(token_budget=1000)
+        compactor.feed("\x1b[31mred\x1b[0m line\nsecond line\n")
+        result = compactor.finish()
+
+        assert result.text == "red line\nsecond line"
+        assert not result.reduced
+
+    def test_near_identical_lines_collapse(self):
+        """Test that lines differing only in numbers collapse with a count."""
+        compactor = OutputCompactor(token_budget=1000)
+        for i in range(50):
+            compactor.feed(f"2024-01-01 10:00:{i:02d} worker {i} heartbeat ok\n")
+        compactor.feed("done\n")
+        result = compactor.finish()
+
+        assert result.text.splitlines() == [
+            "2024-01-01 10:00:00 worker 0 heartbeat ok  [repeated 50x]",
+            "done",
+        ]
+        assert result.collapsed_lines == 49
+
+    def test_keeps_head_tail_and_errors_within_budget(self):
+        """Test that the middle is dropped except for error-like lines."""
+        compactor = OutputCompactor(token_budget=200)
+        text = "".join(
+            "ERROR: disk sda failed\n" if i == 500 else f"line {'abcdefghij'[i % 10]} {i}\n"
+            for i in range(1000)
+        )
+        # Feed in chunks that split lines to exercise partial-line handling
+        for start in range(0, len(text), 37):
+            compactor.feed(text[start:start + 37])
+        result = compactor.finish()
+
+        lines = result.text.splitlines()
+        assert lines[0] == "line a 0"
+        assert lines[-1] == "line j 999"
+        assert "ERROR: disk sda failed" in lines
+        assert result.omitted_lines > 900
+        assert result.kept_error_lines == 1
+        assert len(result.text) <= 200 * 4 + 200
+        assert result.total_lines == 1000
+
+    def test_overlong_lines_truncated(self):
+        """Test that a single huge line cannot exceed the line limit."""
+        compactor = OutputCompactor(token_budget=1000, max_line_chars=100)
+        compactor.feed("x" * 5000)
+        compactor.feed("y" * 5000 + "\nnext\n")
+        result = compactor.finish()
+
+        assert result.text.splitlines()[0] == "x" * 100 + " [line truncated by cmdrx]"
+        assert result.truncated_lines == 1
+
+    def test_helpers(self):
+        """Test ANSI stripping and line signatures."""
+        assert strip_ansi("\x1b[1;32mok\x1b[0m \x1b]0;title\x07done") == "ok done"
+        assert line_signature("pid 123 id 7f3a9c01") == line_signature("pid 9 id 0badc0de")
@@ -0,0 +1,96 @@
+"""
+Tests for CmdRx settings and credential resolution.
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from cmdrx.config import ConfigManager
+from cmdrx.exceptions import ConfigurationError
+from cmdrx.settings import load_settings
+
+
+@pytest.fixture
+def config_home(tmp_path, monkeypatch):
+    """Point the configuration at a temporary home directory."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.delenv("CMDRX_CREDENTIAL_SOURCES", raising=False)
+    monkeypatch.delenv("CMDRX_OPENAI_API_KEY", raising=False)
+    config_dir = tmp_path / ".config" / "cmdrx"
+    config_dir.mkdir(parents=True)
+    ConfigManager.clear_credential_cache()
+    yield config_dir
+    ConfigManager.clear_credential_cache()
+
+
+def write_config(config_dir, **settings):
+    (config_dir / "config.json").write_text(json.dumps(settings))
+
+
+class TestCredentialResolution:
+    """Test credential lookup order and caching."""
+
+    def test_sources_follow_configured_order(self, config_home, monkeypatch):
+        """Test that an environment-only order never touches the keyring."""
+        write_config(config_home, credential_sources=["environment", "file"])
+        (config_home / "credentials.json").write_text(json.dumps({"openai_api_key": "from-file"}))
+        monkeypatch.setenv("CMDRX_OPENAI_API_KEY", "from-env")
+
+        with patch.object(ConfigManager, "_credential_from_keyring") as keyring_lookup:
+            manager = ConfigManager()
+            assert manager.get_llm_credentials("openai") == {"api_key": "from-env"}
+
+        keyring_lookup.assert_not_called()
+        assert manager.credential_lookups[0].source == "environment"
+
+        monkeypatch.setenv("CMDRX_CREDENTIAL_SOURCES", "file")
+        ConfigManager.clear_credential_cache()
+        assert ConfigManager().get_llm_credentials("openai") == {"api_key": "from-file"}
+
+    def test_resolved_credentials_are_cached(self, config_home):
+        """Test that lookups are cached across managers until invalidated."""
+        write_config(config_home, credential_sources=["file"])
+        creds_file = config_home / "credentials.json"
+        creds_file.write_text(json.dumps({"openai_api_key": "first"}))
+
+        assert ConfigManager().get_llm_credentials("openai") == {"api_key": "first"}
+
+        creds_file.write_text(json.dumps({"openai_api_key": "second"}))
+        manager = ConfigManager()
+        assert manager.get_llm_credentials("openai") == {"api_key": "first"}
+        assert manager.credential_lookups[0].cached
+
+        ConfigManager.clear_credential_cache("openai_api_key")
+        assert ConfigManager().get_llm_credentials("openai") == {"api_key": "second"}
+
+    def test_cache_can_be_disabled(self, config_home):
+        """Test that a zero TTL looks credentials up every time."""
+        write_config(config_home, credential_sources=["file"], credential_cache_ttl=0)
+        creds_file = config_home / "credentials.json"
+        creds_file.write_text(json.dumps({"openai_api_key": "first"}))
+        assert ConfigManager().get_llm_credentials("openai") == {"api_key": "first"}
+
+        creds_file.write_text(json.dumps({"openai_api_key": "second"}))
+        assert ConfigManager().get_llm_credentials("openai") == {"api_key": "second"}
+
+    def test_unknown_source_rejected(self, config_home):
+        """Test that a misspelled source is reported."""
+        write_config(config_home, credential_sources=["env"])
+
+        with pytest.raises(ConfigurationError, match="Unknown credential source"):
+            ConfigManager().get_llm_credentials("openai")
+
+
+class TestSettings:
+    """Test settings loading."""
+
+    def test_file_settings_merged_over_defaults(self, config_home):
+        """Test that the CLI reads the same settings as the configuration manager."""
+        write_config(config_home, command_timeout=5)
+
+        settings = load_settings()
+        assert settings['command_timeout'] == 5
+        assert settings['capture_max_bytes'] > 0
+        assert ConfigManager().get_config() == settings
@@ -2,13 +2,17 @@
 Tests for CmdRx core functionality.
 """
 
+import asyncio
+import threading
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
 from pathlib import Path
 import tempfile
 import json
 
+from cmdrx.cache import ResponseCache
 from cmdrx.core import CmdRxCore
+from cmdrx.execution import execute
 from cmdrx.config import ConfigManager
 from cmdrx.llm import LLMResponse
 from cmdrx.exceptions import ConfigurationError, LLMError
@@ -30,7 +34,8 @@ class TestCmdRxCore:
             'log_directory': '~/cmdrx_logs',
             'verbose': False,
             'auto_fix_scripts': True,
-            'command_timeout': 30
+            'command_timeout': 30,
+            'history_enabled': False
         }
         config_manager.get_llm_credentials.return_value = {
             'api_key': 'test-api-key'
@@ -188,6 +193,31 @@ class TestCmdRxCore:
             assert 'Exit code: 1' in prompt
             assert 'JSON format' in prompt
     
+    def test_repeated_runs_share_cache_key(self, mock_config_manager, temp_log_dir):
+        """Test that capture timestamps don't make identical runs miss the cache."""
+        with patch('cmdrx.core.ConfigManager') as mock_config_manager_class, \
+             patch('cmdrx.core.LLMProvider') as mock_llm_provider_class, \
+             patch('cmdrx.core.OutputGenerator') as mock_output_gen_class:
+            
+            mock_config_manager_class.return_value = mock_config_manager
+            mock_llm_provider_class.return_value = Mock()
+            mock_output_gen_class.return_value = Mock()
+            
+            core = CmdRxCore(log_dir=str(temp_log_dir))
+            
+            keys = []
+            outputs = []
+            for delay in ('0', '0.2'):
+                result = execute(f"echo started; sleep {delay}; echo failed >&2", timeout=10, tee=False)
+                outputs.append(result.text())
+                result.close()
+                prompt = core._generate_prompt({'command': 'check', 'output': outputs[-1], 'return_code': 0})
+                assert '[stderr] failed' in prompt
+                keys.append(ResponseCache.make_key('openai', 'gpt-4', prompt))
+            
+            assert outputs[0] != outputs[1]
+            assert keys[0] == keys[1]
+    
     def test_system_info_generation(self, mock_config_manager, temp_log_dir):
         """Test system information gathering."""
         with patch('cmdrx.core.ConfigManager') as mock_config_manager_class, \
@@ -204,4 +234,70 @@ class TestCmdRxCore:
             
             assert isinstance(system_info, dict)
             # Should have some basic system information
-            assert len(system_info) > 0
\ No newline at end of file
+            assert len(system_info) > 0
+
+    @patch('cmdrx.core.ConfigManager')
+    @patch('cmdrx.core.LLMProvider')
+    @patch('cmdrx.core.OutputGenerator')
+    def test_aanalyze_output_success(
+        self, 
+        mock_output_gen_class, 
+        mock_llm_provider_class, 
+        mock_config_manager_class,
+        mock_config_manager,
+        mock_llm_provider,
+        temp_log_dir
+    ):
+        """Test successful async output analysis."""
+        mock_config_manager_class.return_value = mock_config_manager
+        mock_llm_provider.aanalyze = AsyncMock(return_value=mock_llm_provider.analyze.return_value)
+        mock_llm_provider_class.return_value = mock_llm_provider
+        
+        mock_output_gen = Mock()
+        writer_threads = []
+        mock_output_gen.generate_outputs.side_effect = lambda *args, **kwargs: (
+            writer_threads.append(threading.current_thread()) or True
+        )
+        mock_output_gen_class.return_value = mock_output_gen
+        
+        core = CmdRxCore(log_dir=str(temp_log_dir))
+        
+        result = asyncio.run(core.aanalyze_output(
+            command="systemctl status httpd",
+            output="test output",
+            return_code=1,
+            timeout=5
+        ))
+        
+        assert result is True
+        mock_llm_provider.aanalyze.assert_awaited_once()
+        assert mock_llm_provider.aanalyze.call_args.kwargs['timeout'] == 5
+        mock_llm_provider.analyze.assert_not_called()
+        # Files are written off the event loop
+        assert writer_threads and writer_threads[0] is not threading.main_thread()
+
+    @patch('cmdrx.core.ConfigManager')
+    @patch('cmdrx.core.LLMProvider')
+    @patch('cmdrx.core.OutputGenerator')
+    def test_warm_up_prepares_analysis(
+        self,
+        mock_output_gen_class,
+        mock_llm_provider_class,
+        mock_config_manager_class,
+        mock_config_manager,
+        mock_llm_provider,
+        temp_log_dir
+    ):
+        """Test that warm-up connects and collects context ahead of the analysis."""
+        mock_config_manager_class.return_value = mock_config_manager
+        mock_llm_provider_class.return_value = mock_llm_provider
+        mock_output_gen_class.return_value = Mock()
+        
+        core = CmdRxCore(log_dir=str(temp_log_dir))
+        with patch.object(core, '_get_system_info', return_value={'os': 'Linux'}) as system_info:
+            core.warm_up()
+            core.analyze_output(command="uptime", output="up 3 days", return_code=0)
+        
+        mock_llm_provider.warm_up.assert_called_once()
+        system_info.assert_called_once()
+        assert "OS: Linux" in mock_llm_provider.analyze.call_args[0][0]
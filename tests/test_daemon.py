@@ -0,0 +1,105 @@
+"""
+Tests for the CmdRx daemon and its client.
+"""
+
+import json
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from cmdrx import client
+from cmdrx.config import ConfigManager
+from cmdrx.daemon import DaemonServer
+from cmdrx.llm import LLMResponse
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    """Run a daemon with a mocked provider on a temporary socket."""
+    monkeypatch.setenv(client.SOCKET_ENV, str(tmp_path / "cmdrxd.sock"))
+    monkeypatch.delenv(client.NO_DAEMON_ENV, raising=False)
+
+    config_manager = Mock(spec=ConfigManager)
+    config_manager.get_config.return_value = {
+        'log_directory': str(tmp_path / "logs"),
+        'history_directory': str(tmp_path / "history")
+    }
+    provider = Mock()
+    provider.analyze.return_value = LLMResponse(
+        content=json.dumps({"analysis": "Disk is full", "status": "error", "issues": ["No space left"]}),
+        model="test-model"
+    )
+
+    server = DaemonServer(client.socket_path())
+    server.warm_state = lambda: (config_manager, provider)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    yield server, provider
+
+    server.stop()
+    thread.join(timeout=5)
+
+
+class TestDaemon:
+    """Test analyses handed to cmdrxd."""
+
+    options = {'dry_run': True, 'use_cache': False, 'stream': False}
+
+    def test_command_output_analyzed_by_daemon(self, daemon, capsys):
+        """Test that the daemon analyzes and renders back to the client."""
+        server, provider = daemon
+
+        code = client.run_analysis(self.options, "df -h", "STDOUT:\n/dev/sda1 100%", 0)
+
+        output = capsys.readouterr().out
+        assert code == 0
+        assert "Command Output: df -h" in output
+        assert "Disk is full" in output
+        assert provider.analyze.call_count == 1
+        assert client.request({'type': 'ping'})['requests'] == 1
+
+    def test_piped_input_streamed_to_daemon(self, daemon, capsys):
+        """Test that piped input is sent in chunks and analyzed."""
+        server, provider = daemon
+
+        code = client.run_analysis(self.options, chunks=iter(["kernel: EXT4-fs error\n", "more\n"]))
+
+        assert code == 0
+        assert "EXT4-fs error" in capsys.readouterr().out
+        prompt = provider.analyze.call_args[0][0]
+        assert "kernel: EXT4-fs error\nmore" in prompt
+
+    def test_warm_up_request(self, daemon):
+        """Test that the client can have the daemon reconnect while a command runs."""
+        server, provider = daemon
+
+        assert client.warm_up()
+        for _ in range(50):
+            if provider.warm_up.called:
+                break
+            threading.Event().wait(0.1)
+        provider.warm_up.assert_called_once()
+        assert client.request({'type': 'ping'})['requests'] == 0
+
+    def test_shutdown_removes_socket(self, daemon):
+        """Test that a shutdown request stops the daemon."""
+        server, _ = daemon
+
+        assert client.request({'type': 'shutdown'}) == {'type': 'ok'}
+        server.stop()
+        for _ in range(50):
+            if not server.path.exists():
+                break
+            threading.Event().wait(0.1)
+        assert not server.path.exists()
+
+    def test_falls_back_without_daemon(self, tmp_path, monkeypatch):
+        """Test that the client reports no daemon so the CLI runs in-process."""
+        monkeypatch.setenv(client.SOCKET_ENV, str(tmp_path / "missing.sock"))
+        assert client.run_analysis(self.options, "ls", "out", 0) is None
+
+        monkeypatch.setenv(client.NO_DAEMON_ENV, "1")
+        assert client.run_analysis(self.options, "ls", "out", 0) is None
+        assert not client.warm_up()
@@ -0,0 +1,88 @@
+"""
+Tests for CmdRx command execution.
+"""
+
+import re
+import time
+
+from cmdrx.execution import CaptureBuffer, execute
+
+
+def process_running(pid):
+    """Check whether a process exists and is not a zombie."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().split(") ")[1][0] != "Z"
+    except (FileNotFoundError, IndexError):
+        return False
+
+
+class TestExecute:
+    """Test streaming command execution."""
+
+    def test_output_teed_and_captured_in_arrival_order(self, capfd):
+        """Test that stdout and stderr are shown live and captured interleaved."""
+        result = execute("echo first; sleep 0.1; echo second >&2; sleep 0.1; printf third", timeout=10)
+
+        shown = capfd.readouterr()
+        assert shown.out == "first\nthird"
+        assert shown.err == "second\n"
+
+        lines = result.text().splitlines()
+        assert re.fullmatch(r"\[\+\d+\.\d{3}s\] first", lines[0])
+        assert re.fullmatch(r"\[\+\d+\.\d{3}s stderr\] second", lines[1])
+        assert lines[2].endswith("] third")
+        assert result.return_code == 0
+        assert not result.timed_out
+        result.close()
+
+    def test_exit_code_without_tee(self, capfd):
+        """Test that nothing is shown without tee and the exit code is kept."""
+        result = execute("echo quiet; exit 3", tee=False)
+
+        assert capfd.readouterr().out == ""
+        assert result.return_code == 3
+        assert "] quiet" in result.text()
+        result.close()
+
+    def test_timeout_kills_process_group(self, tmp_path):
+        """Test that a timeout kills the command and its background children."""
+        pid_file = tmp_path / "child.pid"
+        start = time.monotonic()
+        result = execute(f"sleep 60 & echo $! > {pid_file}; echo started; wait", timeout=0.5, tee=False)
+
+        assert time.monotonic() - start < 10
+        assert result.timed_out
+        assert "started" in result.text()
+        assert "timed out after 0.5s" in result.text()
+        assert not process_running(int(pid_file.read_text()))
+        result.close()
+
+
+class TestCaptureBuffer:
+    """Test bounded output capture."""
+
+    def test_long_output_keeps_head_and_tail(self):
+        """Test that the middle of output beyond the limit is dropped."""
+        capture = CaptureBuffer(max_bytes=400, memory_bytes=100)
+        for i in range(1000):
+            capture.add(f"line {i}\n")
+
+        text = capture.text()
+        assert text.startswith("line 0\n")
+        assert text.endswith("line 999\n")
+        assert f"[... {capture.omitted_lines} lines omitted by cmdrx ...]" in text
+        assert capture.total_lines == 1000
+        assert len(text) < 500
+        capture.close()
+
+    def test_unlimited_capture_spills_to_disk(self):
+        """Test that an unlimited capture keeps every line beyond the memory size."""
+        capture = CaptureBuffer(max_bytes=0, memory_bytes=100)
+        for i in range(100):
+            capture.add(f"line {i}\n")
+
+        assert capture._file._rolled
+        assert capture.text().count("\n") == 100
+        assert capture.omitted_lines == 0
+        capture.close()
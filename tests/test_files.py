@@ -0,0 +1,63 @@
+"""
+Tests for CmdRx artifact naming and atomic writes.
+"""
+
+import os
+import stat
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from cmdrx.files import artifact_id, atomic_write
+
+
+def make_ids(count):
+    return [artifact_id() for _ in range(count)]
+
+
+class TestArtifactId:
+    """Test collision-free artifact IDs."""
+
+    def test_unique_across_threads_and_processes(self):
+        """Test that concurrent threads and processes never share an ID."""
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            thread_ids = [i for ids in pool.map(make_ids, [200] * 8) for i in ids]
+        with ProcessPoolExecutor(max_workers=4) as pool:
+            process_ids = [i for ids in pool.map(make_ids, [200] * 4) for i in ids]
+
+        all_ids = thread_ids + process_ids
+        assert len(set(all_ids)) == len(all_ids)
+
+    def test_ordered_even_if_clock_stalls(self):
+        """Test that IDs from one process keep increasing."""
+        with patch('cmdrx.files.time.time_ns', return_value=time.time_ns()):
+            ids = make_ids(3)
+        assert len(set(ids)) == 3
+        assert ids == sorted(ids)
+        assert all(f"_{os.getpid()}_" in i for i in ids)
+
+
+class TestAtomicWrite:
+    """Test writing through a temporary file."""
+
+    def test_write_executable(self, tmp_path):
+        """Test that content and mode are in place and no temporary file remains."""
+        target = atomic_write(tmp_path / "fix.sh", "#!/bin/bash\n", executable=True, fsync='full')
+
+        assert target.read_text() == "#!/bin/bash\n"
+        assert target.stat().st_mode & stat.S_IXUSR
+        assert os.listdir(tmp_path) == ["fix.sh"]
+
+    def test_failed_write_leaves_nothing(self, tmp_path):
+        """Test that a failed write removes the temporary file and keeps the old one."""
+        target = tmp_path / "analysis.log"
+        target.write_text("old")
+
+        with patch('cmdrx.files.os.replace', side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                atomic_write(target, "new")
+
+        assert target.read_text() == "old"
+        assert os.listdir(tmp_path) == ["analysis.log"]
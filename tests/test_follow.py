@@ -0,0 +1,123 @@
+"""
+Tests for CmdRx follow mode.
+"""
+
+import io
+
+import pytest
+
+from cmdrx.exceptions import InputError
+from cmdrx.follow import FollowWatcher, follow
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_watcher(clock, **kwargs):
+    options = dict(debounce=5, max_delay=30, min_interval=60, learn_lines=0, clock=clock)
+    options.update(kwargs)
+    return FollowWatcher(**options)
+
+
+class TestFollowWatcher:
+    """Test local triggers, debouncing and rate limiting."""
+
+    def test_pattern_trigger_is_debounced(self):
+        """Test that an analysis waits until triggers have been quiet."""
+        clock = FakeClock()
+        watcher = make_watcher(clock, patterns=[r"OOM"])
+
+        assert watcher.feed("all good") is None
+        assert watcher.wait_time() is None
+
+        assert watcher.feed("kernel: OOM killer invoked") == "matched /OOM/"
+        clock.now += 3
+        watcher.feed("kernel: OOM killer invoked again")
+        assert watcher.wait_time() == pytest.approx(5)
+
+        # Continuous triggers are analyzed after the maximum delay
+        for _ in range(10):
+            clock.now += 4
+            watcher.feed("kernel: OOM")
+        assert watcher.wait_time() <= 0
+
+        window = watcher.take()
+        assert window.reasons == ["matched /OOM/"]
+        assert window.lines[0] == "all good"
+
+    def test_error_spike_relative_to_baseline(self):
+        """Test that a burst of errors triggers but a steady error rate does not."""
+        clock = FakeClock()
+        watcher = make_watcher(clock, spike_min_errors=5, spike_factor=3)
+
+        reasons = [watcher.feed(f"error: timeout {i}") for i in range(5)]
+        assert reasons[-1] == "error spike (5 errors in 10s)"
+        watcher.take()
+
+        # A noisy service settles into a baseline of 5 errors per bucket
+        triggered = []
+        for _ in range(60):
+            clock.now += 10
+            triggered += [watcher.feed("error: timeout") for _ in range(5)]
+        assert not any(triggered[-100:])
+
+        clock.now += 10
+        burst = [watcher.feed("error: timeout") for _ in range(20)]
+        assert any(burst)
+
+    def test_new_log_message_after_learning(self):
+        """Test that unseen message shapes trigger only after the learning period."""
+        clock = FakeClock()
+        watcher = make_watcher(clock, learn_lines=10, spike_min_errors=0)
+
+        for i in range(10):
+            assert watcher.feed(f"GET /health {i} 200") is None
+        assert watcher.feed("GET /health 11 200") is None
+        assert watcher.feed("worker 3 exited unexpectedly, restarting") == "new log message"
+
+    def test_rate_limit_and_rolling_summary(self):
+        """Test the minimum interval and the summary of earlier analyses."""
+        clock = FakeClock()
+        watcher = make_watcher(clock, patterns=["panic"])
+
+        watcher.feed("panic: nil map")
+        clock.now += 5
+        first = watcher.take()
+        watcher.analyzed(first, "[error] Nil map write in handler")
+
+        watcher.feed("line between")
+        watcher.feed("panic: again")
+        clock.now += 5
+        assert watcher.wait_time() == pytest.approx(55)
+
+        clock.now += 55
+        second = watcher.take()
+        assert second.lines == ["line between", "panic: again"]
+        assert "analysis 2 of a continuously followed stream" in second.background
+        assert "Nil map write in handler" in second.background
+
+    def test_invalid_pattern(self):
+        """Test that a bad trigger pattern is reported."""
+        with pytest.raises(InputError, match="Invalid trigger pattern"):
+            FollowWatcher(patterns=["("])
+
+
+class TestFollow:
+    """Test following a stream."""
+
+    def test_pending_trigger_analyzed_at_end_of_input(self):
+        """Test that the stream is followed to its end and triggers are not lost."""
+        watcher = FollowWatcher(patterns=["FATAL"], window_lines=2, min_interval=3600, learn_lines=0)
+        stream = io.StringIO("one\ntwo\nthree\nFATAL: disk gone\nfour\n")
+        windows = []
+
+        assert follow(stream, watcher, windows.append) == 1
+        assert windows[0].lines == ["FATAL: disk gone", "four"]
+        assert windows[0].text.startswith("[... 3 earlier lines not kept by cmdrx ...]")
@@ -0,0 +1,107 @@
+"""
+Tests for the CmdRx analysis history.
+"""
+
+import pytest
+from rich.console import Console
+
+from cmdrx.history import SNIPPET_END, SNIPPET_START, AnalysisHistory, HistoryEntry, parse_log_file
+from cmdrx.llm import LLMResponse
+from cmdrx.output import OutputGenerator
+
+
+def make_entry(timestamp, command, output="", status="info", **kwargs):
+    return HistoryEntry(timestamp=timestamp, command=command, output=output, status=status, **kwargs)
+
+
+class TestAnalysisHistory:
+    """Test recording, listing and searching analyses."""
+
+    @pytest.fixture
+    def history(self, tmp_path):
+        """Create a history index in a temporary directory."""
+        return AnalysisHistory(tmp_path / "history.db")
+
+    def test_recent_with_filters(self, history):
+        """Test listing analyses newest first, filtered by status, command and time."""
+        history.record(make_entry("2024-05-01T10:00:00", "df -h", status="success"))
+        history.record(make_entry("2024-05-02T10:00:00", "systemctl status nginx", status="error", issues=["down"]))
+        history.record(make_entry("2024-05-03T10:00:00", "systemctl status sshd", status="success"))
+
+        assert [e.command for e in history.recent()] == [
+            "systemctl status sshd", "systemctl status nginx", "df -h"
+        ]
+        errors = history.recent(status="ERROR")
+        assert [e.issues for e in errors] == [["down"]]
+        assert len(history.recent(command="systemctl", since="2024-05-03")) == 1
+
+    def test_search_relevance_and_first_occurrence(self, history):
+        """Test full-text search over output and analysis, oldest first on request."""
+        history.record(make_entry("2024-05-01T10:00:00", "kubectl logs api", "dial tcp: connection refused"))
+        history.record(make_entry("2024-05-02T10:00:00", "journalctl -u db", "all good"))
+        history.record(make_entry(
+            "2024-05-03T10:00:00", "kubectl logs api", "connection refused\nconnection refused",
+            analysis="The database refuses connections"
+        ))
+
+        oldest = history.search('"connection refused"', oldest_first=True)
+        assert [e.timestamp for e in oldest] == ["2024-05-01T10:00:00", "2024-05-03T10:00:00"]
+        assert oldest[0].snippet == f"dial tcp: {SNIPPET_START}connection refused{SNIPPET_END}"
+
+        assert [e.id for e in history.search("database")] == [3]
+        assert history.get(3).analysis.startswith("The database")
+
+        with pytest.raises(ValueError, match="Invalid search query"):
+            history.search("AND (")
+
+    def test_from_config_disabled(self, tmp_path):
+        """Test that the history can be turned off."""
+        assert AnalysisHistory.from_config({'history_enabled': False}) is None
+        history = AnalysisHistory.from_config({'history_directory': str(tmp_path)})
+        assert history.db_path == tmp_path / AnalysisHistory.DB_FILE
+
+
+class TestLogImport:
+    """Test indexing log files written by the output generator."""
+
+    def write_log(self, log_dir, history=None):
+        generator = OutputGenerator(log_dir, dry_run=True, console=Console(quiet=True), history=history)
+        response = LLMResponse(
+            content="{}", model="gpt-4", provider="openai", response_time=1.5,
+            usage={'prompt_tokens': 100, 'completion_tokens': 20, 'total_tokens': 120}
+        )
+        analysis = {
+            'status': 'error',
+            'analysis': 'Disk is full.\nLogs cannot be written.',
+            'issues': ['/var is 100% used', 'journald stopped'],
+        }
+        context = {
+            'command': 'df -h', 'return_code': 1, 'timestamp': '2024-05-01T10:00:00',
+            'output': '/dev/sda1  100%  /var', 'system_info': {'os': 'Linux'}
+        }
+        return generator.write_artifacts(context, analysis, response).log_file
+
+    def test_parse_log_file_matches_recorded_entry(self, tmp_path):
+        """Test that parsing a log file recovers what was recorded when it was written."""
+        history = AnalysisHistory(tmp_path / "history.db")
+        log_file = self.write_log(tmp_path / "logs", history)
+
+        recorded = history.get(1)
+        parsed = parse_log_file(log_file)
+        for name in ('timestamp', 'command', 'return_code', 'status', 'issues', 'provider', 'model',
+                     'prompt_tokens', 'completion_tokens', 'log_file', 'output', 'analysis'):
+            assert getattr(parsed, name) == getattr(recorded, name), name
+        assert parsed.total_tokens == 120
+
+    def test_import_skips_indexed_and_unreadable_files(self, tmp_path):
+        """Test that importing indexes new log files once."""
+        log_dir = tmp_path / "logs"
+        self.write_log(log_dir)
+        self.write_log(log_dir)
+        (log_dir / "cmdrx_analysis_20240101_000000.log").write_text("not a cmdrx log")
+        (log_dir / "notes.txt").write_text("ignored")
+
+        history = AnalysisHistory(tmp_path / "history.db")
+        assert history.import_logs([log_dir], workers=1) == {'imported': 2, 'skipped': 0, 'failed': 1}
+        assert history.import_logs([log_dir], workers=1) == {'imported': 0, 'skipped': 2, 'failed': 1}
+        assert len(history.search("journald")) == 2
@@ -0,0 +1,96 @@
+"""
+Tests for CmdRx map-reduce analysis.
+"""
+
+import io
+import threading
+import time
+
+import pytest
+
+from cmdrx.exceptions import LLMError
+from cmdrx.llm import LLMResponse
+from cmdrx.mapreduce import MapReduceAnalyzer, iter_chunks
+
+
+class FakeProvider:
+    """Provider answering map prompts with the part number and merges with a summary."""
+
+    def __init__(self, delay=0.0, fail_on=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.prompts = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def analyze(self, prompt, use_cache=True, refresh=False):
+        with self.lock:
+            self.prompts.append(prompt)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            if self.fail_on and self.fail_on in prompt:
+                raise RuntimeError("boom")
+            if prompt.startswith("You are helping troubleshoot a Linux/Unix command whose output is too large"):
+                part = prompt.split("This is part ", 1)[1].split(" ", 1)[0]
+                return LLMResponse(content=f"- finding from part {part} " + "x" * 40, model="m")
+            return LLMResponse(content="- merged findings", model="m")
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+class TestMapReduce:
+    """Test chunked map-reduce analysis."""
+
+    def test_chunks_split_on_line_boundaries(self):
+        """Test that chunks hold whole lines within the chunk size."""
+        text = "".join(f"\x1b[31mline {i:03d}\x1b[0m\n" for i in range(100))
+        chunks = list(iter_chunks(io.StringIO(text), chunk_tokens=10))
+
+        assert all(len(chunk) <= 40 for chunk in chunks)
+        lines = [line for chunk in chunks for line in chunk.split("\n")]
+        assert lines == [f"line {i:03d}" for i in range(100)]
+
+    def test_findings_merged_hierarchically(self):
+        """Test map over every chunk and merging until findings fit."""
+        provider = FakeProvider()
+        analyzer = MapReduceAnalyzer(provider, chunk_tokens=10, concurrency=3, findings_budget=50)
+        chunks = [f"chunk {i}" for i in range(10)]
+
+        result = analyzer.run("journalctl", iter(chunks), total_chunks=10)
+
+        assert result.chunks == 10
+        assert result.map_calls == 10
+        assert result.merge_calls >= 2
+        assert result.levels >= 2
+        assert "merged findings" in result.findings
+        assert any("This is part 10 of 10" in prompt for prompt in provider.prompts)
+
+    def test_small_findings_need_no_merge(self):
+        """Test that findings within budget are returned in order."""
+        analyzer = MapReduceAnalyzer(FakeProvider(), findings_budget=1000)
+
+        result = analyzer.run("dmesg", iter(["a", "b", "c"]), total_chunks=3)
+
+        assert result.merge_calls == 0
+        assert result.findings.index("Part 1:") < result.findings.index("Part 3:")
+        assert "finding from part 2" in result.findings
+
+    def test_concurrency_bounded(self):
+        """Test that no more than the configured number of requests run at once."""
+        provider = FakeProvider(delay=0.02)
+        analyzer = MapReduceAnalyzer(provider, concurrency=2, findings_budget=100000)
+
+        analyzer.run("cmd", iter([f"chunk {i}" for i in range(8)]), total_chunks=8)
+
+        assert provider.peak == 2
+
+    def test_failed_part_raises(self):
+        """Test that a failed map request names the part."""
+        analyzer = MapReduceAnalyzer(FakeProvider(fail_on="chunk 2"))
+
+        with pytest.raises(LLMError, match="part 3"):
+            analyzer.run("cmd", iter(["chunk 0", "chunk 1", "chunk 2"]), total_chunks=3)
@@ -0,0 +1,59 @@
+"""
+Tests for CmdRx periodic re-run monitoring.
+"""
+
+import pytest
+
+from cmdrx.monitor import OutputMonitor, normalize_output, parse_interval
+
+
+class TestParseInterval:
+    """Test --every interval parsing."""
+
+    @pytest.mark.parametrize("text,seconds", [("60", 60), ("30s", 30), ("5m", 300), ("1.5h", 5400)])
+    def test_units(self, text, seconds):
+        """Test plain seconds and unit suffixes."""
+        assert parse_interval(text) == seconds
+
+    @pytest.mark.parametrize("text", ["", "5 minutes", "0s", "-1"])
+    def test_invalid(self, text):
+        """Test that malformed and non-positive intervals are rejected."""
+        with pytest.raises(ValueError):
+            parse_interval(text)
+
+
+class TestOutputMonitor:
+    """Test change detection between runs."""
+
+    def test_volatile_parts_masked(self):
+        """Test that timestamps, PIDs and capture prefixes do not count as changes."""
+        lines = normalize_output(
+            "[+0.001s]      Active: active (running) since Sat 2026-10-17 10:01:02 UTC; 3min 12s ago\n"
+            "[+0.002s]    Main PID: 4242 (nginx)\n"
+            "[+0.002s stderr] Oct 18 02:01:00 vm nginx[4242]: started\n"
+        )
+        assert lines == [
+            "     Active: active (running) since Sat <time> UTC; <duration> ago",
+            "   Main PID: <pid> (nginx)",
+            "[stderr] <time> vm nginx[<pid>]: started",
+        ]
+
+    def test_only_material_changes_analyzed(self):
+        """Test that unchanged runs are skipped and changes come with a diff."""
+        monitor = OutputMonitor()
+        first = "[+0.001s] 2026-10-18 10:00:00 /dev/sda1 81%\n[+0.001s] worker pid=101 ok\n"
+
+        assert monitor.check(first, 0) == ""
+        monitor.analyzed(first, 0)
+
+        same = "[+0.004s] 2026-10-18 10:05:00 /dev/sda1 81%\n[+0.002s] worker pid=202 ok\n"
+        assert monitor.check(same, 0) is None
+
+        changed = "[+0.001s] 2026-10-18 10:10:00 /dev/sda1 97%\n[+0.001s] worker pid=303 ok\n"
+        diff = monitor.check(changed, 1)
+        assert diff.startswith("Exit code changed from 0 to 1")
+        assert "-<time> /dev/sda1 81%" in diff
+        assert "+<time> /dev/sda1 97%" in diff
+
+        # Until a run is analyzed, later runs are compared with the last analyzed one
+        assert monitor.check(same, 0) is None
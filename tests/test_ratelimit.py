@@ -0,0 +1,145 @@
+"""
+Tests for CmdRx client-side rate limiting.
+"""
+
+import asyncio
+import multiprocessing
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from cmdrx.config import ConfigManager
+from cmdrx.exceptions import LLMError, RateLimitError
+from cmdrx.llm import LLMProvider, LLMResponse
+from cmdrx.ratelimit import RateLimiter
+
+
+def acquire_in_process(path, start_together, results):
+    limiter = RateLimiter(path, rpm=60)
+    # Once when ready, once more when the parent has drained the bucket
+    start_together.wait()
+    start_together.wait()
+    start = time.time()
+    limiter.acquire(1)
+    results.put(time.time() - start)
+
+
+class TestRateLimiter:
+    """Test the shared token buckets."""
+
+    def test_requests_paced_after_burst(self, tmp_path):
+        """Test that a full bucket serves a burst and then paces requests."""
+        limiter = RateLimiter(tmp_path / 'p.bucket', rpm=120)
+        waits = [limiter._reserve(0).wait for _ in range(122)]
+
+        assert waits[:120] == [0.0] * 120
+        assert waits[120] == pytest.approx(0.5, abs=0.05)
+        assert waits[121] == pytest.approx(1.0, abs=0.05)
+
+    def test_budget_shared_between_processes(self, tmp_path):
+        """Test that separate processes draw from one bucket."""
+        path = tmp_path / 'p.bucket'
+        context = multiprocessing.get_context('spawn')
+        start_together = context.Barrier(4)
+        results = context.Queue()
+        processes = [
+            context.Process(target=acquire_in_process, args=(path, start_together, results))
+            for _ in range(3)
+        ]
+        for process in processes:
+            process.start()
+        start_together.wait(30)
+
+        # Leave one request in a 60 rpm bucket
+        limiter = RateLimiter(path, rpm=60)
+        for _ in range(59):
+            limiter._reserve(0)
+        start_together.wait(30)
+        for process in processes:
+            process.join(30)
+        waits = sorted(results.get(timeout=5) for _ in processes)
+
+        # One got the last request, the others waited one and two seconds
+        assert waits[0] < 0.5
+        assert waits[1] == pytest.approx(1.0, abs=0.5)
+        assert waits[2] == pytest.approx(2.0, abs=0.5)
+
+    def test_tokens_reconciled_with_usage(self, tmp_path):
+        """Test that the estimate is corrected once the actual usage is known."""
+        limiter = RateLimiter(tmp_path / 'p.bucket', tpm=10000)
+
+        reservation = limiter.acquire(1000)
+        assert limiter.available()['tokens'] == pytest.approx(9000, abs=5)
+
+        limiter.settle(reservation, {'prompt_tokens': 1200, 'completion_tokens': 300, 'total_tokens': 1500})
+        assert limiter.available()['tokens'] == pytest.approx(8500, abs=5)
+
+        limiter.release(limiter.acquire(500))
+        assert limiter.available()['tokens'] == pytest.approx(8500, abs=5)
+
+    def test_tokens_reconciled_with_anthropic_usage(self, tmp_path):
+        """Test that Anthropic's input/output token counts correct the estimate too."""
+        limiter = RateLimiter(tmp_path / 'p.bucket', tpm=10000)
+
+        limiter.settle(limiter.acquire(100), {'input_tokens': 900, 'output_tokens': 100})
+        assert limiter.available()['tokens'] == pytest.approx(9000, abs=5)
+
+    def test_wait_beyond_max_wait_fails(self, tmp_path):
+        """Test that a request is refused without charge instead of waiting too long."""
+        limiter = RateLimiter(tmp_path / 'p.bucket', tpm=600, max_wait=5, name='openai/gpt-4o')
+        limiter.acquire(550)
+
+        with pytest.raises(RateLimitError, match="openai/gpt-4o"):
+            limiter.acquire(200)
+        with pytest.raises(RateLimitError):
+            asyncio.run(limiter.aacquire(200))
+        assert limiter.available()['tokens'] == pytest.approx(50, abs=1)
+
+        # 10 tokens short at 10 tokens per second
+        reservation = asyncio.run(limiter.aacquire(60))
+        assert reservation.wait == pytest.approx(1.0, abs=0.1)
+
+    def test_from_config(self, tmp_path):
+        """Test that provider/model limits take precedence over provider limits."""
+        config = {
+            'cache_directory': str(tmp_path),
+            'rate_limits': {'openai': {'rpm': 500}, 'openai/gpt-4o': {'rpm': 60, 'tpm': 30000}},
+        }
+
+        specific = RateLimiter.from_config(config, 'openai/gpt-4o')
+        fallback = RateLimiter.from_config(config, 'openai/gpt-4o-mini')
+
+        assert (specific.rpm, specific.tpm) == (60, 30000)
+        assert specific.path == tmp_path / 'ratelimit' / 'openai_gpt-4o.bucket'
+        assert (fallback.rpm, fallback.tpm) == (500, 0)
+        assert RateLimiter.from_config(config, 'anthropic/claude') is None
+
+
+class TestProviderRateLimit:
+    """Test rate limiting of LLM requests."""
+
+    def test_attempts_charged_and_limit_error_not_wrapped(self, tmp_path):
+        """Test that each attempt is charged and settled with the reported usage."""
+        config_manager = Mock(spec=ConfigManager)
+        config_manager.get_config.return_value = {
+            'llm_provider': 'custom', 'llm_model': 'm', 'llm_base_url': 'http://127.0.0.1:9/v1',
+            'cache_enabled': False, 'coalesce_requests': False, 'retry_max_attempts': 1,
+            'cache_directory': str(tmp_path), 'rate_limits': {'custom/m': {'rpm': 2, 'tpm': 100000}},
+            'rate_limit_max_wait': 1,
+        }
+        config_manager.get_llm_credentials.return_value = {}
+        with patch.object(LLMProvider, '_create_client'):
+            provider = LLMProvider(config_manager)
+
+        response = LLMResponse(content='{}', model='m', usage={'total_tokens': 2000})
+        with patch.object(provider, '_analyze_openai_compatible', return_value=response):
+            provider.analyze("disk full")
+            provider.analyze("disk full")
+            with pytest.raises(RateLimitError):
+                provider.analyze("disk full")
+
+        available = provider.resilience.limiter.available()
+        assert available['requests'] < 0.1
+        assert available['tokens'] == pytest.approx(96000, abs=10)
+        assert issubclass(RateLimitError, LLMError)
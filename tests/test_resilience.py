@@ -0,0 +1,138 @@
+"""
+Tests for CmdRx retry and circuit breaker handling.
+"""
+
+import asyncio
+import time
+
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from cmdrx.resilience import CircuitBreaker, Resilience, RetryLog, RetryPolicy, get_retry_after
+from cmdrx.exceptions import CircuitOpenError, LLMError, RateLimitError
+from cmdrx.ratelimit import RateLimiter, Reservation
+
+
+class APIStatusError(Exception):
+    """Stand-in for an SDK error carrying an HTTP response."""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = Mock(status_code=status_code, headers=headers or {})
+
+
+class TestResilience:
+    """Test retry policy and circuit breaker behaviour."""
+
+    @pytest.fixture
+    def resilience(self):
+        """Create a resilience wrapper with a fresh breaker."""
+        policy = RetryPolicy(max_attempts=3, base_delay=0.1, max_delay=1.0, deadline=30)
+        return Resilience(policy, CircuitBreaker('test/model', failure_threshold=3, reset_timeout=60))
+
+    @patch('cmdrx.resilience.time.sleep')
+    def test_retries_rate_limit_honouring_retry_after(self, mock_sleep, resilience):
+        """Test that 429 responses are retried after the requested delay."""
+        request = Mock(side_effect=[APIStatusError(429, {'retry-after': '2'}), 'ok'])
+        log = RetryLog()
+
+        assert resilience.call(request, log) == 'ok'
+        assert log.attempts == 2
+        mock_sleep.assert_called_once_with(2.0)
+        assert 'Retry-After' in log.events[0]
+
+    @patch('cmdrx.resilience.time.sleep')
+    def test_client_errors_are_not_retried(self, mock_sleep, resilience):
+        """Test that bad requests fail immediately."""
+        request = Mock(side_effect=LLMError("bad request"))
+        request.side_effect.__cause__ = APIStatusError(400)
+
+        with pytest.raises(LLMError):
+            resilience.call(request, RetryLog())
+
+        assert request.call_count == 1
+        mock_sleep.assert_not_called()
+
+    @patch('cmdrx.resilience.time.sleep')
+    def test_circuit_opens_and_fails_fast(self, mock_sleep, resilience):
+        """Test that repeated failures open the circuit."""
+        request = Mock(side_effect=APIStatusError(503))
+
+        with pytest.raises(APIStatusError):
+            resilience.call(request, RetryLog())
+
+        assert resilience.breaker.state == CircuitBreaker.OPEN
+        assert request.call_count == 3
+
+        with pytest.raises(CircuitOpenError):
+            resilience.call(request, RetryLog())
+        assert request.call_count == 3
+
+    def test_cancelled_half_open_trial_is_handed_back(self):
+        """Test that a trial ended by cancellation does not leave the circuit half-open."""
+        breaker = CircuitBreaker('test/cancelled', failure_threshold=1, reset_timeout=0.05)
+        resilience = Resilience(RetryPolicy(max_attempts=1), breaker)
+        breaker.record_failure()
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        async def main():
+            await asyncio.sleep(0.1)
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(resilience.acall(hang, RetryLog()), 0.05)
+
+        asyncio.run(main())
+        assert breaker.state == CircuitBreaker.OPEN
+        # The next request becomes the trial without waiting another reset timeout
+        assert breaker.retry_in() == 0
+
+        log = RetryLog()
+        with pytest.raises(KeyboardInterrupt):
+            resilience.call(Mock(side_effect=KeyboardInterrupt), log)
+        assert "trial request abandoned" in log.events[-1]
+        assert resilience.call(Mock(return_value='ok'), RetryLog()) == 'ok'
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_rate_limited_half_open_trial_is_handed_back(self):
+        """Test that a trial that never gets rate limit capacity does not leave the circuit half-open."""
+        breaker = CircuitBreaker('test/limited', failure_threshold=1, reset_timeout=0.05)
+        limiter = Mock(spec=RateLimiter)
+        limiter.name = 'test/limited'
+        limiter.acquire.side_effect = RateLimitError("over budget")
+        limiter.aacquire = AsyncMock(side_effect=RateLimitError("over budget"))
+        resilience = Resilience(RetryPolicy(max_attempts=1), breaker, limiter=limiter)
+        breaker.record_failure()
+        time.sleep(0.1)
+        request = Mock(return_value='ok')
+
+        with pytest.raises(RateLimitError):
+            resilience.call(request, RetryLog())
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.retry_in() == 0
+
+        with pytest.raises(RateLimitError):
+            asyncio.run(resilience.acall(AsyncMock(return_value='ok'), RetryLog()))
+        assert breaker.retry_in() == 0
+        request.assert_not_called()
+
+        limiter.acquire.side_effect = None
+        limiter.acquire.return_value = Reservation(tokens=0, wait=0.0)
+        assert resilience.call(request, RetryLog()) == 'ok'
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_deadline_budget(self):
+        """Test that retries stop when the deadline would be exceeded."""
+        policy = RetryPolicy(max_attempts=5, base_delay=0.1, deadline=1)
+        resilience = Resilience(policy, CircuitBreaker('test/deadline'))
+        request = Mock(side_effect=APIStatusError(429, {'retry-after': '5'}))
+
+        with pytest.raises(LLMError, match="deadline"):
+            resilience.call(request, RetryLog())
+        assert request.call_count == 1
+
+    def test_retry_after_milliseconds(self):
+        """Test parsing of retry-after-ms headers."""
+        assert get_retry_after(APIStatusError(429, {'retry-after-ms': '1500'})) == 1.5
+        assert get_retry_after(APIStatusError(500)) is None
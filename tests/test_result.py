@@ -0,0 +1,141 @@
+"""
+Tests for the CmdRx library API.
+"""
+
+import asyncio
+import io
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from rich.console import Console
+
+from cmdrx.config import ConfigManager
+from cmdrx.core import CmdRxCore
+from cmdrx.llm import LLMResponse
+from cmdrx.result import ArtifactSink, ConsoleSink
+
+ANALYSIS = {
+    "analysis": "Disk is full",
+    "status": "error",
+    "issues": ["/ is 100% used"],
+    "troubleshooting_steps": [{"step": 1, "description": "Find large files", "command": "du -sh /*"}],
+    "suggested_fixes": [{"description": "Clean apt cache", "commands": ["apt-get clean"], "risk_level": "low"}],
+    "additional_info": "",
+}
+
+
+def respond(prompt, use_cache=True, refresh=False, timeout=None):
+    """Answer with an analysis naming the command from the prompt."""
+    command = re.search(r"Command executed: (.*)", prompt).group(1)
+    return LLMResponse(
+        content=json.dumps({**ANALYSIS, "analysis": f"Analysis of {command}"}),
+        model="gpt-4", provider="openai",
+        usage={'prompt_tokens': 100, 'completion_tokens': 20, 'total_tokens': 120}
+    )
+
+
+@pytest.fixture
+def console_output():
+    return io.StringIO()
+
+
+@pytest.fixture
+def core(tmp_path, console_output):
+    config_manager = Mock(spec=ConfigManager)
+    config_manager.get_config.return_value = {'llm_provider': 'openai', 'history_enabled': False}
+    provider = Mock()
+    provider.analyze.side_effect = respond
+    return CmdRxCore(
+        verbose=True,
+        log_dir=str(tmp_path),
+        console=Console(file=console_output),
+        config_manager=config_manager,
+        llm_provider=provider
+    )
+
+
+class TestAnalyze:
+    """Test the side-effect-free analysis API."""
+
+    def test_returns_typed_result_without_side_effects(self, core, tmp_path, console_output):
+        """Test that nothing is displayed or written without sinks."""
+        result = core.analyze("df -h", "/dev/sda1 100%", return_code=1)
+
+        assert (result.command, result.return_code, result.status) == ("df -h", 1, "error")
+        assert result.analysis == "Analysis of df -h"
+        assert result.issues == ["/ is 100% used"]
+        assert result.suggested_fixes[0]['commands'] == ["apt-get clean"]
+        assert (result.prompt_tokens, result.completion_tokens, result.total_tokens) == (100, 20, 120)
+        assert set(result.timings) == {'prepare', 'llm', 'parse', 'sinks', 'total'}
+        assert result.artifacts is None
+
+        assert console_output.getvalue() == ""
+        assert list(tmp_path.iterdir()) == []
+        assert core.last_analysis is None
+
+    def test_plain_text_response_is_quiet(self, core, console_output):
+        """Test that the plain text fallback is not reported even when verbose."""
+        core.llm_provider.analyze.side_effect = None
+        core.llm_provider.analyze.return_value = LLMResponse(content="All good", model="gpt-4")
+
+        result = core.analyze("uptime", "up 3 days")
+
+        assert (result.status, result.analysis, result.issues) == ("info", "All good", [])
+        assert result.total_tokens == 0
+        assert console_output.getvalue() == ""
+
+    def test_sinks(self, core, tmp_path):
+        """Test that the artifact and console sinks are opt-in."""
+        screen = io.StringIO()
+        result = core.analyze(
+            "df -h", "/dev/sda1 100%", 1,
+            sinks=[ArtifactSink(core.output_generator), ConsoleSink(Console(file=screen, width=100))]
+        )
+
+        assert "Analysis of df -h" in result.artifacts.log_file.read_text()
+        assert "apt-get clean" in result.artifacts.fix_script.read_text()
+        assert "Analysis (ERROR)" in screen.getvalue()
+        assert "Clean apt cache" in screen.getvalue()
+
+    def test_concurrent_callers_share_one_core(self, core):
+        """Test that results of concurrent analyses do not mix."""
+        commands = [f"check-{i}" for i in range(64)]
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(lambda c: core.analyze(c, f"output of {c}"), commands))
+
+        assert [r.command for r in results] == commands
+        assert [r.analysis for r in results] == [f"Analysis of {c}" for c in commands]
+
+    def test_aanalyze(self, core):
+        """Test the async variant."""
+        core.llm_provider.aanalyze = AsyncMock(side_effect=respond)
+
+        result = asyncio.run(core.aanalyze("df -h", "/dev/sda1 100%", timeout=5))
+
+        assert result.analysis == "Analysis of df -h"
+        assert core.llm_provider.aanalyze.call_args.kwargs['timeout'] == 5
+        core.llm_provider.analyze.assert_not_called()
+
+    def test_aanalyze_matches_analyze(self, core):
+        """Test that the async variant passes background and runs map-reduce off the loop."""
+        reduce_provider = Mock(aanalyze=AsyncMock(side_effect=respond))
+        prepare_threads = []
+
+        def prepare_output(context, source, on_progress=None, quiet=False):
+            prepare_threads.append(threading.current_thread())
+            context['mapreduce'] = "output split into 3 chunks"
+            return reduce_provider
+
+        core._prepare_output = prepare_output
+
+        result = asyncio.run(core.aanalyze("df -h", "/dev/sda1 100%", background="Nightly backup host"))
+
+        assert result.analysis == "Analysis of df -h"
+        prompt = reduce_provider.aanalyze.call_args[0][0]
+        assert "Nightly backup host" in prompt
+        assert "output split into 3 chunks" in prompt
+        assert prepare_threads and prepare_threads[0] is not threading.main_thread()
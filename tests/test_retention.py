@@ -0,0 +1,105 @@
+"""
+Tests for CmdRx log retention.
+"""
+
+import gzip
+import os
+import time
+
+from cmdrx.history import AnalysisHistory, HistoryEntry
+from cmdrx.retention import GarbageCollector, RetentionPolicy
+from cmdrx.store import AnalysisStore
+
+DAY = 86400
+
+
+def write(log_dir, name, content="x" * 100, age_days=0):
+    path = log_dir / name
+    path.write_text(content)
+    mtime = time.time() - age_days * DAY
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+class TestGarbageCollector:
+    """Test incremental enforcement of the retention policy."""
+
+    def test_only_journaled_files_after_first_scan(self, tmp_path):
+        """Test that later runs read the journal instead of rescanning."""
+        write(tmp_path, "cmdrx_analysis_1.log")
+        write(tmp_path, "notes.txt")
+        collector = GarbageCollector(tmp_path, RetentionPolicy(max_files=100))
+        assert collector.collect().discovered == 1
+
+        journaled = write(tmp_path, "cmdrx_analysis_2.log")
+        collector.note([journaled, None])
+        write(tmp_path, "cmdrx_analysis_3.log")
+        result = collector.collect()
+        assert (result.discovered, result.files) == (1, 2)
+
+        assert collector.collect(rescan=True).files == 3
+
+    def test_oldest_deleted_beyond_limits(self, tmp_path):
+        """Test the age, count and size limits, oldest first."""
+        for i, age in enumerate([40, 20, 10, 5, 1]):
+            write(tmp_path, f"cmdrx_analysis_{i}.log", age_days=age)
+        collector = GarbageCollector(
+            tmp_path, RetentionPolicy(max_age_days=30, max_files=3, compress_after_days=0)
+        )
+
+        result = collector.collect()
+        assert (result.deleted, result.freed_bytes, result.files) == (2, 200, 3)
+        assert sorted(os.listdir(tmp_path)) == [
+            ".cmdrx", "cmdrx_analysis_2.log", "cmdrx_analysis_3.log", "cmdrx_analysis_4.log"
+        ]
+
+        collector.policy = RetentionPolicy(max_bytes=150, compress_after_days=0)
+        assert collector.collect(limit=1).deleted == 1
+        assert collector.collect().files == 1
+
+    def test_old_logs_compressed_and_history_updated(self, tmp_path):
+        """Test compression keeps logs readable, scripts runnable and history current."""
+        log = write(tmp_path, "cmdrx_analysis_1.log", "analysis text", age_days=8)
+        script = write(tmp_path, "cmdrx_fix_1.sh", "#!/bin/bash", age_days=8)
+        write(tmp_path, "cmdrx_analysis_2.log", age_days=1)
+        history = AnalysisHistory(tmp_path / "history" / "history.db")
+        history.record(HistoryEntry(timestamp="2024-05-01T10:00:00", command="df", log_file=str(log.resolve())))
+
+        collector = GarbageCollector(tmp_path, RetentionPolicy(compress_after_days=7), history=history)
+        assert collector.collect().compressed == 1
+
+        compressed = tmp_path / "cmdrx_analysis_1.log.gz"
+        with gzip.open(compressed, 'rt') as f:
+            assert f.read() == "analysis text"
+        assert not log.exists()
+        assert script.read_text() == "#!/bin/bash"
+        assert abs(compressed.stat().st_mtime - (time.time() - 8 * DAY)) < 5
+        assert history.get(1).log_file == str(compressed.resolve())
+
+    def test_closed_store_segments_expire(self, tmp_path):
+        """Test that complete store segments are journaled and can be deleted."""
+        collector = GarbageCollector(tmp_path, RetentionPolicy(max_files=1))
+        collector.collect()
+        store = AnalysisStore(tmp_path, segment_bytes=100)
+        store.on_segment_closed = collector.note
+        for i in range(3):
+            store.append({'n': i, 'output': os.urandom(60).hex()})
+
+        assert collector.collect().deleted == 1
+        assert store.get(1) is None
+        assert store.get(3)['n'] == 2
+
+    def test_concurrent_collection_skipped(self, tmp_path):
+        """Test that only one collection runs at a time."""
+        collector = GarbageCollector(tmp_path, RetentionPolicy(max_files=1))
+        with collector._lock() as locked:
+            assert locked
+            assert GarbageCollector(tmp_path, RetentionPolicy(max_files=1)).collect().skipped
+
+    def test_from_config(self, tmp_path):
+        """Test that no collector is created without limits."""
+        assert GarbageCollector.from_config({}, tmp_path) is None
+        assert GarbageCollector.from_config({'retention_compress_after_days': 0}, tmp_path) is None
+        collector = GarbageCollector.from_config({'retention_max_files': 10}, tmp_path)
+        assert collector.policy.compress_after_days == 0
+        assert not collector.schedule()
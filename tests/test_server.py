@@ -0,0 +1,190 @@
+"""
+Tests for the CmdRx HTTP server.
+"""
+
+import json
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+from unittest.mock import Mock
+
+import pytest
+from rich.console import Console
+
+from cmdrx.config import ConfigManager
+from cmdrx.core import CmdRxCore
+from cmdrx.exceptions import LLMError
+from cmdrx.llm import LLMResponse
+from cmdrx.result import ArtifactSink
+from cmdrx.server import AnalysisServer
+
+
+class StandInLLM:
+    """Local stand-in for the LLM provider; can be held to keep workers busy."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.release.set()
+        self.calls = 0
+        self.error = None
+        self.on_event = None
+
+    def analyze(self, prompt, use_cache=True, refresh=False):
+        self.calls += 1
+        self.release.wait(10)
+        if self.error:
+            raise self.error
+        return LLMResponse(
+            content=json.dumps({"analysis": "Disk is full", "status": "error", "issues": ["/ is 100% used"],
+                                "suggested_fixes": [{"description": "Clean", "commands": ["apt-get clean"]}]}),
+            model="stand-in", provider="custom",
+            usage={'prompt_tokens': 90, 'completion_tokens': 30, 'total_tokens': 120}
+        )
+
+
+def start_server(tmp_path, **kwargs):
+    config_manager = Mock(spec=ConfigManager)
+    config_manager.get_config.return_value = {'history_enabled': False}
+    llm = StandInLLM()
+    core = CmdRxCore(
+        log_dir=str(tmp_path), console=Console(quiet=True),
+        config_manager=config_manager, llm_provider=llm
+    )
+    server = AnalysisServer(core, address=('127.0.0.1', 0), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, llm
+
+
+def call(server, path, body=None, token=None):
+    """Send a request; returns the status, headers and decoded body."""
+    data = body if isinstance(body, bytes) or body is None else json.dumps(body).encode()
+    req = urllib.request.Request(server.url + path, data=data, method='POST' if data is not None else 'GET')
+    if token:
+        req.add_header('Authorization', f"Bearer {token}")
+    try:
+        with urllib.request.urlopen(req, timeout=10) as response:
+            status, headers, raw = response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        status, headers, raw = e.code, e.headers, e.read()
+    is_json = headers.get('Content-Type') == 'application/json'
+    return status, headers, json.loads(raw) if is_json else raw.decode()
+
+
+@pytest.fixture
+def serve(tmp_path):
+    servers = []
+
+    def start(**kwargs):
+        server, llm = start_server(tmp_path, **kwargs)
+        servers.append(server)
+        return server, llm
+
+    yield start
+
+    for server in servers:
+        server.shutdown()
+        server.close(timeout=5)
+
+
+REQUEST = {'command': 'df -h', 'output': '/dev/sda1 100%', 'return_code': 1}
+
+
+class TestAnalysisServer:
+    """Test analyses, backpressure and monitoring over HTTP."""
+
+    def test_analysis_round_trip(self, serve, tmp_path):
+        """Test that a posted output is analyzed, written and counted."""
+        server, llm = serve()
+        server.sinks = [ArtifactSink(server.core.output_generator)]
+
+        status, _, body = call(server, '/v1/analyze', REQUEST)
+
+        assert status == 200
+        assert (body['command'], body['return_code'], body['status']) == ('df -h', 1, 'error')
+        assert body['issues'] == ["/ is 100% used"]
+        assert body['usage']['total_tokens'] == 120
+        assert {'queue', 'llm', 'total'} <= set(body['timings'])
+        assert "Disk is full" in (tmp_path / body['artifacts']['log_file']).read_text()
+
+        _, _, metrics = call(server, '/metrics')
+        assert 'cmdrx_requests_total{outcome="ok"} 1' in metrics
+        assert 'cmdrx_tokens_total{kind="prompt"} 90' in metrics
+        assert 'cmdrx_workers 4' in metrics
+
+    def test_saturated_queue_rejected_with_retry_after(self, serve):
+        """Test backpressure when all workers are busy and the queue is full."""
+        server, llm = serve(workers=1, queue_size=1)
+        llm.release.clear()
+
+        responses = []
+        clients = [
+            threading.Thread(target=lambda: responses.append(call(server, '/v1/analyze', REQUEST)))
+            for _ in range(2)
+        ]
+        for client in clients:
+            client.start()
+        deadline = time.time() + 5
+        while (server.busy, server.health()['queued']) != (1, 1) and time.time() < deadline:
+            time.sleep(0.01)
+
+        status, headers, body = call(server, '/v1/analyze', REQUEST)
+        assert status == 503
+        assert int(headers['Retry-After']) >= 1
+        assert call(server, '/healthz')[2]['status'] == 'saturated'
+
+        llm.release.set()
+        for client in clients:
+            client.join(10)
+        assert [r[0] for r in responses] == [200, 200]
+        assert llm.calls == 2
+        assert 'cmdrx_requests_total{outcome="rejected"} 1' in call(server, '/metrics')[2]
+
+    def test_invalid_requests(self, serve):
+        """Test that malformed requests are answered without reaching the LLM."""
+        server, llm = serve()
+
+        assert call(server, '/v1/analyze', b'{not json')[0] == 400
+        assert call(server, '/v1/analyze', {'output': 'x'})[0] == 400
+        assert call(server, '/v1/analyze', {**REQUEST, 'return_code': '1'})[0] == 400
+        assert call(server, '/v2/analyze', REQUEST)[0] == 404
+        assert llm.calls == 0
+        assert 'cmdrx_requests_total{outcome="invalid"} 3' in call(server, '/metrics')[2]
+
+    def test_bad_length_and_stalled_body(self, serve):
+        """Test that a negative Content-Length or a stalled body does not pin a handler."""
+        server, llm = serve(request_timeout=0.3)
+
+        def send_raw(length, body):
+            with socket.create_connection(server.server_address[:2], timeout=5) as sock:
+                sock.sendall(
+                    f"POST /v1/analyze HTTP/1.1\r\nHost: x\r\nContent-Length: {length}\r\n\r\n".encode() + body
+                )
+                # The connection stays open; only the server may end the exchange
+                return sock.recv(4096).decode().split("\r\n", 1)[0]
+
+        assert send_raw(-1, b'{}') == "HTTP/1.1 400 Bad Request"
+        started = time.monotonic()
+        assert send_raw(100, b'{"command": ') == "HTTP/1.1 408 Request Timeout"
+        assert time.monotonic() - started < 3
+        assert llm.calls == 0
+
+    def test_llm_failure(self, serve):
+        """Test that a failed LLM request is reported as a bad gateway."""
+        server, llm = serve()
+        llm.error = LLMError("upstream down")
+
+        status, _, body = call(server, '/v1/analyze', REQUEST)
+
+        assert status == 502
+        assert "upstream down" in body['error']
+
+    def test_bearer_token(self, serve):
+        """Test that analyses and metrics require the token, health checks do not."""
+        server, llm = serve(token='s3cret')
+
+        assert call(server, '/v1/analyze', REQUEST)[0] == 401
+        assert call(server, '/metrics', token='wrong')[0] == 401
+        assert call(server, '/v1/analyze', REQUEST, token='s3cret')[0] == 200
+        assert call(server, '/healthz')[2]['status'] == 'ok'
@@ -0,0 +1,52 @@
+"""
+Tests for CmdRx startup imports.
+
+Shell hooks run cmdrx constantly, so the entry point must not load heavy
+modules before they are needed. scripts/startup_benchmark.py measures the
+timing; these tests guard which modules are loaded.
+"""
+
+import subprocess
+import sys
+
+import cmdrx
+
+HEAVY_MODULES = ("openai", "rich", "keyring", "cmdrx.core", "cmdrx.config", "cmdrx.llm")
+
+
+def loaded_modules(code, args=(), stdin=None, env=None):
+    """Run code in a fresh interpreter and return the modules it loaded."""
+    script = f"{code}\nimport sys\nprint(' '.join(sorted(sys.modules)), file=sys.stderr)"
+    result = subprocess.run(
+        [sys.executable, "-c", script, *args],
+        input=stdin,
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    return set(result.stderr.split()), result
+
+
+class TestStartup:
+    """Test that fast paths stay light."""
+
+    def test_package_import_is_lazy(self):
+        """Test that importing the package loads no heavy modules."""
+        modules, _ = loaded_modules("import cmdrx")
+        assert not modules & set(HEAVY_MODULES)
+        # Public classes are still available on access
+        assert cmdrx.CmdRxCore.__name__ == "CmdRxCore"
+        assert "LLMProvider" in dir(cmdrx)
+
+    def test_version_loads_no_heavy_modules(self):
+        """Test that cmdrx --version only needs click."""
+        code = (
+            "from cmdrx.cli import main\n"
+            "try:\n"
+            "    main(['--version'])\n"
+            "except SystemExit:\n"
+            "    pass"
+        )
+        modules, result = loaded_modules(code)
+        assert f"CmdRx version {cmdrx.__version__}" in result.stdout
+        assert not modules & set(HEAVY_MODULES)
@@ -0,0 +1,84 @@
+"""
+Tests for the CmdRx analysis store.
+"""
+
+import gzip
+import json
+
+from rich.console import Console
+
+from cmdrx.llm import LLMResponse
+from cmdrx.output import OutputGenerator
+from cmdrx.store import AnalysisStore
+
+
+class TestAnalysisStore:
+    """Test appending to and reading from segmented storage."""
+
+    def test_random_access_across_rotated_segments(self, tmp_path):
+        """Test that records are found by ID after segments rotate."""
+        store = AnalysisStore(tmp_path, segment_bytes=200)
+        ids = [store.append({'n': i, 'output': f"line {i}\n" * 20}) for i in range(10)]
+
+        assert ids == list(range(1, 11))
+        assert store.count() == 10
+        assert len(list(tmp_path.glob("analyses-*.jsonl.gz"))) > 1
+        assert store.get(7)['n'] == 6
+        assert store.get(0) is None
+        assert store.get(11) is None
+
+    def test_segments_are_plain_gzip_json_lines(self, tmp_path):
+        """Test that segments can be read without cmdrx."""
+        store = AnalysisStore(tmp_path)
+        for i in range(3):
+            store.append({'n': i})
+
+        with gzip.open(tmp_path / "analyses-000001.jsonl.gz", 'rt') as f:
+            assert [json.loads(line)['n'] for line in f] == [0, 1, 2]
+
+    def test_interrupted_append_is_discarded(self, tmp_path):
+        """Test that bytes written without an index entry are overwritten."""
+        store = AnalysisStore(tmp_path)
+        store.append({'n': 1})
+        with open(tmp_path / "analyses-000001.jsonl.gz", 'ab') as f:
+            f.write(b"partial record")
+        with open(store.index_path, 'ab') as f:
+            f.write(b"\x01\x02")
+
+        assert store.append({'n': 2}) == 2
+        assert store.get(2) == {'n': 2}
+        with gzip.open(tmp_path / "analyses-000001.jsonl.gz", 'rt') as f:
+            assert len(f.readlines()) == 2
+
+    def test_from_config(self, tmp_path):
+        """Test that the store is only used with log_format 'store'."""
+        assert AnalysisStore.from_config({}, tmp_path) is None
+        store = AnalysisStore.from_config({'log_format': 'store', 'store_compression': 'zstd'}, tmp_path)
+        assert store.compression in ('gzip', 'zstd')
+
+
+class TestStoredOutput:
+    """Test writing analyses to the store and rendering them."""
+
+    def test_rendered_record_matches_log_file(self, tmp_path):
+        """Test that cmdrx show renders what the log file would have contained."""
+        response = LLMResponse(
+            content='{"status": "error"}', model="gpt-4", provider="openai",
+            usage={'total_tokens': 12}, events=["retry 1"]
+        )
+        context = {
+            'command': 'df -h', 'return_code': 1, 'timestamp': '2024-05-01T10:00:00',
+            'output': '/dev/sda1 100%', 'system_info': {'os': 'Linux'}
+        }
+        analysis = {'status': 'error', 'analysis': 'Disk full', 'issues': ['/ is full']}
+
+        text_generator = OutputGenerator(tmp_path / "text", console=Console(quiet=True))
+        log_file = text_generator.write_artifacts(context, analysis, response).log_file
+
+        store = AnalysisStore(tmp_path / "store")
+        generator = OutputGenerator(tmp_path / "store", console=Console(quiet=True), store=store)
+        artifacts = generator.write_artifacts(context, analysis, response)
+
+        assert artifacts.log_file is None
+        assert list((tmp_path / "store").glob("*.log")) == []
+        assert generator.render_record(store.get(artifacts.record_id)) == log_file.read_text()
@@ -0,0 +1,50 @@
+"""
+Tests for CmdRx streaming support.
+"""
+
+import json
+
+from cmdrx.streaming import IncrementalJSONParser
+
+
+SAMPLE = {
+    "analysis": "Service {failed}, see \"journal\"",
+    "status": "error",
+    "issues": ["Port 80 in use", "Bad config, line 3"],
+    "troubleshooting_steps": [{"step": 1, "description": "Check", "command": "ss -ltnp"}],
+    "suggested_fixes": [],
+    "additional_info": ""
+}
+
+
+class TestIncrementalJSONParser:
+    """Test incremental JSON parsing."""
+
+    def test_fields_complete_in_order(self):
+        """Test that fields are reported as soon as they are complete."""
+        parser = IncrementalJSONParser()
+        text = json.dumps(SAMPLE, indent=2)
+
+        completed = []
+        for i in range(0, len(text), 7):
+            completed.extend(key for key, _ in parser.feed(text[i:i + 7]))
+
+        assert completed == list(SAMPLE.keys())
+        assert parser.fields == SAMPLE
+        assert parser.complete
+
+    def test_ignores_leading_text(self):
+        """Test that text before the object, such as a fence, is skipped."""
+        parser = IncrementalJSONParser()
+        parser.feed("```json\n" + json.dumps(SAMPLE) + "\n```")
+
+        assert parser.fields == SAMPLE
+
+    def test_truncated_stream_keeps_complete_fields(self):
+        """Test that a cut-off stream still yields the finished fields."""
+        parser = IncrementalJSONParser()
+        text = json.dumps(SAMPLE)
+        parser.feed(text[:text.index('"troubleshooting_steps"') + 30])
+
+        assert set(parser.fields) == {"analysis", "status", "issues"}
+        assert not parser.complete
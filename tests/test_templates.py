@@ -0,0 +1,68 @@
+"""
+Tests for CmdRx log template mining.
+"""
+
+from cmdrx.compaction import OutputCompactor
+from cmdrx.templates import TemplateMiner
+
+
+def sample_logs(count):
+    """Generate log lines from a few message shapes."""
+    users = ['alice', 'bob', 'carol']
+    for i in range(count):
+        timestamp = f"2024-05-01T10:{i // 60 % 60:02d}:{i % 60:02d}Z"
+        if i % 3 == 0:
+            yield f"{timestamp} INFO session opened for user {users[i // 3 % len(users)]} from 10.0.0.{i % 250}"
+        elif i % 3 == 1:
+            yield f"{timestamp} INFO request {i} took {i % 90}ms"
+        else:
+            yield f"{timestamp} ERROR connection to db-{i % 2} refused"
+
+
+class TestTemplateMiner:
+    """Test Drain-style template mining."""
+
+    def test_lines_grouped_into_templates(self):
+        """Test that lines with the same shape share one template."""
+        miner = TemplateMiner(min_lines=10)
+        for line in sample_logs(300):
+            miner.add(line)
+
+        templates = {template.text: template for template in miner.templates}
+
+        assert len(templates) == 3
+        error = templates["ERROR connection to db-<*> refused"]
+        assert error.count == 100
+        assert error.first_seen == "2024-05-01T10:00:02Z"
+        assert error.last_seen == "2024-05-01T10:04:59Z"
+        assert error.samples[3] == ["db-0", "db-1"]
+        # Non-numeric variables are found by comparing lines
+        assert "INFO session opened for user <*> from <*>.<*>.<*>.<*>" in templates
+        assert miner.worthwhile()
+
+    def test_summary_lists_errors_first_within_budget(self):
+        """Test summary ordering and size."""
+        miner = TemplateMiner()
+        for line in sample_logs(3000):
+            miner.add(line)
+
+        summary = miner.summarize(token_budget=2000)
+        lines = summary.splitlines()
+
+        assert lines[0].startswith("[log template summary by cmdrx: 3,000 lines, 3 templates")
+        assert "ERROR connection to db-<*> refused" in lines[1]
+        assert len(summary) < 2000 * 4
+
+    def test_compactor_uses_templates_for_large_logs(self):
+        """Test that compaction produces a template summary once worthwhile."""
+        compactor = OutputCompactor(token_budget=500, miner=TemplateMiner(min_lines=1000))
+        compactor.feed("\n".join(sample_logs(1500)))
+        result = compactor.finish()
+
+        assert result.template_count == 3
+        assert result.templates.startswith("[log template summary")
+        assert "summarized as 3 log templates" in result.summary()
+
+        small = OutputCompactor(token_budget=500, miner=TemplateMiner(min_lines=1000))
+        small.feed("\n".join(sample_logs(50)))
+        assert small.finish().templates is None
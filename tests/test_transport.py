@@ -0,0 +1,98 @@
+"""
+Tests for CmdRx connection pooling and async clients.
+"""
+
+import asyncio
+import gc
+from unittest.mock import AsyncMock, Mock, patch
+
+from cmdrx.config import ConfigManager
+from cmdrx.llm import LLMProvider
+from cmdrx.transport import TransportManager
+
+
+def make_provider():
+    config_manager = Mock(spec=ConfigManager)
+    config_manager.get_config.return_value = {
+        'llm_provider': 'custom', 'llm_model': 'm', 'llm_base_url': 'http://127.0.0.1:9/v1',
+        'cache_enabled': False,
+    }
+    config_manager.get_llm_credentials.return_value = {}
+    with patch.object(LLMProvider, '_create_client'):
+        return LLMProvider(config_manager)
+
+
+class TestProviderAsyncClients:
+    """Test the per-event-loop async clients of a provider."""
+
+    def test_one_client_per_loop_released_with_the_loop(self):
+        """Test that a loop reuses its client and closed loops do not keep theirs."""
+        provider = make_provider()
+
+        async def get_twice():
+            return provider._get_async_client(), provider._get_async_client()
+
+        with patch.object(provider, '_create_async_client', side_effect=lambda: object()) as create:
+            first, again = asyncio.run(get_twice())
+            gc.collect()
+            second, _ = asyncio.run(get_twice())
+
+        assert first is again
+        assert second is not first
+        assert create.call_count == 2
+        gc.collect()
+        assert len(provider._async_clients) == 0
+
+    def test_aclose_evicts_loop_client(self):
+        """Test that aclose() forgets the running loop's client."""
+        provider = make_provider()
+        provider.transport = Mock(aclose=AsyncMock())
+
+        async def use_and_close():
+            provider._get_async_client()
+            assert len(provider._async_clients) == 1
+            await provider.aclose()
+            return len(provider._async_clients)
+
+        with patch.object(provider, '_create_async_client', side_effect=lambda: object()):
+            assert asyncio.run(use_and_close()) == 0
+
+
+class TestTransportManager:
+    """Test the shared connection pools."""
+
+    def test_shared_per_settings(self):
+        """Test that providers with the same pool settings share one manager."""
+        config = {'http_pool_size': 7, 'http_keepalive_connections': 3}
+
+        manager = TransportManager.shared(config)
+
+        assert TransportManager.shared(dict(config)) is manager
+        assert TransportManager.shared({**config, 'http_pool_size': 8}) is not manager
+        assert manager.get_info()['pool_size'] == 7
+
+    def test_async_client_per_loop_and_aclose(self):
+        """Test that a loop reuses its client until aclose() evicts and closes it."""
+        manager = TransportManager()
+
+        async def use_and_close():
+            client = manager.async_client()
+            assert manager.async_client() is client
+            await manager.aclose()
+            return client, len(manager._async_clients)
+
+        with patch.object(manager, '_create_async_client', side_effect=lambda: Mock(aclose=AsyncMock())):
+            client, remaining = asyncio.run(use_and_close())
+
+        client.aclose.assert_awaited_once()
+        assert remaining == 0
+
+    def test_warm_up_fails_softly(self):
+        """Test that an unreachable endpoint or client error only reports False."""
+        manager = TransportManager()
+
+        with patch.object(manager, 'sync_client', side_effect=OSError("connection refused")):
+            assert manager.warm_up('http://127.0.0.1:9/v1', timeout=0.1) is False
+
+        with patch.object(manager, 'sync_client', return_value=Mock()):
+            assert manager.warm_up('http://127.0.0.1:9/v1') is True